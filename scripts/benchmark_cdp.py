@@ -0,0 +1,106 @@
+"""
+Latence par commande: execute_script (chromedriver) vs websocket DevTools
+Usage: python scripts/benchmark_cdp.py [--iterations 200] [--url URL]
+
+Ouvre un Chrome local sur la fixture du calendrier (ou --url), ouvre le
+calendrier puis exécute les scripts chauds du scraper (mois chargés,
+cellules d'un mois, attente des prix, clic Suivant/Précédent) par les deux
+transports. Affiche moyenne, p50 et p95 par script et transport.
+Nécessite websocket-client (pip install websocket-client).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+os.environ.setdefault("PACING_ENABLED", "false")
+
+from benchmark_engines import FIXTURE_PAGE, start_fixture_server
+from src.core.cdp_transport import WEBSOCKET_AVAILABLE, TRANSPORT_CDP, TRANSPORT_WEBDRIVER
+from src.core.driver_manager import DriverManager
+from src.scrapers.calendar_extraction import (
+    CLICK_NAV_SCRIPT, GRID_CELLS_SCRIPT, MONTH_GROUPS_SCRIPT, NEXT_LABEL, PREV_LABEL,
+    WAIT_PRICES_SCRIPT, build_url, month_prefix,
+)
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def measure(run, iterations: int) -> list:
+    """Durées (ms) de `iterations` appels"""
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        run(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence WebDriver vs CDP direct")
+    parser.add_argument("--iterations", type=int, default=200, help="Appels par script et transport")
+    parser.add_argument("--url", default=None, help="Page calendrier (défaut: fixture locale)")
+    args = parser.parse_args()
+
+    if not WEBSOCKET_AVAILABLE:
+        print("⚠️  websocket-client non installé (pip install websocket-client)")
+        sys.exit(1)
+
+    server = None
+    url = args.url
+    if not url:
+        server = start_fixture_server()
+        url = build_url("CDG", "JFK", f"http://127.0.0.1:{server.server_address[1]}/{FIXTURE_PAGE}")
+
+    manager = DriverManager(headless=True)
+    driver = manager.create_driver()
+    try:
+        driver.get(url)
+        driver.execute_script("document.querySelector(\"input[aria-label*='Départ']\").click();")
+        time.sleep(1)
+        cdp = manager.open_cdp_session()
+        if not cdp:
+            print("❌ Websocket DevTools injoignable")
+            sys.exit(1)
+
+        today = date.today()
+        prefix = month_prefix(today.year, today.month)
+        labels = [NEXT_LABEL, PREV_LABEL]
+        scripts = {
+            "mois chargés": (MONTH_GROUPS_SCRIPT, lambda i: ()),
+            "cellules du mois": (GRID_CELLS_SCRIPT, lambda i: (prefix,)),
+            "attente des prix": (WAIT_PRICES_SCRIPT, lambda i: (prefix, 4, 5000)),
+            "clic navigation": (CLICK_NAV_SCRIPT, lambda i: (labels[i % 2],)),
+        }
+        transports = {
+            TRANSPORT_WEBDRIVER: lambda script, params: driver.execute_script(script, *params),
+            TRANSPORT_CDP: lambda script, params: cdp.evaluate(script, *params, await_promise=True),
+        }
+
+        print(f"{args.iterations} appels par script sur {url}\n")
+        print(f"{'script':<18} {'transport':<10} {'moy':>8} {'p50':>8} {'p95':>8}")
+        for name, (script, params) in scripts.items():
+            for transport, run in transports.items():
+                samples = measure(lambda i: run(script, params(i)), args.iterations)
+                print(
+                    f"{name:<18} {transport:<10} {statistics.mean(samples):>6.2f}ms "
+                    f"{percentile(samples, 0.5):>6.2f}ms {percentile(samples, 0.95):>6.2f}ms"
+                )
+    finally:
+        manager.close()
+        if server:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark du cache calendrier (écritures et lectures)
+Usage: python scripts/benchmark_db.py [--mode write|read|all] [--sizes 1000 10000 100000]
+
+- write: ancien chemin (delete de la route + session.add par date) vs
+  upsert groupé de DatabaseManager.save_calendar_prices
+- read: lecture ORM (objets CalendarPrice) vs lecture Core (date, prix)
+  pour une route de 365 jours
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+# Base jetable: ne pas toucher data/flights.db
+_tmp_dir = tempfile.mkdtemp(prefix="travliaq_bench_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp_dir}/default.db")
+
+from sqlalchemy import and_
+
+from src.database.manager import DatabaseManager
+from src.database.models import CalendarPrice
+
+
+def make_prices(count: int, price_offset: float = 0.0) -> dict:
+    """Génère count dates consécutives avec un prix synthétique"""
+    base = date(2025, 1, 1)
+    return {
+        (base + timedelta(days=i)).isoformat(): 50.0 + (i % 300) + price_offset
+        for i in range(count)
+    }
+
+
+def legacy_save(manager: DatabaseManager, origin: str, destination: str, prices: dict):
+    """Ancien chemin: suppression complète de la route puis un add par date"""
+    with manager.get_session() as session:
+        session.query(CalendarPrice).filter(
+            and_(
+                CalendarPrice.origin == origin,
+                CalendarPrice.destination == destination
+            )
+        ).delete()
+
+        for d, price in prices.items():
+            session.add(CalendarPrice(
+                origin=origin,
+                destination=destination,
+                date=d,
+                price=price,
+                scraped_at=datetime.now()
+            ))
+
+        session.commit()
+
+
+def legacy_read(manager: DatabaseManager, origin: str, destination: str, max_age: int = 60) -> dict:
+    """Ancien chemin: hydratation complète des objets CalendarPrice"""
+    cutoff = datetime.now() - timedelta(minutes=max_age)
+    with manager.get_session() as session:
+        prices = session.query(CalendarPrice).filter(
+            and_(
+                CalendarPrice.origin == origin,
+                CalendarPrice.destination == destination,
+                CalendarPrice.scraped_at >= cutoff
+            )
+        ).all()
+        return {p.date: p.price for p in prices}
+
+
+def run_reads(rows: int, iterations: int):
+    manager = DatabaseManager(f"sqlite:///{_tmp_dir}/reads_{rows}.db")
+    manager.save_calendar_prices("BRU", "CDG", make_prices(rows))
+
+    def measure(fn):
+        fn()  # warm-up (compilation + cache de statements)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        return (time.perf_counter() - start) / iterations * 1000
+
+    orm_ms = measure(lambda: legacy_read(manager, "BRU", "CDG"))
+    core_ms = measure(lambda: manager.get_cached_price_rows("BRU", "CDG"))
+    batch_ms = measure(
+        lambda: manager.get_cached_calendar_prices_batch([("BRU", "CDG")])
+    )
+
+    print(f"Lecture de {rows} lignes ({iterations} itérations)")
+    print(f"  ORM   : {orm_ms:8.3f} ms/requête")
+    print(f"  Core  : {core_ms:8.3f} ms/requête  (x{orm_ms / core_ms:.1f})")
+    print(f"  Batch : {batch_ms:8.3f} ms/requête")
+
+    manager.engine.dispose()
+
+
+def run_writes(sizes):
+    print(f"{'rows':>8} | {'legacy (s)':>10} | {'upsert (s)':>10} | {'re-upsert (s)':>13} | {'rows/s upsert':>13}")
+    print("-" * 68)
+
+    for size in sizes:
+        prices = make_prices(size)
+        updated = make_prices(size, price_offset=1.0)
+
+        legacy_db = DatabaseManager(f"sqlite:///{_tmp_dir}/legacy_{size}.db")
+        bulk_db = DatabaseManager(f"sqlite:///{_tmp_dir}/bulk_{size}.db")
+
+        start = time.perf_counter()
+        legacy_save(legacy_db, "BRU", "CDG", prices)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bulk_db.save_calendar_prices("BRU", "CDG", prices)
+        upsert_time = time.perf_counter() - start
+
+        # Deuxième passage: toutes les lignes entrent en conflit
+        start = time.perf_counter()
+        bulk_db.save_calendar_prices("BRU", "CDG", updated)
+        reupsert_time = time.perf_counter() - start
+
+        print(
+            f"{size:>8} | {legacy_time:>10.3f} | {upsert_time:>10.3f} | "
+            f"{reupsert_time:>13.3f} | {size / upsert_time:>13.0f}"
+        )
+
+        legacy_db.engine.dispose()
+        bulk_db.engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du cache calendrier")
+    parser.add_argument("--mode", choices=["write", "read", "all"], default="all")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--read-rows", type=int, default=365)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    if args.mode in ("write", "all"):
+        run_writes(args.sizes)
+    if args.mode in ("read", "all"):
+        if args.mode == "all":
+            print()
+        run_reads(args.read_rows, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
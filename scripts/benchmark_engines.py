@@ -0,0 +1,234 @@
+"""
+Benchmark des moteurs de scraping (Selenium vs Playwright) sur une page locale
+Usage: python scripts/benchmark_engines.py [--engine both] [--routes 24] [--concurrency 4 8] [--months 2]
+
+La page tests/fixtures/google_flights_calendar.html reproduit le DOM du
+calendrier Google Flights (prix déterministes par route et date): aucun
+accès réseau, seul le coût des moteurs est mesuré. On relève le débit
+(routes/min), la mémoire des process navigateur (RSS des descendants, pic
+et moyenne), les erreurs et l'exactitude des prix extraits.
+
+Selenium: un Chrome par route (ThreadPoolExecutor de CalendarScraper, comme
+le pool lance un worker par job; le process Python du worker n'est pas
+compté ici). Playwright: un seul Chromium, un contexte par route.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+# Pas d'espacement entre requêtes: la page est locale
+os.environ.setdefault("PACING_ENABLED", "false")
+
+from src.scrapers.calendar_extraction import months_in_range
+from src.scrapers.calendar_scraper import CalendarScraper
+from src.scrapers.playwright_scraper import (
+    PLAYWRIGHT_AVAILABLE, AsyncCalendarScraper, PlaywrightCalendarScraper, PlaywrightEngine
+)
+
+FIXTURES_DIR = root_dir / "tests" / "fixtures"
+FIXTURE_PAGE = "google_flights_calendar.html"
+AIRPORTS = ["CDG", "ORY", "LYS", "NCE", "MRS", "TLS", "BOD", "NTE", "BCN", "MAD", "LIS", "FCO"]
+
+
+def expected_price(origin: str, destination: str, iso: str, trip_length: int = 0) -> float:
+    """Prix affiché par la fixture (même formule que la page, durée 0 = aller simple)"""
+    return float(50 + (7 * sum(ord(ch) for ch in f"{origin}{destination}{iso}") + 13 * trip_length) % 400)
+
+
+def build_routes(count: int, months: int) -> list:
+    """Routes distinctes couvrant `months` mois à partir du mois courant"""
+    start = date.today().replace(day=1)
+    end = start
+    for _ in range(months):
+        end = (end + timedelta(days=32)).replace(day=1)
+    end -= timedelta(days=1)
+
+    pairs = [(o, d) for o in AIRPORTS for d in AIRPORTS if o != d]
+    return [(o, d, start.isoformat(), end.isoformat()) for o, d in pairs[:count]]
+
+
+def start_fixture_server() -> ThreadingHTTPServer:
+    """Sert tests/fixtures sur un port libre"""
+    handler = partial(SimpleHTTPRequestHandler, directory=str(FIXTURES_DIR))
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def descendants_rss_mb() -> float:
+    """RSS cumulée des process descendants (navigateurs, drivers) via /proc"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total_kb = 0
+    stack = list(children.get(os.getpid(), []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+class MemorySampler:
+    """Échantillonne la RSS des descendants pendant un run"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.samples.append(descendants_rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak(self) -> float:
+        return max(self.samples, default=0.0)
+
+    @property
+    def mean(self) -> float:
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+
+def check_prices(route: tuple, prices) -> int:
+    """Nombre de dates fausses ou manquantes pour une route"""
+    origin, destination, start_date, end_date = route
+    if isinstance(prices, BaseException):
+        return -1
+    expected_dates = []
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    while start <= end:
+        expected_dates.append(start.isoformat())
+        start += timedelta(days=1)
+    return sum(
+        1 for iso in expected_dates
+        if prices.get(iso) != expected_price(origin, destination, iso)
+    )
+
+
+def run_selenium(routes: list, concurrency: int) -> list:
+    """Un CalendarScraper (un Chrome) par route"""
+    def scrape(route):
+        scraper = CalendarScraper(headless=True)
+        try:
+            return scraper.scrape_date_range(*route)
+        except Exception as e:
+            return e
+        finally:
+            scraper.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(scrape, routes))
+
+
+def run_playwright(routes: list, concurrency: int) -> list:
+    """Un seul Chromium, un contexte par route"""
+    engine = PlaywrightEngine(max_contexts=concurrency, headless=True)
+    try:
+        return PlaywrightCalendarScraper(engine=engine).scrape_many(routes)
+    finally:
+        engine.shutdown()
+
+
+def benchmark(engine: str, routes: list, concurrency: int) -> dict:
+    runner = run_selenium if engine == "selenium" else run_playwright
+    start = time.time()
+    with MemorySampler() as memory:
+        results = runner(routes, concurrency)
+    elapsed = time.time() - start
+
+    mismatches = [check_prices(route, result) for route, result in zip(routes, results)]
+    errors = [r for r in results if isinstance(r, BaseException)]
+    return {
+        'engine': engine,
+        'concurrency': concurrency,
+        'routes': len(routes),
+        'seconds': round(elapsed, 1),
+        'routes_per_min': round(len(routes) / elapsed * 60, 1) if elapsed else 0.0,
+        'rss_peak_mb': round(memory.peak),
+        'rss_mean_mb': round(memory.mean),
+        'errors': len(errors),
+        'wrong_routes': sum(1 for m in mismatches if m > 0),
+        'first_error': str(errors[0])[:120] if errors else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Selenium vs Playwright")
+    parser.add_argument("--engine", choices=["selenium", "playwright", "both"], default="both")
+    parser.add_argument("--routes", type=int, default=24, help="Nombre de routes scrapées par run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8], help="Niveaux de concurrence")
+    parser.add_argument("--months", type=int, default=2, help="Mois par route")
+    args = parser.parse_args()
+
+    engines = ["selenium", "playwright"] if args.engine == "both" else [args.engine]
+    if "playwright" in engines and not PLAYWRIGHT_AVAILABLE:
+        print("⚠️  playwright non installé (pip install playwright && playwright install chromium)")
+        engines.remove("playwright")
+    if not engines:
+        sys.exit(1)
+
+    server = start_fixture_server()
+    fixture_url = f"http://127.0.0.1:{server.server_address[1]}/{FIXTURE_PAGE}"
+    CalendarScraper.base_url = fixture_url
+    AsyncCalendarScraper.base_url = fixture_url
+
+    routes = build_routes(args.routes, args.months)
+    print(f"{len(routes)} routes x {len(months_in_range(*routes[0][2:]))} mois sur {fixture_url}\n")
+
+    print(f"{'moteur':<11} {'conc':>4} {'durée':>7} {'routes/min':>10} {'RSS pic':>8} "
+          f"{'RSS moy':>8} {'erreurs':>7} {'faux':>5}")
+    for concurrency in args.concurrency:
+        for engine in engines:
+            result = benchmark(engine, routes, concurrency)
+            print(
+                f"{result['engine']:<11} {result['concurrency']:>4} {result['seconds']:>6}s "
+                f"{result['routes_per_min']:>10} {result['rss_peak_mb']:>6}Mo {result['rss_mean_mb']:>6}Mo "
+                f"{result['errors']:>7} {result['wrong_routes']:>5}"
+            )
+            if result['first_error']:
+                print(f"  ↳ {result['first_error']}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
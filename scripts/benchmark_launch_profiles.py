@@ -0,0 +1,103 @@
+"""
+Démarrage et mémoire de Chrome par profil de lancement
+Usage: python scripts/benchmark_launch_profiles.py [--profiles lean stealth debug] [--runs 5]
+                                                   [--url URL] [--headless-shell PATH]
+
+Pour chaque profil, lance Chrome `runs` fois (séquentiellement) et mesure:
+- démarrage à froid: create_driver() (chromedriver + Chrome + scripts stealth)
+- première navigation: driver.get() sur la fixture du calendrier (ou --url)
+- RSS au repos: chromedriver + Chrome après --idle secondes sur la page
+Affiche les médianes. --headless-shell renseigne CHROME_HEADLESS_SHELL_PATH
+(utilisé par les profils qui l'autorisent, lean).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+os.environ.setdefault("PACING_ENABLED", "false")
+
+from benchmark_engines import FIXTURE_PAGE, descendants_rss_mb, start_fixture_server
+from src.core.config import settings
+from src.core.driver_manager import DriverManager
+from src.core.launch_profiles import LAUNCH_PROFILES, headless_shell_binary
+from src.scrapers.calendar_extraction import build_url
+
+
+def measure_launch(profile: str, url: str, idle: float) -> dict:
+    """Un lancement complet: démarrage, navigation, RSS au repos"""
+    manager = DriverManager(headless=True, launch_profile=profile)
+    try:
+        started = time.perf_counter()
+        driver = manager.create_driver()
+        cold_start = time.perf_counter() - started
+
+        started = time.perf_counter()
+        driver.get(url)
+        first_navigation = time.perf_counter() - started
+
+        time.sleep(idle)
+        return {
+            'cold_start': cold_start,
+            'first_navigation': first_navigation,
+            'idle_rss_mb': descendants_rss_mb(),
+        }
+    finally:
+        manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des profils de lancement de Chrome")
+    parser.add_argument("--profiles", nargs="+", default=list(LAUNCH_PROFILES), choices=list(LAUNCH_PROFILES))
+    parser.add_argument("--runs", type=int, default=5, help="Lancements par profil")
+    parser.add_argument("--url", default=None, help="Page de la première navigation (défaut: fixture locale)")
+    parser.add_argument("--idle", type=float, default=3.0, help="Secondes sur la page avant la mesure RSS")
+    parser.add_argument("--headless-shell", default=None, help="Chemin de chrome-headless-shell")
+    args = parser.parse_args()
+
+    if args.headless_shell:
+        settings.chrome_headless_shell_path = args.headless_shell
+
+    server = None
+    url = args.url
+    if not url:
+        server = start_fixture_server()
+        url = build_url("CDG", "JFK", f"http://127.0.0.1:{server.server_address[1]}/{FIXTURE_PAGE}")
+
+    print(f"{args.runs} lancements par profil, navigation vers {url}\n")
+    print(f"{'profil':<9} {'binaire':<8} {'démarrage':>10} {'navigation':>11} {'RSS repos':>10} {'erreurs':>8}")
+    try:
+        for profile in args.profiles:
+            results, errors = [], []
+            for _ in range(args.runs):
+                try:
+                    results.append(measure_launch(profile, url, args.idle))
+                except Exception as e:
+                    errors.append(e)
+
+            binary = "shell" if headless_shell_binary(LAUNCH_PROFILES[profile], True) else "chrome"
+            if not results:
+                print(f"{profile:<9} {binary:<8} {'-':>10} {'-':>11} {'-':>10} {len(errors):>8}")
+                print(f"  ↳ {str(errors[0])[:120]}")
+                continue
+
+            print(
+                f"{profile:<9} {binary:<8} "
+                f"{statistics.median(r['cold_start'] for r in results):>9.2f}s "
+                f"{statistics.median(r['first_navigation'] for r in results):>10.2f}s "
+                f"{statistics.median(r['idle_rss_mb'] for r in results):>8.0f}Mo "
+                f"{len(errors):>8}"
+            )
+    finally:
+        if server:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark de la file de jobs en base avec plusieurs process workers
+Usage: python scripts/benchmark_queue.py [--jobs 200] [--workers 1 2 4] [--job-seconds 0.2]
+
+Base SQLite jetable partagée par tous les process. Chaque worker exécute
+un scraping simulé (sleep) à la place de Chrome; on mesure le débit selon
+le nombre de process et on vérifie qu'aucun job n'est traité deux fois.
+Un worker tué en plein job (--kill-one) laisse expirer son bail: ses jobs
+en cours sont repris par un autre (livraison au moins une fois, les
+"duplicates" attendus sont ces jobs-là).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+
+def child(args):
+    """Process worker: scraping simulé, trace des jobs exécutés"""
+    from src.services.job_queue import QueueWorker
+
+    def fake_scrape(origin, destination, start_date, end_date, timeout, trigger, prune_missing):
+        with open(args.trace, "a") as f:
+            f.write(f"{time.time():.3f} {origin}{destination}{start_date}\n")
+        time.sleep(args.job_seconds)
+        return {start_date: 100.0}
+
+    worker = QueueWorker(
+        worker_id=f"bench-{os.getpid()}",
+        concurrency=args.concurrency,
+        lease_seconds=args.lease_seconds,
+        poll_seconds=0.05,
+        execute=fake_scrape,
+    )
+    worker.run_forever()
+
+
+def run(jobs: int, workers: int, args) -> dict:
+    tmp_dir = tempfile.mkdtemp(prefix="travliaq_queue_")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_dir}/queue.db", LOG_FILE=f"{tmp_dir}/queue.log")
+    trace = f"{tmp_dir}/trace.txt"
+
+    # Remplir la file avant de démarrer les workers
+    subprocess.run(
+        [sys.executable, __file__, "--enqueue", str(jobs)], env=env, check=True
+    )
+
+    cmd = [
+        sys.executable, __file__, "--child", "--trace", trace,
+        "--job-seconds", str(args.job_seconds), "--concurrency", str(args.concurrency),
+        "--lease-seconds", str(args.lease_seconds),
+    ]
+    started = time.time()
+    procs = [subprocess.Popen(cmd, env=env) for _ in range(workers)]
+
+    if args.kill_one:
+        time.sleep(args.job_seconds * 2)
+        procs[0].kill()
+
+    stats_cmd = [sys.executable, __file__, "--count"]
+    while True:
+        time.sleep(1.0)
+        remaining = int(subprocess.run(stats_cmd, env=env, capture_output=True, text=True).stdout or 0)
+        if remaining == 0:
+            break
+    elapsed = time.time() - started
+
+    for proc in procs:
+        proc.kill()
+        proc.wait()
+
+    # Débit mesuré du premier au dernier job (hors démarrage des process)
+    lines = [line.split() for line in Path(trace).read_text().splitlines()]
+    executed = [key for _, key in lines]
+    first, last = min(float(ts) for ts, _ in lines), max(float(ts) for ts, _ in lines)
+    busy = last - first + args.job_seconds
+    return {
+        "workers": workers,
+        "wall_seconds": round(elapsed, 2),
+        "jobs_per_second": round(jobs / busy, 1),
+        "ideal_jobs_per_second": round(workers * args.concurrency / args.job_seconds, 1),
+        "executions": len(executed),
+        "duplicates": len(executed) - len(set(executed)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la file de jobs en base")
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=2, help="Threads par process worker")
+    parser.add_argument("--job-seconds", type=float, default=0.2)
+    parser.add_argument("--lease-seconds", type=float, default=3.0)
+    parser.add_argument("--kill-one", action="store_true", help="Tuer un worker en plein job")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--enqueue", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--count", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--trace", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+    if args.enqueue or args.count:
+        from datetime import datetime, timedelta
+        from src.database.manager import db_manager
+
+        if args.count:
+            by_status = db_manager.get_job_queue_stats().get('by_status', {})
+            print(by_status.get('queued', 0) + by_status.get('leased', 0))
+            return
+        deadline = datetime.now() + timedelta(hours=1)
+        for i in range(args.enqueue):
+            day = f"2027-{1 + i // 28 % 12:02d}-{1 + i % 28:02d}"
+            db_manager.enqueue_scrape_job(
+                "CDG", f"{chr(65 + i // 336 % 26)}AA", day, day,
+                trigger="prewarm", priority=1, deadline=deadline
+            )
+        return
+
+    print(f"{args.jobs} jobs de {args.job_seconds}s, {args.concurrency} threads par worker")
+    for workers in args.workers:
+        print(run(args.jobs, workers, args))
+
+
+if __name__ == "__main__":
+    main()
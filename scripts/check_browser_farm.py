@@ -0,0 +1,95 @@
+"""
+Vérification des endpoints de navigateurs distants (BROWSER_ENDPOINTS)
+Usage: python scripts/check_browser_farm.py [--endpoints URL[|N],...] [--sessions N] [--url URL]
+
+Sonde chaque endpoint puis ouvre N sessions en parallèle via la
+BrowserFarm (sélection du moins chargé), charge une page et mesure le
+temps de création de session. Test local avec un serveur Selenium
+standalone:
+
+    docker run -d -p 4444:4444 --shm-size=2g -e SE_NODE_MAX_SESSIONS=4 selenium/standalone-chrome
+    python scripts/check_browser_farm.py --endpoints "http://localhost:4444|4" --sessions 4
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.core.browser_farm import BrowserFarm
+from src.core.driver_manager import DriverManager
+from src.core.proxy_pool import OUTCOME_SUCCESS, OUTCOME_FAILURE
+
+DEFAULT_PAGE = "data:text/html,<title>travliaq</title>"
+
+
+def open_session(farm: BrowserFarm, page: str, results: list):
+    """Emprunte un endpoint, ouvre une session, charge la page"""
+    try:
+        url = farm.acquire(timeout=30)
+    except Exception as e:
+        results.append({'error': str(e)})
+        return
+    start = time.time()
+    manager = DriverManager(headless=True, remote_url=url)
+    try:
+        driver = manager.create_driver()
+        created = time.time() - start
+        driver.get(page)
+        results.append({'endpoint': url, 'session_seconds': round(created, 2), 'title': driver.title})
+        farm.release(url, OUTCOME_SUCCESS)
+    except Exception as e:
+        results.append({'endpoint': url, 'error': str(e)[:200]})
+        farm.release(url, OUTCOME_FAILURE, driver_failed=manager.driver is None)
+    finally:
+        manager.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérification des navigateurs distants")
+    parser.add_argument("--endpoints", default=None, help="Endpoints url[|sessions] (défaut: BROWSER_ENDPOINTS)")
+    parser.add_argument("--sessions", type=int, default=2, help="Sessions ouvertes en parallèle")
+    parser.add_argument("--url", default=DEFAULT_PAGE, help="Page chargée dans chaque session")
+    args = parser.parse_args()
+
+    endpoints = args.endpoints.split(",") if args.endpoints else None
+    farm = BrowserFarm(endpoints=endpoints, enabled=True)
+    if not farm.enabled:
+        print("Aucun endpoint configuré (BROWSER_ENDPOINTS ou --endpoints)")
+        sys.exit(1)
+
+    farm.probe_all()
+    print("Sondes:")
+    for endpoint in farm.get_stats()['endpoints']:
+        status = "✅" if endpoint['healthy'] else "❌"
+        print(
+            f"  {status} {endpoint['url']} ({endpoint['kind']}): capacité {endpoint['capacity']}, "
+            f"slots {endpoint['remote_slots']}, libres {endpoint['remote_free']}, "
+            f"sonde {endpoint['probe_latency_seconds']}s {endpoint['last_error'] or ''}"
+        )
+
+    results = []
+    threads = [
+        threading.Thread(target=open_session, args=(farm, args.url, results))
+        for _ in range(args.sessions)
+    ]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"\nSessions ({time.time() - start:.1f}s):")
+    for result in results:
+        print(f"  {result}")
+    print(f"\n{farm.get_stats()}")
+    farm.stop()
+    sys.exit(0 if all('error' not in r for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Proxies HTTP locaux de substitution pour tester le ProxyPool
+Usage: python scripts/local_proxies.py [--count 3] [--base-port 8901] [--slow 8902:2.0] [--stall 8903] [--refuse 8904]
+
+Chaque port relaie CONNECT (HTTPS) et les requêtes HTTP simples vers la
+vraie destination. Les modes dégradés permettent de vérifier la
+pondération (slow), la quarantaine sur timeout (stall) et les échecs
+(refuse). Afficher la ligne PROXY_LIST à exporter pour l'API.
+"""
+
+import argparse
+import asyncio
+from urllib.parse import urlsplit
+
+
+async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+def make_handler(port: int, mode: str, delay: float):
+    async def handle(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        try:
+            head = await client_reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            client_writer.close()
+            return
+
+        request_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+        method, target, _ = request_line.split(" ", 2)
+        print(f"[{port}] {mode:<6} {method} {target}", flush=True)
+
+        if mode == "stall":
+            # Ne répond jamais: le job doit expirer côté pool
+            await asyncio.sleep(3600)
+            return
+        if mode == "refuse":
+            client_writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+            await client_writer.drain()
+            client_writer.close()
+            return
+        if delay:
+            await asyncio.sleep(delay)
+
+        if method == "CONNECT":
+            host, _, remote_port = target.partition(":")
+            remote_port = int(remote_port or 443)
+            rest = b""
+        else:
+            url = urlsplit(target)
+            host, remote_port = url.hostname, url.port or 80
+            path = (url.path or "/") + (f"?{url.query}" if url.query else "")
+            rest = head.replace(target.encode("latin-1"), path.encode("latin-1"), 1)
+
+        try:
+            remote_reader, remote_writer = await asyncio.open_connection(host, remote_port)
+        except OSError:
+            client_writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+            await client_writer.drain()
+            client_writer.close()
+            return
+
+        if method == "CONNECT":
+            client_writer.write(b"HTTP/1.1 200 Connection Established\r\n\r\n")
+            await client_writer.drain()
+        else:
+            remote_writer.write(rest)
+            await remote_writer.drain()
+
+        await asyncio.gather(
+            pipe(client_reader, remote_writer),
+            pipe(remote_reader, client_writer),
+        )
+
+    return handle
+
+
+def parse_slow(values):
+    slow = {}
+    for value in values or []:
+        port, _, delay = value.partition(":")
+        slow[int(port)] = float(delay or 1.0)
+    return slow
+
+
+async def serve(args):
+    slow = parse_slow(args.slow)
+    ports = [args.base_port + i for i in range(args.count)]
+    ports += [p for p in list(slow) + (args.stall or []) + (args.refuse or []) if p not in ports]
+
+    servers = []
+    for port in ports:
+        if port in (args.stall or []):
+            mode, delay = "stall", 0.0
+        elif port in (args.refuse or []):
+            mode, delay = "refuse", 0.0
+        elif port in slow:
+            mode, delay = "slow", slow[port]
+        else:
+            mode, delay = "ok", 0.0
+        servers.append(await asyncio.start_server(make_handler(port, mode, delay), "127.0.0.1", port))
+        print(f"✓ Proxy local {mode:<6} http://127.0.0.1:{port}", flush=True)
+
+    print(f"\nPROXY_ROTATION=true PROXY_LIST={','.join(f'http://127.0.0.1:{p}' for p in ports)}\n", flush=True)
+    await asyncio.gather(*(s.serve_forever() for s in servers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Proxies locaux de substitution")
+    parser.add_argument("--count", type=int, default=3, help="Proxies sains à démarrer")
+    parser.add_argument("--base-port", type=int, default=8901)
+    parser.add_argument("--slow", action="append", metavar="PORT:SECONDES", help="Latence ajoutée")
+    parser.add_argument("--stall", action="append", type=int, metavar="PORT", help="Ne répond jamais")
+    parser.add_argument("--refuse", action="append", type=int, metavar="PORT", help="Répond 502")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
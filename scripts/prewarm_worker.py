@@ -0,0 +1,47 @@
+"""
+Sidecar de pré-chauffage du cache (hors du process API)
+Usage: python scripts/prewarm_worker.py [--once]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.database.manager import db_manager
+from src.services.prewarm_scheduler import prewarm_scheduler
+from src.services.refresh_queue import refresh_queue
+from src.services.ttl_policy import ttl_policy
+from src.core.scraper_pool import scraper_pool
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sidecar de pré-chauffage")
+    parser.add_argument("--once", action="store_true", help="Un seul passage puis sortie")
+    args = parser.parse_args()
+
+    ttl_policy.load_history(db_manager.get_scrape_history(days=30))
+    scraper_pool.reaper.start()
+
+    try:
+        if args.once:
+            launched = prewarm_scheduler.run_once()
+            print(f"{launched} rafraîchissement(s) lancé(s)")
+        else:
+            prewarm_scheduler.run_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Arrêt du pré-chauffage")
+    finally:
+        prewarm_scheduler.stop()
+        # Laisser finir les scrapings déjà lancés
+        refresh_queue.shutdown(wait=True)
+        scraper_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
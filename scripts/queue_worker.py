@@ -0,0 +1,49 @@
+"""
+Worker de la file de jobs en base (JOB_BACKEND=database)
+Usage: python scripts/queue_worker.py [--concurrency N] [--worker-id ID] [--once]
+
+À lancer sur chaque nœud de scraping (même DATABASE_URL que l'API): prend
+les jobs par bail, scrape avec le ScraperPool local et écrit les prix, le
+log et le résultat en base.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.core.scraper_pool import scraper_pool
+from src.services.job_queue import QueueWorker
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker de la file de jobs en base")
+    parser.add_argument("--concurrency", type=int, default=None, help="Jobs simultanés (défaut: QUEUE_WORKER_CONCURRENCY)")
+    parser.add_argument("--worker-id", default=None, help="Identifiant du worker (défaut: hôte-pid)")
+    parser.add_argument("--once", action="store_true", help="Traiter au plus un job puis sortir")
+    args = parser.parse_args()
+
+    worker = QueueWorker(worker_id=args.worker_id, concurrency=args.concurrency)
+    scraper_pool.reaper.start()
+
+    try:
+        if args.once:
+            processed = worker.run_once()
+            print("1 job traité" if processed else "File vide")
+        else:
+            worker.run_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Arrêt du worker de file")
+    finally:
+        worker.stop()
+        scraper_pool.shutdown()
+        print(worker.get_stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 # scripts/scraper_worker.py - VERSION COMPLÈTE
 
+import os
 import sys
 import json
 import time
@@ -17,11 +18,28 @@ def log_with_time(job_id, message):
     print(f"[{timestamp}] [Worker-{job_id}] {message}", flush=True)
 
 
+def worker_stats(scraper, duration):
+    """Comptabilité du job (durée, page, volume réseau, latence des scripts) pour le ProxyPool"""
+    stats = {"duration_seconds": round(duration, 2)}
+    if scraper is not None:
+        stats.update(scraper.transfer_stats or {})
+        if scraper.page_load_seconds is not None:
+            stats["page_load_seconds"] = round(scraper.page_load_seconds, 2)
+        if scraper.recoveries:
+            stats["recoveries"] = scraper.recoveries
+        if scraper.destination_seconds:
+            stats["destination_seconds"] = {d: round(s, 2) for d, s in scraper.destination_seconds.items()}
+        for transport, commands in (scraper.command_stats or {}).items():
+            stats[f"{transport}_commands"] = commands["commands"]
+            stats[f"{transport}_avg_ms"] = round(commands["seconds"] / commands["commands"] * 1000, 2)
+    return stats
+
+
 def main():
     """Point d'entrée du worker"""
-    if len(sys.argv) != 7:
+    if len(sys.argv) not in (7, 8):
         print(f"ERROR: Mauvais nombre d'arguments: {len(sys.argv)}")
-        print("Usage: scraper_worker.py <origin> <dest> <start> <end> <result_file> <job_id>")
+        print("Usage: scraper_worker.py <origin> <dest> <start> <end> <result_file> <job_id> [proxy]")
         sys.exit(1)
 
     origin = sys.argv[1]
@@ -30,22 +48,72 @@ def main():
     end_date = sys.argv[4]
     result_file = Path(sys.argv[5])
     job_id = sys.argv[6]
+    proxy = sys.argv[7] if len(sys.argv) == 8 else None
 
     log_with_time(job_id, f"DÉMARRAGE: {origin}->{destination} ({start_date} to {end_date})")
     start_time = time.time()
+    scraper = None
 
     try:
         # Import ici pour éviter problèmes de sérialisation
         from src.scrapers.calendar_scraper import CalendarScraper
         from src.utils.logger import get_logger
+        from src.core.exceptions import PreemptedError
+        from src.core.heartbeat import HEARTBEAT_ENV_VAR, PREEMPT_ENV_VAR, HeartbeatWriter, preempt_requested
+        from src.core.browser_farm import BROWSER_ENDPOINT_ENV_VAR
+        from src.core.launch_profiles import LAUNCH_PROFILE_ENV_VAR
+        from src.scrapers.calendar_extraction import (
+            DESTINATIONS_ENV_VAR, FLIGHT_DATES_ENV_VAR, TRIP_LENGTHS_ENV_VAR, parse_trip_lengths
+        )
 
         logger = get_logger(f"worker_{job_id}")
 
         log_with_time(job_id, "Initialisation du scraper...")
-        scraper = CalendarScraper(headless=True)
-
-        log_with_time(job_id, "Scraping en cours...")
-        prices = scraper.scrape_date_range(origin, destination, start_date, end_date)
+        heartbeat_file = os.environ.get(HEARTBEAT_ENV_VAR)
+        preempt_file = os.environ.get(PREEMPT_ENV_VAR)
+        scraper = CalendarScraper(
+            headless=True,
+            proxy=proxy,
+            progress_callback=HeartbeatWriter(heartbeat_file) if heartbeat_file else None,
+            should_stop=lambda: preempt_requested(preempt_file),
+            browser_endpoint=os.environ.get(BROWSER_ENDPOINT_ENV_VAR) or None,
+            launch_profile=os.environ.get(LAUNCH_PROFILE_ENV_VAR) or None
+        )
+
+        trip_lengths = os.environ.get(TRIP_LENGTHS_ENV_VAR)
+        flight_dates = os.environ.get(FLIGHT_DATES_ENV_VAR)
+        destinations = os.environ.get(DESTINATIONS_ENV_VAR)
+        log_with_time(job_id, f"Scraping en cours{' (aller-retour: ' + trip_lengths + ' j)' if trip_lengths else ''}"
+                              f"{' (vols: ' + flight_dates + ')' if flight_dates else ''}"
+                              f"{' (destinations: ' + destinations + ')' if destinations else ''}...")
+        try:
+            if destinations:
+                # Batch: {destination: {date: prix}}, une seule session Chrome
+                prices = scraper.scrape_destinations(origin, destinations.split(","), start_date, end_date)
+            elif flight_dates:
+                # Calendrier du mois de départ puis liste des vols, même session
+                calendar, flights = scraper.scrape_flights(origin, destination, *flight_dates.split(","))
+                prices = {"calendar": calendar, "flights": flights}
+            elif trip_lengths:
+                # Grille aller-retour: {durée: {départ: prix}} (clés JSON en texte)
+                grid = scraper.scrape_round_trip_grid(
+                    origin, destination, start_date, end_date, parse_trip_lengths(trip_lengths)
+                )
+                prices = {str(length): row for length, row in grid.items()}
+            else:
+                prices = scraper.scrape_date_range(origin, destination, start_date, end_date)
+        except PreemptedError as e:
+            duration = time.time() - start_time
+            log_with_time(job_id, f"PRÉEMPTÉ: {len(e.prices)} prix, reprise au {e.resume_from}")
+            result_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(result_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "prices": e.prices,
+                    "preempted": True,
+                    "resume_from": e.resume_from,
+                    "stats": worker_stats(scraper, duration)
+                }, f, ensure_ascii=False, indent=2)
+            sys.exit(0)
 
         duration = time.time() - start_time
         log_with_time(job_id, f"TERMINÉ: {len(prices)} prix en {duration:.1f}s")
@@ -53,7 +121,10 @@ def main():
         # Sauvegarder le résultat
         result_file.parent.mkdir(parents=True, exist_ok=True)
         with open(result_file, 'w', encoding='utf-8') as f:
-            json.dump(prices, f, ensure_ascii=False, indent=2)
+            json.dump({
+                "prices": prices,
+                "stats": worker_stats(scraper, duration)
+            }, f, ensure_ascii=False, indent=2)
 
         log_with_time(job_id, f"Résultat sauvegardé: {result_file}")
         sys.exit(0)
@@ -71,7 +142,9 @@ def main():
         with open(result_file, 'w', encoding='utf-8') as f:
             json.dump({
                 "error": str(e),
-                "traceback": traceback.format_exc()
+                "error_type": type(e).__name__,
+                "traceback": traceback.format_exc(),
+                "stats": worker_stats(scraper, duration)
             }, f, ensure_ascii=False, indent=2)
 
         sys.exit(1)
@@ -0,0 +1,130 @@
+"""
+Simulation de la politique TTL adaptative sur l'historique scrape_logs
+Usage: python scripts/simulate_ttl_policy.py [--days 30] [--max-ttl 720]
+
+Rejoue chaque scraping journalisé comme une demande: sous chaque politique,
+un mois n'est re-scrapé que si son dernier scraping simulé n'est plus frais.
+Compare le TTL global (cache_ttl_minutes) et le TTL adaptatif.
+"""
+
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.core.config import settings
+from src.database.manager import db_manager
+from src.services.price_cache import month_keys
+from src.services.ttl_policy import TTLPolicy
+
+# Tranches de distance au départ pour le rapport (jours)
+HORIZON_BUCKETS = [(0, 14), (15, 60), (61, 180), (181, 400)]
+
+
+def horizon_bucket(days_out: int) -> str:
+    for low, high in HORIZON_BUCKETS:
+        if low <= days_out <= high:
+            return f"{low}-{high}j"
+    return "autre"
+
+
+def simulate(history, policy: TTLPolicy) -> dict:
+    """Rejoue l'historique sous une politique donnée"""
+    last_scraped = {}
+    scrapes = 0
+    month_scrapes = 0
+    requests = 0
+    served_ages = defaultdict(list)
+
+    for log in history:
+        params = log.get('params') or {}
+        start_date, end_date = params.get('start_date'), params.get('end_date')
+        if not log['success'] or not start_date or not end_date:
+            continue
+
+        requests += 1
+        now = log['started_at']
+        origin, destination = log['origin'], log['destination']
+        change_rate = policy.change_rate(origin, destination)
+
+        to_scrape = []
+        for month in month_keys(start_date, end_date):
+            key = (origin, destination, month)
+            scraped_at = last_scraped.get(key)
+            # Date représentative du mois pour la distance au départ
+            travel_date = f"{month}-15"
+
+            if scraped_at is not None:
+                ttl = policy.ttl_minutes(travel_date, change_rate, scraped_at.date())
+                age_minutes = (now - scraped_at).total_seconds() / 60
+                if age_minutes < ttl:
+                    days_out = (date.fromisoformat(travel_date) - now.date()).days
+                    served_ages[horizon_bucket(days_out)].append(age_minutes)
+                    continue
+
+            to_scrape.append(key)
+
+        if to_scrape:
+            scrapes += 1
+            month_scrapes += len(to_scrape)
+            for key in to_scrape:
+                last_scraped[key] = now
+
+        if params.get('price_change_rate') is not None:
+            policy.record_change_rate(origin, destination, float(params['price_change_rate']))
+
+    return {
+        'requests': requests,
+        'scrapes': scrapes,
+        'month_scrapes': month_scrapes,
+        'served_ages': served_ages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulation de la politique TTL")
+    parser.add_argument("--days", type=int, default=30, help="Profondeur de l'historique")
+    parser.add_argument("--base-ttl", type=int, default=settings.cache_ttl_minutes)
+    parser.add_argument("--max-ttl", type=int, default=settings.adaptive_ttl_max_minutes)
+    args = parser.parse_args()
+
+    history = db_manager.get_scrape_history(days=args.days)
+    if not history:
+        print("Aucun scraping journalisé sur la période")
+        return
+
+    print(f"📊 {len(history)} scrapings journalisés sur {args.days} jours\n")
+
+    results = {
+        "global": simulate(history, TTLPolicy(base_ttl_minutes=args.base_ttl, enabled=False)),
+        "adaptatif": simulate(history, TTLPolicy(
+            base_ttl_minutes=args.base_ttl, max_ttl_minutes=args.max_ttl, enabled=True
+        )),
+    }
+
+    print(f"{'politique':<10} | {'demandes':>8} | {'scrapings':>9} | {'mois scrapés':>12}")
+    print("-" * 50)
+    for name, r in results.items():
+        print(f"{name:<10} | {r['requests']:>8} | {r['scrapes']:>9} | {r['month_scrapes']:>12}")
+
+    baseline = results["global"]["month_scrapes"]
+    if baseline:
+        saved = 1 - results["adaptatif"]["month_scrapes"] / baseline
+        print(f"\n✅ Volume de scraping (mois): {saved:.1%} d'économie")
+
+    print("\nÂge moyen des prix servis depuis le cache (minutes):")
+    for name, r in results.items():
+        ages = r['served_ages']
+        summary = ", ".join(
+            f"{bucket}: {sum(v) / len(v):.0f} (max {max(v):.0f})"
+            for bucket, v in sorted(ages.items())
+        ) or "aucun"
+        print(f"  {name:<10} {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,46 @@
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from contextlib import asynccontextmanager
-from datetime import datetime
+import json
+from typing import Optional
 import time
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
 from ..core.config import settings, PROJECT_NAME, API_VERSION, API_PREFIX
 from ..core.scraper_pool import scraper_pool
+from ..core.pacing import pacing_controller
+from ..core.proxy_pool import proxy_pool
+from ..core.circuit_breaker import circuit_breakers
+from ..core.exceptions import BlockedError, RateLimitError, ScrapingTimeoutError, ValidationError
 from ..database.manager import db_manager
+from ..services.price_cache import price_cache
+from ..services.refresh_queue import refresh_queue
+from ..services.job_estimator import job_estimator
+from ..services.ttl_policy import ttl_policy
+from ..services.prewarm_scheduler import prewarm_scheduler
+from ..services.calendar_service import (
+    DEFAULT_SCRAPE_TIMEOUT, scrape_flights_and_store, scrape_round_trip_and_store
+)
+from ..services.job_queue import job_queue
+from ..services.batch_search import batch_search, expand_routes
+from ..services.metro_search import metro_search
+from ..scrapers.calendar_extraction import parse_trip_lengths
+from ..scrapers.playwright_scraper import playwright_engine
+from ..utils.airports import airport_index
 from ..models.schemas import (
+    BatchCalendarPricesRequest,
     CalendarPricesResponse,
+    FlightsRequest,
+    FlightsResponse,
+    RoundTripPricesResponse,
     HealthResponse,
     ErrorResponse,
     CacheStatsResponse
 )
 from ..utils.logger import get_logger
+from ..utils.validators import Validators
 from .middleware.rate_limiter import rate_limit_middleware
 
 # Après la création de l'app
@@ -72,11 +96,23 @@ async def lifespan(app: FastAPI):
     if settings.environment == "production":
         db_manager.clear_old_cache(days=7)
 
+    # Volatilité observée des routes pour la politique TTL
+    ttl_policy.load_history(db_manager.get_scrape_history(days=30))
+
+    # Navigateurs orphelins (jobs tués, workers morts)
+    scraper_pool.reaper.start()
+
+    if settings.prewarm_enabled:
+        prewarm_scheduler.start()
+
     yield
 
     # Arrêt propre
     logger.warning(f"🛑 Arrêt {PROJECT_NAME}")
+    prewarm_scheduler.stop()
+    refresh_queue.shutdown()
     scraper_pool.shutdown()
+    playwright_engine.shutdown()
 
 
 # Créer l'app
@@ -128,6 +164,36 @@ async def general_exception_handler(request, exc: Exception):
     )
 
 
+def scraping_http_error(exc: Exception, label: str) -> HTTPException:
+    """
+    Erreur HTTP d'un scraping en échec (commune aux endpoints de scraping)
+
+    504 sur timeout, 503 + Retry-After sur cadence saturée / blocage /
+    disjoncteur ouvert, 500 sinon (envoyée à Sentry).
+
+    Args:
+        exc: Exception remontée par le service
+        label: Route pour les logs (ex: "CDG->JFK")
+    """
+    if isinstance(exc, (TimeoutError, ScrapingTimeoutError)):
+        logger.error(f"⏰ Timeout pour {label}")
+        return HTTPException(status_code=504, detail="Scraping timeout - le serveur a mis trop de temps")
+
+    if isinstance(exc, (RateLimitError, BlockedError)):
+        logger.warning(f"🚫 Scraping indisponible: {exc}")
+        retry_after = getattr(exc, 'retry_after', None) or settings.circuit_cooldown_seconds
+        return HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(int(retry_after) + 1)}
+        )
+
+    logger.error(f"❌ Erreur {label}: {exc}")
+    if SENTRY_AVAILABLE and settings.sentry_dsn and sentry_sdk:
+        sentry_sdk.capture_exception(exc)
+    return HTTPException(status_code=500, detail=str(exc))
+
+
 # ==================== HEALTH CHECK ====================
 
 @app.get(
@@ -179,15 +245,38 @@ async def get_calendar_prices(
     origin = origin.upper()
     destination = destination.upper()
 
-    # Vérifier cache
+    # Code métropole (PAR, NYC...): une route par aéroport, minimum par date
+    if airport_index.is_metro(origin) or airport_index.is_metro(destination):
+        return await get_metro_calendar_prices(origin, destination, start_date, end_date, force_refresh)
+
+    prewarm_scheduler.record_request(origin, destination, start_date, end_date)
+
+    # Vérifier cache (mémoire d'abord, la base hors de l'event loop)
     if not force_refresh:
-        cached_prices = db_manager.get_cached_calendar_prices(
-            origin, destination, start_date, end_date
+        cached = price_cache.lookup(
+            origin, destination, start_date, end_date, allow_stale=True
         )
 
-        if cached_prices:
+        # Mois vides (bloc négatif de 30s) ou stale en mémoire: un autre
+        # process (sidecar de pré-chauffage, worker de file) a pu écrire en
+        # base sans invalider ce cache
+        if cached is None or not cached[0] or cached[1]:
+            cached = await asyncio.get_running_loop().run_in_executor(
+                None,
+                db_manager.lookup_calendar_prices,
+                origin, destination, start_date, end_date
+            )
+
+        if cached and cached[0]:
+            cached_prices, stale_months = cached
+            stale = bool(stale_months)
+            if stale:
+                refresh_queue.schedule_months(
+                    origin, destination, start_date, end_date, stale_months
+                )
+
             duration = time.time() - start_time
-            logger.info(f"✓ Cache hit ({duration:.2f}s)")
+            logger.info(f"✓ Cache hit{' stale' if stale else ''} ({duration:.2f}s)")
 
             return CalendarPricesResponse.from_prices_dict(
                 origin=origin,
@@ -195,82 +284,334 @@ async def get_calendar_prices(
                 start_date=start_date,
                 end_date=end_date,
                 prices=cached_prices,
-                from_cache=True
+                from_cache=True,
+                stale=stale
             )
 
     # Scraping
     logger.info(f"🕷️  Soumission job scraping...")
 
     try:
-        job_id = scraper_pool.submit_scrape(origin, destination, start_date, end_date)
-
         loop = asyncio.get_event_loop()
         executor = ThreadPoolExecutor()
 
         # Attendre avec timeout de 5 minutes
         prices = await loop.run_in_executor(
             executor,
-            scraper_pool.wait_for_job,
-            job_id,
-            300  # 5 minutes
+            job_queue.scrape,
+            origin,
+            destination,
+            start_date,
+            end_date,
+            DEFAULT_SCRAPE_TIMEOUT
         )
 
-        if not prices:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Aucun prix trouvé"
-            )
+    except Exception as e:
+        raise scraping_http_error(e, f"{origin}->{destination}")
 
-        # Sauvegarder
-        db_manager.save_calendar_prices(origin, destination, prices)
-
-        # Logger
-        duration = time.time() - start_time
-        db_manager.log_scrape(
-            scrape_type="calendar",
-            origin=origin,
-            destination=destination,
-            success=True,
-            results_count=len(prices),
-            started_at=datetime.fromtimestamp(start_time),
-            duration_seconds=duration,
-            params={"start_date": start_date, "end_date": end_date}
+    if not prices:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Aucun prix trouvé"
         )
 
-        logger.info(f"✓ Scraping terminé ({duration:.1f}s)")
+    duration = time.time() - start_time
+    logger.info(f"✓ Scraping terminé ({duration:.1f}s)")
 
-        return CalendarPricesResponse.from_prices_dict(
-            origin=origin,
-            destination=destination,
-            start_date=start_date,
-            end_date=end_date,
-            prices=prices,
-            from_cache=False
+    return CalendarPricesResponse.from_prices_dict(
+        origin=origin,
+        destination=destination,
+        start_date=start_date,
+        end_date=end_date,
+        prices=prices,
+        from_cache=False
+    )
+
+
+@app.post(
+    f"{API_PREFIX}/calendar-prices/batch",
+    tags=["Scraping"],
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def get_calendar_prices_batch(request: BatchCalendarPricesRequest):
+    """
+    Calendriers de plusieurs routes, en NDJSON au fil de l'eau
+
+    Une ligne par route ({origin, destination, status: cached|scraped|error,
+    stale, prices, total_dates, min_price, routes, error}) dès qu'elle est
+    prête, puis une ligne {"done": true, ...}. Cache lu en une requête
+    (routes stale servies puis rafraîchies), routes manquantes ou partielles
+    scrapées par sessions Chrome partagées entre destinations d'une même
+    origine. Codes métropole développés comme pour /calendar-prices
+    (minimum par date, routes: route gagnante par date).
+    """
+    try:
+        routes = [Validators.validate_route(r.origin, r.destination) for r in request.routes]
+        start = Validators.validate_date(request.start_date)
+        Validators.validate_date(request.end_date, min_date=start)
+        expanded = expand_routes(routes)
+    except (ValidationError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    airport_routes = {r for parts in expanded.values() for r in parts}
+    if len(airport_routes) > settings.batch_max_routes:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.batch_max_routes} routes aéroport par batch ({len(airport_routes)} demandées)"
         )
 
-    except TimeoutError:
-        logger.error(f"⏰ Timeout pour {origin}->{destination}")
+    logger.info(f"📥 Requête batch: {len(routes)} routes, {request.start_date} -> {request.end_date}")
+
+    def lines():
+        for event in batch_search.stream(routes, request.start_date, request.end_date, request.force_refresh):
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    # Générateur bloquant: itéré dans le threadpool par Starlette
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def get_metro_calendar_prices(
+    origin: str,
+    destination: str,
+    start_date: str,
+    end_date: str,
+    force_refresh: bool
+) -> CalendarPricesResponse:
+    """Calendrier d'une requête métropole: routes en cache réutilisées, les autres scrapées en parallèle"""
+    start_time = time.time()
+
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(
+            None,
+            metro_search.calendar_prices,
+            origin, destination, start_date, end_date, force_refresh
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise scraping_http_error(e, f"{origin}->{destination}")
+
+    if not result.prices:
+        raise HTTPException(status_code=404, detail="Aucun prix trouvé")
+
+    logger.info(
+        f"✓ Métropole {origin}->{destination}: {len(result.cached_routes)} routes en cache, "
+        f"{len(result.scraped_routes)} scrapées, {len(result.failed_routes)} en échec ({time.time() - start_time:.1f}s)"
+    )
+    return CalendarPricesResponse.from_prices_dict(
+        origin=origin,
+        destination=destination,
+        start_date=start_date,
+        end_date=end_date,
+        prices=result.prices,
+        from_cache=result.from_cache,
+        stale=result.stale,
+        routes=result.route_labels()
+    )
+
+
+# ==================== ROUND TRIP ====================
+
+@app.get(
+    f"{API_PREFIX}/round-trip-prices",
+    response_model=RoundTripPricesResponse,
+    tags=["Scraping"],
+)
+async def get_round_trip_prices(
+    origin: str = Query(..., description="Code IATA aéroport de départ"),
+    destination: str = Query(..., description="Code IATA aéroport d'arrivée"),
+    start_date: str = Query(..., description="Premier départ (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="Dernier départ (YYYY-MM-DD)"),
+    trip_lengths: str = Query("7", description="Durées de séjour en jours, séparées par des virgules (ex: 3,7,14)"),
+    force_refresh: bool = Query(False, description="Forcer le re-scraping"),
+):
+    """Grille aller-retour départ × durée, scrapée en une seule session navigateur"""
+    start_time = time.time()
+
+    try:
+        origin, destination = Validators.validate_route(origin, destination)
+        start = Validators.validate_date(start_date)
+        Validators.validate_date(end_date, min_date=start)
+        lengths = parse_trip_lengths(trip_lengths)
+    except (ValidationError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(lengths) > settings.round_trip_max_lengths:
         raise HTTPException(
-            status_code=504,
-            detail="Scraping timeout - le serveur a mis trop de temps"
+            status_code=400,
+            detail=f"Maximum {settings.round_trip_max_lengths} durées par grille"
+        )
+
+    logger.info(f"📥 Requête aller-retour: {origin}<->{destination}, {start_date} -> {end_date}, {lengths} j")
+    loop = asyncio.get_running_loop()
+
+    if not force_refresh:
+        cached = await loop.run_in_executor(
+            None,
+            db_manager.get_cached_round_trip_grid,
+            origin, destination, start_date, end_date, lengths
+        )
+        if cached is not None:
+            logger.info(f"✓ Cache hit aller-retour ({time.time() - start_time:.2f}s)")
+            return RoundTripPricesResponse.from_grid(
+                origin, destination, start_date, end_date, cached, from_cache=True
+            )
+
+    try:
+        grid = await loop.run_in_executor(
+            None,
+            scrape_round_trip_and_store,
+            origin, destination, start_date, end_date, lengths, DEFAULT_SCRAPE_TIMEOUT
         )
     except Exception as e:
-        logger.error(f"❌ Erreur: {e}")
-        db_manager.log_scrape(
-            scrape_type="calendar",
-            origin=origin,
-            destination=destination,
-            success=False,
-            error_message=str(e),
-            started_at=datetime.fromtimestamp(start_time),
-            duration_seconds=time.time() - start_time
+        raise scraping_http_error(e, f"aller-retour {origin}<->{destination}")
+
+    if not any(grid.values()):
+        raise HTTPException(status_code=404, detail="Aucun prix trouvé")
+
+    logger.info(f"✓ Grille aller-retour terminée ({time.time() - start_time:.1f}s)")
+    return RoundTripPricesResponse.from_grid(origin, destination, start_date, end_date, grid)
+
+
+# ==================== FLIGHTS ====================
+
+@app.get(
+    f"{API_PREFIX}/flights",
+    response_model=FlightsResponse,
+    tags=["Scraping"],
+)
+async def get_flights(
+    origin: str = Query(..., description="Code IATA aéroport de départ"),
+    destination: str = Query(..., description="Code IATA aéroport d'arrivée"),
+    departure_date: str = Query(..., description="Date de départ (YYYY-MM-DD)"),
+    return_date: Optional[str] = Query(None, description="Date de retour (YYYY-MM-DD, absent = aller simple)"),
+    passengers: int = Query(1, ge=1, le=9, description="Nombre de passagers"),
+    force_refresh: bool = Query(False, description="Forcer le re-scraping"),
+):
+    """Liste des vols d'une date, lue dans la session du calendrier du mois de départ"""
+    start_time = time.time()
+
+    try:
+        origin, destination = Validators.validate_route(origin, destination)
+        departure = Validators.validate_date(departure_date)
+        if return_date:
+            Validators.validate_date(return_date, min_date=departure)
+    except (ValidationError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    request = FlightsRequest(
+        origin=origin, destination=destination, departure_date=departure_date,
+        return_date=return_date, passengers=passengers, force_refresh=force_refresh
+    )
+
+    logger.info(f"📥 Requête vols: {origin}->{destination} le {departure_date}"
+                f"{f' retour {return_date}' if return_date else ''}")
+    loop = asyncio.get_running_loop()
+
+    if not force_refresh:
+        cached = await loop.run_in_executor(
+            None,
+            db_manager.get_cached_flights,
+            origin, destination, departure_date, return_date
+        )
+        if cached:
+            logger.info(f"✓ Cache hit vols ({time.time() - start_time:.2f}s)")
+            return FlightsResponse.from_flights(request, cached, from_cache=True)
+
+    try:
+        flights = await loop.run_in_executor(
+            None,
+            scrape_flights_and_store,
+            origin, destination, departure_date, return_date, DEFAULT_SCRAPE_TIMEOUT
         )
+    except Exception as e:
+        raise scraping_http_error(e, f"vols {origin}->{destination}")
 
-        # Envoyer à Sentry si configuré
-        if SENTRY_AVAILABLE and settings.sentry_dsn and sentry_sdk:
-            sentry_sdk.capture_exception(e)
+    if not flights:
+        raise HTTPException(status_code=404, detail="Aucun vol trouvé")
+
+    logger.info(f"✓ Vols terminés ({time.time() - start_time:.1f}s)")
+    return FlightsResponse.from_flights(request, flights)
+
+
+# ==================== SCRAPER ====================
+
+@app.get(
+    f"{API_PREFIX}/scraper/pacing",
+    tags=["Scraper"]
+)
+async def get_pacing_stats():
+    """Débit courant et temps d'attente du contrôleur de cadence global"""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, pacing_controller.get_stats)
+
+
+@app.get(
+    f"{API_PREFIX}/scraper/processes",
+    tags=["Scraper"]
+)
+async def get_process_stats():
+    """Navigateurs résidents, mémoire (RSS) par job et orphelins tués"""
+    loop = asyncio.get_event_loop()
+    stats = await loop.run_in_executor(None, scraper_pool.get_process_stats)
+    stats['playwright'] = playwright_engine.get_stats()
+    return stats
 
-        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get(
+    f"{API_PREFIX}/scraper/circuit",
+    tags=["Scraper"]
+)
+async def get_circuit_stats():
+    """État des disjoncteurs (global, connexion directe)"""
+    return circuit_breakers.get_stats()
+
+
+@app.get(
+    f"{API_PREFIX}/scraper/proxies",
+    tags=["Scraper"]
+)
+async def get_proxy_stats():
+    """Santé, quarantaine et comptabilité (requêtes, octets) par proxy"""
+    stats = proxy_pool.get_stats()
+    stats['capacity'] = scraper_pool.capacity()
+    stats['active_jobs'] = scraper_pool.get_active_jobs_count()
+    return stats
+
+
+@app.get(
+    f"{API_PREFIX}/scraper/queue",
+    tags=["Scraper"]
+)
+async def get_refresh_queue():
+    """Jobs de rafraîchissement et de scraping (interactifs compris) en cours et en file, avec ETA estimée"""
+    loop = asyncio.get_event_loop()
+    jobs = await loop.run_in_executor(None, refresh_queue.get_queue)
+    scraper_jobs = await loop.run_in_executor(None, refresh_queue.get_scraper_jobs)
+    return {
+        'stats': refresh_queue.get_stats(),
+        'jobs': jobs,
+        'scraper_jobs': scraper_jobs,
+        'estimator': job_estimator.get_stats(),
+        'job_queue': await loop.run_in_executor(None, job_queue.get_stats),
+    }
+
+
+@app.get(
+    f"{API_PREFIX}/scraper/estimate",
+    tags=["Scraper"]
+)
+async def estimate_scrape(
+    origin: str = Query(..., description="Code IATA aéroport de départ"),
+    destination: str = Query(..., description="Code IATA aéroport d'arrivée"),
+    start_date: str = Query(..., description="Date début (YYYY-MM-DD)"),
+    end_date: str = Query(..., description="Date fin (YYYY-MM-DD)"),
+):
+    """Durée et temps de worker prédits pour un scraping"""
+    try:
+        origin, destination = Validators.validate_route(origin, destination)
+        start = Validators.validate_date(start_date)
+        Validators.validate_date(end_date, min_date=start)
+    except (ValidationError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job_estimator.estimate(origin, destination, start_date, end_date)
 
 
 # ==================== CACHE MANAGEMENT ====================
@@ -282,7 +623,10 @@ async def get_calendar_prices(
 )
 async def get_cache_stats():
     """Récupère les statistiques du cache"""
-    stats = db_manager.get_cache_stats()
+    loop = asyncio.get_running_loop()
+    stats = await loop.run_in_executor(None, db_manager.get_cache_stats)
+    # Classement lu dans scrape_logs: hors de l'event loop
+    ranked = await loop.run_in_executor(None, prewarm_scheduler.rank_routes)
 
     from ..models.schemas import CacheInfo
 
@@ -295,7 +639,14 @@ async def get_cache_stats():
 
     return CacheStatsResponse(
         cache_info=cache_info,
-        recent_scrapes=stats.get('recent_scrapes', [])
+        recent_scrapes=stats.get('recent_scrapes', []),
+        popular_routes=[
+            {k: v for k, v in route.items() if k != 'months'}
+            for route in ranked[:10]
+        ],
+        memory_cache=price_cache.get_stats(),
+        stale_refresh=refresh_queue.get_stats(),
+        prewarm=prewarm_scheduler.get_stats()
     )
 
 
@@ -0,0 +1,317 @@
+"""
+Contrôle d'admission des jobs selon la mémoire et le CPU du conteneur
+
+Les limites sont lues dans le cgroup au démarrage (v2 puis v1, sinon la
+machine). La mémoire mesurée est l'usage du cgroup (tous les process du
+conteneur: autres workers uvicorn, sidecar, Chrome d'autres pools), à
+défaut la RSS de ce process et de ses workers. Un échantillonneur suit
+la RSS de l'arbre de chaque worker et apprend un profil mémoire par job
+(EWMA des pics), qui ne sert qu'à la projection: un job ne démarre que
+si la mémoire mesurée + la croissance attendue des jobs en cours jusqu'à
+leur pic + le nouveau job reste sous la limite; sinon il attend une
+place, puis est refusé.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config import settings
+from .exceptions import CapacityError
+from .process_tree import scan_job_processes
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+# Lissage du profil mémoire (pics des jobs terminés)
+PROFILE_EWMA_ALPHA = 0.3
+
+# Seuil au-delà duquel une limite cgroup v1 signifie "illimité"
+CGROUP_V1_UNLIMITED = 1 << 60
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def read_cgroup_limits(root: Path = CGROUP_ROOT) -> Dict:
+    """
+    Limites mémoire et CPU du conteneur
+
+    Returns:
+        Dict {memory_bytes, cpus, source} (None = pas de limite connue)
+    """
+    memory = cpus = None
+    source = "host"
+
+    # cgroup v2
+    memory_max = _read(root / "memory.max")
+    cpu_max = _read(root / "cpu.max")
+    if memory_max is not None or cpu_max is not None:
+        source = "cgroup2"
+        if memory_max and memory_max != "max":
+            memory = int(memory_max)
+        if cpu_max:
+            quota, _, period = cpu_max.partition(" ")
+            if quota != "max" and period:
+                cpus = int(quota) / int(period)
+    else:
+        # cgroup v1
+        limit = _read(root / "memory" / "memory.limit_in_bytes")
+        quota = _read(root / "cpu" / "cpu.cfs_quota_us")
+        period = _read(root / "cpu" / "cpu.cfs_period_us")
+        if limit is not None or quota is not None:
+            source = "cgroup1"
+        if limit and int(limit) < CGROUP_V1_UNLIMITED:
+            memory = int(limit)
+        if quota and period and int(quota) > 0:
+            cpus = int(quota) / int(period)
+
+    if memory is None:
+        meminfo = _read(Path("/proc/meminfo")) or ""
+        for line in meminfo.splitlines():
+            if line.startswith("MemTotal:"):
+                memory = int(line.split()[1]) * 1024
+                break
+    if cpus is None:
+        cpus = float(os.cpu_count() or 1)
+
+    return {'memory_bytes': memory, 'cpus': cpus, 'source': source}
+
+
+def read_cgroup_usage(root: Path = CGROUP_ROOT) -> Optional[int]:
+    """
+    Mémoire utilisée par le conteneur (cgroup v2 puis v1)
+
+    Le cache de pages inactif (récupérable) est retiré, comme docker stats.
+
+    Returns:
+        Octets utilisés, ou None hors cgroup
+    """
+    for usage_file, stat_file, inactive_key in (
+            (root / "memory.current", root / "memory.stat", "inactive_file"),
+            (root / "memory" / "memory.usage_in_bytes", root / "memory" / "memory.stat", "total_inactive_file"),
+    ):
+        usage = _read(usage_file)
+        if usage is None:
+            continue
+        inactive = 0
+        for line in (_read(stat_file) or "").splitlines():
+            key, _, value = line.partition(" ")
+            if key == inactive_key:
+                inactive = int(value)
+                break
+        return max(0, int(usage) - inactive)
+    return None
+
+
+def _self_rss() -> int:
+    """RSS du process courant (API ou sidecar)"""
+    statm = _read(Path("/proc/self/statm"))
+    if not statm:
+        return 0
+    return int(statm.split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class AdmissionController:
+    """
+    Admission des jobs de scraping (mémoire projetée + slots CPU)
+
+    La RSS est sommée sur les process de l'arbre (mémoire partagée de
+    Chrome comptée plusieurs fois): l'estimation est volontairement
+    pessimiste.
+    """
+
+    def __init__(
+            self,
+            memory_limit_bytes: Optional[int] = None,
+            cpus: Optional[float] = None,
+            enabled: Optional[bool] = None
+    ):
+        limits = read_cgroup_limits()
+        self.memory_limit_bytes = memory_limit_bytes or limits['memory_bytes']
+        self.cpus = cpus or limits['cpus']
+        self.source = limits['source'] if memory_limit_bytes is None else "config"
+        self.enabled = (settings.admission_enabled if enabled is None else enabled) and bool(self.memory_limit_bytes)
+
+        self.reserve_ratio = settings.admission_memory_reserve_ratio
+        self.cpu_slots = max(1, int(self.cpus * settings.admission_jobs_per_cpu))
+        self.profile_bytes = float(settings.admission_default_job_mb * 1024 * 1024)
+
+        # {job_id: RSS courante}, {job_id: pic observé}
+        self._running: Dict[str, int] = {}
+        self._peaks: Dict[str, int] = {}
+        # Mémoire mesurée (cgroup, sinon RSS de ce process et de ses jobs)
+        usage = read_cgroup_usage()
+        self.usage_source = "cgroup" if usage is not None else "rss"
+        self._measured_bytes = usage if usage is not None else _self_rss()
+        self._cond = threading.Condition()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+        if self.enabled:
+            logger.info(
+                f"✓ Admission: {self.memory_limit_bytes / 1024 ** 3:.1f} Go, "
+                f"{self.cpus:g} CPU ({self.source}), {self.cpu_slots} slots CPU"
+            )
+
+    # ==================== PROJECTION ====================
+
+    @property
+    def usable_bytes(self) -> float:
+        return self.memory_limit_bytes * (1 - self.reserve_ratio)
+
+    @property
+    def _baseline_bytes(self) -> float:
+        """Mémoire mesurée hors jobs de ce process"""
+        return max(0, self._measured_bytes - sum(self._running.values()))
+
+    def projected_bytes(self, extra_jobs: int = 1) -> float:
+        """Mémoire mesurée + croissance des jobs en cours jusqu'au profil + extra_jobs nouveaux"""
+        growth = sum(max(0.0, self.profile_bytes - rss) for rss in self._running.values())
+        return self._measured_bytes + growth + extra_jobs * self.profile_bytes
+
+    def _has_headroom(self) -> bool:
+        return (
+            len(self._running) < self.cpu_slots
+            and self.projected_bytes() <= self.usable_bytes
+        )
+
+    def capacity(self) -> int:
+        """Jobs simultanés que la mémoire et le CPU permettent"""
+        if not self.enabled:
+            return self.cpu_slots
+        by_memory = int((self.usable_bytes - self._baseline_bytes) // max(self.profile_bytes, 1))
+        return max(1, min(self.cpu_slots, by_memory))
+
+    # ==================== ADMISSION ====================
+
+    def admit(self, job_id: str, timeout: Optional[float] = None):
+        """
+        Réserve une place pour un job (bloque tant qu'il n'y a pas de marge)
+
+        Args:
+            timeout: Attente maximale en file (None = settings)
+
+        Raises:
+            CapacityError: Si la marge n'apparaît pas à temps
+        """
+        if not self.enabled:
+            return
+
+        self._start_sampler()
+        timeout = settings.admission_queue_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+        waited = False
+
+        with self._cond:
+            while not self._has_headroom():
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self.rejected += 1
+                    raise CapacityError(
+                        f"Capacité du conteneur saturée ({len(self._running)} jobs, "
+                        f"{self.projected_bytes() / 1024 ** 2:.0f}/{self.usable_bytes / 1024 ** 2:.0f} Mo projetés)",
+                        retry_after=max(10.0, settings.admission_queue_timeout)
+                    )
+                if not waited:
+                    waited = True
+                    self.queued += 1
+                    logger.info(f"⏳ Job {job_id} en attente de mémoire/CPU")
+                self._cond.wait(min(remaining, settings.admission_sample_seconds))
+
+            self._running[job_id] = 0
+            self._peaks[job_id] = 0
+            self.admitted += 1
+
+    def finish(self, job_id: str, learn: bool = True):
+        """
+        Libère la place d'un job
+
+        Args:
+            learn: Intégrer son pic mémoire au profil (False = job jamais lancé)
+        """
+        with self._cond:
+            self._running.pop(job_id, None)
+            peak = self._peaks.pop(job_id, 0)
+            if learn and peak > 0:
+                self.profile_bytes = PROFILE_EWMA_ALPHA * peak + (1 - PROFILE_EWMA_ALPHA) * self.profile_bytes
+            self._cond.notify_all()
+
+    # ==================== ÉCHANTILLONNAGE ====================
+
+    def sample(self):
+        """Met à jour la RSS des jobs admis (arbres marqués de ce process)"""
+        me = os.getpid()
+        rss: Dict[str, int] = {}
+        for info in scan_job_processes():
+            if info.owner_pid == me:
+                rss[info.job_id] = rss.get(info.job_id, 0) + info.rss_bytes
+
+        usage = read_cgroup_usage() if self.usage_source == "cgroup" else None
+
+        with self._cond:
+            for job_id in self._running:
+                current = rss.get(job_id, 0)
+                self._running[job_id] = current
+                self._peaks[job_id] = max(self._peaks.get(job_id, 0), current)
+            if usage is None:
+                usage = _self_rss() + sum(self._running.values())
+            self._measured_bytes = usage
+            self._cond.notify_all()
+
+    def _run_sampler(self):
+        while not self._stop.wait(settings.admission_sample_seconds):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.debug(f"Erreur échantillonnage mémoire: {e}")
+
+    def _start_sampler(self):
+        with self._cond:
+            if self._sampler and self._sampler.is_alive():
+                return
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._run_sampler, name="admission-sampler", daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def get_stats(self) -> Dict:
+        """Limites, projection et compteurs d'admission"""
+        with self._cond:
+            return {
+                'enabled': self.enabled,
+                'source': self.source,
+                'memory_limit_bytes': self.memory_limit_bytes,
+                'usable_bytes': int(self.usable_bytes) if self.memory_limit_bytes else None,
+                'cpus': self.cpus,
+                'cpu_slots': self.cpu_slots,
+                'capacity': self.capacity(),
+                'running_jobs': len(self._running),
+                'running_rss_bytes': sum(self._running.values()),
+                'usage_source': self.usage_source,
+                'measured_bytes': int(self._measured_bytes),
+                'projected_bytes': int(self.projected_bytes(extra_jobs=0)) if self.memory_limit_bytes else None,
+                'job_profile_bytes': int(self.profile_bytes),
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected': self.rejected,
+            }
+
+
+# Instance globale
+admission_controller = AdmissionController()
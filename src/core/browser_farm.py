@@ -0,0 +1,370 @@
+"""
+Ferme de navigateurs distants (Selenium Grid / standalone, Chrome en CDP)
+
+Avec BROWSER_BACKEND=remote, les workers ne lancent plus Chrome sur l'hôte
+de l'API: chaque job emprunte un endpoint de BROWSER_ENDPOINTS (le moins
+chargé parmi les sains, dans la limite de sa capacité) et y ouvre sa
+session. Les endpoints sont sondés périodiquement (/status WebDriver,
+/json/version CDP); un endpoint qui refuse plusieurs sessions de suite est
+écarté jusqu'à la prochaine sonde réussie.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+import requests
+
+from .config import settings
+from .exceptions import CapacityError
+from .proxy_pool import OUTCOME_SUCCESS, OUTCOME_CANCELLED
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+BROWSER_BACKEND_LOCAL = "local"
+BROWSER_BACKEND_REMOTE = "remote"
+
+ENDPOINT_WEBDRIVER = "webdriver"
+ENDPOINT_CDP = "cdp"
+
+# Variable d'environnement qui indique au worker l'endpoint emprunté
+BROWSER_ENDPOINT_ENV_VAR = "TRAVLIAQ_BROWSER_ENDPOINT"
+
+# Sessions refusées d'affilée avant d'écarter un endpoint
+MAX_CONSECUTIVE_FAILURES = 3
+
+# Timeout HTTP des sondes et des suppressions de session
+PROBE_TIMEOUT_SECONDS = 3.0
+
+
+@dataclass
+class BrowserEndpoint:
+    """État et comptabilité d'un endpoint distant"""
+    url: str
+    kind: str
+    max_sessions: int
+    active: int = 0
+    healthy: bool = True
+    remote_slots: Optional[int] = None  # slots annoncés par la Grid
+    remote_free: Optional[int] = None
+    sessions: int = 0
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    probe_latency_seconds: Optional[float] = None
+    last_probe: float = 0.0
+    last_error: Optional[str] = None
+
+    @property
+    def capacity(self) -> int:
+        if self.remote_slots:
+            return min(self.max_sessions, self.remote_slots)
+        return self.max_sessions
+
+    @property
+    def load(self) -> float:
+        return self.active / max(1, self.capacity)
+
+    def is_available(self) -> bool:
+        return self.healthy and self.active < self.capacity
+
+
+def endpoint_kind(url: str) -> str:
+    """webdriver (http/https) ou cdp (cdp://host:port)"""
+    return ENDPOINT_CDP if urlsplit(url).scheme == "cdp" else ENDPOINT_WEBDRIVER
+
+
+def parse_endpoint(spec: str, default_sessions: int) -> BrowserEndpoint:
+    """
+    Parse un endpoint `url[|sessions]`
+
+    http(s)://... = serveur WebDriver (Grid, standalone), cdp://host:port =
+    Chrome lancé avec --remote-debugging-port.
+    """
+    url, _, sessions = spec.partition("|")
+    url = url.strip().rstrip("/")
+    return BrowserEndpoint(
+        url=url,
+        kind=endpoint_kind(url),
+        max_sessions=int(sessions) if sessions.strip() else default_sessions
+    )
+
+
+def parse_endpoint_list(value: Optional[str], default_sessions: int) -> List[BrowserEndpoint]:
+    """Parse une liste d'endpoints séparés par des virgules"""
+    return [parse_endpoint(spec, default_sessions) for spec in (value or "").split(",") if spec.strip()]
+
+
+def cdp_http_url(url: str) -> str:
+    """cdp://host:port -> http://host:port (API HTTP de DevTools)"""
+    return "http://" + urlsplit(url).netloc
+
+
+def debugger_address(url: str) -> str:
+    """cdp://host:port -> host:port (option debuggerAddress de chromedriver)"""
+    return urlsplit(url).netloc
+
+
+def probe_endpoint(endpoint: BrowserEndpoint, timeout: float = PROBE_TIMEOUT_SECONDS) -> Dict:
+    """
+    Sonde un endpoint
+
+    Returns:
+        Dict {healthy, slots, free, latency_seconds, error} (slots/free
+        seulement pour une Grid qui les annonce)
+    """
+    start = time.time()
+    try:
+        if endpoint.kind == ENDPOINT_CDP:
+            response = requests.get(f"{cdp_http_url(endpoint.url)}/json/version", timeout=timeout)
+            response.raise_for_status()
+            return {'healthy': True, 'slots': None, 'free': None, 'latency_seconds': time.time() - start}
+
+        response = requests.get(f"{endpoint.url}/status", timeout=timeout)
+        response.raise_for_status()
+        value = response.json().get('value') or {}
+        nodes = value.get('nodes') or []
+        slots = [slot for node in nodes if node.get('availability', 'UP') == 'UP' for slot in node.get('slots', [])]
+        # ready=false aussi quand tous les slots sont pris: un noeud UP suffit
+        healthy = bool(value.get('ready')) or any(node.get('availability') == 'UP' for node in nodes)
+        return {
+            'healthy': healthy,
+            'slots': len(slots) or None,
+            'free': sum(1 for slot in slots if not slot.get('session')) if slots else None,
+            'latency_seconds': time.time() - start,
+            'error': None if healthy else value.get('message', 'not ready'),
+        }
+    except (requests.RequestException, ValueError) as e:
+        return {'healthy': False, 'slots': None, 'free': None, 'latency_seconds': None, 'error': str(e)}
+
+
+def delete_session(endpoint_url: str, session_id: str):
+    """Ferme une session WebDriver restée ouverte (worker tué)"""
+    try:
+        requests.delete(f"{endpoint_url}/session/{session_id}", timeout=PROBE_TIMEOUT_SECONDS)
+        logger.info(f"🧹 Session {session_id[:8]} fermée sur {endpoint_url}")
+    except requests.RequestException as e:
+        logger.debug(f"Erreur fermeture session {session_id} ({endpoint_url}): {e}")
+
+
+class BrowserFarm:
+    """
+    Endpoints de navigateurs partagés par les jobs du ScraperPool
+
+    Désactivée (acquire() renvoie None = Chrome local) si BROWSER_BACKEND
+    vaut local ou si BROWSER_ENDPOINTS est vide.
+    """
+
+    def __init__(
+            self,
+            endpoints: Optional[List[str]] = None,
+            max_sessions: Optional[int] = None,
+            probe_interval: Optional[float] = None,
+            enabled: Optional[bool] = None
+    ):
+        self.max_sessions = max_sessions or settings.browser_endpoint_max_sessions
+        self.probe_interval = probe_interval or settings.browser_probe_interval_seconds
+        specs = ",".join(endpoints) if endpoints is not None else settings.browser_endpoints
+
+        self._endpoints: Dict[str, BrowserEndpoint] = {
+            endpoint.url: endpoint for endpoint in parse_endpoint_list(specs, self.max_sessions)
+        }
+        backend_remote = settings.browser_backend == BROWSER_BACKEND_REMOTE
+        self.enabled = (backend_remote if enabled is None else enabled) and bool(self._endpoints)
+        self._cond = threading.Condition()
+        self._prober: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        if self.enabled:
+            logger.info(f"✓ BrowserFarm: {len(self._endpoints)} endpoints, {self.capacity()} sessions")
+
+    # ==================== SONDES ====================
+
+    def probe_all(self):
+        """Sonde tous les endpoints (hors verrou) et met à jour leur santé"""
+        with self._cond:
+            endpoints = list(self._endpoints.values())
+
+        results = [(endpoint, probe_endpoint(endpoint)) for endpoint in endpoints]
+
+        with self._cond:
+            now = time.time()
+            for endpoint, result in results:
+                was_healthy = endpoint.healthy
+                endpoint.healthy = result['healthy']
+                endpoint.remote_slots = result['slots']
+                endpoint.remote_free = result['free']
+                endpoint.probe_latency_seconds = result['latency_seconds']
+                endpoint.last_probe = now
+                endpoint.last_error = result.get('error')
+                if endpoint.healthy:
+                    endpoint.consecutive_failures = 0
+                if was_healthy != endpoint.healthy:
+                    if endpoint.healthy:
+                        logger.info(f"✓ Endpoint navigateur {endpoint.url} de nouveau disponible")
+                    else:
+                        logger.warning(f"🚫 Endpoint navigateur {endpoint.url} indisponible: {endpoint.last_error}")
+            self._cond.notify_all()
+
+    def _start_prober(self):
+        """Première sonde synchrone puis thread périodique (au premier job)"""
+        with self._cond:
+            if self._prober is not None:
+                return
+            self._prober = threading.Thread(target=self._probe_loop, name="browser-farm-prober", daemon=True)
+
+        self.probe_all()
+        self._prober.start()
+
+    def _probe_loop(self):
+        while not self._stop.wait(self.probe_interval):
+            try:
+                self.probe_all()
+            except Exception as e:
+                logger.error(f"Erreur sonde des endpoints navigateur: {e}")
+
+    # ==================== SÉLECTION ====================
+
+    def _pick(self, exclude: Optional[Set[str]] = None) -> Optional[BrowserEndpoint]:
+        candidates = [
+            e for e in self._endpoints.values()
+            if e.is_available() and e.url not in (exclude or ())
+        ]
+        if not candidates:
+            return None
+        # Le moins chargé, puis celui qui a servi le moins de sessions
+        return min(candidates, key=lambda e: (e.load, e.active, e.sessions))
+
+    def acquire(self, timeout: Optional[float] = None, exclude: Optional[Set[str]] = None) -> Optional[str]:
+        """
+        Emprunte un endpoint pour un job
+
+        Args:
+            timeout: Attente maximale d'un endpoint libre (None = settings)
+            exclude: Endpoints à éviter (ex: celui du job qu'on double)
+
+        Returns:
+            URL de l'endpoint, ou None si la ferme est désactivée
+
+        Raises:
+            CapacityError: Si aucun endpoint sain ne se libère à temps
+        """
+        if not self.enabled:
+            return None
+
+        self._start_prober()
+        timeout = settings.browser_acquire_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+
+        with self._cond:
+            while True:
+                endpoint = self._pick(exclude)
+                if endpoint is not None:
+                    endpoint.active += 1
+                    endpoint.sessions += 1
+                    return endpoint.url
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    healthy = sum(1 for e in self._endpoints.values() if e.healthy)
+                    raise CapacityError(
+                        f"Aucun navigateur distant libre ({healthy}/{len(self._endpoints)} endpoints sains)",
+                        retry_after=max(10.0, float(settings.browser_acquire_timeout))
+                    )
+                # Réveil sur release() ou sur une sonde
+                self._cond.wait(min(remaining, self.probe_interval))
+
+    def release(
+            self,
+            url: Optional[str],
+            outcome: str,
+            session_id: Optional[str] = None,
+            driver_failed: bool = False
+    ):
+        """
+        Rend un endpoint à la ferme
+
+        Args:
+            url: Endpoint emprunté (None = rien à faire)
+            outcome: success, failure, timeout, blocked ou cancelled
+            session_id: Session WebDriver du worker, fermée si le job n'a
+                pas abouti (le worker tué n'a pas pu appeler quit())
+            driver_failed: La session n'a pas pu être créée sur l'endpoint
+        """
+        if not url:
+            return
+
+        with self._cond:
+            endpoint = self._endpoints.get(url)
+            if endpoint is None:
+                return
+
+            endpoint.active = max(0, endpoint.active - 1)
+            if outcome == OUTCOME_SUCCESS:
+                endpoint.successes += 1
+                endpoint.consecutive_failures = 0
+            elif outcome != OUTCOME_CANCELLED:
+                endpoint.failures += 1
+
+            if driver_failed:
+                endpoint.consecutive_failures += 1
+                if endpoint.healthy and endpoint.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                    endpoint.healthy = False
+                    logger.warning(
+                        f"🚫 Endpoint navigateur {url} écarté "
+                        f"({endpoint.consecutive_failures} sessions refusées)"
+                    )
+            self._cond.notify_all()
+            kind = endpoint.kind
+
+        if session_id and outcome != OUTCOME_SUCCESS and kind == ENDPOINT_WEBDRIVER:
+            # Sans bloquer l'appelant (la Grid peut être lente à répondre)
+            threading.Thread(target=delete_session, args=(url, session_id), daemon=True).start()
+
+    # ==================== STATS ====================
+
+    def capacity(self) -> int:
+        """Sessions simultanées que les endpoints sains peuvent porter"""
+        with self._cond:
+            return sum(e.capacity for e in self._endpoints.values() if e.healthy)
+
+    def get_stats(self) -> Dict:
+        """Santé et charge par endpoint"""
+        now = time.time()
+        with self._cond:
+            endpoints = [
+                {
+                    'url': e.url,
+                    'kind': e.kind,
+                    'healthy': e.healthy,
+                    'active': e.active,
+                    'capacity': e.capacity,
+                    'remote_slots': e.remote_slots,
+                    'remote_free': e.remote_free,
+                    'sessions': e.sessions,
+                    'successes': e.successes,
+                    'failures': e.failures,
+                    'probe_latency_seconds': (
+                        round(e.probe_latency_seconds, 3) if e.probe_latency_seconds is not None else None
+                    ),
+                    'probed_seconds_ago': round(now - e.last_probe) if e.last_probe else None,
+                    'last_error': e.last_error,
+                }
+                for e in self._endpoints.values()
+            ]
+        return {
+            'enabled': self.enabled,
+            'backend': settings.browser_backend,
+            'endpoints': endpoints,
+        }
+
+    def stop(self):
+        self._stop.set()
+
+
+# Instance globale
+browser_farm = BrowserFarm()
@@ -0,0 +1,170 @@
+"""
+Transport CDP direct vers l'onglet Chrome (websocket DevTools)
+
+Chaque commande WebDriver fait Python → HTTP → chromedriver → CDP →
+navigateur. Avec CDP_TRANSPORT=true, les opérations chaudes du scraper
+(lecture des cellules, clics de navigation, attente des prix) passent par
+le websocket DevTools de l'onglet: Runtime.evaluate en direct, sans le
+saut HTTP ni la sérialisation WebDriver. chromedriver ne sert plus qu'à
+créer la session, charger la page et injecter les scripts stealth.
+
+Dépendance optionnelle: websocket-client. Sans elle (ou si le websocket
+n'est pas joignable), le scraper reste sur execute_script.
+"""
+
+import itertools
+import json
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from .exceptions import ScraperException
+from ..utils.logger import get_logger
+
+try:
+    import websocket
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    WEBSOCKET_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+
+TRANSPORT_WEBDRIVER = "webdriver"
+TRANSPORT_CDP = "cdp"
+
+# Timeout d'une commande CDP (hors attentes awaitPromise)
+CDP_COMMAND_TIMEOUT_SECONDS = 30.0
+
+
+class CdpError(ScraperException):
+    """Commande CDP en erreur ou websocket fermé"""
+    pass
+
+
+class CdpScriptError(CdpError):
+    """Exception JavaScript levée par le script évalué"""
+    pass
+
+
+def page_websocket_url(debugger_address: str, target_id: Optional[str] = None,
+                       timeout: float = 3.0) -> str:
+    """
+    URL websocket d'un onglet via l'API HTTP DevTools (/json/list)
+
+    Args:
+        debugger_address: host:port du port de debug de Chrome
+        target_id: Onglet voulu (handle de fenêtre chromedriver = targetId);
+            None = premier onglet
+
+    Raises:
+        CdpError: Aucun onglet joignable
+    """
+    try:
+        targets = requests.get(f"http://{debugger_address}/json/list", timeout=timeout).json()
+    except Exception as e:
+        raise CdpError(f"DevTools injoignable sur {debugger_address}: {e}")
+
+    pages = [t for t in targets if t.get("type") == "page" and t.get("webSocketDebuggerUrl")]
+    if not pages:
+        raise CdpError(f"Aucun onglet sur {debugger_address}")
+    page = next((t for t in pages if target_id and t.get("id") == target_id), pages[0])
+
+    # Chrome annonce son propre hôte (127.0.0.1 dans un conteneur): garder l'adresse jointe
+    return urlsplit(page["webSocketDebuggerUrl"])._replace(netloc=debugger_address).geturl()
+
+
+def call_expression(script: str, args: tuple) -> str:
+    """Script execute_script (corps, arguments[i], return) -> expression Runtime.evaluate"""
+    return f"(function() {{{script}}}).apply(null, {json.dumps(list(args))})"
+
+
+class CdpSession:
+    """
+    Connexion websocket DevTools à un onglet
+
+    Deux modes:
+    - URL d'onglet (ws://.../devtools/page/<id>): commandes envoyées telles quelles
+    - URL navigateur (se:cdp d'une Grid) + target_id: attache à l'onglet
+      (Target.attachToTarget, flatten) et commandes routées par sessionId
+    """
+
+    def __init__(self, ws_url: str, target_id: Optional[str] = None,
+                 timeout: float = CDP_COMMAND_TIMEOUT_SECONDS):
+        if not WEBSOCKET_AVAILABLE:
+            raise CdpError("websocket-client non installé (pip install websocket-client)")
+
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._session_id: Optional[str] = None
+
+        try:
+            self._ws = websocket.create_connection(
+                ws_url, timeout=timeout, suppress_origin=True, enable_multithread=True
+            )
+        except Exception as e:
+            raise CdpError(f"Connexion websocket impossible ({ws_url}): {e}")
+
+        if target_id:
+            result = self.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})
+            self._session_id = result["sessionId"]
+
+    def send(self, method: str, params: Optional[Dict] = None, timeout: Optional[float] = None) -> Dict:
+        """
+        Envoie une commande et attend sa réponse (les événements sont ignorés)
+
+        Raises:
+            CdpError: Erreur renvoyée par le navigateur ou websocket fermé
+        """
+        message = {"id": next(self._ids), "method": method, "params": params or {}}
+        if self._session_id:
+            message["sessionId"] = self._session_id
+
+        with self._lock:
+            try:
+                self._ws.settimeout(timeout or self.timeout)
+                self._ws.send(json.dumps(message))
+                while True:
+                    response = json.loads(self._ws.recv())
+                    if response.get("id") == message["id"]:
+                        break
+            except Exception as e:
+                raise CdpError(f"{method}: {e}")
+
+        if "error" in response:
+            raise CdpError(f"{method}: {response['error'].get('message')}")
+        return response.get("result", {})
+
+    def evaluate(self, script: str, *args, await_promise: bool = False, timeout: Optional[float] = None):
+        """
+        Équivalent de driver.execute_script(script, *args) en un seul message
+
+        Les arguments et la valeur de retour passent en JSON (returnByValue):
+        pas de WebElement, comme les scripts de calendar_extraction.
+
+        Raises:
+            CdpScriptError: Exception JavaScript
+            CdpError: Erreur de transport
+        """
+        result = self.send("Runtime.evaluate", {
+            "expression": call_expression(script, args),
+            "returnByValue": True,
+            "awaitPromise": await_promise,
+        }, timeout=timeout)
+
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            description = (details.get("exception") or {}).get("description") or details.get("text")
+            raise CdpScriptError(f"Exception JavaScript: {description}")
+        return result.get("result", {}).get("value")
+
+    def close(self):
+        """Ferme le websocket (l'onglet et la session WebDriver restent ouverts)"""
+        try:
+            self._ws.close()
+        except Exception:
+            pass
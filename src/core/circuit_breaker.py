@@ -0,0 +1,172 @@
+"""
+Disjoncteurs de scraping après pages de blocage / captcha
+
+Un disjoncteur par adresse de sortie sans proxy ("direct") et un global.
+Ouvert, il refuse les nouveaux jobs pendant un cool-down qui double à
+chaque nouvelle ouverture, puis laisse passer un seul job de test
+(half-open): succès = fermeture, nouveau blocage = réouverture.
+Les proxies du ProxyPool ont leur propre quarantaine (même principe).
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from .config import settings
+from .exceptions import CircuitOpenError
+from .proxy_pool import OUTCOME_SUCCESS, OUTCOME_BLOCKED
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+GLOBAL_SCOPE = "global"
+DIRECT_SCOPE = "direct"
+
+
+@dataclass
+class Breaker:
+    """État d'un disjoncteur"""
+    threshold: int
+    consecutive_blocks: int = 0
+    opened_until: float = 0.0
+    trips: int = 0
+    probe_started: Optional[float] = None
+    total_blocks: int = 0
+
+    def state(self, now: float) -> str:
+        if self.opened_until > now:
+            return STATE_OPEN
+        if self.trips and self.consecutive_blocks >= self.threshold:
+            return STATE_HALF_OPEN
+        return STATE_CLOSED
+
+
+class CircuitBreakers:
+    """Registre des disjoncteurs (global + connexion directe)"""
+
+    def __init__(
+            self,
+            global_threshold: Optional[int] = None,
+            direct_threshold: Optional[int] = None,
+            cooldown_seconds: Optional[float] = None,
+            max_cooldown_seconds: Optional[float] = None,
+            enabled: Optional[bool] = None
+    ):
+        self.cooldown_seconds = cooldown_seconds or settings.circuit_cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds or settings.circuit_max_cooldown_seconds
+        self.enabled = settings.circuit_breaker_enabled if enabled is None else enabled
+
+        self._breakers: Dict[str, Breaker] = {
+            GLOBAL_SCOPE: Breaker(threshold=global_threshold or settings.circuit_global_threshold),
+            DIRECT_SCOPE: Breaker(threshold=direct_threshold or settings.circuit_direct_threshold),
+        }
+        self._lock = threading.Lock()
+
+    def _check(self, scope: str, now: float):
+        breaker = self._breakers[scope]
+        state = breaker.state(now)
+
+        if state == STATE_OPEN:
+            raise CircuitOpenError(scope, breaker.opened_until - now)
+
+        if state == STATE_HALF_OPEN:
+            # Un seul job de test à la fois (relâché si le test ne revient jamais)
+            if breaker.probe_started is not None and now - breaker.probe_started < self.cooldown_seconds:
+                raise CircuitOpenError(scope, breaker.probe_started + self.cooldown_seconds - now)
+            breaker.probe_started = now
+            logger.info(f"🔌 Disjoncteur {scope}: job de test")
+
+    def before_job(self, egress: Optional[str] = None):
+        """
+        Vérifie qu'un nouveau job peut partir
+
+        Args:
+            egress: URL du proxy (None = connexion directe)
+
+        Raises:
+            CircuitOpenError: Si un disjoncteur concerné est ouvert
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._check(GLOBAL_SCOPE, now)
+            if egress is None:
+                self._check(DIRECT_SCOPE, now)
+
+    def record(self, egress: Optional[str], outcome: str):
+        """
+        Enregistre l'issue d'un job
+
+        Seuls un succès (fermeture) ou un blocage (comptage) changent l'état;
+        un échec d'une autre nature libère juste le job de test éventuel.
+
+        Args:
+            egress: URL du proxy (None = connexion directe)
+            outcome: Issue du job (OUTCOME_* du ProxyPool)
+        """
+        if not self.enabled:
+            return
+
+        scopes = [GLOBAL_SCOPE] + ([DIRECT_SCOPE] if egress is None else [])
+        now = time.time()
+
+        with self._lock:
+            for scope in scopes:
+                breaker = self._breakers[scope]
+                breaker.probe_started = None
+
+                if outcome == OUTCOME_SUCCESS:
+                    if breaker.trips:
+                        logger.info(f"✓ Disjoncteur {scope} refermé")
+                    breaker.consecutive_blocks = 0
+                    breaker.trips = 0
+                    continue
+                if outcome != OUTCOME_BLOCKED:
+                    continue
+
+                breaker.consecutive_blocks += 1
+                breaker.total_blocks += 1
+                if breaker.consecutive_blocks >= breaker.threshold:
+                    cooldown = min(self.max_cooldown_seconds, self.cooldown_seconds * (2 ** breaker.trips))
+                    breaker.trips += 1
+                    breaker.opened_until = now + cooldown
+                    logger.warning(
+                        f"🚨 Disjoncteur {scope} ouvert {cooldown:.0f}s "
+                        f"({breaker.consecutive_blocks} blocages consécutifs)"
+                    )
+
+    def retry_after(self) -> float:
+        """Secondes avant réouverture du disjoncteur global (0 = fermé)"""
+        with self._lock:
+            return max(0.0, self._breakers[GLOBAL_SCOPE].opened_until - time.time())
+
+    def get_stats(self) -> Dict:
+        """État de chaque disjoncteur"""
+        now = time.time()
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                **{
+                    scope: {
+                        'state': b.state(now),
+                        'consecutive_blocks': b.consecutive_blocks,
+                        'threshold': b.threshold,
+                        'trips': b.trips,
+                        'retry_after_seconds': max(0, round(b.opened_until - now)),
+                        'total_blocks': b.total_blocks,
+                    }
+                    for scope, b in self._breakers.items()
+                },
+            }
+
+
+# Instance globale
+circuit_breakers = CircuitBreakers()
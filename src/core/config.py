@@ -23,6 +23,54 @@ class Settings(BaseSettings):
     headless: bool = Field(default=True, env="HEADLESS")
     screenshot_on_error: bool = Field(default=False, env="SCREENSHOT_ON_ERROR")  # Désactivé
     max_retries: int = Field(default=3, env="MAX_RETRIES")
+    scraper_max_workers: int = Field(default=10, env="SCRAPER_MAX_WORKERS")  # navigateurs simultanés
+    scraper_engine: str = Field(default="selenium", env="SCRAPER_ENGINE")  # selenium (process par job) ou playwright
+    playwright_max_contexts: int = Field(default=8, env="PLAYWRIGHT_MAX_CONTEXTS")  # contextes par navigateur
+    cdp_transport: bool = Field(default=False, env="CDP_TRANSPORT")  # scripts du calendrier via le websocket DevTools
+    chrome_launch_profile: str = Field(default="stealth", env="CHROME_LAUNCH_PROFILE")  # lean, stealth ou debug
+    chrome_headless_shell_path: str = Field(default="", env="CHROME_HEADLESS_SHELL_PATH")  # chrome-headless-shell (profil lean)
+    reaper_interval_seconds: int = Field(default=60, env="REAPER_INTERVAL_SECONDS")  # Chrome orphelins
+    watchdog_enabled: bool = Field(default=True, env="WATCHDOG_ENABLED")  # jobs sans progrès
+    watchdog_deadline_factor: float = Field(default=1.0, env="WATCHDOG_DEADLINE_FACTOR")  # × délais par étape
+    watchdog_max_reschedules: int = Field(default=1, env="WATCHDOG_MAX_RESCHEDULES")
+    round_trip_max_lengths: int = Field(default=8, env="ROUND_TRIP_MAX_LENGTHS")  # durées par grille aller-retour
+    flights_max_results: int = Field(default=30, env="FLIGHTS_MAX_RESULTS")  # vols gardés par recherche
+    metro_max_routes: int = Field(default=9, env="METRO_MAX_ROUTES")  # routes par requête métropole (PAR, NYC...)
+    batch_max_routes: int = Field(default=50, env="BATCH_MAX_ROUTES")  # routes par requête batch
+    batch_session_max_routes: int = Field(default=5, env="BATCH_SESSION_MAX_ROUTES")  # destinations par session Chrome
+    scraper_max_recoveries: int = Field(default=2, env="SCRAPER_MAX_RECOVERIES")  # drivers recréés par job (crash Chrome)
+
+    interactive_reserved_slots: int = Field(default=2, env="INTERACTIVE_RESERVED_SLOTS")  # hors refresh/bulk
+    preemption_enabled: bool = Field(default=True, env="PREEMPTION_ENABLED")  # aux frontières de mois
+    shared_slot_ttl_seconds: int = Field(default=900, env="SHARED_SLOT_TTL_SECONDS")  # slot d'un process mort
+
+    # File de jobs: local (ScraperPool du process) ou database (workers scripts/queue_worker.py)
+    job_backend: str = Field(default="local", env="JOB_BACKEND")
+    job_lease_seconds: int = Field(default=120, env="JOB_LEASE_SECONDS")  # visibility timeout
+    job_max_attempts: int = Field(default=2, env="JOB_MAX_ATTEMPTS")
+    job_poll_seconds: float = Field(default=1.0, env="JOB_POLL_SECONDS")
+    queue_worker_concurrency: int = Field(default=2, env="QUEUE_WORKER_CONCURRENCY")  # jobs par worker
+
+    # Navigateurs: local (Chrome de l'hôte) ou remote (Selenium Grid / Chrome CDP de BROWSER_ENDPOINTS)
+    browser_backend: str = Field(default="local", env="BROWSER_BACKEND")
+    browser_endpoints: str = Field(default="", env="BROWSER_ENDPOINTS")  # url[|sessions] séparés par des virgules
+    browser_endpoint_max_sessions: int = Field(default=4, env="BROWSER_ENDPOINT_MAX_SESSIONS")  # défaut par endpoint
+    browser_probe_interval_seconds: float = Field(default=30, env="BROWSER_PROBE_INTERVAL_SECONDS")
+    browser_acquire_timeout: int = Field(default=60, env="BROWSER_ACQUIRE_TIMEOUT")
+
+    # Hedging des jobs lents (doublon après le p90 de la durée apprise)
+    hedging_enabled: bool = Field(default=True, env="HEDGING_ENABLED")
+    hedge_percentile: float = Field(default=0.9, env="HEDGE_PERCENTILE")
+    hedge_min_samples: int = Field(default=20, env="HEDGE_MIN_SAMPLES")  # durées connues avant de doubler
+    hedge_budget_ratio: float = Field(default=0.2, env="HEDGE_BUDGET_RATIO")  # part de la capacité (arrondie au sup., min 1; 0 = aucun doublon)
+
+    # Admission des jobs (limites cgroup mémoire/CPU)
+    admission_enabled: bool = Field(default=True, env="ADMISSION_ENABLED")
+    admission_default_job_mb: int = Field(default=600, env="ADMISSION_DEFAULT_JOB_MB")  # avant apprentissage
+    admission_memory_reserve_ratio: float = Field(default=0.15, env="ADMISSION_MEMORY_RESERVE_RATIO")
+    admission_jobs_per_cpu: float = Field(default=1.5, env="ADMISSION_JOBS_PER_CPU")
+    admission_queue_timeout: int = Field(default=60, env="ADMISSION_QUEUE_TIMEOUT")
+    admission_sample_seconds: float = Field(default=2.0, env="ADMISSION_SAMPLE_SECONDS")
     timeout: int = Field(default=30, env="TIMEOUT")
 
     # Anti-détection
@@ -34,6 +82,18 @@ class Settings(BaseSettings):
     use_proxy: bool = Field(default=False, env="USE_PROXY")
     proxy_url: Optional[str] = Field(default=None, env="PROXY_URL")
     proxy_rotation: bool = Field(default=False, env="PROXY_ROTATION")
+    proxy_list: str = Field(default="", env="PROXY_LIST")  # URLs séparées par des virgules
+    proxy_max_concurrency: int = Field(default=2, env="PROXY_MAX_CONCURRENCY")  # jobs simultanés par proxy
+    proxy_max_requests_per_hour: int = Field(default=30, env="PROXY_MAX_REQUESTS_PER_HOUR")  # jobs/h par proxy
+    proxy_quarantine_minutes: float = Field(default=10, env="PROXY_QUARANTINE_MINUTES")  # doublée à chaque récidive
+    proxy_acquire_timeout: int = Field(default=60, env="PROXY_ACQUIRE_TIMEOUT")
+
+    # Disjoncteurs après pages de blocage / captcha
+    circuit_breaker_enabled: bool = Field(default=True, env="CIRCUIT_BREAKER_ENABLED")
+    circuit_global_threshold: int = Field(default=3, env="CIRCUIT_GLOBAL_THRESHOLD")  # blocages consécutifs
+    circuit_direct_threshold: int = Field(default=1, env="CIRCUIT_DIRECT_THRESHOLD")
+    circuit_cooldown_seconds: float = Field(default=120, env="CIRCUIT_COOLDOWN_SECONDS")  # doublé à chaque ouverture
+    circuit_max_cooldown_seconds: float = Field(default=3600, env="CIRCUIT_MAX_COOLDOWN_SECONDS")
 
     # Database
     database_url: str = Field(
@@ -43,6 +103,29 @@ class Settings(BaseSettings):
 
     # Cache
     cache_ttl_minutes: int = Field(default=60, env="CACHE_TTL_MINUTES")
+    cache_stale_ttl_minutes: int = Field(default=1440, env="CACHE_STALE_TTL_MINUTES")  # stale-while-revalidate
+    stale_refresh_workers: int = Field(default=2, env="STALE_REFRESH_WORKERS")
+    refresh_queue_order: str = Field(default="deadline", env="REFRESH_QUEUE_ORDER")  # deadline, sjf ou fifo
+    estimator_refresh_seconds: int = Field(default=300, env="ESTIMATOR_REFRESH_SECONDS")  # relecture scrape_logs
+    estimator_history_days: int = Field(default=30, env="ESTIMATOR_HISTORY_DAYS")
+
+    # TTL adaptatif (distance au départ + volatilité de la route)
+    adaptive_ttl_enabled: bool = Field(default=True, env="ADAPTIVE_TTL_ENABLED")
+    adaptive_ttl_max_minutes: int = Field(default=720, env="ADAPTIVE_TTL_MAX_MINUTES")
+    adaptive_ttl_reference_change_rate: float = Field(default=0.05, env="ADAPTIVE_TTL_REFERENCE_CHANGE_RATE")  # 5%/jour
+
+    # Pré-chauffage des routes populaires
+    prewarm_enabled: bool = Field(default=False, env="PREWARM_ENABLED")
+    prewarm_interval_seconds: int = Field(default=300, env="PREWARM_INTERVAL_SECONDS")
+    prewarm_top_routes: int = Field(default=20, env="PREWARM_TOP_ROUTES")
+    prewarm_demand_days: int = Field(default=7, env="PREWARM_DEMAND_DAYS")
+    prewarm_lead_minutes: int = Field(default=10, env="PREWARM_LEAD_MINUTES")
+    prewarm_max_scrapes_per_hour: int = Field(default=20, env="PREWARM_MAX_SCRAPES_PER_HOUR")
+    prewarm_peak_budget_ratio: float = Field(default=0.25, env="PREWARM_PEAK_BUDGET_RATIO")
+    prewarm_offpeak_hours: str = Field(default="0-6", env="PREWARM_OFFPEAK_HOURS")
+    prewarm_min_free_workers: int = Field(default=2, env="PREWARM_MIN_FREE_WORKERS")
+    price_cache_enabled: bool = Field(default=True, env="PRICE_CACHE_ENABLED")
+    price_cache_max_entries: int = Field(default=5000, env="PRICE_CACHE_MAX_ENTRIES")  # blocs route/mois
 
     # Logs - Minimaux en production
     log_level: str = Field(default="WARNING", env="LOG_LEVEL")  # WARNING = peu de logs
@@ -55,6 +138,13 @@ class Settings(BaseSettings):
     delay_between_requests_min: float = Field(default=3.0, env="DELAY_BETWEEN_REQUESTS_MIN")
     delay_between_requests_max: float = Field(default=7.0, env="DELAY_BETWEEN_REQUESTS_MAX")
 
+    # Cadence globale (token bucket partagé entre tous les workers)
+    pacing_enabled: bool = Field(default=True, env="PACING_ENABLED")
+    pacing_burst: float = Field(default=3.0, env="PACING_BURST")  # jetons accumulables
+    pacing_nav_cost: float = Field(default=0.0, env="PACING_NAV_COST")  # coût d'un changement de mois
+    pacing_max_wait_seconds: int = Field(default=120, env="PACING_MAX_WAIT_SECONDS")
+    pacing_db_path: Optional[str] = Field(default=None, env="PACING_DB_PATH")  # défaut: data/pacing.db
+
     # Sentry
     sentry_dsn: Optional[str] = Field(default=None, env="SENTRY_DSN")
     sentry_environment: str = Field(default="production", env="SENTRY_ENVIRONMENT")
@@ -5,18 +5,95 @@ import time
 import platform
 from typing import Optional
 from pathlib import Path
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
 from selenium import webdriver
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
 from selenium.webdriver.support.ui import WebDriverWait
 
+from ..core.browser_farm import ENDPOINT_CDP, debugger_address, endpoint_kind
+from ..core.cdp_transport import CdpSession, page_websocket_url
 from ..core.config import settings
+from ..core.launch_profiles import get_launch_profile, headless_shell_binary
 from ..core.exceptions import DriverInitializationError
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+# Scripts anti-détection injectés avant chaque document (Selenium et Playwright)
+STEALTH_SCRIPTS = [
+    """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    """,
+    """
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5]
+    });
+    """,
+    """
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['fr-FR', 'fr', 'en-US', 'en']
+    });
+    """,
+    """
+    window.chrome = {
+        runtime: {}
+    };
+    """,
+    """
+    const originalQuery = window.navigator.permissions.query;
+    window.navigator.permissions.query = (parameters) => (
+        parameters.name === 'notifications' ?
+            Promise.resolve({ state: Notification.permission }) :
+            originalQuery(parameters)
+    );
+    """,
+]
+
+# Volume réseau de la page courante (Resource Timing)
+TRANSFER_STATS_SCRIPT = """
+const entries = performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'));
+return {
+    bytes: entries.reduce((total, e) => total + (e.transferSize || 0), 0),
+    requests: entries.length
+};
+"""
+
+
+# Messages chromedriver d'un onglet ou d'un navigateur perdu
+SESSION_LOST_MARKERS = (
+    "disconnected",
+    "tab crashed",
+    "chrome not reachable",
+    "session deleted",
+    "no such session",
+    "target window already closed",
+    "target frame detached",
+)
+
+
+def is_session_lost(error: BaseException) -> bool:
+    """
+    Session WebDriver inutilisable (renderer planté, chromedriver mort,
+    onglet déconnecté): seul un nouveau driver permet de continuer
+    """
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    # chromedriver (ou la Grid) ne répond plus
+    if isinstance(error, (ConnectionError, Urllib3HTTPError)):
+        return True
+    if isinstance(error, WebDriverException):
+        message = (error.msg or "").lower()
+        return any(marker in message for marker in SESSION_LOST_MARKERS)
+    return False
+
+
 class DriverManager:
     """Gestionnaire du WebDriver - compatible Windows + Linux"""
 
@@ -27,13 +104,29 @@ class DriverManager:
         'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
     ]
 
-    def __init__(self, headless: Optional[bool] = None):
+    def __init__(
+            self,
+            headless: Optional[bool] = None,
+            proxy: Optional[str] = None,
+            remote_url: Optional[str] = None,
+            launch_profile: Optional[str] = None
+    ):
         self.headless = headless if headless is not None else settings.headless
+        # Proxy explicite (ProxyPool) sinon proxy unique de la config
+        self.proxy = proxy or (settings.proxy_url if settings.use_proxy else None)
+        # Endpoint de la BrowserFarm (None = Chrome local)
+        self.remote_url = remote_url
+        # Profil de lancement (None = CHROME_LAUNCH_PROFILE)
+        self.profile = get_launch_profile(launch_profile)
         self.driver = None
         self.wait = None
+        # Websocket DevTools de l'onglet (transport CDP direct, optionnel)
+        self.cdp: Optional[CdpSession] = None
         self.is_windows = platform.system() == 'Windows'
 
-        logger.info(f"DriverManager - OS: {platform.system()}, Headless: {self.headless}")
+        logger.info(
+            f"DriverManager - OS: {platform.system()}, Headless: {self.headless}, Profil: {self.profile.name}"
+        )
 
     def create_driver(self):
         """Crée un driver avec anti-détection"""
@@ -41,24 +134,11 @@ class DriverManager:
             options = Options()
             self._configure_stealth_options(options)
 
-            # Déterminer le chemin du driver selon l'OS
-            if self.is_windows:
-                # Windows: utiliser le driver local ou webdriver-manager
-                driver_path = Path("drivers/chromedriver.exe")
-                if driver_path.exists():
-                    logger.info(f"Utilisation driver local: {driver_path}")
-                    service = Service(str(driver_path))
-                else:
-                    logger.info("Utilisation webdriver-manager")
-                    from webdriver_manager.chrome import ChromeDriverManager
-                    service = Service(ChromeDriverManager().install())
-            else:
-                # Linux/Docker: chemin standard
-                logger.info("Linux détecté - driver à /usr/local/bin/chromedriver")
-                service = Service('/usr/local/bin/chromedriver')
-
             # Créer le driver
-            self.driver = webdriver.Chrome(service=service, options=options)
+            if self.remote_url:
+                self.driver = self._create_remote_driver(options)
+            else:
+                self.driver = webdriver.Chrome(service=self._local_service(), options=options)
 
             # Scripts anti-détection
             self._inject_stealth_scripts()
@@ -73,6 +153,90 @@ class DriverManager:
             logger.error(f"❌ Erreur création driver: {e}")
             raise DriverInitializationError(f"Impossible de créer le driver: {e}")
 
+    def _local_service(self) -> Service:
+        """chromedriver local selon l'OS"""
+        if self.is_windows:
+            # Windows: utiliser le driver local ou webdriver-manager
+            driver_path = Path("drivers/chromedriver.exe")
+            if driver_path.exists():
+                logger.info(f"Utilisation driver local: {driver_path}")
+                return Service(str(driver_path))
+            logger.info("Utilisation webdriver-manager")
+            from webdriver_manager.chrome import ChromeDriverManager
+            return Service(ChromeDriverManager().install())
+
+        # Linux/Docker: chemin standard
+        logger.info("Linux détecté - driver à /usr/local/bin/chromedriver")
+        return Service('/usr/local/bin/chromedriver')
+
+    def _create_remote_driver(self, options: Options):
+        """Session sur un endpoint distant (Grid/standalone ou Chrome en CDP)"""
+        if endpoint_kind(self.remote_url) == ENDPOINT_CDP:
+            # Chrome déjà lancé sur le noeud: chromedriver local s'y attache,
+            # les options de lancement (proxy, user agent) sont celles du noeud
+            attach = Options()
+            attach.debugger_address = debugger_address(self.remote_url)
+            logger.info(f"Attache CDP: {attach.debugger_address}")
+            return webdriver.Chrome(service=self._local_service(), options=attach)
+
+        logger.info(f"Session WebDriver distante: {self.remote_url}")
+        # Connexion Chromium: les commandes CDP passent aussi par la Grid
+        executor = ChromiumRemoteConnection(self.remote_url, vendor_prefix="goog", browser_name="chrome")
+        return webdriver.Remote(command_executor=executor, options=options)
+
+    @property
+    def session_id(self) -> Optional[str]:
+        """Session WebDriver courante (fermée par la ferme si le worker est tué)"""
+        return self.driver.session_id if self.driver else None
+
+    def open_cdp_session(self) -> Optional[CdpSession]:
+        """
+        Ouvre le websocket DevTools de l'onglet de la session
+
+        Chrome local ou endpoint cdp://: port de debug (debuggerAddress).
+        Grid: endpoint se:cdp annoncé par la session, attaché à l'onglet.
+
+        Returns:
+            La session CDP, ou None si indisponible (le scraper reste sur WebDriver)
+        """
+        if not self.driver:
+            return None
+        if self.cdp:
+            return self.cdp
+
+        try:
+            target_id = self.driver.current_window_handle  # handle chromedriver = targetId CDP
+            if self.remote_url and endpoint_kind(self.remote_url) != ENDPOINT_CDP:
+                grid_cdp = self.driver.capabilities.get('se:cdp')
+                if not grid_cdp:
+                    raise ValueError("la Grid n'annonce pas se:cdp")
+                self.cdp = CdpSession(grid_cdp, target_id=target_id)
+            else:
+                if self.remote_url:
+                    address = debugger_address(self.remote_url)
+                else:
+                    address = self.driver.capabilities['goog:chromeOptions']['debuggerAddress']
+                self.cdp = CdpSession(page_websocket_url(address, target_id))
+
+            logger.debug(f"✓ Transport CDP direct: {self.cdp.ws_url}")
+            return self.cdp
+
+        except Exception as e:
+            logger.warning(f"⚠️ Transport CDP indisponible, WebDriver conservé: {e}")
+            return None
+
+    def close_cdp_session(self):
+        """Ferme le websocket DevTools (la session WebDriver reste ouverte)"""
+        if self.cdp:
+            self.cdp.close()
+            self.cdp = None
+
+    def _execute_cdp(self, cmd: str, params: dict):
+        """Commande CDP (driver Chrome local ou session distante)"""
+        if hasattr(self.driver, 'execute_cdp_cmd'):
+            return self.driver.execute_cdp_cmd(cmd, params)
+        return self.driver.execute("executeCdpCommand", {'cmd': cmd, 'params': params})['value']
+
     def _configure_stealth_options(self, options: Options):
         """Configure les options stealth"""
 
@@ -97,9 +261,14 @@ class DriverManager:
         options.add_argument('--disable-notifications')
         options.add_argument('--disable-popup-blocking')
 
-        # Désactiver les logs Chrome verbeux
-        options.add_argument('--log-level=3')
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
+        # Arguments du profil de lancement (lean: services d'arrière-plan coupés)
+        for argument in self.profile.arguments:
+            options.add_argument(argument)
+
+        # Désactiver les logs Chrome verbeux (sauf profil debug)
+        if self.profile.quiet_logs:
+            options.add_argument('--log-level=3')
+            options.add_experimental_option('excludeSwitches', ['enable-automation', 'enable-logging'])
 
         # Langue
         options.add_argument('--lang=fr-FR')
@@ -107,19 +276,26 @@ class DriverManager:
             'intl.accept_languages': 'fr-FR,fr,en-US,en',
             'profile.default_content_setting_values.notifications': 2,
             'profile.managed_default_content_settings.images': 1,
+            **self.profile.prefs,
         })
 
-        # Headless
+        # Headless (chrome-headless-shell si le profil l'autorise et qu'il est installé)
         if self.headless:
-            options.add_argument('--headless=new')
+            shell = None if self.remote_url else headless_shell_binary(self.profile, self.headless)
+            if shell:
+                options.binary_location = shell
+                options.add_argument('--headless')
+                logger.info(f"Mode headless activé (headless shell: {shell})")
+            else:
+                options.add_argument('--headless=new')
+                logger.info("Mode headless activé")
             options.add_argument('--window-size=1920,1080')
             options.add_argument('--start-maximized')
-            logger.info("Mode headless activé")
 
         # Proxy
-        if settings.use_proxy and settings.proxy_url:
-            options.add_argument(f'--proxy-server={settings.proxy_url}')
-            logger.info(f"Proxy: {settings.proxy_url}")
+        if self.proxy:
+            options.add_argument(f'--proxy-server={self.proxy}')
+            logger.info(f"Proxy: {self.proxy}")
 
     def _inject_stealth_scripts(self):
         """Injecte les scripts anti-détection"""
@@ -127,59 +303,31 @@ class DriverManager:
             return
 
         try:
-            # Script 1: Masquer webdriver
-            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                'source': '''
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    });
-                '''
-            })
-
-            # Script 2: Plugins
-            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                'source': '''
-                    Object.defineProperty(navigator, 'plugins', {
-                        get: () => [1, 2, 3, 4, 5]
-                    });
-                '''
-            })
-
-            # Script 3: Languages
-            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                'source': '''
-                    Object.defineProperty(navigator, 'languages', {
-                        get: () => ['fr-FR', 'fr', 'en-US', 'en']
-                    });
-                '''
-            })
-
-            # Script 4: Chrome runtime
-            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                'source': '''
-                    window.chrome = {
-                        runtime: {}
-                    };
-                '''
-            })
-
-            # Script 5: Permissions
-            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                'source': '''
-                    const originalQuery = window.navigator.permissions.query;
-                    window.navigator.permissions.query = (parameters) => (
-                        parameters.name === 'notifications' ?
-                            Promise.resolve({ state: Notification.permission }) :
-                            originalQuery(parameters)
-                    );
-                '''
-            })
+            for source in STEALTH_SCRIPTS:
+                self._execute_cdp('Page.addScriptToEvaluateOnNewDocument', {'source': source})
 
             logger.debug("✓ Scripts anti-détection injectés")
 
         except Exception as e:
             logger.warning(f"Erreur injection scripts: {e}")
 
+    def get_transfer_stats(self) -> dict:
+        """
+        Volume réseau de la page courante (Resource Timing)
+
+        Returns:
+            Dict {'bytes', 'requests'} (transferSize vaut 0 pour les
+            ressources cross-origin sans Timing-Allow-Origin)
+        """
+        if not self.driver:
+            return {}
+
+        try:
+            return self.driver.execute_script(TRANSFER_STATS_SCRIPT) or {}
+        except Exception as e:
+            logger.debug(f"Erreur mesure transfert: {e}")
+            return {}
+
     def simulate_human_behavior(self):
         """Simule un comportement humain"""
         if not settings.simulate_human or not self.driver:
@@ -200,6 +348,7 @@ class DriverManager:
 
     def close(self):
         """Ferme le driver"""
+        self.close_cdp_session()
         if self.driver:
             try:
                 self.driver.quit()
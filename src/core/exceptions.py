@@ -46,6 +46,33 @@ class RateLimitError(ScraperException):
     pass
 
 
+class CapacityError(RateLimitError):
+    """Mémoire/CPU du conteneur insuffisants pour un nouveau job"""
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message, details={"retry_after": retry_after})
+        self.retry_after = retry_after
+
+
+class BlockedError(ScraperException):
+    """Page de blocage Google (trafic inhabituel)"""
+    pass
+
+
+class CaptchaError(BlockedError):
+    """Captcha servi par Google"""
+    pass
+
+
+class CircuitOpenError(RateLimitError):
+    """Disjoncteur ouvert: nouveaux jobs suspendus après des blocages"""
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(
+            f"Scraping suspendu ({scope}) après des blocages, réessayer dans {retry_after:.0f}s",
+            details={"scope": scope, "retry_after": retry_after}
+        )
+        self.retry_after = retry_after
+
+
 class CacheError(ScraperException):
     """Erreur liée au cache"""
     pass
@@ -76,4 +103,17 @@ class InvalidDateError(ValidationError):
 
 class ScrapingTimeoutError(ScraperException):
     """Timeout lors du scraping"""
-    pass
\ No newline at end of file
+    pass
+
+
+class StuckJobError(ScrapingTimeoutError):
+    """Job sans progrès au-delà du délai de son étape (watchdog)"""
+    pass
+
+
+class PreemptedError(ScraperException):
+    """Job de basse priorité interrompu à une frontière de mois"""
+    def __init__(self, message: str, prices: dict, resume_from: str):
+        super().__init__(message, details={"resume_from": resume_from, "prices_count": len(prices)})
+        self.prices = prices
+        self.resume_from = resume_from
@@ -0,0 +1,122 @@
+"""
+Heartbeats de progression des workers et détection des jobs bloqués
+
+Le worker écrit un petit fichier JSON (étape, mois en cours, dernière
+activité DOM utile) que le pool relit pendant l'attente: un job sans
+progrès au-delà du délai de son étape est tué et relancé, sans attendre
+le timeout global. Dans l'autre sens, le pool crée un fichier de
+préemption que le worker consulte à chaque frontière de mois.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .config import settings
+
+# Variable d'environnement qui indique au worker où écrire son heartbeat
+HEARTBEAT_ENV_VAR = "TRAVLIAQ_HEARTBEAT_FILE"
+
+# Fichier dont la présence demande au worker de s'arrêter (préemption)
+PREEMPT_ENV_VAR = "TRAVLIAQ_PREEMPT_FILE"
+
+# Délai maximal sans progrès par étape (secondes)
+STAGE_DEADLINES = {
+    "starting": 60,       # import + démarrage du process
+    "driver": 60,         # lancement Chrome/chromedriver
+    "navigate": 60,       # chargement de la page
+    "open_calendar": 45,  # par sélecteur essayé (au moins TIMEOUT + 15, voir stage_deadline)
+    "month": 45,          # navigation + extraction d'un mois
+    "results": 45,        # choix des dates + liste des vols
+    "done": 30,           # fermeture du navigateur, écriture du résultat
+}
+DEFAULT_STAGE_DEADLINE = 60
+
+# Écriture au plus une fois par intervalle (sauf changement d'étape)
+WRITE_INTERVAL_SECONDS = 1.0
+
+
+def stage_deadline(stage: str) -> float:
+    """Délai sans progrès toléré pour une étape"""
+    if stage == "pacing":
+        # Attente légitime d'un jeton du contrôleur de cadence
+        return settings.pacing_max_wait_seconds + 15
+    deadline = STAGE_DEADLINES.get(stage, DEFAULT_STAGE_DEADLINE)
+    if stage == "open_calendar":
+        # Un sélecteur absent bloque TIMEOUT secondes dans wait.until
+        deadline = max(deadline, settings.timeout + 15)
+    return deadline * settings.watchdog_deadline_factor
+
+
+class HeartbeatWriter:
+    """Callback de progression côté worker (écriture atomique du fichier)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.state: Dict = {"stage": "starting", "pid": os.getpid()}
+        self._last_write = 0.0
+
+    def __call__(self, stage: Optional[str] = None, **info):
+        """
+        Signale une progression
+
+        Args:
+            stage: Nouvelle étape (None = simple activité dans l'étape courante)
+            info: month_index, months_total...
+        """
+        now = time.time()
+        changed = stage is not None and stage != self.state.get("stage")
+        if stage is not None:
+            self.state["stage"] = stage
+        self.state.update(info)
+        self.state["last_activity"] = now
+
+        if changed or info or now - self._last_write >= WRITE_INTERVAL_SECONDS:
+            self._write(now)
+
+    def _write(self, now: float):
+        tmp = self.path.with_suffix(".tmp")
+        try:
+            tmp.write_text(json.dumps(self.state))
+            os.replace(tmp, self.path)
+            self._last_write = now
+        except OSError:
+            pass
+
+
+def read_heartbeat(path: Optional[Path]) -> Optional[Dict]:
+    """Dernier heartbeat d'un job (None si absent ou illisible)"""
+    if path is None:
+        return None
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def preempt_requested(path: Optional[str]) -> bool:
+    """Vrai si le pool a demandé l'arrêt du job (côté worker)"""
+    return bool(path) and os.path.exists(path)
+
+
+def check_stuck(heartbeat: Optional[Dict], started_at: float, now: Optional[float] = None) -> Optional[Tuple[str, float]]:
+    """
+    Détermine si un job est bloqué
+
+    Args:
+        heartbeat: Dernier heartbeat (None = worker pas encore démarré)
+        started_at: Timestamp de lancement du job
+
+    Returns:
+        (étape, secondes sans progrès) si bloqué, sinon None
+    """
+    now = now or time.time()
+    stage = (heartbeat or {}).get("stage", "starting")
+    last_activity = (heartbeat or {}).get("last_activity", started_at)
+    idle = now - last_activity
+
+    if idle > stage_deadline(stage):
+        return stage, idle
+    return None
@@ -0,0 +1,147 @@
+"""
+Hedging des jobs de scraping lents
+
+La durée des jobs a une longue traîne (page lente, proxy qui traîne). On
+apprend la distribution des durées par nombre de mois scrapés; un job qui
+dépasse le percentile cible (p90) reçoit un doublon sur un autre worker /
+proxy, le premier résultat complet gagne et l'autre est annulé. Le nombre
+de doublons simultanés est plafonné à une fraction de la capacité (au
+moins un doublon, voir HedgePolicy.budget).
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from .config import settings
+
+# Durées conservées par nombre de mois
+MAX_SAMPLES_PER_BUCKET = 200
+
+
+def month_count(start_date: str, end_date: str) -> int:
+    """Nombre de mois calendaires couverts par une plage YYYY-MM-DD"""
+    start = int(start_date[:4]) * 12 + int(start_date[5:7])
+    end = int(end_date[:4]) * 12 + int(end_date[5:7])
+    return max(1, end - start + 1)
+
+
+def percentile(values, q: float) -> float:
+    """Percentile par rang le plus proche (q entre 0 et 1)"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+class HedgePolicy:
+    """Durées apprises et budget de doublons"""
+
+    def __init__(
+            self,
+            percentile_target: Optional[float] = None,
+            min_samples: Optional[int] = None,
+            budget_ratio: Optional[float] = None,
+            enabled: Optional[bool] = None
+    ):
+        self.percentile_target = percentile_target or settings.hedge_percentile
+        self.min_samples = min_samples or settings.hedge_min_samples
+        self.budget_ratio = settings.hedge_budget_ratio if budget_ratio is None else budget_ratio
+        self.enabled = settings.hedging_enabled if enabled is None else enabled
+
+        self._durations: Dict[int, Deque[float]] = {}
+        self._active = 0
+        self._lock = threading.Lock()
+
+        self.launched = 0
+        self.won = 0
+        self.lost = 0
+        self.skipped = 0
+
+    def record(self, months: int, duration_seconds: float):
+        """Ajoute la durée d'un job réussi"""
+        with self._lock:
+            bucket = self._durations.setdefault(months, deque(maxlen=MAX_SAMPLES_PER_BUCKET))
+            bucket.append(duration_seconds)
+
+    def threshold(self, months: int) -> Optional[float]:
+        """
+        Durée au-delà de laquelle un job de ce nombre de mois est doublé
+
+        Returns:
+            Secondes, ou None si pas assez d'historique
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            bucket = self._durations.get(months)
+            if not bucket or len(bucket) < self.min_samples:
+                return None
+            return percentile(bucket, self.percentile_target)
+
+    def budget(self, capacity: int) -> int:
+        """
+        Doublons simultanés autorisés pour une capacité donnée
+
+        Arrondi au supérieur, au moins 1 dès que budget_ratio > 0: sinon un
+        petit pool (capacité 4 à 20%) n'aurait jamais droit à un doublon.
+        """
+        if self.budget_ratio <= 0:
+            return 0
+        return max(1, math.ceil(capacity * self.budget_ratio))
+
+    def try_start(self, capacity: int) -> bool:
+        """Réserve un doublon si le budget (fraction de la capacité) le permet"""
+        with self._lock:
+            if self._active >= self.budget(capacity):
+                self.skipped += 1
+                return False
+            self._active += 1
+            self.launched += 1
+            return True
+
+    def end(self, won: Optional[bool] = None):
+        """
+        Libère un doublon
+
+        Args:
+            won: True = le doublon a gagné, False = perdu, None = jamais lancé
+        """
+        with self._lock:
+            self._active = max(0, self._active - 1)
+            if won is None:
+                self.launched -= 1
+                self.skipped += 1
+            elif won:
+                self.won += 1
+            else:
+                self.lost += 1
+
+    def get_stats(self) -> Dict:
+        """Seuils par nombre de mois et compteurs de doublons"""
+        with self._lock:
+            buckets = {
+                months: {
+                    'samples': len(bucket),
+                    'threshold_seconds': (
+                        round(percentile(bucket, self.percentile_target), 1)
+                        if len(bucket) >= self.min_samples else None
+                    ),
+                }
+                for months, bucket in sorted(self._durations.items())
+            }
+            return {
+                'enabled': self.enabled,
+                'percentile': self.percentile_target,
+                'budget_ratio': self.budget_ratio,
+                'active': self._active,
+                'launched': self.launched,
+                'won': self.won,
+                'lost': self.lost,
+                'skipped': self.skipped,
+                'months': buckets,
+            }
+
+
+# Instance globale
+hedge_policy = HedgePolicy()
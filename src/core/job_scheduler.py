@@ -0,0 +1,198 @@
+"""
+Classes de priorité des jobs de scraping et attribution des slots
+
+Trois classes: interactive (requête d'un client), refresh (stale-while-
+revalidate, pré-chauffage) et bulk (backfills). Les jobs en attente
+passent par classe puis par échéance la plus proche (EDF, échéance =
+timeout du client). INTERACTIVE_RESERVED_SLOTS slots restent réservés aux
+requêtes interactives; si elles attendent malgré tout, le job de plus basse
+priorité est préempté à sa prochaine frontière de mois.
+"""
+
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import settings
+from .exceptions import CapacityError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_REFRESH = "refresh"
+PRIORITY_BULK = "bulk"
+
+PRIORITY_RANK = {PRIORITY_INTERACTIVE: 0, PRIORITY_REFRESH: 1, PRIORITY_BULK: 2}
+
+# Classe des déclencheurs journalisés dans scrape_logs (autres = bulk)
+TRIGGER_PRIORITIES = {
+    "interactive": PRIORITY_INTERACTIVE,
+    "stale_refresh": PRIORITY_REFRESH,
+    "prewarm": PRIORITY_REFRESH,
+}
+
+# Réveil périodique des jobs en attente (la capacité du pool varie)
+WAIT_SLICE_SECONDS = 1.0
+
+
+def priority_for_trigger(trigger: str) -> str:
+    """Classe de priorité d'un déclencheur (interactive, stale_refresh, ...)"""
+    return TRIGGER_PRIORITIES.get(trigger, PRIORITY_BULK)
+
+
+@dataclass
+class Slot:
+    """Slot occupé par un job lancé"""
+    job_id: str
+    priority: str
+    deadline: float
+    started_at: float
+    preempting: bool = False
+
+
+class SlotScheduler:
+    """
+    Attribution des slots du ScraperPool par priorité puis échéance
+
+    Args:
+        capacity: Nombre de slots courant (mémoire, CPU, proxies)
+        preempt: Demande l'arrêt d'un job à sa prochaine frontière de mois
+    """
+
+    def __init__(
+            self,
+            capacity: Callable[[], int],
+            preempt: Callable[[str], None],
+            reserved_interactive: Optional[int] = None,
+            preemption_enabled: Optional[bool] = None
+    ):
+        self.capacity = capacity
+        self.preempt = preempt
+        self.reserved_interactive = (
+            settings.interactive_reserved_slots if reserved_interactive is None else reserved_interactive
+        )
+        self.preemption_enabled = (
+            settings.preemption_enabled if preemption_enabled is None else preemption_enabled
+        )
+
+        self._running: Dict[str, Slot] = {}
+        # (rang de la classe, échéance, ordre d'arrivée, job_id)
+        self._waiting: List[Tuple[int, float, int, str]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        self.started = {p: 0 for p in PRIORITY_RANK}
+        self.preemptions = 0
+        self.rejected = 0
+
+    def _limit(self, priority: str) -> int:
+        """
+        Slots utilisables par une classe
+
+        La réservation est bornée à capacity - 1: un petit pool (capacité
+        inférieure ou égale à INTERACTIVE_RESERVED_SLOTS) garde un slot pour
+        refresh/bulk, repris par préemption si une requête interactive attend.
+        """
+        capacity = max(1, self.capacity())
+        if priority == PRIORITY_INTERACTIVE:
+            return capacity
+        return capacity - min(self.reserved_interactive, capacity - 1)
+
+    def _can_start(self, entry: Tuple[int, float, int, str], priority: str) -> bool:
+        return min(self._waiting) == entry and len(self._running) < self._limit(priority)
+
+    def acquire(self, job_id: str, priority: str, deadline: Optional[float] = None, block: bool = True):
+        """
+        Attend un slot pour un job
+
+        Args:
+            priority: interactive, refresh ou bulk
+            deadline: Échéance du client (timestamp); l'attente s'arrête là
+            block: False = slot immédiat ou refus (doublons de hedging)
+
+        Raises:
+            CapacityError: Pas de slot avant l'échéance
+        """
+        now = time.time()
+        deadline = deadline or now + settings.admission_queue_timeout
+        entry = (PRIORITY_RANK[priority], deadline, next(self._seq), job_id)
+
+        with self._cond:
+            self._waiting.append(entry)
+            try:
+                while not self._can_start(entry, priority):
+                    remaining = deadline - time.time()
+                    if not block or remaining <= 0:
+                        self.rejected += 1
+                        raise CapacityError(
+                            f"Aucun slot de scraping libre ({priority}, {len(self._running)} jobs)",
+                            retry_after=max(10.0, settings.admission_queue_timeout)
+                        )
+                    if priority == PRIORITY_INTERACTIVE:
+                        self._maybe_preempt()
+                    self._cond.wait(min(remaining, WAIT_SLICE_SECONDS))
+            finally:
+                self._waiting.remove(entry)
+                self._cond.notify_all()
+
+            self._running[job_id] = Slot(job_id, priority, deadline, time.time())
+            self.started[priority] += 1
+
+    def _maybe_preempt(self):
+        """Préempte un job refresh/bulk par requête interactive en attente"""
+        if not self.preemption_enabled:
+            return
+
+        waiting = sum(1 for rank, *_ in self._waiting if rank == PRIORITY_RANK[PRIORITY_INTERACTIVE])
+        pending = sum(1 for slot in self._running.values() if slot.preempting)
+        if waiting <= pending:
+            return
+
+        victims = [
+            slot for slot in self._running.values()
+            if slot.priority != PRIORITY_INTERACTIVE and not slot.preempting
+        ]
+        if not victims:
+            return
+
+        # Classe la plus basse, puis échéance la plus lointaine
+        victim = max(victims, key=lambda s: (PRIORITY_RANK[s.priority], s.deadline))
+        victim.preempting = True
+        self.preemptions += 1
+        logger.warning(f"⏸️ Préemption du job {victim.job_id} ({victim.priority}) pour une requête interactive")
+        try:
+            self.preempt(victim.job_id)
+        except Exception as e:
+            logger.error(f"Erreur préemption {victim.job_id}: {e}")
+
+    def waiting_job_ids(self) -> List[str]:
+        """Jobs en attente d'un slot, dans l'ordre d'attribution"""
+        with self._cond:
+            return [job_id for *_, job_id in sorted(self._waiting)]
+
+    def release(self, job_id: str):
+        """Libère le slot d'un job (fin, échec ou préemption)"""
+        with self._cond:
+            self._running.pop(job_id, None)
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        """Slots occupés et jobs en attente par classe"""
+        with self._cond:
+            return {
+                'capacity': self.capacity(),
+                'reserved_interactive': self.reserved_interactive,
+                'running': {
+                    p: sum(1 for s in self._running.values() if s.priority == p) for p in PRIORITY_RANK
+                },
+                'waiting': {
+                    p: sum(1 for rank, *_ in self._waiting if rank == r) for p, r in PRIORITY_RANK.items()
+                },
+                'started': dict(self.started),
+                'preemptions': self.preemptions,
+                'rejected': self.rejected,
+            }
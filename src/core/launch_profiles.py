@@ -0,0 +1,96 @@
+"""
+Profils de lancement de Chrome (arguments, préférences, binaire)
+
+Chaque job choisit un profil (CHROME_LAUNCH_PROFILE par défaut):
+- stealth: navigateur d'apparence ordinaire (comportement historique)
+- lean: coupe les services d'arrière-plan (réseau, mises à jour de
+  composants, extensions, sync, rapports) et les images; peut tourner sur
+  chrome-headless-shell (CHROME_HEADLESS_SHELL_PATH), plus léger
+- debug: stealth avec les logs Chrome verbeux sur stderr
+
+Les options communes (anti-détection, langue, sandbox, proxy, user agent)
+restent appliquées par DriverManager quel que soit le profil.
+scripts/benchmark_launch_profiles.py mesure démarrage et mémoire par profil.
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from .config import settings
+
+PROFILE_LEAN = "lean"
+PROFILE_STEALTH = "stealth"
+PROFILE_DEBUG = "debug"
+
+# Variable d'environnement qui indique au worker le profil du job
+LAUNCH_PROFILE_ENV_VAR = "TRAVLIAQ_LAUNCH_PROFILE"
+
+# Services lancés au démarrage et inutiles pour lire un calendrier
+LEAN_ARGUMENTS = (
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-extensions',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--no-first-run',
+    '--no-default-browser-check',
+    '--disable-breakpad',
+    '--disable-client-side-phishing-detection',
+    '--disable-domain-reliability',
+    '--disable-hang-monitor',
+    '--metrics-recording-only',
+    '--mute-audio',
+    '--password-store=basic',
+    '--use-mock-keychain',
+    '--disable-features=Translate,OptimizationHints,MediaRouter,DialMediaRouteProvider,'
+    'AutofillServerCommunication,CertificateTransparencyComponentUpdater',
+)
+
+
+@dataclass(frozen=True)
+class LaunchProfile:
+    """Arguments et préférences ajoutés aux options communes"""
+    name: str
+    arguments: Tuple[str, ...] = ()
+    prefs: Dict = field(default_factory=dict)
+    quiet_logs: bool = True  # --log-level=3, pas de logging Chrome
+    headless_shell: bool = False  # chrome-headless-shell autorisé si configuré
+
+
+LAUNCH_PROFILES: Dict[str, LaunchProfile] = {
+    PROFILE_STEALTH: LaunchProfile(name=PROFILE_STEALTH),
+    PROFILE_LEAN: LaunchProfile(
+        name=PROFILE_LEAN,
+        arguments=LEAN_ARGUMENTS,
+        prefs={'profile.managed_default_content_settings.images': 2},
+        headless_shell=True,
+    ),
+    PROFILE_DEBUG: LaunchProfile(
+        name=PROFILE_DEBUG,
+        arguments=('--enable-logging=stderr', '--v=1'),
+        quiet_logs=False,
+    ),
+}
+
+
+def get_launch_profile(name: Optional[str] = None) -> LaunchProfile:
+    """
+    Profil par nom (None = CHROME_LAUNCH_PROFILE)
+
+    Raises:
+        ValueError: Profil inconnu
+    """
+    name = name or settings.chrome_launch_profile
+    try:
+        return LAUNCH_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Profil de lancement inconnu: {name} ({', '.join(LAUNCH_PROFILES)})")
+
+
+def headless_shell_binary(profile: LaunchProfile, headless: bool) -> Optional[str]:
+    """Binaire chrome-headless-shell à utiliser pour ce lancement (None = Chrome)"""
+    path = settings.chrome_headless_shell_path
+    if not (profile.headless_shell and headless and path):
+        return None
+    return path if os.path.isfile(path) else None
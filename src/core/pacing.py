@@ -0,0 +1,237 @@
+"""
+Contrôleur de cadence global des requêtes vers Google Flights
+
+Token bucket partagé entre tous les workers (process distincts) via un
+fichier SQLite: chaque navigation consomme un jeton, le bucket se remplit
+au rythme de settings.requests_per_hour. Les workers vont donc au débit
+maximal autorisé, sans dépasser la cadence globale ni dormir pour rien.
+
+Il y a un bucket par adresse de sortie: la connexion directe partage
+BUCKET_NAME, chaque proxy du ProxyPool a le sien.
+"""
+
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+BUCKET_NAME = "google_flights"
+
+# Sommeil maximal entre deux tentatives (pour réévaluer le bucket)
+MAX_SLEEP_SECONDS = 5.0
+
+# Fenêtre de conservation des événements pour les métriques
+EVENTS_RETENTION_SECONDS = 3600
+
+
+class PacingController:
+    """Token bucket inter-process stocké dans SQLite"""
+
+    def __init__(
+            self,
+            db_path: Optional[str] = None,
+            requests_per_hour: Optional[int] = None,
+            burst: Optional[float] = None,
+            enabled: Optional[bool] = None
+    ):
+        self.db_path = Path(db_path or settings.pacing_db_path or settings.data_dir / "pacing.db")
+        self.rate_per_second = (requests_per_hour or settings.requests_per_hour) / 3600.0
+        self.capacity = float(burst or settings.pacing_burst)
+        self.enabled = settings.pacing_enabled if enabled is None else enabled
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connexion paresseuse (autocommit, transactions explicites)"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.db_path), timeout=30, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pacing_bucket ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pacing_events ("
+                "ts REAL NOT NULL, cost REAL NOT NULL, waited REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_pacing_events_ts ON pacing_events (ts)")
+            self._conn = conn
+        return self._conn
+
+    def _try_take(self, cost: float, bucket: str) -> float:
+        """
+        Tente de prendre `cost` jetons de façon atomique
+
+        Returns:
+            0 si les jetons sont pris, sinon le temps d'attente estimé (s)
+        """
+        conn = self._connection()
+        now = time.time()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM pacing_bucket WHERE name = ?", (bucket,)
+            ).fetchone()
+
+            if row is None:
+                tokens = self.capacity
+            else:
+                tokens = min(self.capacity, row[0] + (now - row[1]) * self.rate_per_second)
+
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / self.rate_per_second
+
+            conn.execute(
+                "INSERT OR REPLACE INTO pacing_bucket (name, tokens, updated_at) VALUES (?, ?, ?)",
+                (bucket, tokens, now)
+            )
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def acquire(
+            self,
+            cost: float = 1.0,
+            timeout: Optional[float] = None,
+            bucket: Optional[str] = None
+    ) -> float:
+        """
+        Bloque jusqu'à obtenir `cost` jetons
+
+        Args:
+            cost: Jetons consommés (1 = chargement de page)
+            timeout: Attente maximale en secondes (None = illimitée)
+            bucket: Adresse de sortie (URL du proxy, None = connexion directe)
+
+        Returns:
+            Temps d'attente effectif en secondes
+
+        Raises:
+            RateLimitError: Si le timeout est dépassé
+        """
+        if not self.enabled or cost <= 0:
+            return 0.0
+
+        from .exceptions import RateLimitError
+
+        # Un coût supérieur à la capacité ne serait jamais satisfait
+        cost = min(cost, self.capacity)
+        bucket = bucket or BUCKET_NAME
+        started = time.time()
+
+        # Le verrou ne protège que la connexion partagée: jamais tenu pendant
+        # le sommeil, les autres buckets et get_stats restent disponibles
+        while True:
+            try:
+                with self._lock:
+                    wait = self._try_take(cost, bucket)
+            except sqlite3.Error as e:
+                # Le pacing ne doit jamais bloquer un scraping
+                logger.warning(f"Pacing indisponible, requête non régulée: {e}")
+                return 0.0
+
+            if wait <= 0:
+                break
+
+            if timeout is not None and time.time() - started + wait > timeout:
+                raise RateLimitError(
+                    f"Cadence globale saturée (attente estimée {wait:.0f}s)",
+                    details={"wait_seconds": wait}
+                )
+
+            # Jitter pour éviter que les workers repartent en même temps
+            time.sleep(min(wait, MAX_SLEEP_SECONDS) + random.uniform(0, 0.25))
+
+        waited = time.time() - started
+        with self._lock:
+            self._record(cost, waited)
+
+        if waited > 1:
+            logger.debug(f"Pacing: {waited:.1f}s d'attente")
+        return waited
+
+    def _record(self, cost: float, waited: float):
+        """Journalise l'acquisition pour les métriques"""
+        try:
+            conn = self._connection()
+            now = time.time()
+            conn.execute("INSERT INTO pacing_events (ts, cost, waited) VALUES (?, ?, ?)", (now, cost, waited))
+            conn.execute("DELETE FROM pacing_events WHERE ts < ?", (now - EVENTS_RETENTION_SECONDS,))
+        except sqlite3.Error as e:
+            logger.debug(f"Erreur métriques pacing: {e}")
+
+    def get_stats(self) -> Dict:
+        """
+        Métriques globales (tous workers confondus)
+
+        Returns:
+            Dict avec débit courant, jetons disponibles et temps d'attente
+        """
+        stats = {
+            'enabled': self.enabled,
+            'configured_rate_per_hour': round(self.rate_per_second * 3600, 1),
+            'burst': self.capacity,
+        }
+        if not self.enabled:
+            return stats
+
+        try:
+            with self._lock:
+                conn = self._connection()
+                now = time.time()
+
+                buckets = {
+                    name: round(min(self.capacity, tokens + (now - updated_at) * self.rate_per_second), 2)
+                    for name, tokens, updated_at in conn.execute(
+                        "SELECT name, tokens, updated_at FROM pacing_bucket"
+                    )
+                }
+
+                last_minute = conn.execute(
+                    "SELECT COALESCE(SUM(cost), 0) FROM pacing_events WHERE ts >= ?", (now - 60,)
+                ).fetchone()[0]
+                count, cost_hour, avg_wait, max_wait = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(cost), 0), COALESCE(AVG(waited), 0), "
+                    "COALESCE(MAX(waited), 0) FROM pacing_events WHERE ts >= ?",
+                    (now - 3600,)
+                ).fetchone()
+                waits = [w for (w,) in conn.execute(
+                    "SELECT waited FROM pacing_events WHERE ts >= ? ORDER BY waited", (now - 3600,)
+                )]
+        except sqlite3.Error as e:
+            logger.error(f"Erreur lecture métriques pacing: {e}")
+            return stats
+
+        stats.update({
+            'tokens_available': buckets.get(BUCKET_NAME, self.capacity),
+            'buckets': buckets,
+            'current_rate_per_hour': round(last_minute * 60, 1),
+            'acquisitions_last_hour': count,
+            'cost_last_hour': round(cost_hour, 2),
+            'avg_wait_seconds': round(avg_wait, 2),
+            'p95_wait_seconds': round(waits[int(len(waits) * 0.95)] if waits else 0.0, 2),
+            'max_wait_seconds': round(max_wait, 2),
+        })
+        return stats
+
+
+# Instance globale (une par process, bucket partagé via SQLite)
+pacing_controller = PacingController()
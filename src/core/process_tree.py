@@ -0,0 +1,301 @@
+"""
+Supervision des arbres de process des workers (worker Python, chromedriver, Chrome)
+
+Chaque worker est lancé dans son propre groupe de process et marqué par des
+variables d'environnement héritées par chromedriver et Chrome. On peut ainsi
+tuer tout l'arbre d'un job, retrouver les navigateurs orphelins et mesurer
+la mémoire résidente par job en lisant /proc (Linux).
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Marqueurs hérités par tout l'arbre du worker
+JOB_ENV_VAR = "TRAVLIAQ_SCRAPER_JOB"
+OWNER_ENV_VAR = "TRAVLIAQ_SCRAPER_OWNER"
+
+# Délai entre SIGTERM et SIGKILL du groupe
+TERMINATE_GRACE_SECONDS = 3.0
+
+# Âge minimal d'un process sans job avant d'être considéré orphelin
+ORPHAN_MIN_AGE_SECONDS = 30.0
+
+IS_POSIX = os.name == "posix"
+PROC_DIR = Path("/proc")
+
+
+@dataclass
+class ProcessInfo:
+    """Process marqué d'un job, lu dans /proc"""
+    pid: int
+    pgid: int
+    name: str
+    rss_bytes: int
+    age_seconds: float
+    job_id: str
+    owner_pid: int
+    is_browser_main: bool
+
+
+def popen_kwargs(job_id: str, extra_env: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    Arguments Popen: nouveau groupe de process + marqueurs d'environnement
+    """
+    env = dict(os.environ)
+    env.update(extra_env or {})
+    env[JOB_ENV_VAR] = job_id
+    env[OWNER_ENV_VAR] = str(os.getpid())
+
+    if IS_POSIX:
+        return {"env": env, "start_new_session": True}
+    return {"env": env, "creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+
+
+def kill_process_tree(process: subprocess.Popen, grace: float = TERMINATE_GRACE_SECONDS):
+    """Termine le worker et tous ses descendants (Chrome, chromedriver)"""
+    if process is None:
+        return
+
+    if not IS_POSIX:
+        subprocess.run(
+            ["taskkill", "/T", "/F", "/PID", str(process.pid)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return
+
+    # Le worker est leader de son groupe (start_new_session): pgid == pid
+    pgid = process.pid
+    try:
+        os.killpg(pgid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    except PermissionError as e:
+        logger.warning(f"killpg {pgid} refusé: {e}")
+        process.kill()
+        return
+
+    deadline = time.time() + grace
+    while time.time() < deadline:
+        if process.poll() is not None and not _group_alive(pgid):
+            return
+        time.sleep(0.1)
+
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _group_alive(pgid: int) -> bool:
+    try:
+        os.killpg(pgid, 0)
+        return True
+    except (ProcessLookupError, PermissionError):
+        return False
+
+
+def _boot_time() -> float:
+    try:
+        for line in (PROC_DIR / "stat").read_text().splitlines():
+            if line.startswith("btime "):
+                return float(line.split()[1])
+    except OSError:
+        pass
+    return 0.0
+
+
+def _read_marked_process(pid_dir: Path, page_size: int, clock_ticks: int, boot_time: float,
+                         now: float) -> Optional[ProcessInfo]:
+    try:
+        environ = (pid_dir / "environ").read_bytes()
+    except OSError:
+        return None
+
+    if JOB_ENV_VAR.encode() not in environ:
+        return None
+
+    env = dict(
+        item.split(b"=", 1) for item in environ.split(b"\0") if b"=" in item
+    )
+    try:
+        stat = (pid_dir / "stat").read_text()
+        statm = (pid_dir / "statm").read_text().split()
+        cmdline = (pid_dir / "cmdline").read_bytes()
+    except OSError:
+        return None
+
+    # Le nom (comm) est entre parenthèses et peut contenir des espaces
+    name = stat[stat.index("(") + 1:stat.rindex(")")]
+    fields = stat[stat.rindex(")") + 2:].split()
+    started = boot_time + int(fields[19]) / clock_ticks if boot_time else now
+
+    lowered = name.lower()
+    is_browser = any(b in lowered for b in ("chrome", "chromium", "headless_shell")) and "chromedriver" not in lowered
+
+    return ProcessInfo(
+        pid=int(pid_dir.name),
+        pgid=int(fields[2]),
+        name=name,
+        rss_bytes=int(statm[1]) * page_size,
+        age_seconds=max(0.0, now - started),
+        job_id=env.get(JOB_ENV_VAR.encode(), b"").decode(errors="replace"),
+        owner_pid=int(env.get(OWNER_ENV_VAR.encode(), b"0") or 0),
+        is_browser_main=is_browser and b"--type=" not in cmdline,
+    )
+
+
+def scan_job_processes() -> List[ProcessInfo]:
+    """
+    Liste les process marqués d'un job de scraping (Linux uniquement)
+
+    Returns:
+        Liste de ProcessInfo (vide hors Linux)
+    """
+    if not PROC_DIR.exists():
+        return []
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    boot_time = _boot_time()
+    now = time.time()
+    me = os.getpid()
+
+    found = []
+    for pid_dir in PROC_DIR.iterdir():
+        if not pid_dir.name.isdigit() or int(pid_dir.name) == me:
+            continue
+        info = _read_marked_process(pid_dir, page_size, clock_ticks, boot_time, now)
+        if info is not None:
+            found.append(info)
+    return found
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+class ProcessReaper:
+    """
+    Reaper périodique des navigateurs orphelins
+
+    Un process marqué est orphelin si son propriétaire (le process qui a
+    lancé le job) est mort, ou si c'est nous et que le job n'est plus actif.
+    Les jobs d'autres process vivants (sidecar, autre API) ne sont jamais
+    touchés.
+    """
+
+    def __init__(self, live_jobs: Callable[[], Set[str]], interval_seconds: float = 60.0):
+        self.live_jobs = live_jobs
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.runs = 0
+        self.reaped = 0
+
+    def find_orphans(self, processes: Optional[List[ProcessInfo]] = None) -> List[ProcessInfo]:
+        """Process marqués sans job propriétaire vivant"""
+        processes = scan_job_processes() if processes is None else processes
+        me = os.getpid()
+        live = self.live_jobs()
+        owners_alive: Dict[int, bool] = {}
+
+        orphans = []
+        for info in processes:
+            if info.age_seconds < ORPHAN_MIN_AGE_SECONDS:
+                continue
+            if info.owner_pid == me:
+                if info.job_id in live:
+                    continue
+            else:
+                if info.owner_pid not in owners_alive:
+                    owners_alive[info.owner_pid] = _pid_alive(info.owner_pid)
+                if owners_alive[info.owner_pid]:
+                    continue
+            orphans.append(info)
+        return orphans
+
+    def reap_once(self) -> int:
+        """
+        Tue les process orphelins
+
+        Returns:
+            Nombre de process tués
+        """
+        self.runs += 1
+        killed = 0
+        for info in self.find_orphans():
+            try:
+                os.kill(info.pid, signal.SIGKILL)
+                killed += 1
+                logger.warning(
+                    f"🧹 Orphelin tué: {info.name} PID={info.pid} (job {info.job_id}, "
+                    f"{info.rss_bytes / 1024 / 1024:.0f} Mo)"
+                )
+            except (ProcessLookupError, PermissionError):
+                continue
+        self.reaped += killed
+        return killed
+
+    def run_forever(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.reap_once()
+            except Exception as e:
+                logger.error(f"Erreur reaper: {e}")
+
+    def start(self):
+        """Démarre le reaper dans un thread daemon (Linux uniquement)"""
+        if not PROC_DIR.exists() or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="process-reaper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def process_metrics(processes: Optional[List[ProcessInfo]] = None) -> Dict:
+    """
+    Navigateurs résidents et mémoire par job
+
+    Returns:
+        Dict {browsers, processes, rss_bytes, jobs: {job_id: {...}}}
+    """
+    processes = scan_job_processes() if processes is None else processes
+    jobs: Dict[str, Dict] = {}
+    for info in processes:
+        job = jobs.setdefault(info.job_id, {'processes': 0, 'browsers': 0, 'rss_bytes': 0})
+        job['processes'] += 1
+        job['browsers'] += int(info.is_browser_main)
+        job['rss_bytes'] += info.rss_bytes
+
+    return {
+        'supported': PROC_DIR.exists(),
+        'platform': sys.platform,
+        'browsers': sum(j['browsers'] for j in jobs.values()),
+        'processes': len(processes),
+        'rss_bytes': sum(j['rss_bytes'] for j in jobs.values()),
+        'jobs': jobs,
+    }
@@ -0,0 +1,290 @@
+"""
+Pool de proxies avec rotation pondérée, santé et quarantaine
+
+Chaque job de scraping emprunte un proxy au pool (choix pondéré par le taux
+de succès récent et la latence), dans la limite d'une concurrence et d'un
+débit par proxy. Les proxies qui servent une page de blocage ou qui font
+expirer un job sont mis en quarantaine (durée exponentielle).
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Set
+
+from .config import settings
+from .exceptions import RateLimitError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# Issues d'un job vues par le pool
+OUTCOME_SUCCESS = "success"
+OUTCOME_FAILURE = "failure"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_BLOCKED = "blocked"
+OUTCOME_CANCELLED = "cancelled"  # job jamais lancé: santé inchangée
+
+# Lissage exponentiel du taux de succès et de la latence
+HEALTH_EWMA_ALPHA = 0.3
+
+# Poids plancher: un proxy dégradé reste sélectionnable de temps en temps
+MIN_SUCCESS_SCORE = 0.05
+
+# Plafond de la quarantaine exponentielle
+MAX_QUARANTINE_MINUTES = 240
+
+
+@dataclass
+class ProxyState:
+    """Santé et comptabilité d'un proxy"""
+    url: str
+    max_concurrency: int
+    max_per_hour: int
+    active: int = 0
+    success_score: float = 1.0
+    latency_seconds: Optional[float] = None
+    requests: int = 0
+    successes: int = 0
+    failures: int = 0
+    blocks: int = 0
+    timeouts: int = 0
+    bytes_transferred: int = 0
+    page_requests: int = 0
+    quarantined_until: float = 0.0
+    quarantine_count: int = 0
+    launches: Deque[float] = field(default_factory=deque)
+
+    def launches_last_hour(self, now: float) -> int:
+        while self.launches and self.launches[0] < now - 3600:
+            self.launches.popleft()
+        return len(self.launches)
+
+    def is_available(self, now: float) -> bool:
+        return (
+            self.quarantined_until <= now
+            and self.active < self.max_concurrency
+            and self.launches_last_hour(now) < self.max_per_hour
+        )
+
+
+def parse_proxy_list(value: Optional[str]) -> List[str]:
+    """Parse une liste de proxies séparés par des virgules"""
+    return [p.strip() for p in (value or "").split(",") if p.strip()]
+
+
+class ProxyPool:
+    """
+    Pool de proxies partagé par les jobs du ScraperPool
+
+    Désactivé (acquire() renvoie None = connexion directe ou PROXY_URL) si
+    PROXY_ROTATION est faux ou si PROXY_LIST est vide.
+    """
+
+    def __init__(
+            self,
+            proxies: Optional[List[str]] = None,
+            max_concurrency: Optional[int] = None,
+            max_per_hour: Optional[int] = None,
+            quarantine_minutes: Optional[float] = None,
+            enabled: Optional[bool] = None
+    ):
+        urls = proxies if proxies is not None else parse_proxy_list(settings.proxy_list)
+        self.max_concurrency = max_concurrency or settings.proxy_max_concurrency
+        self.max_per_hour = max_per_hour or settings.proxy_max_requests_per_hour
+        self.quarantine_minutes = quarantine_minutes or settings.proxy_quarantine_minutes
+
+        self._proxies: Dict[str, ProxyState] = {
+            url: ProxyState(url=url, max_concurrency=self.max_concurrency, max_per_hour=self.max_per_hour)
+            for url in dict.fromkeys(urls)
+        }
+        self.enabled = (settings.proxy_rotation if enabled is None else enabled) and bool(self._proxies)
+        self._cond = threading.Condition()
+
+        if self.enabled:
+            logger.info(f"✓ ProxyPool: {len(self._proxies)} proxies, {self.max_concurrency} jobs/proxy")
+
+    # ==================== SÉLECTION ====================
+
+    def _weight(self, proxy: ProxyState, reference_latency: float) -> float:
+        """Poids de sélection: succès récent / latence relative"""
+        latency = proxy.latency_seconds if proxy.latency_seconds is not None else reference_latency
+        score = max(MIN_SUCCESS_SCORE, proxy.success_score)
+        return score * score * reference_latency / max(latency, 0.1)
+
+    def _pick(self, now: float, exclude: Optional[Set[str]] = None) -> Optional[ProxyState]:
+        candidates = [
+            p for p in self._proxies.values()
+            if p.is_available(now) and p.url not in (exclude or ())
+        ]
+        if not candidates:
+            return None
+
+        known = [p.latency_seconds for p in self._proxies.values() if p.latency_seconds is not None]
+        reference_latency = sum(known) / len(known) if known else 1.0
+
+        weights = [self._weight(p, reference_latency) for p in candidates]
+        return random.choices(candidates, weights=weights, k=1)[0]
+
+    def acquire(self, timeout: Optional[float] = None, exclude: Optional[Set[str]] = None) -> Optional[str]:
+        """
+        Emprunte un proxy pour un job
+
+        Args:
+            timeout: Attente maximale d'un proxy libre (None = settings)
+            exclude: Proxies à éviter (ex: celui du job qu'on double)
+
+        Returns:
+            URL du proxy, ou None si le pool est désactivé
+
+        Raises:
+            RateLimitError: Si aucun proxy ne se libère à temps
+        """
+        if not self.enabled:
+            return None
+
+        timeout = settings.proxy_acquire_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+
+        with self._cond:
+            while True:
+                now = time.time()
+                proxy = self._pick(now, exclude)
+                if proxy is not None:
+                    proxy.active += 1
+                    proxy.requests += 1
+                    proxy.launches.append(now)
+                    return proxy.url
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise RateLimitError(
+                        "Aucun proxy disponible (quarantaine, concurrence ou débit)",
+                        details={"proxies": len(self._proxies)}
+                    )
+                # Réveil sur release() ou à la fin probable d'une quarantaine/fenêtre
+                self._cond.wait(min(remaining, self._next_availability(now)))
+
+    def _next_availability(self, now: float) -> float:
+        """Délai avant qu'un proxy saturé ou en quarantaine redevienne éligible"""
+        delays = [5.0]
+        for p in self._proxies.values():
+            if p.quarantined_until > now:
+                delays.append(p.quarantined_until - now)
+            elif p.launches_last_hour(now) >= p.max_per_hour and p.launches:
+                delays.append(p.launches[0] + 3600 - now)
+        return max(0.1, min(delays))
+
+    # ==================== RETOUR D'EXPÉRIENCE ====================
+
+    def release(
+            self,
+            url: Optional[str],
+            outcome: str,
+            latency_seconds: Optional[float] = None,
+            stats: Optional[Dict] = None
+    ):
+        """
+        Rend un proxy au pool et met à jour sa santé
+
+        Args:
+            url: Proxy emprunté (None = rien à faire)
+            outcome: success, failure, timeout, blocked ou cancelled
+            latency_seconds: Temps de chargement mesuré (ou durée du job)
+            stats: Comptabilité du worker {'bytes', 'requests'}
+        """
+        if not url:
+            return
+
+        with self._cond:
+            proxy = self._proxies.get(url)
+            if proxy is None:
+                return
+
+            proxy.active = max(0, proxy.active - 1)
+            if outcome == OUTCOME_CANCELLED:
+                proxy.requests -= 1
+                if proxy.launches:
+                    proxy.launches.pop()
+                self._cond.notify_all()
+                return
+
+            success = outcome == OUTCOME_SUCCESS
+            proxy.success_score = (
+                HEALTH_EWMA_ALPHA * (1.0 if success else 0.0)
+                + (1 - HEALTH_EWMA_ALPHA) * proxy.success_score
+            )
+
+            if success:
+                proxy.successes += 1
+                proxy.quarantine_count = 0
+                if latency_seconds is not None:
+                    proxy.latency_seconds = latency_seconds if proxy.latency_seconds is None else (
+                        HEALTH_EWMA_ALPHA * latency_seconds + (1 - HEALTH_EWMA_ALPHA) * proxy.latency_seconds
+                    )
+            else:
+                proxy.failures += 1
+
+            if stats:
+                proxy.bytes_transferred += int(stats.get('bytes', 0) or 0)
+                proxy.page_requests += int(stats.get('requests', 0) or 0)
+
+            if outcome in (OUTCOME_BLOCKED, OUTCOME_TIMEOUT):
+                if outcome == OUTCOME_BLOCKED:
+                    proxy.blocks += 1
+                else:
+                    proxy.timeouts += 1
+                self._quarantine(proxy, outcome)
+
+            self._cond.notify_all()
+
+    def _quarantine(self, proxy: ProxyState, reason: str):
+        minutes = min(MAX_QUARANTINE_MINUTES, self.quarantine_minutes * (2 ** proxy.quarantine_count))
+        proxy.quarantine_count += 1
+        proxy.quarantined_until = time.time() + minutes * 60
+        logger.warning(f"🚫 Proxy {proxy.url} en quarantaine {minutes:.0f} min ({reason})")
+
+    # ==================== STATS ====================
+
+    def capacity(self) -> int:
+        """Nombre de jobs simultanés que les proxies sains peuvent porter"""
+        now = time.time()
+        with self._cond:
+            return sum(p.max_concurrency for p in self._proxies.values() if p.quarantined_until <= now)
+
+    def get_stats(self) -> Dict:
+        """Santé et comptabilité par proxy"""
+        now = time.time()
+        with self._cond:
+            proxies = [
+                {
+                    'url': p.url,
+                    'active': p.active,
+                    'available': p.is_available(now),
+                    'quarantined_for_seconds': max(0, round(p.quarantined_until - now)),
+                    'success_score': round(p.success_score, 3),
+                    'latency_seconds': round(p.latency_seconds, 2) if p.latency_seconds is not None else None,
+                    'requests': p.requests,
+                    'requests_last_hour': p.launches_last_hour(now),
+                    'successes': p.successes,
+                    'failures': p.failures,
+                    'blocks': p.blocks,
+                    'timeouts': p.timeouts,
+                    'bytes_transferred': p.bytes_transferred,
+                    'page_requests': p.page_requests,
+                }
+                for p in self._proxies.values()
+            ]
+        return {
+            'enabled': self.enabled,
+            'max_concurrency_per_proxy': self.max_concurrency,
+            'max_requests_per_hour_per_proxy': self.max_per_hour,
+            'proxies': proxies,
+        }
+
+
+# Instance globale
+proxy_pool = ProxyPool()
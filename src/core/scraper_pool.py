@@ -2,20 +2,47 @@
 
 import subprocess
 import json
+import os
+import socket
 import tempfile
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import threading
 from dataclasses import dataclass
 from datetime import datetime
 import uuid
 import sys
-
+import time
+
+from .config import settings
+from .admission import admission_controller
+from .browser_farm import BROWSER_ENDPOINT_ENV_VAR, browser_farm
+from .circuit_breaker import circuit_breakers
+from .exceptions import BlockedError, CaptchaError, PreemptedError, StuckJobError
+from .heartbeat import HEARTBEAT_ENV_VAR, PREEMPT_ENV_VAR, check_stuck, read_heartbeat
+from .hedging import hedge_policy, month_count
+from .job_scheduler import PRIORITY_INTERACTIVE, SlotScheduler
+from .launch_profiles import LAUNCH_PROFILE_ENV_VAR, get_launch_profile
+from .process_tree import ProcessReaper, kill_process_tree, popen_kwargs, process_metrics
+from .proxy_pool import (
+    proxy_pool,
+    OUTCOME_SUCCESS,
+    OUTCOME_FAILURE,
+    OUTCOME_TIMEOUT,
+    OUTCOME_BLOCKED,
+    OUTCOME_CANCELLED,
+)
+from ..database.manager import db_manager
+from ..scrapers.calendar_extraction import DESTINATIONS_ENV_VAR, FLIGHT_DATES_ENV_VAR, TRIP_LENGTHS_ENV_VAR
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+# Fréquence de vérification des heartbeats pendant l'attente d'un job
+WATCHDOG_POLL_SECONDS = 2.0
+
+
 @dataclass
 class ScrapeJob:
     """Job de scraping"""
@@ -27,16 +54,48 @@ class ScrapeJob:
     created_at: datetime
     process: Optional[subprocess.Popen] = None
     result_file: Optional[Path] = None
+    heartbeat_file: Optional[Path] = None
+    preempt_file: Optional[Path] = None
+    priority: str = PRIORITY_INTERACTIVE
+    deadline: Optional[float] = None
+    proxy: Optional[str] = None
+    browser: Optional[str] = None  # endpoint de la BrowserFarm (None = Chrome local)
+    launch_profile: Optional[str] = None  # profil de lancement de Chrome (None = config)
+    trip_lengths: Optional[List[int]] = None  # grille aller-retour (None = calendrier aller simple)
+    flight_dates: Optional[List[str]] = None  # [départ] ou [départ, retour]: liste des vols en fin de job
+    destinations: Optional[List[str]] = None  # plusieurs destinations dans la même session (batch)
+    stats: Optional[Dict] = None
+    finished: bool = False
+    hedge_of: Optional[str] = None  # job doublé (hedging)
+
+    @property
+    def months(self) -> int:
+        """Mois de calendrier à extraire (par durée en grille aller-retour, par destination en batch)"""
+        return (
+            month_count(self.start_date, self.end_date)
+            * len(self.trip_lengths or [None]) * len(self.destinations or [None])
+        )
 
 
 class ScraperPool:
     """Gestionnaire de scrapers avec subprocess"""
 
-    def __init__(self, max_workers: int = 10):
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.scraper_max_workers
         self.jobs: Dict[str, ScrapeJob] = {}
+        # Jobs en attente d'un slot du scheduler (ETA de /scraper/queue)
+        self._pending: Dict[str, ScrapeJob] = {}
         self.lock = threading.Lock()
         self.temp_dir = Path(tempfile.gettempdir()) / "travliaq_scraper"
         self.temp_dir.mkdir(exist_ok=True, parents=True)
+        self.reaper = ProcessReaper(self.live_job_ids, settings.reaper_interval_seconds)
+        self.scheduler = SlotScheduler(self.capacity, self._request_preempt)
+        self.worker_script = Path(__file__).parent.parent.parent / "scripts" / "scraper_worker.py"
+        # Slots déclarés en base: les autres process (sidecar, workers) voient nos navigateurs
+        self.owner = f"{socket.gethostname()}-{os.getpid()}"
+        self.slot_prefix = uuid.uuid4().hex[:8]
+        # Stats du worker par job attendu (consommées par calendar_service)
+        self._job_stats: Dict[str, Dict] = {}
 
         logger.info(f"✓ ScraperPool initialisé (temp_dir: {self.temp_dir})")
 
@@ -45,11 +104,45 @@ class ScraperPool:
             origin: str,
             destination: str,
             start_date: str,
-            end_date: str
+            end_date: str,
+            hedge_of: Optional[ScrapeJob] = None,
+            priority: str = PRIORITY_INTERACTIVE,
+            deadline: Optional[float] = None,
+            launch_profile: Optional[str] = None,
+            trip_lengths: Optional[List[int]] = None,
+            flight_dates: Optional[List[str]] = None,
+            destinations: Optional[List[str]] = None
     ) -> str:
-        """Lance un subprocess de scraping"""
+        """
+        Lance un subprocess de scraping
+
+        Attend d'abord un slot selon la classe de priorité puis l'échéance.
+
+        Args:
+            hedge_of: Job lent à doubler (pas d'attente en file, autre proxy)
+            priority: interactive, refresh ou bulk
+            deadline: Échéance du client (timestamp), ordonne la file
+            launch_profile: Profil de lancement de Chrome (lean, stealth, debug)
+            trip_lengths: Durées de séjour: grille aller-retour au lieu du calendrier
+            flight_dates: [départ] ou [départ, retour]: liste des vols lue dans la
+                session du calendrier (résultat {"calendar": ..., "flights": ...})
+            destinations: Destinations scrapées l'une après l'autre dans la même
+                session (résultat {destination: {date: prix}}, `destination` ignoré)
+
+        Raises:
+            ValueError: Profil de lancement inconnu
+        """
+        if hedge_of:
+            priority, deadline = hedge_of.priority, hedge_of.deadline
+            launch_profile = hedge_of.launch_profile
+            trip_lengths = hedge_of.trip_lengths
+            flight_dates = hedge_of.flight_dates
+            destinations = hedge_of.destinations
+        launch_profile = get_launch_profile(launch_profile).name
+
         job_id = str(uuid.uuid4())[:8]
         result_file = self.temp_dir / f"result_{job_id}.json"
+        heartbeat_file = self.temp_dir / f"heartbeat_{job_id}.json"
 
         job = ScrapeJob(
             job_id=job_id,
@@ -58,15 +151,65 @@ class ScraperPool:
             start_date=start_date,
             end_date=end_date,
             created_at=datetime.now(),
-            result_file=result_file
+            result_file=result_file,
+            heartbeat_file=heartbeat_file,
+            preempt_file=self.temp_dir / f"preempt_{job_id}",
+            priority=priority,
+            deadline=deadline,
+            launch_profile=launch_profile,
+            trip_lengths=trip_lengths,
+            flight_dates=flight_dates,
+            destinations=destinations
         )
 
         # Chemin du worker
-        script_path = Path(__file__).parent.parent.parent / "scripts" / "scraper_worker.py"
+        script_path = self.worker_script
 
         if not script_path.exists():
             raise FileNotFoundError(f"Worker script introuvable: {script_path}")
 
+        # Slot du pool (classe de priorité, puis échéance la plus proche)
+        with self.lock:
+            self._pending[job_id] = job
+        try:
+            self.scheduler.acquire(job_id, priority, deadline, block=hedge_of is None)
+        finally:
+            with self.lock:
+                self._pending.pop(job_id, None)
+
+        try:
+            # Navigateur distant (BrowserFarm), sinon marge mémoire/CPU du
+            # conteneur pour un Chrome local (attente en file puis refus)
+            job.browser = browser_farm.acquire(timeout=0 if hedge_of else None)
+            if job.browser is None:
+                admission_controller.admit(job_id, timeout=0 if hedge_of else None)
+        except Exception:
+            self.scheduler.release(job_id)
+            raise
+
+        try:
+            # Proxy emprunté au pool (None = connexion directe / PROXY_URL)
+            if hedge_of:
+                exclude = {hedge_of.proxy} if hedge_of.proxy else None
+                job.proxy = proxy_pool.acquire(timeout=0, exclude=exclude)
+            else:
+                job.proxy = proxy_pool.acquire()
+
+            # Disjoncteurs (global, connexion directe) après des blocages
+            try:
+                circuit_breakers.before_job(job.proxy)
+            except Exception:
+                proxy_pool.release(job.proxy, OUTCOME_CANCELLED)
+                raise
+        except Exception:
+            admission_controller.finish(job_id, learn=False)
+            browser_farm.release(job.browser, OUTCOME_CANCELLED)
+            self.scheduler.release(job_id)
+            raise
+
+        # Durées (watchdog, hedging) comptées à partir du lancement effectif
+        job.created_at = datetime.now()
+
         # Commande
         cmd = [
             sys.executable,
@@ -78,35 +221,224 @@ class ScraperPool:
             str(result_file),
             job_id
         ]
+        if job.proxy:
+            cmd.append(job.proxy)
 
         logger.info(f"Job {job_id}: Lancement subprocess pour {origin}->{destination}")
         logger.debug(f"Job {job_id}: Commande: {' '.join(cmd)}")
 
         try:
             # Lancer le subprocess
+            # Groupe de process dédié: tout l'arbre (Chrome inclus) est tuable d'un coup
             process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
-                bufsize=1
+                bufsize=1,
+                **popen_kwargs(job_id, {
+                    HEARTBEAT_ENV_VAR: str(heartbeat_file),
+                    PREEMPT_ENV_VAR: str(job.preempt_file),
+                    BROWSER_ENDPOINT_ENV_VAR: job.browser or "",
+                    LAUNCH_PROFILE_ENV_VAR: launch_profile,
+                    TRIP_LENGTHS_ENV_VAR: ",".join(str(length) for length in trip_lengths or []),
+                    FLIGHT_DATES_ENV_VAR: ",".join(flight_dates or []),
+                    DESTINATIONS_ENV_VAR: ",".join(destinations or []),
+                })
             )
 
             job.process = process
+            job.hedge_of = hedge_of.job_id if hedge_of else None
 
             with self.lock:
                 self.jobs[job_id] = job
 
-            logger.info(f"Job {job_id}: Subprocess PID={process.pid} lancé")
+            db_manager.claim_scraper_slot(
+                self._slot_id(job_id), self.owner, priority, settings.shared_slot_ttl_seconds
+            )
+
+            logger.info(
+                f"Job {job_id}: Subprocess PID={process.pid} lancé ({priority}"
+                f"{', ' + job.browser if job.browser else ''})"
+            )
 
         except Exception as e:
             logger.error(f"Job {job_id}: Erreur lancement subprocess: {e}")
+            self._finish(job, OUTCOME_CANCELLED)
             raise
 
         return job_id
 
     def wait_for_job(self, job_id: str, timeout: Optional[float] = None) -> Dict:
-        """Attend qu'un job se termine"""
+        """
+        Attend qu'un job se termine
+
+        Un job bloqué (watchdog) est relancé jusqu'à watchdog_max_reschedules
+        fois, dans la limite du timeout global. Les stats du worker qui a
+        répondu (relance ou doublon compris) restent rangées sous job_id:
+        voir pop_job_stats.
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        reschedules = 0
+        submitted_id = job_id
+
+        try:
+            while True:
+                try:
+                    return self._wait_single(job_id, deadline)
+                except StuckJobError:
+                    if reschedules >= settings.watchdog_max_reschedules:
+                        raise
+                    if deadline is not None and deadline - time.time() < 30:
+                        raise
+
+                    reschedules += 1
+                    with self.lock:
+                        job = self.jobs[job_id]
+                    job_id = self.submit_scrape(
+                        job.origin, job.destination, job.start_date, job.end_date,
+                        priority=job.priority, deadline=job.deadline,
+                        launch_profile=job.launch_profile, trip_lengths=job.trip_lengths,
+                        flight_dates=job.flight_dates, destinations=job.destinations
+                    )
+                    logger.warning(f"🔁 Job {job.job_id} relancé en {job_id} ({reschedules})")
+        finally:
+            if job_id != submitted_id:
+                with self.lock:
+                    stats = self._job_stats.pop(job_id, None)
+                    if stats is not None:
+                        self._job_stats[submitted_id] = stats
+
+    def _communicate(self, race: List[ScrapeJob], deadline: Optional[float]) -> Tuple[ScrapeJob, str, str]:
+        """
+        communicate() par tranches, en surveillant les heartbeats du worker
+
+        Au-delà du p90 appris pour son nombre de mois, le job est doublé
+        (hedging): le premier résultat complet gagne, l'autre est annulé.
+        `race` contient les jobs encore en lice.
+
+        Returns:
+            (job gagnant, stdout, stderr)
+
+        Raises:
+            subprocess.TimeoutExpired: Timeout global dépassé
+            StuckJobError: Job sans progrès (arbre de process déjà tué)
+        """
+        primary = race[0]
+        threshold = hedge_policy.threshold(primary.months)
+        hedge_at = primary.created_at.timestamp() + threshold if threshold is not None else None
+
+        while True:
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(primary.process.args, 0)
+
+            poll = WATCHDOG_POLL_SECONDS if remaining is None else min(WATCHDOG_POLL_SECONDS, remaining)
+            for job in list(race):
+                try:
+                    stdout, stderr = job.process.communicate(timeout=poll / len(race))
+                except subprocess.TimeoutExpired:
+                    continue
+
+                if len(race) == 1 or self._succeeded(job):
+                    self._cancel_losers(race, job)
+                    return job, stdout, stderr
+
+                # Un concurrent a échoué: l'autre continue seul
+                logger.warning(f"Job {job.job_id}: échec pendant le hedging, on garde l'autre worker")
+                race.remove(job)
+                self._finish(job, self._failure_outcome(job))
+                self._discard_result(job)
+
+            for job in list(race):
+                self._check_watchdog(job, race)
+
+            if hedge_at is not None and time.time() >= hedge_at:
+                hedge_at = None
+                hedge = self._start_hedge(primary)
+                if hedge:
+                    race.append(hedge)
+
+    def _check_watchdog(self, job: ScrapeJob, race: List[ScrapeJob]):
+        """Tue un job sans progrès (l'autre concurrent éventuel continue)"""
+        if not settings.watchdog_enabled:
+            return
+
+        stuck = check_stuck(read_heartbeat(job.heartbeat_file), job.created_at.timestamp())
+        if not stuck:
+            return
+
+        stage, idle = stuck
+        logger.error(f"Job {job.job_id}: bloqué à l'étape '{stage}' depuis {idle:.0f}s, arrêt")
+        kill_process_tree(job.process)
+        if len(race) > 1:
+            race.remove(job)
+            self._finish(job, OUTCOME_FAILURE)
+            return
+        raise StuckJobError(
+            f"Job {job.job_id} bloqué ({stage}, {idle:.0f}s sans progrès)",
+            details={"stage": stage, "idle_seconds": idle}
+        )
+
+    def _start_hedge(self, job: ScrapeJob) -> Optional[ScrapeJob]:
+        """Lance un doublon d'un job lent si le budget et la capacité le permettent"""
+        if not hedge_policy.try_start(self.capacity()):
+            return None
+
+        try:
+            hedge_id = self.submit_scrape(job.origin, job.destination, job.start_date, job.end_date, hedge_of=job)
+        except Exception as e:
+            hedge_policy.end(won=None)
+            logger.info(f"Job {job.job_id}: pas de doublon possible ({e})")
+            return None
+
+        elapsed = time.time() - job.created_at.timestamp()
+        logger.warning(f"🐢 Job {job.job_id} lent ({elapsed:.0f}s, {job.months} mois): doublon {hedge_id}")
+        with self.lock:
+            return self.jobs[hedge_id]
+
+    def _cancel_losers(self, race: List[ScrapeJob], winner: ScrapeJob):
+        """Annule les autres jobs en lice une fois le gagnant connu"""
+        for job in race:
+            if job is winner:
+                continue
+            kill_process_tree(job.process)
+            self._finish(job, OUTCOME_CANCELLED)
+            self._discard_result(job)
+        if len(race) > 1:
+            logger.info(f"🏁 Job {winner.job_id} gagne la course ({len(race)} workers)")
+        race[:] = [winner]
+
+    def _discard_result(self, job: ScrapeJob):
+        if job.result_file:
+            try:
+                job.result_file.unlink()
+            except OSError:
+                pass
+
+    def _read_result(self, job: ScrapeJob) -> Optional[Dict]:
+        """Contenu du fichier de résultat (None si absent ou illisible)"""
+        if not job.result_file or not job.result_file.exists():
+            return None
+        try:
+            with open(job.result_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _succeeded(self, job: ScrapeJob) -> bool:
+        result = self._read_result(job)
+        return job.process.returncode == 0 and result is not None and "error" not in result
+
+    def _failure_outcome(self, job: ScrapeJob) -> str:
+        result = self._read_result(job) or {}
+        job.stats = result.get("stats")
+        if result.get("error_type") in ("BlockedError", "CaptchaError"):
+            return OUTCOME_BLOCKED
+        return OUTCOME_FAILURE
+
+    def _wait_single(self, job_id: str, deadline: Optional[float]) -> Dict:
+        """Attend un job précis (voir wait_for_job)"""
         with self.lock:
             job = self.jobs.get(job_id)
 
@@ -116,52 +448,204 @@ class ScraperPool:
         if not job.process:
             raise ValueError(f"Job {job_id} n'a pas de process")
 
+        timeout = None if deadline is None else max(0, round(deadline - time.time()))
         logger.info(f"Job {job_id}: Attente du résultat (timeout={timeout}s)...")
 
+        race = [job]
         try:
-            # Attendre la fin
-            stdout, stderr = job.process.communicate(timeout=timeout)
+            # Attendre la fin (watchdog sur les heartbeats, doublon si lent)
+            job, stdout, stderr = self._communicate(race, deadline)
             returncode = job.process.returncode
 
-            logger.info(f"Job {job_id}: Process terminé avec code {returncode}")
+            logger.info(f"Job {job.job_id}: Process terminé avec code {returncode}")
 
             # Logger la sortie (pour debug)
             if stdout:
-                logger.debug(f"Job {job_id} STDOUT:\n{stdout}")
+                logger.debug(f"Job {job.job_id} STDOUT:\n{stdout}")
             if stderr:
-                logger.warning(f"Job {job_id} STDERR:\n{stderr}")
+                logger.warning(f"Job {job.job_id} STDERR:\n{stderr}")
 
             # Lire le résultat
             if job.result_file and job.result_file.exists():
                 with open(job.result_file, 'r', encoding='utf-8') as f:
                     result = json.load(f)
 
+                job.stats = result.get("stats")
+                with self.lock:
+                    # Sous l'id attendu, même si un doublon a gagné
+                    self._job_stats[job_id] = job.stats or {}
+
                 # Vérifier si erreur
                 if "error" in result:
                     error_msg = result["error"]
                     traceback_msg = result.get("traceback", "")
-                    logger.error(f"Job {job_id}: Erreur dans worker:\n{error_msg}\n{traceback_msg}")
+                    logger.error(f"Job {job.job_id}: Erreur dans worker:\n{error_msg}\n{traceback_msg}")
+                    error_type = result.get("error_type")
+                    if error_type in ("BlockedError", "CaptchaError"):
+                        self._finish(job, OUTCOME_BLOCKED)
+                        error_class = CaptchaError if error_type == "CaptchaError" else BlockedError
+                        raise error_class(error_msg, details={"proxy": job.proxy, "job_id": job.job_id})
+                    self._finish(job, OUTCOME_FAILURE)
                     raise Exception(f"Worker error: {error_msg}")
 
+                # Arrêté à une frontière de mois au profit d'une requête interactive
+                if result.get("preempted"):
+                    self._finish(job, OUTCOME_CANCELLED)
+                    self._discard_result(job)
+                    raise PreemptedError(
+                        f"Job {job.job_id} préempté ({len(result['prices'])} prix, reprise au {result['resume_from']})",
+                        prices=result["prices"],
+                        resume_from=result["resume_from"]
+                    )
+
+                # Ancien format: le dict des prix directement
+                prices = result["prices"] if "prices" in result else result
+                self._finish(job, OUTCOME_SUCCESS)
+
                 # Nettoyer le fichier
                 try:
                     job.result_file.unlink()
                 except:
                     pass
 
-                logger.info(f"Job {job_id}: {len(result)} prix récupérés")
-                return result
+                logger.info(f"Job {job.job_id}: {len(prices)} prix récupérés")
+                return prices
             else:
                 raise Exception(f"Fichier de résultat introuvable: {job.result_file}")
 
         except subprocess.TimeoutExpired:
             logger.error(f"Job {job_id}: Timeout après {timeout}s!")
-            job.process.kill()
+            for racer in race:
+                kill_process_tree(racer.process)
+                self._finish(racer, OUTCOME_TIMEOUT)
             raise TimeoutError(f"Job {job_id} timeout")
+        except PreemptedError as e:
+            logger.info(str(e))
+            raise
         except Exception as e:
             logger.error(f"Job {job_id}: Erreur - {e}")
+            for racer in race:
+                if racer.process.poll() is None:
+                    kill_process_tree(racer.process)
+                self._finish(racer, OUTCOME_FAILURE)
             raise
 
+    def _finish(self, job: ScrapeJob, outcome: str):
+        """Rend le proxy du job et informe les disjoncteurs (une seule fois)"""
+        with self.lock:
+            if job.finished:
+                return
+            job.finished = True
+
+        if job.browser:
+            # Avant suppression du heartbeat: session à fermer, échec à la création
+            heartbeat = read_heartbeat(job.heartbeat_file) or {}
+            browser_farm.release(
+                job.browser, outcome,
+                session_id=heartbeat.get("session_id"),
+                driver_failed=outcome in (OUTCOME_FAILURE, OUTCOME_TIMEOUT) and heartbeat.get("stage") == "driver"
+            )
+
+        for control_file in (job.heartbeat_file, job.preempt_file):
+            if control_file:
+                try:
+                    control_file.unlink()
+                except OSError:
+                    pass
+
+        self.scheduler.release(job.job_id)
+        if job.process is not None:
+            db_manager.release_scraper_slot(self._slot_id(job.job_id))
+
+        admission_controller.finish(job.job_id, learn=outcome != OUTCOME_CANCELLED)
+        if outcome == OUTCOME_SUCCESS:
+            hedge_policy.record(job.months, time.time() - job.created_at.timestamp())
+        if job.hedge_of:
+            hedge_policy.end(won=outcome == OUTCOME_SUCCESS)
+        if outcome != OUTCOME_CANCELLED:
+            circuit_breakers.record(job.proxy, outcome)
+
+        if job.proxy:
+            stats = job.stats or {}
+            latency = stats.get("page_load_seconds", stats.get("duration_seconds"))
+            proxy_pool.release(job.proxy, outcome, latency_seconds=latency, stats=stats)
+
+    def _slot_id(self, job_id: str) -> str:
+        """Identifiant du slot partagé d'un job (unique entre process)"""
+        return f"{self.slot_prefix}-{job_id}"
+
+    def pop_job_stats(self, job_id: str) -> Dict:
+        """Stats du worker d'un job attendu par wait_for_job (consommées une seule fois)"""
+        with self.lock:
+            return self._job_stats.pop(job_id, {})
+
+    def _request_preempt(self, job_id: str):
+        """Demande à un worker de s'arrêter à sa prochaine frontière de mois"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job and job.preempt_file and not job.finished:
+            job.preempt_file.touch()
+
+    def capacity(self) -> int:
+        """Jobs simultanés possibles (mémoire/CPU ou navigateurs distants, proxies sains si rotation)"""
+        if browser_farm.enabled:
+            capacity = min(self.max_workers, browser_farm.capacity())
+        else:
+            capacity = min(self.max_workers, admission_controller.capacity())
+        if proxy_pool.enabled:
+            return min(capacity, proxy_pool.capacity())
+        return capacity
+
+    def live_job_ids(self) -> set:
+        """Jobs dont le worker tourne encore"""
+        with self.lock:
+            return {
+                job_id for job_id, job in self.jobs.items()
+                if job.process and job.process.poll() is None
+            }
+
+    def get_process_stats(self) -> Dict:
+        """Navigateurs résidents, mémoire et orphelins tués"""
+        stats = process_metrics()
+        stats['reaper_runs'] = self.reaper.runs
+        stats['reaped'] = self.reaper.reaped
+        stats['admission'] = admission_controller.get_stats()
+        stats['browser_farm'] = browser_farm.get_stats()
+        stats['hedging'] = hedge_policy.get_stats()
+        stats['scheduler'] = self.scheduler.get_stats()
+        return stats
+
+    def get_jobs(self) -> List[Dict]:
+        """
+        Jobs lancés puis en attente d'un slot (ordre du scheduler)
+
+        Returns:
+            Liste de dicts {status, job_id, route, dates, priority, months, since}
+        """
+        waiting_ids = self.scheduler.waiting_job_ids()
+        with self.lock:
+            running = sorted(
+                (job for job in self.jobs.values() if job.process and job.process.poll() is None),
+                key=lambda job: job.created_at
+            )
+            waiting = [self._pending[job_id] for job_id in waiting_ids if job_id in self._pending]
+
+        return [
+            {
+                'status': status,
+                'job_id': job.job_id,
+                'origin': job.origin,
+                'destination': job.destination,
+                'start_date': job.start_date,
+                'end_date': job.end_date,
+                'priority': job.priority,
+                'months': job.months,
+                'since': job.created_at.timestamp(),
+            }
+            for status, jobs in (('running', running), ('queued', waiting))
+            for job in jobs
+        ]
+
     def get_active_jobs_count(self) -> int:
         """Compte les jobs actifs"""
         with self.lock:
@@ -179,7 +663,12 @@ class ScraperPool:
             for job_id, job in self.jobs.items():
                 if job.created_at.timestamp() < cutoff:
                     if job.process and job.process.poll() is None:
-                        job.process.kill()
+                        kill_process_tree(job.process)
+                    if not job.finished:
+                        job.finished = True
+                        proxy_pool.release(job.proxy, OUTCOME_FAILURE)
+                        browser_farm.release(job.browser, OUTCOME_FAILURE)
+                        admission_controller.finish(job_id)
                     if job.result_file and job.result_file.exists():
                         try:
                             job.result_file.unlink()
@@ -190,13 +679,22 @@ class ScraperPool:
             for job_id in to_remove:
                 del self.jobs[job_id]
 
+        # Hors du verrou du pool (le scheduler l'utilise pour préempter)
+        for job_id in to_remove:
+            self.scheduler.release(job_id)
+
     def shutdown(self):
         """Arrête tous les processus"""
         logger.info("Arrêt du ScraperPool...")
+        self.reaper.stop()
+        admission_controller.stop()
+        browser_farm.stop()
         with self.lock:
-            for job in self.jobs.values():
-                if job.process and job.process.poll() is None:
-                    job.process.kill()
+            jobs = list(self.jobs.values())
+
+        for job in jobs:
+            if job.process and job.process.poll() is None:
+                kill_process_tree(job.process, grace=1.0)
 
 
 # Instance globale
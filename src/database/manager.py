@@ -2,21 +2,84 @@
 Gestionnaire de base de données avec système de cache intelligent
 """
 
-from sqlalchemy import create_engine, and_, desc, func
+from sqlalchemy import create_engine, and_, or_, desc, func, insert, select, update, bindparam, tuple_
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Tuple
 import json
+import uuid
 
-from ..database.models import Base, CalendarPrice, Flight, ScrapeLog
+from ..database.models import Base, CalendarPrice, Flight, RoundTripPrice, ScrapeLog, ScrapeJobRecord, ScraperSlotRecord
 from ..core.config import settings
 from ..core.exceptions import DatabaseError
+from ..services.price_cache import price_cache, month_bounds, month_keys, month_last_day
+from ..services.ttl_policy import ttl_policy
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+# Bornes neutres pour garder une seule forme de requête (cache de compilation)
+_MIN_DATE = "0000-00-00"
+_MAX_DATE = "9999-99-99"
+
+# Lecture rapide du cache: uniquement (date, prix), sans hydratation ORM
+_CACHED_PRICES_STMT = (
+    select(CalendarPrice.date, CalendarPrice.price)
+    .where(
+        CalendarPrice.origin == bindparam('origin'),
+        CalendarPrice.destination == bindparam('destination'),
+        CalendarPrice.scraped_at >= bindparam('cutoff'),
+        CalendarPrice.date >= bindparam('start_date'),
+        CalendarPrice.date <= bindparam('end_date'),
+    )
+    .order_by(CalendarPrice.date)
+)
+
+# Même requête avec l'âge des lignes, pour aligner le TTL du cache mémoire
+_CACHED_PRICE_AGES_STMT = (
+    select(CalendarPrice.date, CalendarPrice.price, CalendarPrice.scraped_at)
+    .where(
+        CalendarPrice.origin == bindparam('origin'),
+        CalendarPrice.destination == bindparam('destination'),
+        CalendarPrice.scraped_at >= bindparam('cutoff'),
+        CalendarPrice.date >= bindparam('start_date'),
+        CalendarPrice.date <= bindparam('end_date'),
+    )
+)
+
+# Variante multi-routes: une seule requête pour N routes
+_CACHED_PRICES_BATCH_STMT = (
+    select(CalendarPrice.origin, CalendarPrice.destination, CalendarPrice.date, CalendarPrice.price)
+    .where(
+        tuple_(CalendarPrice.origin, CalendarPrice.destination).in_(
+            bindparam('routes', expanding=True)
+        ),
+        CalendarPrice.scraped_at >= bindparam('cutoff'),
+        CalendarPrice.date >= bindparam('start_date'),
+        CalendarPrice.date <= bindparam('end_date'),
+    )
+    .order_by(CalendarPrice.origin, CalendarPrice.destination, CalendarPrice.date)
+)
+
+# Variante multi-routes avec l'âge des lignes (lecture stale-while-revalidate)
+_CACHED_PRICE_AGES_BATCH_STMT = (
+    select(
+        CalendarPrice.origin, CalendarPrice.destination,
+        CalendarPrice.date, CalendarPrice.price, CalendarPrice.scraped_at
+    )
+    .where(
+        tuple_(CalendarPrice.origin, CalendarPrice.destination).in_(
+            bindparam('routes', expanding=True)
+        ),
+        CalendarPrice.scraped_at >= bindparam('cutoff'),
+        CalendarPrice.date >= bindparam('start_date'),
+        CalendarPrice.date <= bindparam('end_date'),
+    )
+)
+
+
 class DatabaseManager:
     """Gestionnaire centralisé de la base de données"""
     
@@ -100,85 +163,537 @@ class DatabaseManager:
         Returns:
             Dict {date: prix} ou None
         """
-        max_age = max_age_minutes or settings.cache_ttl_minutes
-        cutoff_time = datetime.now() - timedelta(minutes=max_age)
-
         try:
-            with self.get_session() as session:
-                query = session.query(CalendarPrice).filter(
-                    and_(
-                        CalendarPrice.origin == origin,
-                        CalendarPrice.destination == destination,
-                        CalendarPrice.scraped_at >= cutoff_time
+            if max_age_minutes is None and start_date and end_date and price_cache.enabled:
+                now = datetime.now()
+                rows = [
+                    (date, price)
+                    for date, price, scraped_at in self._load_price_cache(
+                        origin, destination, start_date, end_date
                     )
+                    if ttl_policy.is_fresh(origin, destination, date, scraped_at, now)
+                ]
+            else:
+                rows = self.get_cached_price_rows(
+                    origin, destination, start_date, end_date, max_age_minutes
                 )
 
-                # Filtrer par plage de dates si fournie
-                if start_date:
-                    query = query.filter(CalendarPrice.date >= start_date)
-                if end_date:
-                    query = query.filter(CalendarPrice.date <= end_date)
+            if not rows:
+                logger.debug(f"Pas de cache valide pour {origin}-{destination}")
+                return None
 
-                prices = query.all()
+            result = dict(rows)
+            logger.info(f"✓ Cache hit: {len(result)} prix pour {origin}-{destination}")
+            return result
 
-                if not prices:
-                    logger.debug(f"Pas de cache valide pour {origin}-{destination}")
-                    return None
+        except Exception as e:
+            logger.error(f"Erreur lecture cache: {e}")
+            return None
 
-                result = {p.date: p.price for p in prices}
-                logger.info(f"✓ Cache hit: {len(result)} prix pour {origin}-{destination}")
-                return result
+    def get_cached_price_rows(
+            self,
+            origin: str,
+            destination: str,
+            start_date: Optional[str] = None,
+            end_date: Optional[str] = None,
+            max_age_minutes: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Lecture rapide du cache au niveau Core (pas d'objets ORM)
+
+        Args:
+            origin: Code aéroport départ
+            destination: Code aéroport arrivée
+            start_date: Date début optionnelle pour filtrer
+            end_date: Date fin optionnelle pour filtrer
+            max_age_minutes: Age maximum du cache
+
+        Returns:
+            Liste de tuples (date, prix) triée par date
+        """
+        max_age = max_age_minutes or settings.cache_ttl_minutes
+
+        with self.engine.connect() as conn:
+            result = conn.execute(_CACHED_PRICES_STMT, {
+                'origin': origin,
+                'destination': destination,
+                'cutoff': datetime.now() - timedelta(minutes=max_age),
+                'start_date': start_date or _MIN_DATE,
+                'end_date': end_date or _MAX_DATE,
+            })
+            return [tuple(row) for row in result]
+
+    def lookup_calendar_prices(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str
+    ) -> Optional[Tuple[Dict[str, float], List[str]]]:
+        """
+        Lecture stale-while-revalidate du cache
+
+        Les dates qui ne sont plus fraîches selon la politique TTL mais
+        encore dans cache_stale_ttl_minutes sont servies; leurs mois sont
+        renvoyés pour planifier le rafraîchissement.
+
+        Returns:
+            Tuple ({date: prix}, mois stale) ou None si aucun prix servable
+        """
+        try:
+            rows = self._load_price_cache(origin, destination, start_date, end_date)
+
+            if not rows:
+                logger.debug(f"Pas de cache servable pour {origin}-{destination}")
+                return None
+
+            stale_months = ttl_policy.stale_months(origin, destination, rows)
+
+            result = {date: price for date, price, _ in rows}
+            logger.info(
+                f"✓ Cache hit{' (stale)' if stale_months else ''}: "
+                f"{len(result)} prix pour {origin}-{destination}"
+            )
+            return result, stale_months
 
         except Exception as e:
             logger.error(f"Erreur lecture cache: {e}")
             return None
+
+    def get_cached_price_ages(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str
+    ) -> List[Tuple[str, float, datetime]]:
+        """
+        Lignes en cache avec leur date de scraping (sans toucher au cache mémoire)
+
+        Returns:
+            Liste de tuples (date, prix, scraped_at), jusqu'à l'horizon stale
+        """
+        max_age = max(
+            settings.cache_stale_ttl_minutes,
+            settings.cache_ttl_minutes,
+            ttl_policy.horizon_ttl_minutes
+        )
+
+        try:
+            with self.engine.connect() as conn:
+                return conn.execute(_CACHED_PRICE_AGES_STMT, {
+                    'origin': origin,
+                    'destination': destination,
+                    'cutoff': datetime.now() - timedelta(minutes=max_age),
+                    'start_date': start_date,
+                    'end_date': end_date,
+                }).all()
+        except Exception as e:
+            logger.error(f"Erreur lecture âges du cache: {e}")
+            return []
+
+    def _load_price_cache(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str
+    ) -> List[Tuple[str, float, datetime]]:
+        """
+        Lit les mois complets de la plage en base et alimente le cache mémoire
+
+        Returns:
+            Liste de tuples (date, prix, scraped_at) restreinte à la plage,
+            jusqu'à cache_stale_ttl_minutes d'ancienneté
+        """
+        month_start, month_end = month_bounds(start_date, end_date)
+
+        # Relevée avant la lecture: une sauvegarde concurrente l'incrémente
+        generation = price_cache.generation(origin, destination)
+        with self.engine.connect() as conn:
+            rows = conn.execute(_CACHED_PRICE_AGES_STMT, {
+                'origin': origin,
+                'destination': destination,
+                'cutoff': self._servable_cutoff(),
+                'start_date': month_start,
+                'end_date': month_end,
+            }).all()
+
+        price_cache.put_rows(origin, destination, month_start, month_end, rows, generation=generation)
+
+        return sorted(
+            (date, price, scraped_at) for date, price, scraped_at in rows
+            if start_date <= date <= end_date
+        )
+
+    @staticmethod
+    def _servable_cutoff() -> datetime:
+        """scraped_at minimal d'une ligne encore servable (fraîche ou stale)"""
+        max_age = max(
+            settings.cache_stale_ttl_minutes,
+            settings.cache_ttl_minutes,
+            ttl_policy.horizon_ttl_minutes
+        )
+        return datetime.now() - timedelta(minutes=max_age)
+
+    def lookup_calendar_prices_batch(
+            self,
+            routes: List[Tuple[str, str]],
+            start_date: str,
+            end_date: str
+    ) -> Dict[Tuple[str, str], Tuple[Dict[str, float], List[str], List[str]]]:
+        """
+        Lecture stale-while-revalidate de plusieurs routes
+
+        Par route, même contrat que lookup_calendar_prices (cache mémoire,
+        TTL adaptatif, mois stale), plus les mois de la plage sans aucun
+        prix: une route partiellement en cache est à scraper. Les routes
+        absentes de la mémoire (ou vides, ou stale) sont lues en une seule
+        requête, qui alimente le cache mémoire.
+
+        Returns:
+            Dict {(origin, destination): (prix, mois stale, mois manquants)}
+            (routes sans aucun prix servable absentes)
+        """
+        found: Dict[Tuple[str, str], Tuple[Dict[str, float], List[str]]] = {}
+        to_read = []
+        for route in dict.fromkeys(routes):
+            cached = price_cache.lookup(route[0], route[1], start_date, end_date, allow_stale=True)
+            # Même règle que l'endpoint calendrier: base relue si vide ou stale
+            if cached is None or not cached[0] or cached[1]:
+                to_read.append(route)
+            else:
+                found[route] = cached
+
+        if to_read:
+            month_start, month_end = month_bounds(start_date, end_date)
+            generations = {route: price_cache.generation(*route) for route in to_read}
+            rows_by_route: Dict[Tuple[str, str], List[Tuple[str, float, datetime]]] = {r: [] for r in to_read}
+
+            try:
+                with self.engine.connect() as conn:
+                    for origin, destination, date, price, scraped_at in conn.execute(_CACHED_PRICE_AGES_BATCH_STMT, {
+                        'routes': to_read,
+                        'cutoff': self._servable_cutoff(),
+                        'start_date': month_start,
+                        'end_date': month_end,
+                    }):
+                        rows_by_route[(origin, destination)].append((date, price, scraped_at))
+            except Exception as e:
+                logger.error(f"Erreur lecture cache batch: {e}")
+                rows_by_route = {}
+
+            for route, rows in rows_by_route.items():
+                price_cache.put_rows(route[0], route[1], month_start, month_end, rows, generation=generations[route])
+                rows = [row for row in rows if start_date <= row[0] <= end_date]
+                if rows:
+                    found[route] = (
+                        {date: price for date, price, _ in rows},
+                        ttl_policy.stale_months(route[0], route[1], rows),
+                    )
+
+        months = month_keys(start_date, end_date)
+        result = {}
+        for route, (prices, stale_months) in found.items():
+            covered = {date[:7] for date in prices}
+            result[route] = (prices, stale_months, [m for m in months if m not in covered])
+
+        logger.info(f"✓ Cache batch: {len(result)}/{len(set(routes))} routes en cache ({len(to_read)} lues en base)")
+        return result
+
+    def get_cached_calendar_prices_batch(
+            self,
+            routes: List[Tuple[str, str]],
+            start_date: Optional[str] = None,
+            end_date: Optional[str] = None,
+            max_age_minutes: Optional[int] = None
+    ) -> Dict[Tuple[str, str], Dict[str, float]]:
+        """
+        Récupère le cache de plusieurs routes en une seule requête
+
+        Args:
+            routes: Liste de tuples (origin, destination)
+            start_date: Date début optionnelle pour filtrer
+            end_date: Date fin optionnelle pour filtrer
+            max_age_minutes: Age maximum du cache
+
+        Returns:
+            Dict {(origin, destination): {date: prix}} (routes sans cache absentes)
+        """
+        if not routes:
+            return {}
+
+        max_age = max_age_minutes or settings.cache_ttl_minutes
+        result: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(_CACHED_PRICES_BATCH_STMT, {
+                    'routes': list(dict.fromkeys(routes)),
+                    'cutoff': datetime.now() - timedelta(minutes=max_age),
+                    'start_date': start_date or _MIN_DATE,
+                    'end_date': end_date or _MAX_DATE,
+                })
+                for origin, destination, date, price in rows:
+                    result.setdefault((origin, destination), {})[date] = price
+
+            logger.info(f"✓ Cache batch: {len(result)}/{len(routes)} routes en cache")
+            return result
+
+        except Exception as e:
+            logger.error(f"Erreur lecture cache batch: {e}")
+            return {}
     
     def save_calendar_prices(
         self, 
         origin: str, 
         destination: str, 
-        prices: Dict[str, float]
+        prices: Dict[str, float],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        prune_missing: bool = False
     ) -> bool:
         """
-        Sauvegarde les prix du calendrier
+        Sauvegarde les prix du calendrier (upsert groupé sur uix_route_date)
+
+        Seules les dates scrapées sont écrites: les mois déjà en cache en
+        dehors de la plage restent valides.
         
         Args:
             origin: Code aéroport départ
             destination: Code aéroport arrivée
             prices: Dict {date: prix}
+            start_date: Début de la plage scrapée (défaut: plus petite date)
+            end_date: Fin de la plage scrapée (défaut: plus grande date)
+            prune_missing: Supprimer les dates de la plage absentes de prices
             
         Returns:
             True si succès
         """
+        now = datetime.now()
+        rows = [
+            {
+                'origin': origin,
+                'destination': destination,
+                'date': date,
+                'price': price,
+                'scraped_at': now,
+                'updated_at': now,
+                'raw_data': None,
+            }
+            for date, price in prices.items()
+        ]
+
         try:
             with self.get_session() as session:
-                # Supprimer les anciens prix pour cette route
-                session.query(CalendarPrice).filter(
-                    and_(
-                        CalendarPrice.origin == origin,
-                        CalendarPrice.destination == destination
-                    )
-                ).delete()
-                
-                # Insérer les nouveaux prix
-                for date, price in prices.items():
-                    calendar_price = CalendarPrice(
-                        origin=origin,
-                        destination=destination,
-                        date=date,
-                        price=price,
-                        scraped_at=datetime.now()
-                    )
-                    session.add(calendar_price)
-                
+                if rows:
+                    # Volatilité de la route: anciens prix vs nouveaux, avant écrasement
+                    previous = session.execute(_CACHED_PRICE_AGES_STMT, {
+                        'origin': origin,
+                        'destination': destination,
+                        'cutoff': datetime.min,
+                        'start_date': min(prices),
+                        'end_date': max(prices),
+                    }).all()
+                    ttl_policy.observe(origin, destination, previous, prices, now)
+
+                    upsert = self._calendar_upsert_statement()
+                    if upsert is not None:
+                        session.execute(upsert, rows)
+                    else:
+                        # Dialecte sans ON CONFLICT: delete ciblé + insert groupé
+                        session.query(CalendarPrice).filter(
+                            and_(
+                                CalendarPrice.origin == origin,
+                                CalendarPrice.destination == destination,
+                                CalendarPrice.date.in_(list(prices))
+                            )
+                        ).delete(synchronize_session=False)
+                        session.execute(insert(CalendarPrice), rows)
+
+                range_start = start_date or (min(prices) if prices else None)
+                range_end = end_date or (max(prices) if prices else None)
+
+                if prune_missing and range_start and range_end:
+                    # Les lignes non rafraîchies par cet upsert ont disparu du calendrier
+                    deleted = session.query(CalendarPrice).filter(
+                        and_(
+                            CalendarPrice.origin == origin,
+                            CalendarPrice.destination == destination,
+                            CalendarPrice.date >= range_start,
+                            CalendarPrice.date <= range_end,
+                            CalendarPrice.scraped_at < now
+                        )
+                    ).delete(synchronize_session=False)
+                    if deleted:
+                        logger.info(f"✓ {deleted} dates disparues supprimées pour {origin}-{destination}")
+
                 session.commit()
-                logger.info(f"✓ {len(prices)} prix sauvegardés pour {origin}-{destination}")
-                return True
+
+            # Write-through: les blocs mémoire des mois touchés sont périmés
+            touched = list(prices)
+            if prune_missing and range_start and range_end:
+                touched.extend(month_keys(range_start, range_end))
+            price_cache.invalidate(origin, destination, touched)
+
+            logger.info(f"✓ {len(prices)} prix sauvegardés pour {origin}-{destination}")
+            return True
                 
         except Exception as e:
             logger.error(f"Erreur sauvegarde prix: {e}")
             return False
+
+    def _calendar_upsert_statement(self):
+        """
+        Construit l'INSERT ... ON CONFLICT (uix_route_date) pour le dialecte courant
+
+        Returns:
+            Statement exécutable en executemany, ou None si non supporté
+        """
+        dialect = self.engine.dialect.name
+
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        elif dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            return None
+
+        stmt = dialect_insert(CalendarPrice)
+        return stmt.on_conflict_do_update(
+            index_elements=['origin', 'destination', 'date'],
+            set_={
+                'price': stmt.excluded.price,
+                'scraped_at': stmt.excluded.scraped_at,
+                'updated_at': stmt.excluded.updated_at,
+                # Sinon la ligne mise à jour garde le payload brut de l'ancien prix
+                'raw_data': stmt.excluded.raw_data,
+            }
+        )
     
+    # ==================== ROUND TRIP ====================
+
+    def get_cached_round_trip_grid(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            trip_lengths: List[int],
+            max_age_minutes: Optional[int] = None
+    ) -> Optional[Dict[int, Dict[str, float]]]:
+        """
+        Matrice aller-retour depuis le cache
+
+        Returns:
+            Dict {durée: {départ: prix}}, ou None si un (durée, mois) demandé
+            manque ou a dépassé le TTL
+        """
+        max_age = max_age_minutes or settings.cache_ttl_minutes
+        cutoff = datetime.now() - timedelta(minutes=max_age)
+        months = month_keys(start_date, end_date)
+
+        try:
+            with self.get_session() as session:
+                rows = session.query(
+                    RoundTripPrice.trip_length, RoundTripPrice.month, RoundTripPrice.prices
+                ).filter(
+                    RoundTripPrice.origin == origin,
+                    RoundTripPrice.destination == destination,
+                    RoundTripPrice.trip_length.in_(trip_lengths),
+                    RoundTripPrice.month.in_(months),
+                    RoundTripPrice.scraped_at >= cutoff,
+                ).all()
+
+            if len(rows) < len(months) * len(set(trip_lengths)):
+                return None
+
+            grid = {length: {} for length in trip_lengths}
+            for length, month, prices in rows:
+                for day, price in enumerate(prices, 1):
+                    departure = f"{month}-{day:02d}"
+                    if price is not None and start_date <= departure <= end_date:
+                        grid[length][departure] = price
+
+            logger.info(f"✓ Cache hit aller-retour: {len(rows)} blocs pour {origin}-{destination}")
+            return grid
+
+        except Exception as e:
+            logger.error(f"Erreur lecture cache aller-retour: {e}")
+            return None
+
+    def save_round_trip_grid(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            grid: Dict[int, Dict[str, float]]
+    ) -> bool:
+        """
+        Sauvegarde une matrice aller-retour (une ligne par durée et mois)
+
+        Tous les (durée, mois) de la plage sont écrits, même sans prix, pour
+        que le cache sache qu'ils ont été scrapés. Les jours hors plage d'un
+        bloc encore frais sont conservés.
+
+        Args:
+            grid: Dict {durée: {date de départ: prix}}
+
+        Returns:
+            True si succès
+        """
+        now = datetime.now()
+        cutoff = now - timedelta(minutes=settings.cache_ttl_minutes)
+        months = month_keys(start_date, end_date)
+
+        try:
+            with self.get_session() as session:
+                existing = {
+                    (row.trip_length, row.month): row
+                    for row in session.query(RoundTripPrice).filter(
+                        RoundTripPrice.origin == origin,
+                        RoundTripPrice.destination == destination,
+                        RoundTripPrice.trip_length.in_(list(grid)),
+                        RoundTripPrice.month.in_(months),
+                    )
+                }
+
+                for length, prices in grid.items():
+                    for month in months:
+                        days = int(month_last_day(month)[8:])
+                        row = existing.get((length, month))
+                        if row is not None and row.scraped_at >= cutoff:
+                            values = (list(row.prices) + [None] * days)[:days]
+                        else:
+                            values = [None] * days
+
+                        for day in range(1, days + 1):
+                            departure = f"{month}-{day:02d}"
+                            if start_date <= departure <= end_date:
+                                values[day - 1] = prices.get(departure)
+
+                        if row is None:
+                            session.add(RoundTripPrice(
+                                origin=origin, destination=destination, trip_length=length,
+                                month=month, prices=values, scraped_at=now,
+                            ))
+                        else:
+                            row.prices = values
+                            row.scraped_at = now
+
+                session.commit()
+
+            logger.info(
+                f"✓ {sum(len(p) for p in grid.values())} prix aller-retour sauvegardés "
+                f"pour {origin}-{destination} ({len(grid)} durées)"
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"Erreur sauvegarde aller-retour: {e}")
+            return False
+
     # ==================== FLIGHTS ====================
     
     def get_cached_flights(
@@ -204,10 +719,11 @@ class DatabaseManager:
                     )
                 )
                 
-                if return_date:
-                    query = query.filter(Flight.return_date == return_date)
+                # Aller simple: ne pas mélanger avec les allers-retours du même départ
+                query = query.filter(Flight.return_date == return_date) if return_date \
+                    else query.filter(Flight.return_date.is_(None))
                 
-                flights = query.all()
+                flights = query.order_by(Flight.flight_index).all()
                 
                 if not flights:
                     return None
@@ -240,8 +756,9 @@ class DatabaseManager:
                     )
                 )
                 
-                if return_date:
-                    query = query.filter(Flight.return_date == return_date)
+                # Aller simple: ne pas mélanger avec les allers-retours du même départ
+                query = query.filter(Flight.return_date == return_date) if return_date \
+                    else query.filter(Flight.return_date.is_(None))
                 
                 query.delete()
                 
@@ -308,6 +825,355 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Erreur log scrape: {e}")
     
+    def get_scrape_history(self, days: int = 30, scrape_type: str = "calendar") -> List[Dict]:
+        """
+        Historique des scrapings (ordre chronologique)
+
+        Args:
+            days: Profondeur de l'historique
+            scrape_type: Type de scraping ('calendar' ou 'flights')
+
+        Returns:
+            Liste de dicts (origin, destination, success, started_at, ...)
+        """
+        cutoff = datetime.now() - timedelta(days=days)
+
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    select(
+                        ScrapeLog.origin,
+                        ScrapeLog.destination,
+                        ScrapeLog.success,
+                        ScrapeLog.results_count,
+                        ScrapeLog.started_at,
+                        ScrapeLog.duration_seconds,
+                        ScrapeLog.params,
+                    )
+                    .where(
+                        ScrapeLog.scrape_type == scrape_type,
+                        ScrapeLog.started_at >= cutoff,
+                    )
+                    .order_by(ScrapeLog.started_at)
+                )
+                return [dict(row._mapping) for row in rows]
+
+        except Exception as e:
+            logger.error(f"Erreur lecture historique scrapes: {e}")
+            return []
+    
+    def get_scrape_logs_since(
+        self,
+        last_id: int = 0,
+        since: Optional[datetime] = None,
+        scrape_type: str = "calendar",
+        limit: int = 5000
+    ) -> List[Dict]:
+        """
+        Logs de scraping postérieurs à un id (lecture incrémentale)
+
+        Args:
+            last_id: Dernier id déjà lu
+            since: Ignorer les logs plus anciens
+            scrape_type: Type de scraping ('calendar' ou 'flights')
+            limit: Nombre maximal de logs renvoyés
+
+        Returns:
+            Liste de dicts (id, origin, destination, success, started_at, ...) par id croissant
+        """
+        conditions = [ScrapeLog.scrape_type == scrape_type, ScrapeLog.id > last_id]
+        if since is not None:
+            conditions.append(ScrapeLog.started_at >= since)
+
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    select(
+                        ScrapeLog.id,
+                        ScrapeLog.origin,
+                        ScrapeLog.destination,
+                        ScrapeLog.success,
+                        ScrapeLog.results_count,
+                        ScrapeLog.started_at,
+                        ScrapeLog.duration_seconds,
+                        ScrapeLog.params,
+                    )
+                    .where(*conditions)
+                    .order_by(ScrapeLog.id)
+                    .limit(limit)
+                )
+                return [dict(row._mapping) for row in rows]
+
+        except Exception as e:
+            logger.error(f"Erreur lecture logs scrapes: {e}")
+            return []
+
+    # ==================== JOB QUEUE ====================
+
+    def enqueue_scrape_job(
+        self,
+        origin: str,
+        destination: str,
+        start_date: str,
+        end_date: str,
+        trigger: str = "interactive",
+        priority: int = 0,
+        deadline: Optional[datetime] = None,
+        max_attempts: int = 2,
+        scrape_type: str = "calendar"
+    ) -> str:
+        """
+        Ajoute un job à la file durable
+
+        Returns:
+            Id du job
+        """
+        job_id = str(uuid.uuid4())
+        with self.engine.begin() as conn:
+            conn.execute(insert(ScrapeJobRecord).values(
+                id=job_id,
+                scrape_type=scrape_type,
+                origin=origin,
+                destination=destination,
+                start_date=start_date,
+                end_date=end_date,
+                trigger=trigger,
+                priority=priority,
+                deadline=deadline or datetime.now(),
+                status='queued',
+                attempts=0,
+                max_attempts=max_attempts,
+                created_at=datetime.now(),
+            ))
+        return job_id
+
+    def lease_scrape_job(self, worker_id: str, lease_seconds: float) -> Optional[Dict]:
+        """
+        Prend le prochain job disponible (priorité, échéance, ancienneté)
+
+        Un seul UPDATE conditionnel: sur PostgreSQL le job candidat est
+        verrouillé avec FOR UPDATE SKIP LOCKED, sur SQLite les écritures
+        sont sérialisées et la condition rejouée dans l'UPDATE sert de
+        compare-and-set. Les baux expirés (worker mort) redeviennent
+        disponibles jusqu'à max_attempts tentatives.
+
+        Args:
+            worker_id: Identifiant du worker (hôte, pid, thread)
+            lease_seconds: Durée du bail (visibility timeout)
+
+        Returns:
+            Dict du job (avec 'lease_token'), ou None si la file est vide
+        """
+        table = ScrapeJobRecord.__table__
+        now = datetime.now()
+        token = f"{worker_id}:{uuid.uuid4().hex[:8]}"
+
+        available = or_(
+            table.c.status == 'queued',
+            and_(table.c.status == 'leased', table.c.lease_expires_at < now),
+        )
+        candidate = (
+            select(table.c.id)
+            .where(available)
+            .order_by(table.c.priority, table.c.deadline, table.c.created_at)
+            .limit(1)
+        )
+        if self.engine.dialect.name == 'postgresql':
+            candidate = candidate.with_for_update(skip_locked=True)
+
+        with self.engine.begin() as conn:
+            # Baux expirés sans tentative restante: échec définitif
+            conn.execute(
+                update(table)
+                .where(
+                    table.c.status == 'leased',
+                    table.c.lease_expires_at < now,
+                    table.c.attempts >= table.c.max_attempts,
+                )
+                .values(
+                    status='failed',
+                    finished_at=now,
+                    error_type='LeaseExpired',
+                    error_message='Bail expiré (worker perdu)',
+                )
+            )
+
+            leased = conn.execute(
+                update(table)
+                .where(table.c.id == candidate.scalar_subquery(), available)
+                .values(
+                    status='leased',
+                    lease_owner=token,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds),
+                    attempts=table.c.attempts + 1,
+                    started_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if leased.rowcount != 1:
+                return None
+
+            row = conn.execute(select(table).where(table.c.lease_owner == token)).first()
+
+        job = dict(row._mapping)
+        job['lease_token'] = token
+        return job
+
+    def extend_scrape_job_lease(self, job_id: str, lease_token: str, lease_seconds: float) -> bool:
+        """
+        Prolonge le bail d'un job en cours
+
+        Returns:
+            False si le bail a été perdu (expiré et repris par un autre worker)
+        """
+        table = ScrapeJobRecord.__table__
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(table)
+                .where(table.c.id == job_id, table.c.lease_owner == lease_token, table.c.status == 'leased')
+                .values(lease_expires_at=datetime.now() + timedelta(seconds=lease_seconds))
+            )
+        return result.rowcount == 1
+
+    def finish_scrape_job(
+        self,
+        job_id: str,
+        lease_token: str,
+        status: str,
+        result: Optional[Dict] = None,
+        error_type: Optional[str] = None,
+        error_message: Optional[str] = None
+    ) -> bool:
+        """
+        Termine un job détenu par ce bail
+
+        Args:
+            status: done, failed, ou queued (nouvelle tentative)
+
+        Returns:
+            False si le bail a été perdu entre-temps
+        """
+        table = ScrapeJobRecord.__table__
+        values = {
+            'status': status,
+            'result': result,
+            'error_type': error_type,
+            'error_message': (error_message or '')[:500] or None,
+            'finished_at': None if status == 'queued' else datetime.now(),
+            'lease_owner': None,
+            'lease_expires_at': None,
+        }
+        with self.engine.begin() as conn:
+            updated = conn.execute(
+                update(table)
+                .where(table.c.id == job_id, table.c.lease_owner == lease_token, table.c.status == 'leased')
+                .values(**values)
+            )
+        return updated.rowcount == 1
+
+    def cancel_scrape_job(self, job_id: str) -> bool:
+        """Annule un job encore en file (le client a abandonné)"""
+        table = ScrapeJobRecord.__table__
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(table)
+                .where(table.c.id == job_id, table.c.status == 'queued')
+                .values(status='cancelled', finished_at=datetime.now())
+            )
+        return result.rowcount == 1
+
+    def get_scrape_job(self, job_id: str) -> Optional[Dict]:
+        """État courant d'un job de la file"""
+        table = ScrapeJobRecord.__table__
+        with self.engine.connect() as conn:
+            row = conn.execute(select(table).where(table.c.id == job_id)).first()
+        return dict(row._mapping) if row else None
+
+    def get_active_scrape_jobs(self, limit: int = 100) -> List[Dict]:
+        """Jobs en cours (bail) puis en file, dans l'ordre de prise des workers"""
+        table = ScrapeJobRecord.__table__
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    select(table)
+                    .where(table.c.status.in_(('leased', 'queued')))
+                    .order_by(desc(table.c.status == 'leased'), table.c.priority, table.c.deadline, table.c.created_at)
+                    .limit(limit)
+                ).all()
+            return [dict(row._mapping) for row in rows]
+        except Exception as e:
+            logger.error(f"Erreur lecture jobs actifs: {e}")
+            return []
+
+    def get_job_queue_stats(self) -> Dict:
+        """Nombre de jobs par statut et plus vieux job en attente"""
+        try:
+            with self.engine.connect() as conn:
+                counts = dict(conn.execute(
+                    select(ScrapeJobRecord.status, func.count()).group_by(ScrapeJobRecord.status)
+                ).all())
+                oldest = conn.execute(
+                    select(func.min(ScrapeJobRecord.created_at)).where(ScrapeJobRecord.status == 'queued')
+                ).scalar()
+            return {
+                'by_status': counts,
+                'oldest_queued_seconds': round((datetime.now() - oldest).total_seconds(), 1) if oldest else None,
+            }
+        except Exception as e:
+            logger.error(f"Erreur stats file de jobs: {e}")
+            return {}
+
+    # ==================== SLOTS PARTAGÉS ====================
+
+    def claim_scraper_slot(self, slot_id: str, owner: str, priority: str, ttl_seconds: float) -> bool:
+        """
+        Déclare un navigateur en cours (visible des autres process)
+
+        Les slots expirés (process mort) sont purgés au passage.
+
+        Returns:
+            False si la déclaration a échoué (le scraping continue)
+        """
+        table = ScraperSlotRecord.__table__
+        now = datetime.now()
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(table.delete().where(table.c.expires_at < now))
+                conn.execute(insert(table).values(
+                    id=slot_id,
+                    owner=owner,
+                    priority=priority,
+                    started_at=now,
+                    expires_at=now + timedelta(seconds=ttl_seconds),
+                ))
+            return True
+        except Exception as e:
+            logger.warning(f"Slot partagé {slot_id} non déclaré: {e}")
+            return False
+
+    def release_scraper_slot(self, slot_id: str):
+        """Libère un slot déclaré par claim_scraper_slot"""
+        table = ScraperSlotRecord.__table__
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(table.delete().where(table.c.id == slot_id))
+        except Exception as e:
+            logger.warning(f"Slot partagé {slot_id} non libéré: {e}")
+
+    def count_scraper_slots(self) -> Dict[str, int]:
+        """Navigateurs en cours par classe de priorité, tous process confondus"""
+        table = ScraperSlotRecord.__table__
+        try:
+            with self.engine.connect() as conn:
+                return dict(conn.execute(
+                    select(table.c.priority, func.count())
+                    .where(table.c.expires_at >= datetime.now())
+                    .group_by(table.c.priority)
+                ).all())
+        except Exception as e:
+            logger.error(f"Erreur lecture slots partagés: {e}")
+            return {}
+
     # ==================== STATS ====================
     
     def get_cache_stats(self) -> Dict:
@@ -361,10 +1227,18 @@ class DatabaseManager:
                 deleted_flights = session.query(Flight).filter(
                     Flight.scraped_at < cutoff
                 ).delete()
+
+                deleted_jobs = session.query(ScrapeJobRecord).filter(
+                    ScrapeJobRecord.status.in_(('done', 'failed', 'cancelled')),
+                    ScrapeJobRecord.created_at < cutoff
+                ).delete(synchronize_session=False)
                 
                 session.commit()
                 
-                logger.info(f"✓ Cache nettoyé: {deleted_prices} prix, {deleted_flights} vols supprimés")
+                logger.info(
+                    f"✓ Cache nettoyé: {deleted_prices} prix, {deleted_flights} vols, "
+                    f"{deleted_jobs} jobs terminés supprimés"
+                )
                 
         except Exception as e:
             logger.error(f"Erreur nettoyage cache: {e}")
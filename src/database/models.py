@@ -79,7 +79,7 @@ class Flight(Base):
     
     __table_args__ = (
         Index('idx_flight_route', 'origin', 'destination', 'departure_date'),
-        Index('idx_scraped_at', 'scraped_at'),
+        Index('idx_flight_scraped_at', 'scraped_at'),
     )
     
     def __repr__(self):
@@ -100,10 +100,40 @@ class Flight(Base):
             'stops': self.stops,
             'price': self.price,
             'currency': self.currency,
+            'index': self.flight_index,
+            'raw_text': self.raw_text,
             'scraped_at': self.scraped_at.isoformat() if self.scraped_at else None,
         }
 
 
+class RoundTripPrice(Base):
+    """
+    Prix aller-retour par mois de départ et durée de séjour
+
+    Une ligne par (route, durée, mois): prices[i] est le prix d'un départ
+    le (i+1) du mois, None si absent du calendrier.
+    """
+    __tablename__ = 'round_trip_prices'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    origin = Column(String(3), nullable=False)
+    destination = Column(String(3), nullable=False)
+    trip_length = Column(Integer, nullable=False)  # jours entre aller et retour
+    month = Column(String(7), nullable=False)  # YYYY-MM du départ
+    prices = Column(JSON, nullable=False)
+    currency = Column(String(3), default='EUR')
+
+    scraped_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('origin', 'destination', 'trip_length', 'month', name='uix_round_trip_month'),
+        Index('idx_round_trip_route', 'origin', 'destination', 'month'),
+    )
+
+    def __repr__(self):
+        return f"<RoundTripPrice(route={self.origin}-{self.destination}, {self.month}, {self.trip_length}j)>"
+
+
 class ScrapeLog(Base):
     """Log des scraping effectués"""
     __tablename__ = 'scrape_logs'
@@ -133,4 +163,62 @@ class ScrapeLog(Base):
     
     def __repr__(self):
         status = "✓" if self.success else "✗"
-        return f"<ScrapeLog({status} {self.scrape_type} {self.origin}-{self.destination})>"
\ No newline at end of file
+        return f"<ScrapeLog({status} {self.scrape_type} {self.origin}-{self.destination})>"
+
+class ScrapeJobRecord(Base):
+    """File durable des jobs de scraping (workers multi-nœuds)"""
+    __tablename__ = 'scrape_jobs'
+
+    id = Column(String(36), primary_key=True)
+    scrape_type = Column(String(20), nullable=False, default='calendar')
+    origin = Column(String(3), nullable=False)
+    destination = Column(String(3), nullable=False)
+    start_date = Column(String(10), nullable=False)
+    end_date = Column(String(10), nullable=False)
+    trigger = Column(String(20), nullable=False, default='interactive')
+
+    # Ordonnancement: rang de la classe de priorité puis échéance
+    priority = Column(Integer, nullable=False, default=0)
+    deadline = Column(DateTime, nullable=False)
+
+    # queued -> leased -> done / failed / cancelled
+    status = Column(String(10), nullable=False, default='queued')
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=2)
+    lease_owner = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.now, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    result = Column(JSON, nullable=True)
+    error_type = Column(String(50), nullable=True)
+    error_message = Column(String(500), nullable=True)
+
+    __table_args__ = (
+        Index('idx_job_pick', 'status', 'priority', 'deadline'),
+        Index('idx_job_lease', 'status', 'lease_expires_at'),
+    )
+
+    def __repr__(self):
+        return f"<ScrapeJobRecord({self.id} {self.status} {self.origin}-{self.destination})>"
+
+
+class ScraperSlotRecord(Base):
+    """Navigateurs en cours, tous process confondus (API, sidecar, workers de file)"""
+    __tablename__ = 'scraper_slots'
+
+    id = Column(String(36), primary_key=True)
+    owner = Column(String(100), nullable=False)  # hôte-pid du ScraperPool
+    priority = Column(String(20), nullable=False, default='interactive')
+    started_at = Column(DateTime, default=datetime.now, nullable=False)
+    # Un process mort sans libérer ses slots ne les bloque que jusqu'ici
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('idx_slot_expires', 'expires_at'),
+    )
+
+    def __repr__(self):
+        return f"<ScraperSlotRecord({self.id} {self.priority} {self.owner})>"
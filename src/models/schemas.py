@@ -32,6 +32,7 @@ class PricePoint(BaseModel):
     """Un point de prix pour une date donnée"""
     date: str = Field(..., description="Date au format ISO")
     price: float = Field(..., description="Prix minimum en EUR")
+    route: Optional[str] = Field(None, description="Route gagnante (requête métropole, ex: ORY-JFK)")
 
 
 class FlightDetails(BaseModel):
@@ -84,6 +85,20 @@ class CalendarPricesRequest(BaseModel):
         return v
 
 
+class BatchRoute(BaseModel):
+    """Une route d'une requête batch"""
+    origin: str = Field(..., description="Code IATA aéroport de départ", example="CDG")
+    destination: str = Field(..., description="Code IATA aéroport d'arrivée", example="JFK")
+
+
+class BatchCalendarPricesRequest(BaseModel):
+    """Requête batch: même plage de dates pour toutes les routes"""
+    routes: List[BatchRoute] = Field(..., min_items=1, description="Routes à scraper")
+    start_date: str = Field(..., description="Date de début (YYYY-MM-DD)", example="2025-11-01")
+    end_date: str = Field(..., description="Date de fin (YYYY-MM-DD)", example="2025-12-31")
+    force_refresh: bool = Field(default=False, description="Forcer le re-scraping")
+
+
 class CalendarPricesResponse(BaseModel):
     """Réponse avec les prix du calendrier"""
     origin: str
@@ -98,6 +113,10 @@ class CalendarPricesResponse(BaseModel):
     best_dates: List[PricePoint] = Field(default=[], description="Top 5 meilleures dates")
     scraped_at: datetime = Field(default_factory=datetime.now)
     from_cache: bool = Field(default=False)
+    stale: bool = Field(default=False, description="Prix au-delà du TTL, rafraîchissement en cours")
+    routes: Optional[Dict[str, str]] = Field(
+        None, description="Requête métropole: route du prix minimum par date {date: ORY-JFK}"
+    )
 
     @classmethod
     def from_prices_dict(cls,
@@ -106,8 +125,10 @@ class CalendarPricesResponse(BaseModel):
                          start_date: str,
                          end_date: str,
                          prices: Dict[str, float],
-                         from_cache: bool = False):
-        """Factory pour créer une réponse"""
+                         from_cache: bool = False,
+                         stale: bool = False,
+                         routes: Optional[Dict[str, str]] = None):
+        """Factory pour créer une réponse (routes: route gagnante par date, requête métropole)"""
         if not prices:
             return cls(
                 origin=origin,
@@ -116,7 +137,9 @@ class CalendarPricesResponse(BaseModel):
                 end_date=end_date,
                 prices={},
                 total_dates=0,
-                from_cache=from_cache
+                from_cache=from_cache,
+                stale=stale,
+                routes=routes
             )
 
         price_values = list(prices.values())
@@ -133,9 +156,79 @@ class CalendarPricesResponse(BaseModel):
             max_price=max(price_values),
             avg_price=sum(price_values) / len(price_values),
             best_dates=[
-                PricePoint(date=date, price=price)
+                PricePoint(date=date, price=price, route=routes.get(date) if routes else None)
                 for date, price in sorted_prices[:5]
             ],
+            from_cache=from_cache,
+            stale=stale,
+            routes=routes
+        )
+
+
+class RoundTripPoint(BaseModel):
+    """Un aller-retour (départ, durée) et son prix"""
+    departure_date: str
+    return_date: str
+    trip_length: int = Field(..., description="Durée du séjour en jours")
+    price: float = Field(..., description="Prix aller-retour en EUR")
+
+
+class RoundTripPricesResponse(BaseModel):
+    """
+    Grille aller-retour départ × durée
+
+    matrix[i][j]: prix pour la durée trip_lengths[i] et le départ
+    departure_dates[j] (None si absent du calendrier)
+    """
+    origin: str
+    destination: str
+    start_date: str
+    end_date: str
+    trip_lengths: List[int]
+    departure_dates: List[str]
+    matrix: List[List[Optional[float]]]
+    total_prices: int = Field(..., description="Nombre de couples (départ, durée) avec prix")
+    min_price: Optional[float] = None
+    best_trips: List[RoundTripPoint] = Field(default=[], description="Top 5 meilleurs allers-retours")
+    scraped_at: datetime = Field(default_factory=datetime.now)
+    from_cache: bool = Field(default=False)
+
+    @classmethod
+    def from_grid(cls,
+                  origin: str,
+                  destination: str,
+                  start_date: str,
+                  end_date: str,
+                  grid: Dict[int, Dict[str, float]],
+                  from_cache: bool = False):
+        """Factory depuis {durée: {départ: prix}}"""
+        from datetime import timedelta
+
+        trip_lengths = sorted(grid)
+        departure_dates = sorted({d for prices in grid.values() for d in prices})
+        points = sorted(
+            ((price, departure, length) for length, prices in grid.items() for departure, price in prices.items())
+        )
+
+        return cls(
+            origin=origin,
+            destination=destination,
+            start_date=start_date,
+            end_date=end_date,
+            trip_lengths=trip_lengths,
+            departure_dates=departure_dates,
+            matrix=[[grid[length].get(d) for d in departure_dates] for length in trip_lengths],
+            total_prices=len(points),
+            min_price=points[0][0] if points else None,
+            best_trips=[
+                RoundTripPoint(
+                    departure_date=departure,
+                    return_date=(date.fromisoformat(departure) + timedelta(days=length)).isoformat(),
+                    trip_length=length,
+                    price=price
+                )
+                for price, departure, length in points[:5]
+            ],
             from_cache=from_cache
         )
 
@@ -154,6 +247,36 @@ class FlightsResponse(BaseModel):
     scraped_at: datetime = Field(default_factory=datetime.now)
     from_cache: bool = Field(default=False)
 
+    @classmethod
+    def from_flights(cls, request: FlightsRequest, flights: List[Dict], from_cache: bool = False):
+        """Factory depuis les dicts de save_flights / get_cached_flights"""
+        details = [
+            FlightDetails(
+                index=flight.get('index') if flight.get('index') is not None else i,
+                airline=flight.get('airline'),
+                departure_time=flight.get('departure_time'),
+                arrival_time=flight.get('arrival_time'),
+                duration=flight.get('duration'),
+                stops=flight.get('stops'),
+                price=flight.get('price'),
+                raw_text=flight.get('raw_text'),
+            )
+            for i, flight in enumerate(flights)
+        ]
+        prices = [f.price for f in details if f.price is not None]
+        return cls(
+            origin=request.origin,
+            destination=request.destination,
+            departure_date=request.departure_date,
+            return_date=request.return_date,
+            passengers=request.passengers,
+            flights=details,
+            total_flights=len(details),
+            min_price=min(prices) if prices else None,
+            max_price=max(prices) if prices else None,
+            from_cache=from_cache
+        )
+
 
 class HealthResponse(BaseModel):
     """Réponse pour le healthcheck"""
@@ -183,3 +306,6 @@ class CacheStatsResponse(BaseModel):
     cache_info: CacheInfo
     recent_scrapes: List[Dict] = Field(default=[])
     popular_routes: List[Dict] = Field(default=[])
+    memory_cache: Dict = Field(default={}, description="Compteurs du cache mémoire")
+    stale_refresh: Dict = Field(default={}, description="File de rafraîchissement stale")
+    prewarm: Dict = Field(default={}, description="Planificateur de pré-chauffage")
@@ -0,0 +1,399 @@
+"""
+Extraction du calendrier des prix commune aux moteurs Selenium et Playwright
+
+Le DOM est lu en une seule exécution JavaScript par étape (mois chargés,
+cellules d'un mois) au lieu d'un aller-retour WebDriver par élément; le
+moteur ne fait qu'exécuter les scripts, l'interprétation (prix, jours,
+navigation vers le mois cible) est faite ici en Python.
+
+Les scripts sont écrits au format execute_script de Selenium (corps de
+fonction, `arguments[i]`, `return`); page_function() les adapte à
+page.evaluate de Playwright.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+GOOGLE_FLIGHTS_URL = "https://www.google.com/travel/flights"
+
+# Variable d'environnement qui passe le worker en grille aller-retour ("3,7,14")
+TRIP_LENGTHS_ENV_VAR = "TRAVLIAQ_TRIP_LENGTHS"
+
+# Variable d'environnement qui demande au worker la liste des vols ("départ[,retour]")
+FLIGHT_DATES_ENV_VAR = "TRAVLIAQ_FLIGHT_DATES"
+
+# Variable d'environnement: plusieurs destinations dans une même session ("JFK,LAX")
+DESTINATIONS_ENV_VAR = "TRAVLIAQ_DESTINATIONS"
+
+# Navigation vers un mois cible
+NAV_FOUND = "found"
+NAV_PREV = "prev"
+NAV_NEXT = "next"
+NAV_SCROLL = "scroll"
+NAV_RETRY = "retry"
+
+PREV_LABEL = "Précédent"
+NEXT_LABEL = "Suivant"
+
+# Bandeau cookies de la page principale (XPath si commence par //)
+POPUP_SELECTORS = [
+    "button[aria-label*='Tout accepter']",
+    "button[aria-label*='Accept all']",
+    "//button[contains(text(), 'Accepter')]",
+]
+
+# Champ Départ qui ouvre le calendrier
+OPEN_CALENDAR_SELECTORS = [
+    "input[aria-label*='Départ']",
+    "input[placeholder*='Départ']",
+    "button[aria-label*='Départ']",
+]
+
+# Sélecteurs de la vue calendrier
+MONTH_GROUPS_SCRIPT = """
+const groups = document.querySelectorAll(
+    "div[role='dialog'] div[jsname='RAZSvb'] div[role='rowgroup'].Bc6Ryd"
+);
+const result = [];
+for (const group of groups) {
+    const header = group.querySelector('.BgYkof.B5dqIf.qZwLKe');
+    if (!header) continue;
+    for (const cell of group.querySelectorAll('[data-iso]')) {
+        const match = /^(\\d{4})-(\\d{2})-\\d{2}/.exec(cell.getAttribute('data-iso') || '');
+        if (match) {
+            result.push({year: +match[1], month: +match[2], header: header.textContent.trim()});
+            break;
+        }
+    }
+}
+return result;
+"""
+
+SCROLL_TO_MONTH_SCRIPT = """
+const prefix = arguments[0];
+const groups = document.querySelectorAll(
+    "div[role='dialog'] div[jsname='RAZSvb'] div[role='rowgroup'].Bc6Ryd"
+);
+for (const group of groups) {
+    const header = group.querySelector('.BgYkof.B5dqIf.qZwLKe');
+    const cell = group.querySelector('[data-iso]');
+    if (header && cell && (cell.getAttribute('data-iso') || '').startsWith(prefix)) {
+        header.scrollIntoView({block: 'start'});
+        return true;
+    }
+}
+return false;
+"""
+
+CLICK_NAV_SCRIPT = """
+const buttons = document.querySelectorAll("div[role='dialog'] button.a2rVxf");
+for (const button of buttons) {
+    if (button.getAttribute('aria-label') !== arguments[0]) continue;
+    if (!button.getClientRects().length) continue;
+    button.scrollIntoView({block: 'center'});
+    button.click();
+    return true;
+}
+return false;
+"""
+
+# Cellules visibles d'un mois: {iso, day, price} (textes bruts)
+GRID_CELLS_SCRIPT = """
+const prefix = arguments[0];
+const cells = document.querySelectorAll("div[role='dialog'] [role='gridcell'][data-iso]");
+const result = [];
+for (const cell of cells) {
+    const iso = (cell.getAttribute('data-iso') || '').trim();
+    if (!iso.startsWith(prefix)) continue;
+    if ((cell.getAttribute('aria-hidden') || '').toLowerCase() === 'true') continue;
+    if (!cell.getClientRects().length) continue;
+    const dayEl = cell.querySelector("[jsname='nEWxA']");
+    const priceEl = cell.querySelector("[jsname='qCDwBb']");
+    let day, price;
+    if (dayEl && priceEl) {
+        day = dayEl.innerText;
+        price = priceEl.innerText;
+    } else {
+        const lines = (cell.innerText || '').split('\\n').map(l => l.trim()).filter(l => l);
+        day = lines[0] || '';
+        price = lines.length > 1 ? lines[1] : '';
+    }
+    result.push({iso: iso, day: (day || '').trim(), price: (price || '').trim()});
+}
+return result;
+"""
+
+# Attente dans la page: se résout avec le nombre de cellules à prix dès
+# qu'il atteint arguments[1] ou à l'échéance (arguments[2] ms); une seule
+# commande au lieu d'un aller-retour par sondage
+WAIT_PRICES_SCRIPT = """
+const prefix = arguments[0];
+const minCells = arguments[1];
+const deadline = Date.now() + arguments[2];
+const snapshot = function() {""" + GRID_CELLS_SCRIPT + """};
+return new Promise(resolve => {
+    const poll = () => {
+        const priced = snapshot.apply(null, [prefix]).filter(c => /\\d/.test(c.price)).length;
+        if (priced >= minCells || Date.now() >= deadline) {
+            resolve(priced);
+        } else {
+            setTimeout(poll, 100);
+        }
+    };
+    poll();
+});
+"""
+
+
+# Sélection d'un jour du calendrier ouvert (data-iso exact)
+CLICK_DAY_SCRIPT = """
+const cells = document.querySelectorAll("div[role='dialog'] [role='gridcell'][data-iso]");
+for (const cell of cells) {
+    if ((cell.getAttribute('data-iso') || '').trim() !== arguments[0]) continue;
+    if ((cell.getAttribute('aria-hidden') || '').toLowerCase() === 'true') continue;
+    if (!cell.getClientRects().length) continue;
+    cell.scrollIntoView({block: 'center'});
+    cell.click();
+    return true;
+}
+return false;
+"""
+
+# Valide les dates (bouton Terminé du calendrier). Les résultats déjà
+# affichés sont marqués pour ne pas être relus comme ceux de la date choisie
+CONFIRM_DATES_SCRIPT = """
+for (const item of document.querySelectorAll('ul li.pIav2d')) {
+    item.setAttribute('data-travliaq-seen', '1');
+}
+const labels = arguments[0];
+const buttons = document.querySelectorAll("div[role='dialog'] button");
+for (const button of buttons) {
+    const text = (button.innerText || button.getAttribute('aria-label') || '').trim();
+    if (button.getAttribute('jsname') !== 'McfNlf' && !labels.includes(text)) continue;
+    if (!button.getClientRects().length) continue;
+    button.click();
+    return true;
+}
+return false;
+"""
+
+# Liste des vols affichée après validation: textes bruts par résultat
+FLIGHT_RESULTS_SCRIPT = """
+const result = [];
+for (const item of document.querySelectorAll('ul li.pIav2d')) {
+    if (item.hasAttribute('data-travliaq-seen')) continue;
+    if (!item.getClientRects().length) continue;
+    const text = selector => {
+        const el = item.querySelector(selector);
+        return el ? (el.innerText || '').trim() : '';
+    };
+    result.push({
+        airline: text('.sSHqwe.tPgKwe.ogfYpf span'),
+        departure_time: text("span[aria-label^='Heure de départ']"),
+        arrival_time: text(`span[aria-label^="Heure d'arrivée"]`),
+        duration: text('.gvkrdb'),
+        stops: text('.EfT7Ae .ogfYpf'),
+        price: text('.YMlIz.FpEdX span'),
+        raw_text: (item.innerText || '').trim().slice(0, 1000),
+    });
+}
+return result;
+"""
+
+# Attente dans la page: se résout avec le nombre de résultats à prix quand
+# il ne bouge plus depuis arguments[1] ms, ou à l'échéance (arguments[0] ms)
+WAIT_RESULTS_SCRIPT = """
+const deadline = Date.now() + arguments[0];
+const settleMs = arguments[1];
+const snapshot = function() {""" + FLIGHT_RESULTS_SCRIPT + """};
+return new Promise(resolve => {
+    let last = -1, since = Date.now();
+    const poll = () => {
+        const priced = snapshot().filter(r => /\\d/.test(r.price)).length;
+        if (priced !== last) {
+            last = priced;
+            since = Date.now();
+        }
+        if ((priced > 0 && Date.now() - since >= settleMs) || Date.now() >= deadline) {
+            resolve(priced);
+        } else {
+            setTimeout(poll, 100);
+        }
+    };
+    poll();
+});
+"""
+
+# Libellés du bouton de validation du calendrier
+CONFIRM_LABELS = ["Terminé", "OK", "Done"]
+
+
+def page_function(script: str) -> str:
+    """Script execute_script -> fonction pour page.evaluate(fn, [args...])"""
+    return f"(args) => (function() {{{script}}}).apply(null, args)"
+
+
+def build_url(origin: str, destination: str, base_url: str = GOOGLE_FLIGHTS_URL,
+              departure_date: Optional[str] = None, return_date: Optional[str] = None) -> str:
+    """
+    URL de recherche Google Flights (fr, EUR)
+
+    Avec departure_date et return_date, recherche aller-retour: le
+    calendrier affiche alors, pour chaque départ, le prix d'un séjour de
+    même durée.
+    """
+    query = f"Flights+from+{origin}+to+{destination}"
+    if departure_date and return_date:
+        query += f"+on+{departure_date}+through+{return_date}"
+    return f"{base_url}?q={query}&curr=EUR&hl=fr"
+
+
+def trip_return_date(departure_date: str, trip_length: int) -> str:
+    """Date de retour d'un séjour de trip_length jours"""
+    return (date.fromisoformat(departure_date) + timedelta(days=trip_length)).isoformat()
+
+
+def parse_trip_lengths(value: str) -> List[int]:
+    """
+    "3,7,14" -> [3, 7, 14] (triées, sans doublon)
+
+    Raises:
+        ValueError: Durée non entière ou inférieure à 1 jour
+    """
+    lengths = sorted({int(part) for part in value.split(",") if part.strip()})
+    if not lengths or lengths[0] < 1:
+        raise ValueError(f"Durées de séjour invalides: {value}")
+    return lengths
+
+
+def month_prefix(year: int, month: int) -> str:
+    """Préfixe data-iso d'un mois (2025-11-)"""
+    return f"{year:04d}-{month:02d}-"
+
+
+def months_in_range(start_date: str, end_date: str) -> List[Tuple[int, int]]:
+    """
+    Mois (année, mois) couverts par une plage YYYY-MM-DD, dans l'ordre
+
+    Raises:
+        ValueError: Si start_date est après end_date
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    if start > end:
+        raise ValueError("start_date doit être avant end_date")
+
+    months = []
+    current = date(start.year, start.month, 1)
+    while current <= end:
+        months.append((current.year, current.month))
+        current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+    return months
+
+
+def month_navigation(groups: List[Dict], year: int, month: int) -> Tuple[str, Optional[Dict]]:
+    """
+    Prochaine action pour afficher un mois
+
+    Args:
+        groups: Résultat de MONTH_GROUPS_SCRIPT
+
+    Returns:
+        (action, mois à faire défiler) - NAV_FOUND/NAV_SCROLL avec le mois
+        cible ou le plus proche, NAV_PREV/NAV_NEXT/NAV_RETRY sans
+    """
+    target = year * 12 + month
+    if not groups:
+        return NAV_RETRY, None
+
+    for group in groups:
+        if group["year"] == year and group["month"] == month:
+            return NAV_FOUND, group
+
+    loaded = [g["year"] * 12 + g["month"] for g in groups]
+    if target < min(loaded):
+        return NAV_PREV, None
+    if target > max(loaded):
+        return NAV_NEXT, None
+
+    # Entre deux mois chargés mais pas encore rendu: défiler vers le plus proche
+    closest = min(groups, key=lambda g: abs(g["year"] * 12 + g["month"] - target))
+    return NAV_SCROLL, closest
+
+
+def parse_price(text: str) -> Optional[float]:
+    """Prix d'une cellule (chiffres uniquement: "1 234 €" -> 1234.0)"""
+    digits = "".join(ch for ch in text or "" if ch.isdigit())
+    return float(digits) if digits else None
+
+
+def count_priced_cells(cells: List[Dict]) -> int:
+    """Cellules dont le prix est affiché"""
+    return sum(1 for cell in cells if any(ch.isdigit() for ch in cell.get("price") or ""))
+
+
+def cells_to_prices(cells: List[Dict], year: int, month: int) -> Dict[str, float]:
+    """
+    Prix par date d'un mois
+
+    Args:
+        cells: Résultat de GRID_CELLS_SCRIPT pour ce mois
+
+    Returns:
+        Dict {YYYY-MM-DD: prix}
+    """
+    prices = {}
+    for cell in cells:
+        day = cell.get("day") or ""
+        if not day.isdigit():
+            continue
+        price = parse_price(cell.get("price"))
+        if price is None:
+            continue
+        prices[f"{year:04d}-{month:02d}-{int(day):02d}"] = price
+    return prices
+
+
+def parse_stops(text: str) -> Optional[int]:
+    """Nombre d'escales ("Sans escale" -> 0, "2 escales" -> 2, inconnu -> None)"""
+    text = (text or "").strip().lower()
+    if not text:
+        return None
+    if "sans escale" in text or "direct" in text or "nonstop" in text:
+        return 0
+    digits = "".join(ch for ch in text if ch.isdigit())
+    return int(digits) if digits else None
+
+
+def parse_flight_results(items: List[Dict], limit: Optional[int] = None) -> List[Dict]:
+    """
+    Vols normalisés, dans l'ordre d'affichage
+
+    Args:
+        items: Résultat de FLIGHT_RESULTS_SCRIPT
+        limit: Nombre maximum de vols gardés
+
+    Returns:
+        Liste de dicts au format de db_manager.save_flights (index,
+        airline, departure_time, arrival_time, duration, stops, price,
+        raw_text)
+    """
+    flights = []
+    for item in items:
+        price = parse_price(item.get("price"))
+        airline = (item.get("airline") or "").strip() or None
+        if price is None and airline is None:
+            continue
+        flights.append({
+            "index": len(flights),
+            "airline": airline,
+            "departure_time": (item.get("departure_time") or "").strip() or None,
+            "arrival_time": (item.get("arrival_time") or "").strip() or None,
+            "duration": (item.get("duration") or "").strip() or None,
+            "stops": parse_stops(item.get("stops")),
+            "price": price,
+            "raw_text": (item.get("raw_text") or "")[:1000] or None,
+        })
+        if limit and len(flights) >= limit:
+            break
+    return flights
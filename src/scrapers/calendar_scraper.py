@@ -5,26 +5,66 @@ Basé sur l'approche "scroll direct" vers les mois cibles
 
 import time
 import random
-import re
 from datetime import datetime, date
-from typing import Dict, Optional, List, Tuple
+from typing import Callable, Dict, Optional, List, Tuple
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from selenium.webdriver.remote.webelement import WebElement
 
-from ..core.driver_manager import DriverManager
+from ..core.cdp_transport import TRANSPORT_CDP, TRANSPORT_WEBDRIVER, CdpError, CdpScriptError
+from ..core.driver_manager import DriverManager, is_session_lost
 from ..core.config import settings
+from ..core.pacing import pacing_controller
 from ..core.exceptions import (
+    BlockedError,
     CalendarNotFoundError,
     PriceExtractionError,
-    PageLoadError
+    PageLoadError,
+    PreemptedError,
+    RateLimitError
 )
 from ..utils.logger import get_logger
 from ..utils.validators import Validators
+from .calendar_extraction import (
+    CLICK_DAY_SCRIPT,
+    CLICK_NAV_SCRIPT,
+    CONFIRM_DATES_SCRIPT,
+    CONFIRM_LABELS,
+    FLIGHT_RESULTS_SCRIPT,
+    GOOGLE_FLIGHTS_URL,
+    GRID_CELLS_SCRIPT,
+    MONTH_GROUPS_SCRIPT,
+    NAV_FOUND,
+    NAV_NEXT,
+    NAV_PREV,
+    NAV_RETRY,
+    NEXT_LABEL,
+    OPEN_CALENDAR_SELECTORS,
+    POPUP_SELECTORS,
+    PREV_LABEL,
+    SCROLL_TO_MONTH_SCRIPT,
+    WAIT_PRICES_SCRIPT,
+    WAIT_RESULTS_SCRIPT,
+    build_url,
+    cells_to_prices,
+    count_priced_cells,
+    month_navigation,
+    month_prefix,
+    months_in_range,
+    parse_flight_results,
+    trip_return_date,
+)
+from .page_state import PAGE_CONSENT, PAGE_NORMAL, detect_page_state, raise_for_page_state
 
 logger = get_logger(__name__)
 
+# Marge du timeout websocket au-delà de l'attente faite dans la page
+CDP_WAIT_MARGIN_SECONDS = 5.0
+
+# Chargement de la liste des vols après validation des dates
+RESULTS_TIMEOUT_SECONDS = 15.0
+RESULTS_SETTLE_MS = 1000
+
 
 class CalendarScraper:
     """
@@ -32,6 +72,9 @@ class CalendarScraper:
     Utilise une approche de navigation intelligente vers les mois cibles
     """
 
+    # Page chargée (remplacée par une fixture locale dans les benchmarks)
+    base_url = GOOGLE_FLIGHTS_URL
+
     # Mapping des noms de mois français
     MONTHS_FR_ALIASES = {
         "janvier": 1, "janv": 1, "janv.": 1,
@@ -53,21 +96,82 @@ class CalendarScraper:
         'juillet', 'août', 'septembre', 'octobre', 'novembre', 'décembre'
     ]
 
-    def __init__(self, headless: Optional[bool] = None):
+    def __init__(
+            self,
+            headless: Optional[bool] = None,
+            proxy: Optional[str] = None,
+            progress_callback: Optional[Callable] = None,
+            should_stop: Optional[Callable[[], bool]] = None,
+            browser_endpoint: Optional[str] = None,
+            launch_profile: Optional[str] = None
+    ):
         """
         Initialise le scraper
 
         Args:
             headless: Mode headless (None = utiliser config)
+            proxy: URL du proxy emprunté au ProxyPool (None = config)
+            progress_callback: Appelé à chaque étape/progrès (heartbeat du worker)
+            should_stop: Consulté à chaque frontière de mois (préemption)
+            browser_endpoint: Endpoint emprunté à la BrowserFarm (None = Chrome local)
+            launch_profile: Profil de lancement de Chrome (None = config)
         """
-        self.driver_manager = DriverManager(headless=headless)
+        self.proxy = proxy
+        self.progress_callback = progress_callback
+        self.should_stop = should_stop
+        self._stage: Optional[str] = None
+        self.driver_manager = DriverManager(
+            headless=headless, proxy=proxy, remote_url=browser_endpoint, launch_profile=launch_profile
+        )
         self.driver = None
         self.wait = None
+        # Volume réseau de la dernière page (relevé à la fermeture)
+        self.transfer_stats: Dict = {}
+        self.page_load_seconds: Optional[float] = None
+        # Latence des scripts du calendrier par transport (webdriver ou cdp)
+        self.command_stats: Dict = {}
+        # Drivers recréés après une perte de session pendant le job
+        self.recoveries = 0
+        # Temps passé par destination d'une session partagée (scrape_destinations)
+        self.destination_seconds: Dict[str, float] = {}
+        # Recherche chargée dans la session courante (calendrier ouvert)
+        self._loaded_url: Optional[str] = None
 
     # ==================== UTILITIES ====================
 
+    def _run(self, script: str, *args, timeout: Optional[float] = None):
+        """
+        Exécute un script de calendar_extraction
+
+        Websocket DevTools si le transport CDP est ouvert, sinon
+        execute_script (les deux attendent une Promise retournée). Si le
+        websocket tombe, on repasse sur WebDriver pour le reste du job.
+        """
+        cdp = self.driver_manager.cdp
+        transport = TRANSPORT_CDP if cdp else TRANSPORT_WEBDRIVER
+        started = time.perf_counter()
+        try:
+            if cdp:
+                try:
+                    return cdp.evaluate(script, *args, await_promise=True, timeout=timeout)
+                except CdpScriptError:
+                    raise
+                except CdpError as e:
+                    logger.warning(f"⚠️ Transport CDP perdu, retour WebDriver: {e}")
+                    self.driver_manager.close_cdp_session()
+                    transport = TRANSPORT_WEBDRIVER
+            return self.driver.execute_script(script, *args)
+        finally:
+            stats = self.command_stats.setdefault(transport, {'commands': 0, 'seconds': 0.0})
+            stats['commands'] += 1
+            stats['seconds'] += time.perf_counter() - started
+
     def _random_delay(self, min_sec: float = None, max_sec: float = None):
         """Délai aléatoire AUGMENTÉ pour sembler humain"""
+        if min_sec is None and max_sec is None and pacing_controller.enabled:
+            # L'espacement entre requêtes est géré globalement par le pacing
+            time.sleep(random.uniform(0.5, 1.5))
+            return
         min_sec = min_sec or settings.delay_between_requests_min
         max_sec = max_sec or settings.delay_between_requests_max
         delay = random.uniform(min_sec, max_sec)
@@ -88,6 +192,47 @@ class CalendarScraper:
                 time.sleep(random.uniform(0.3, 0.7))
             except:
                 pass
+
+    def _progress(self, stage: Optional[str] = None, **info):
+        """Signale une étape ou un progrès (None = activité dans l'étape courante)"""
+        if stage is not None:
+            self._stage = stage
+        if self.progress_callback:
+            try:
+                self.progress_callback(stage, **info)
+            except Exception as e:
+                logger.debug(f"Erreur heartbeat: {e}")
+
+    def _pace(self, cost: float = 1.0):
+        """Attend un jeton du contrôleur de cadence (étape 'pacing' pendant l'attente)"""
+        if cost <= 0 or not pacing_controller.enabled:
+            return
+        previous = self._stage
+        self._progress("pacing")
+        pacing_controller.acquire(cost, timeout=settings.pacing_max_wait_seconds, bucket=self.proxy)
+        self._progress(previous)
+
+    def _navigate(self, url: str):
+        """Charge une page après accord du contrôleur de cadence global"""
+        self._pace()
+        self._progress("navigate")
+        started = time.time()
+        self.driver.get(url)
+        self.page_load_seconds = time.time() - started
+        self._check_page_state()
+
+    def _check_page_state(self):
+        """Classe la page (une requête DOM) et échoue vite si Google bloque"""
+        state = detect_page_state(self.driver)
+        if state == PAGE_CONSENT:
+            self._handle_consent()
+            state = detect_page_state(self.driver)
+
+        if state != PAGE_NORMAL:
+            logger.warning(f"🚫 Page {state} ({self.proxy or 'direct'})")
+            self._save_screenshot(state)
+        raise_for_page_state(state, self.proxy)
+
     def _save_screenshot(self, name: str = "error"):
         """Sauvegarde une capture d'écran"""
         if settings.screenshot_on_error and self.driver:
@@ -116,11 +261,10 @@ class CalendarScraper:
             raise ValueError(f"Numéro de mois invalide: {num}")
         return self.MONTHS_FR_LONG[num - 1]
 
-    def _build_url(self, origin: str, destination: str) -> str:
-        """Construit l'URL Google Flights"""
-        url = f"https://www.google.com/travel/flights?q=Flights+from+{origin}+to+{destination}"
-        url += "&curr=EUR&hl=fr"
-        return url
+    def _build_url(self, origin: str, destination: str,
+                   departure_date: Optional[str] = None, return_date: Optional[str] = None) -> str:
+        """Construit l'URL Google Flights (aller-retour si les deux dates sont données)"""
+        return build_url(origin, destination, self.base_url, departure_date, return_date)
 
     # ==================== POPUPS & CONSENT ====================
 
@@ -142,13 +286,7 @@ class CalendarScraper:
 
     def _handle_popups(self):
         """Ferme les popups de cookies sur la page principale"""
-        selectors = [
-            "button[aria-label*='Tout accepter']",
-            "button[aria-label*='Accept all']",
-            "//button[contains(text(), 'Accepter')]",
-        ]
-
-        for selector in selectors:
+        for selector in POPUP_SELECTORS:
             try:
                 if selector.startswith('//'):
                     button = self.driver.find_element(By.XPATH, selector)
@@ -168,13 +306,9 @@ class CalendarScraper:
         """Ouvre le calendrier en cliquant sur le champ Départ"""
         logger.debug("Ouverture du calendrier...")
 
-        selectors = [
-            "input[aria-label*='Départ']",
-            "input[placeholder*='Départ']",
-            "button[aria-label*='Départ']",
-        ]
-
-        for selector in selectors:
+        for selector in OPEN_CALENDAR_SELECTORS:
+            # Chaque sélecteur peut attendre settings.timeout: heartbeat avant chacun
+            self._progress()
             try:
                 element = self.wait.until(
                     EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
@@ -193,99 +327,30 @@ class CalendarScraper:
         logger.warning("Impossible d'ouvrir le calendrier")
         return False
 
-    def _click_prev_button(self) -> bool:
-        """Clique sur le bouton Précédent du calendrier"""
+    def _click_nav_button(self, label: str) -> bool:
+        """Clique sur le bouton Précédent/Suivant visible du calendrier"""
+        self._pace(settings.pacing_nav_cost)
         try:
-            btns = self.driver.find_elements(
-                By.XPATH,
-                "//div[@role='dialog']//button[contains(@class,'a2rVxf') and @aria-label='Précédent']"
-            )
-            for b in btns:
-                if b.is_displayed():
-                    self.driver.execute_script(
-                        "arguments[0].scrollIntoView({block:'center'});", b
-                    )
-                    time.sleep(0.15)
-                    self.driver.execute_script("arguments[0].click();", b)
-                    return True
+            if self._run(CLICK_NAV_SCRIPT, label):
+                self._progress()
+                return True
             return False
         except Exception as e:
-            logger.debug(f"Erreur clic Précédent: {e}")
+            if is_session_lost(e):
+                raise
+            logger.debug(f"Erreur clic {label}: {e}")
             return False
 
+    def _click_prev_button(self) -> bool:
+        """Clique sur le bouton Précédent du calendrier"""
+        return self._click_nav_button(PREV_LABEL)
+
     def _click_next_button(self) -> bool:
         """Clique sur le bouton Suivant du calendrier"""
-        try:
-            btns = self.driver.find_elements(
-                By.XPATH,
-                "//div[@role='dialog']//button[contains(@class,'a2rVxf') and @aria-label='Suivant']"
-            )
-            for b in btns:
-                if b.is_displayed():
-                    self.driver.execute_script(
-                        "arguments[0].scrollIntoView({block:'center'});", b
-                    )
-                    time.sleep(0.15)
-                    self.driver.execute_script("arguments[0].click();", b)
-                    return True
-            return False
-        except Exception as e:
-            logger.debug(f"Erreur clic Suivant: {e}")
-            return False
+        return self._click_nav_button(NEXT_LABEL)
 
     # ==================== MONTH DETECTION ====================
 
-    def _get_month_groups(self) -> List[Dict]:
-        """
-        Récupère tous les blocs mois présents dans le calendrier
-        
-        Returns:
-            Liste de dicts avec year, month_num, header_text, group_el, header_el
-        """
-        groups = self.driver.find_elements(
-            By.XPATH,
-            "//div[@role='dialog']//div[@jsname='RAZSvb']"
-            "//div[@role='rowgroup' and contains(@class,'Bc6Ryd')]"
-        )
-
-        result = []
-        for g in groups:
-            try:
-                # Header du mois (ex: "novembre" ou "janvier 2026")
-                header_el = g.find_element(By.CSS_SELECTOR, ".BgYkof.B5dqIf.qZwLKe")
-            except:
-                continue
-
-            header_text = header_el.text.strip()
-
-            # Trouver une cellule avec data-iso pour extraire année/mois réels
-            day_cells = g.find_elements(By.CSS_SELECTOR, "[data-iso]")
-            year_val = None
-            month_val = None
-
-            for cell in day_cells:
-                iso = cell.get_attribute("data-iso") or ""
-                match = re.match(r"(\d{4})-(\d{2})-(\d{2})", iso)
-                if match:
-                    year_val = int(match.group(1))
-                    month_val = int(match.group(2))
-                    break
-
-            if year_val is None:
-                continue
-
-            result.append({
-                "year": year_val,
-                "month_num": month_val,
-                "header_text": header_text,
-                "group_el": g,
-                "header_el": header_el,
-            })
-
-        return result
-
-
-
     def _focus_on_month(self, target_month_name: str, target_year: int, max_attempts: int = 60) -> bool:
         """
         Navigue vers le mois cible (scroll ou clic Suivant/Précédent)
@@ -299,36 +364,26 @@ class CalendarScraper:
             True si le mois est trouvé et affiché
         """
         target_num = self._month_num(target_month_name)
-        target_total = target_year * 12 + target_num
 
         logger.debug(f"Navigation vers {target_month_name} {target_year}...")
 
         for attempt in range(max_attempts):
-            groups = self._get_month_groups()
-
-            # Le mois est-il déjà visible ?
-            for g in groups:
-                if g["year"] == target_year and g["month_num"] == target_num:
-                    logger.debug(f"✓ Mois {target_month_name} {target_year} trouvé (attempt {attempt})")
-                    # Scroll pour s'assurer qu'il est visible et que les prix se chargent
-                    self.driver.execute_script(
-                        "arguments[0].scrollIntoView({block:'start'});",
-                        g["header_el"]
-                    )
-                    time.sleep(0.8)
-                    return True
+            groups = self._run(MONTH_GROUPS_SCRIPT) or []
+            action, group = month_navigation(groups, target_year, target_num)
+
+            if action == NAV_FOUND:
+                logger.debug(f"✓ Mois {target_month_name} {target_year} trouvé (attempt {attempt})")
+                # Scroll pour s'assurer qu'il est visible et que les prix se chargent
+                self._run(SCROLL_TO_MONTH_SCRIPT, month_prefix(target_year, target_num))
+                time.sleep(0.8)
+                return True
 
-            # Sinon, on doit charger plus de mois
-            months_loaded = [x["year"] * 12 + x["month_num"] for x in groups]
-            if not months_loaded:
+            if action == NAV_RETRY:
                 logger.debug("Aucun mois détecté, retry...")
                 time.sleep(0.5)
                 continue
 
-            min_loaded = min(months_loaded)
-            max_loaded = max(months_loaded)
-
-            if target_total < min_loaded:
+            if action == NAV_PREV:
                 # Mois plus ancien → Précédent
                 logger.debug("← Clic Précédent pour charger mois plus anciens")
                 if not self._click_prev_button():
@@ -337,7 +392,7 @@ class CalendarScraper:
                 time.sleep(1.0)
                 continue
 
-            if target_total > max_loaded:
+            if action == NAV_NEXT:
                 # Mois plus récent → Suivant
                 logger.debug("→ Clic Suivant pour charger mois plus récents")
                 if not self._click_next_button():
@@ -348,15 +403,8 @@ class CalendarScraper:
 
             # Target entre min et max mais pas encore rendu
             # Scroll vers le plus proche pour forcer le render
-            closest = min(
-                groups,
-                key=lambda g: abs((g["year"] * 12 + g["month_num"]) - target_total)
-            )
             logger.debug("Scroll vers mois proche pour forcer render...")
-            self.driver.execute_script(
-                "arguments[0].scrollIntoView({block:'start'});",
-                closest["header_el"]
-            )
+            self._run(SCROLL_TO_MONTH_SCRIPT, month_prefix(group["year"], group["month"]))
             time.sleep(0.8)
 
         logger.warning(f"Impossible d'afficher {target_month_name} {target_year} après {max_attempts} tentatives")
@@ -364,103 +412,32 @@ class CalendarScraper:
 
     # ==================== PRICE EXTRACTION ====================
 
-    def _get_grid_cells(self) -> List[WebElement]:
-        """Récupère toutes les cellules jour visibles dans le calendrier"""
-        cells = self.driver.find_elements(
-            By.XPATH,
-            "//div[@role='dialog']//*[@role='gridcell' and @data-iso]"
-        )
-
-        visible_cells = []
-        for cell in cells:
-            if not cell.is_displayed():
-                continue
-            # Ignorer les jours masqués (aria-hidden="true")
-            aria_hidden = (cell.get_attribute("aria-hidden") or "").lower()
-            if aria_hidden == "true":
-                continue
-            iso = (cell.get_attribute("data-iso") or "").strip()
-            if not iso:
-                continue
-            visible_cells.append(cell)
-
-        return visible_cells
-
-    def _parse_iso_date(self, cell: WebElement) -> Optional[datetime]:
-        """Parse la date ISO d'une cellule (data-iso="2025-11-12")"""
-        iso = cell.get_attribute("data-iso") or ""
-        match = re.match(r"(\d{4})-(\d{2})-(\d{2})", iso)
-        if not match:
-            return None
-        return datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)))
-
-    def _extract_day_and_price(self, cell: WebElement) -> Tuple[Optional[int], Optional[float]]:
-        """
-        Extrait le jour et le prix d'une cellule
-        
-        Returns:
-            (jour, prix) ou (None, None) si échec
-        """
-        try:
-            # Structure typique:
-            # <div jsname="nEWxA">12</div>  (le jour)
-            # <div jsname="qCDwBb">€179</div>  (le prix)
-            day_el = cell.find_element(By.CSS_SELECTOR, "[jsname='nEWxA']")
-            price_el = cell.find_element(By.CSS_SELECTOR, "[jsname='qCDwBb']")
-            day_txt = day_el.text.strip()
-            price_txt = price_el.text.strip()
-        except:
-            # Fallback: split du texte brut
-            raw = (cell.text or "").strip().split("\n")
-            raw = [x.strip() for x in raw if x.strip()]
-            if len(raw) < 2:
-                return (None, None)
-            day_txt, price_txt = raw[0], raw[1]
-
-        # Valider le jour
-        if not day_txt.isdigit():
-            return (None, None)
-        day = int(day_txt)
-
-        # Extraire le prix (garder uniquement les chiffres)
-        digits = "".join(ch for ch in price_txt if ch.isdigit())
-        if not digits:
-            return (None, None)
-        price = float(digits)
-
-        return day, price
+    def _month_cells(self, year: int, month: int) -> List[Dict]:
+        """Cellules jour visibles d'un mois (une seule exécution JavaScript)"""
+        return self._run(GRID_CELLS_SCRIPT, month_prefix(year, month)) or []
 
     def _wait_prices_ready(self, target_month: str, target_year: int,
                            min_cells: int = 4, timeout: float = 10.0) -> bool:
         """
         Attend que le mois ait des cellules avec prix
         TIMEOUT AUGMENTÉ: 10s au lieu de 7s
+
+        Le sondage tourne dans la page (WAIT_PRICES_SCRIPT): une seule
+        commande quel que soit le temps de chargement des prix.
         """
         target_num = self._month_num(target_month)
-        deadline = time.time() + timeout
-
-        while time.time() < deadline:
-            ready_count = 0
-            for cell in self._get_grid_cells():
-                dt = self._parse_iso_date(cell)
-                if not dt or dt.year != target_year or dt.month != target_num:
-                    continue
-
-                try:
-                    price_el = cell.find_element(By.CSS_SELECTOR, "[jsname='qCDwBb']")
-                    price_txt = price_el.text.strip()
-                except:
-                    raw_lines = (cell.text or "").strip().split("\n")
-                    price_txt = raw_lines[-1] if raw_lines else ""
-
-                if any(ch.isdigit() for ch in price_txt):
-                    ready_count += 1
-
-            if ready_count >= min_cells:
-                return True
-
-            time.sleep(0.3)
+        try:
+            priced = self._run(
+                WAIT_PRICES_SCRIPT, month_prefix(target_year, target_num), min_cells, int(timeout * 1000),
+                timeout=timeout + CDP_WAIT_MARGIN_SECONDS
+            )
+        except Exception as e:
+            logger.debug(f"Erreur attente des prix: {e}")
+            priced = count_priced_cells(self._month_cells(target_year, target_num))
 
+        if (priced or 0) >= min_cells:
+            self._progress()
+            return True
         return False
 
     def _extract_prices_for_month(self, target_month: str, target_year: int) -> Dict[str, float]:
@@ -481,23 +458,122 @@ class CalendarScraper:
             logger.warning(f"Peu de cellules avec prix détectées pour {target_month} {target_year}")
 
         target_num = self._month_num(target_month)
-        prices = {}
+        prices = cells_to_prices(self._month_cells(target_year, target_num), target_year, target_num)
 
-        for cell in self._get_grid_cells():
-            dt = self._parse_iso_date(cell)
-            if not dt or dt.year != target_year or dt.month != target_num:
-                continue
+        logger.debug(f"✓ {len(prices)} prix extraits pour {target_month} {target_year}")
+        self._progress()
+        return prices
 
-            day_int, price_val = self._extract_day_and_price(cell)
-            if day_int is None or price_val is None:
-                continue
+    # ==================== SESSION & RECOVERY ====================
+
+    def _start_session(self):
+        """Crée le driver (et le transport CDP si activé)"""
+        self._progress("driver")
+        self._loaded_url = None
+        self.driver = self.driver_manager.create_driver()
+        self.wait = self.driver_manager.wait
+        if self.driver_manager.remote_url:
+            # Session distante: le pool la ferme si le worker est tué
+            self._progress(session_id=self.driver_manager.session_id)
+        if settings.cdp_transport:
+            self.driver_manager.open_cdp_session()
+
+    def _load_search(self, url: str):
+        """Charge une recherche dans la session courante et ouvre le calendrier"""
+        self._navigate(url)
+        time.sleep(5)
+
+        self._handle_consent()
+        time.sleep(1)
+        self._handle_popups()
+        time.sleep(1)
+
+        # Ouvrir calendrier
+        self._progress("open_calendar")
+        if not self._open_calendar():
+            self._check_page_state()
+            raise CalendarNotFoundError("Impossible d'ouvrir le calendrier")
+        self._loaded_url = url
+
+    def _with_recovery(self, step: Callable, url: str):
+        """
+        Exécute une étape sur la recherche `url`, en recréant la session si
+        Chrome ou chromedriver est perdu
+
+        La recherche est (re)chargée si la session n'y est pas déjà. Le
+        driver mort est abandonné, une nouvelle session recharge la
+        recherche et rouvre le calendrier, puis l'étape est rejouée; les mois
+        déjà extraits restent acquis. Au-delà de SCRAPER_MAX_RECOVERIES, ou
+        pour toute autre erreur, l'exception remonte.
+        """
+        while True:
+            try:
+                if self.driver is None:
+                    self._start_session()
+                if self._loaded_url != url:
+                    self._load_search(url)
+                return step()
+            except Exception as e:
+                if not is_session_lost(e) or self.recoveries >= settings.scraper_max_recoveries:
+                    raise
+                self.recoveries += 1
+                logger.warning(
+                    f"💥 Session Chrome perdue ({type(e).__name__}), nouveau driver "
+                    f"({self.recoveries}/{settings.scraper_max_recoveries})"
+                )
+                self._progress(recoveries=self.recoveries)
+                self.driver_manager.close()
+                self.driver = None
+                self.wait = None
+
+    def _scrape_month(self, month_name: str, year: int) -> Optional[Dict[str, float]]:
+        """Affiche puis extrait un mois (None si le mois est introuvable)"""
+        if not self._focus_on_month(month_name, year):
+            return None
+        return self._extract_prices_for_month(month_name, year)
+
+    # ==================== FLIGHT RESULTS ====================
+
+    def _click_day(self, iso: str):
+        """Affiche le mois d'une date puis clique sur son jour dans le calendrier"""
+        day = date.fromisoformat(iso)
+        if not self._focus_on_month(self._month_name(day.month), day.year):
+            raise CalendarNotFoundError(f"Mois du {iso} introuvable dans le calendrier")
+        self._pace(settings.pacing_nav_cost)
+        if not self._run(CLICK_DAY_SCRIPT, iso):
+            raise PriceExtractionError(f"Jour {iso} non cliquable dans le calendrier")
+        self._progress()
+        time.sleep(0.5)
+
+    def _scrape_results(self, departure_date: str, return_date: Optional[str] = None) -> List[Dict]:
+        """
+        Choisit les dates dans le calendrier ouvert et lit la liste des vols
 
-            # Formater la date en ISO (YYYY-MM-DD)
-            date_key = f"{target_year:04d}-{target_num:02d}-{day_int:02d}"
-            prices[date_key] = price_val
+        Le calendrier se ferme à la validation: la recherche devra être
+        rechargée pour une autre étape (reprise après perte de session).
+        """
+        self._progress("results")
+        self._click_day(departure_date)
+        if return_date:
+            self._click_day(return_date)
 
-        logger.debug(f"✓ {len(prices)} prix extraits pour {target_month} {target_year}")
-        return prices
+        if not self._run(CONFIRM_DATES_SCRIPT, CONFIRM_LABELS):
+            raise PriceExtractionError("Bouton de validation du calendrier introuvable")
+        self._loaded_url = None
+
+        try:
+            self._run(
+                WAIT_RESULTS_SCRIPT, int(RESULTS_TIMEOUT_SECONDS * 1000), RESULTS_SETTLE_MS,
+                timeout=RESULTS_TIMEOUT_SECONDS + CDP_WAIT_MARGIN_SECONDS
+            )
+        except Exception as e:
+            if is_session_lost(e):
+                raise
+            logger.debug(f"Erreur attente des vols: {e}")
+
+        flights = parse_flight_results(self._run(FLIGHT_RESULTS_SCRIPT) or [], limit=settings.flights_max_results)
+        self._progress()
+        return flights
 
     # ==================== MAIN SCRAPE METHOD ====================
 
@@ -520,9 +596,6 @@ class CalendarScraper:
         Returns:
             Dict {date: prix}
         """
-        from datetime import datetime, date
-        import time
-
         # Valider
         origin, destination = Validators.validate_route(origin, destination)
         start = datetime.strptime(start_date, "%Y-%m-%d").date()
@@ -532,53 +605,45 @@ class CalendarScraper:
             raise ValueError("start_date doit être avant end_date")
 
         # Calculer les mois uniques dans la plage
-        months_set = set()
-        current = start
-        while current <= end:
-            months_set.add((current.year, current.month))
-            # Mois suivant
-            if current.month == 12:
-                current = date(current.year + 1, 1, 1)
-            else:
-                current = date(current.year, current.month + 1, 1)
+        months_set = months_in_range(start_date, end_date)
 
         logger.info(f"Scraping {len(months_set)} mois pour {start_date} → {end_date}")
 
         all_prices = {}
+        self.recoveries = 0
 
         try:
-            # Init driver
-            self.driver = self.driver_manager.create_driver()
-            self.wait = self.driver_manager.wait
-
-            # Charger page
+            # Init driver, page, calendrier
             url = self._build_url(origin, destination)
             logger.info(f"🌐 {origin} → {destination}")
-            self.driver.get(url)
-            time.sleep(5)
-
-            self._handle_consent()
-            time.sleep(1)
-            self._handle_popups()
-            time.sleep(1)
-
-            # Ouvrir calendrier
-            if not self._open_calendar():
-                raise CalendarNotFoundError("Impossible d'ouvrir le calendrier")
+            self._with_recovery(lambda: None, url)
 
             # Scraper chaque mois
             for idx, (year, month_num) in enumerate(sorted(months_set), 1):
                 month_name = self._month_name(month_num)
+
+                # Préemption: on rend les mois déjà faits, la suite sera reprise
+                if idx > 1 and self.should_stop and self.should_stop():
+                    resume_from = max(start_date, f"{year:04d}-{month_num:02d}-01")
+                    partial = {d: p for d, p in all_prices.items() if start_date <= d < resume_from}
+                    raise PreemptedError(
+                        f"Préempté avant {month_name} {year}", prices=partial, resume_from=resume_from
+                    )
+
                 logger.info(f"📊 Mois {idx}/{len(months_set)}: {month_name} {year}")
+                self._progress("month", month_index=idx, months_total=len(months_set))
 
-                if not self._focus_on_month(month_name, year):
+                # Session perdue: reprise à ce mois, les précédents restent acquis
+                month_prices = self._with_recovery(lambda: self._scrape_month(month_name, year), url)
+                if month_prices is None:
                     logger.warning(f"⚠️ Skip {month_name} {year}")
                     continue
 
-                month_prices = self._extract_prices_for_month(month_name, year)
                 all_prices.update(month_prices)
                 time.sleep(0.5)
 
+            self._progress("done")
+
             # Filtrer la plage exacte
             filtered = {
                 d: p for d, p in all_prices.items()
@@ -588,6 +653,221 @@ class CalendarScraper:
             logger.info(f"✅ {len(filtered)} prix dans [{start_date}, {end_date}]")
             return filtered
 
+        except PreemptedError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Erreur: {e}", exc_info=True)
+            self._save_screenshot("error")
+            raise
+        finally:
+            self.close()
+
+    def scrape_round_trip_grid(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            trip_lengths: List[int]
+    ) -> Dict[int, Dict[str, float]]:
+        """
+        Matrice des prix aller-retour départ × durée de séjour, en une session
+
+        Pour chaque durée, une recherche aller-retour (départ start_date,
+        retour start_date + durée) est chargée dans le même navigateur: son
+        calendrier donne le prix de chaque départ pour un séjour de cette
+        durée, un mois entier par extraction.
+
+        Args:
+            origin: Code IATA départ
+            destination: Code IATA arrivée
+            start_date: Premier départ (YYYY-MM-DD)
+            end_date: Dernier départ (YYYY-MM-DD)
+            trip_lengths: Durées de séjour en jours
+
+        Returns:
+            Dict {durée: {date de départ: prix}}
+        """
+        origin, destination = Validators.validate_route(origin, destination)
+        months = months_in_range(start_date, end_date)
+        lengths = sorted(set(trip_lengths))
+        if not lengths or lengths[0] < 1:
+            raise ValueError("Durées de séjour invalides (jours >= 1)")
+
+        logger.info(f"Grille aller-retour: {len(lengths)} durées × {len(months)} mois pour {start_date} → {end_date}")
+
+        grid = {}
+        self.recoveries = 0
+        steps = len(lengths) * len(months)
+
+        try:
+            for l_idx, length in enumerate(lengths, 1):
+                url = self._build_url(origin, destination, start_date, trip_return_date(start_date, length))
+                logger.info(f"🔁 {origin} ⇄ {destination}: séjour de {length} j ({l_idx}/{len(lengths)})")
+
+                prices = {}
+                for idx, (year, month_num) in enumerate(months, 1):
+                    month_name = self._month_name(month_num)
+                    self._progress("month", month_index=(l_idx - 1) * len(months) + idx, months_total=steps)
+
+                    month_prices = self._with_recovery(lambda: self._scrape_month(month_name, year), url)
+                    if month_prices is None:
+                        logger.warning(f"⚠️ Skip {month_name} {year} ({length} j)")
+                        continue
+
+                    prices.update(month_prices)
+                    time.sleep(0.5)
+
+                grid[length] = {d: p for d, p in prices.items() if start_date <= d <= end_date}
+
+            self._progress("done")
+            logger.info(f"✅ {sum(len(p) for p in grid.values())} prix aller-retour ({len(lengths)} durées)")
+            return grid
+
+        except Exception as e:
+            logger.error(f"❌ Erreur: {e}", exc_info=True)
+            self._save_screenshot("error")
+            raise
+        finally:
+            self.close()
+
+    def scrape_destinations(
+            self,
+            origin: str,
+            destinations: List[str],
+            start_date: str,
+            end_date: str
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Calendriers de plusieurs destinations depuis une même origine, en une session
+
+        Chaque destination recharge sa recherche dans le même navigateur
+        (pas de nouveau Chrome). Une destination en échec est sautée; un
+        blocage, ou une session perdue au-delà de SCRAPER_MAX_RECOVERIES,
+        arrête le job.
+
+        Args:
+            origin: Code IATA départ
+            destinations: Codes IATA arrivée
+            start_date: Date début (YYYY-MM-DD)
+            end_date: Date fin (YYYY-MM-DD)
+
+        Returns:
+            Dict {destination: {date: prix}} (destinations en échec absentes)
+
+        Raises:
+            BlockedError, RateLimitError: Page bloquée
+            Exception: Dernière erreur si aucune destination n'a abouti
+        """
+        months = months_in_range(start_date, end_date)
+        steps = len(destinations) * len(months)
+        results = {}
+        last_error = None
+        self.recoveries = 0
+        self.destination_seconds = {}
+
+        logger.info(f"Session partagée: {origin} → {len(destinations)} destinations × {len(months)} mois")
+
+        try:
+            for d_idx, destination in enumerate(destinations, 1):
+                destination_started = time.time()
+                try:
+                    origin, destination = Validators.validate_route(origin, destination)
+                    url = self._build_url(origin, destination)
+                    logger.info(f"🌐 {origin} → {destination} ({d_idx}/{len(destinations)})")
+
+                    prices = {}
+                    for idx, (year, month_num) in enumerate(months, 1):
+                        month_name = self._month_name(month_num)
+                        self._progress("month", month_index=(d_idx - 1) * len(months) + idx, months_total=steps)
+
+                        month_prices = self._with_recovery(lambda: self._scrape_month(month_name, year), url)
+                        if month_prices is None:
+                            logger.warning(f"⚠️ Skip {month_name} {year} ({destination})")
+                            continue
+
+                        prices.update(month_prices)
+                        time.sleep(0.5)
+
+                except (BlockedError, RateLimitError):
+                    raise
+                except Exception as e:
+                    if is_session_lost(e):
+                        raise
+                    logger.warning(f"⚠️ {origin} → {destination} en échec: {e}")
+                    self._save_screenshot("error")
+                    # Page dans un état inconnu: la destination suivante recharge sa recherche
+                    self._loaded_url = None
+                    last_error = e
+                    continue
+                finally:
+                    # Échecs compris: c'est le coût réel de la destination dans la session
+                    self.destination_seconds[destination] = time.time() - destination_started
+
+                results[destination] = {d: p for d, p in prices.items() if start_date <= d <= end_date}
+
+            if not results and last_error is not None:
+                raise last_error
+
+            self._progress("done")
+            logger.info(f"✅ {len(results)}/{len(destinations)} destinations depuis {origin}")
+            return results
+
+        except Exception as e:
+            logger.error(f"❌ Erreur: {e}", exc_info=True)
+            self._save_screenshot("error")
+            raise
+        finally:
+            self.close()
+
+    def scrape_flights(
+            self,
+            origin: str,
+            destination: str,
+            departure_date: str,
+            return_date: Optional[str] = None
+    ) -> Tuple[Dict[str, float], List[Dict]]:
+        """
+        Liste des vols d'une date, lue dans la session du calendrier
+
+        Le calendrier du mois de départ est extrait, puis le jour est choisi
+        dans ce même calendrier ouvert: la liste des vols ne coûte que
+        quelques secondes de plus, sans nouveau navigateur. En aller-retour,
+        la recherche est chargée avec les deux dates (le calendrier donne
+        alors le prix des séjours de même durée).
+
+        Args:
+            origin: Code IATA départ
+            destination: Code IATA arrivée
+            departure_date: Date de départ (YYYY-MM-DD)
+            return_date: Date de retour (None = aller simple)
+
+        Returns:
+            (calendrier du mois de départ {date: prix}, vols au format de
+            db_manager.save_flights)
+        """
+        origin, destination = Validators.validate_route(origin, destination)
+        departure = date.fromisoformat(departure_date)
+        if return_date and date.fromisoformat(return_date) < departure:
+            raise ValueError("return_date doit être après departure_date")
+
+        url = self._build_url(origin, destination, departure_date, return_date) if return_date \
+            else self._build_url(origin, destination)
+        month_name = self._month_name(departure.month)
+        self.recoveries = 0
+
+        try:
+            logger.info(f"🛫 Vols {origin} → {destination} le {departure_date}"
+                        f"{f' (retour {return_date})' if return_date else ''}")
+            self._progress("month", month_index=1, months_total=1)
+            calendar = self._with_recovery(lambda: self._scrape_month(month_name, departure.year), url) or {}
+
+            flights = self._with_recovery(lambda: self._scrape_results(departure_date, return_date), url)
+            self._progress("done")
+
+            logger.info(f"✅ {len(flights)} vols, {len(calendar)} prix du calendrier ({month_name} {departure.year})")
+            return calendar, flights
+
         except Exception as e:
             logger.error(f"❌ Erreur: {e}", exc_info=True)
             self._save_screenshot("error")
@@ -627,13 +907,15 @@ class CalendarScraper:
             # Initialiser le WebDriver
             self.driver = self.driver_manager.create_driver()
             self.wait = self.driver_manager.wait
+            if settings.cdp_transport:
+                self.driver_manager.open_cdp_session()
 
             # Charger la page Google Flights
             url = self._build_url(origin, destination)
             logger.info(f"🌐 Navigation: {origin} → {destination}")
             logger.debug(f"URL: {url}")
 
-            self.driver.get(url)
+            self._navigate(url)
             time.sleep(5)
 
             # Gérer les popups de consentement
@@ -647,6 +929,7 @@ class CalendarScraper:
             # Ouvrir le calendrier
             logger.info("📅 Ouverture du calendrier...")
             if not self._open_calendar():
+                self._check_page_state()
                 self._save_screenshot("calendar_not_opened")
                 raise CalendarNotFoundError("Impossible d'ouvrir le calendrier")
 
@@ -696,7 +979,7 @@ class CalendarScraper:
                 logger.warning("⚠️ Aucun prix trouvé")
                 self._save_screenshot("no_prices_found")
 
-        except CalendarNotFoundError:
+        except (CalendarNotFoundError, BlockedError):
             raise
         except PriceExtractionError:
             raise
@@ -712,6 +995,13 @@ class CalendarScraper:
     def close(self):
         """Ferme proprement le WebDriver"""
         if self.driver_manager:
+            if self.driver_manager.driver:
+                self.transfer_stats = self.driver_manager.get_transfer_stats()
+                for transport, stats in self.command_stats.items():
+                    logger.info(
+                        f"⚡ {stats['commands']} scripts via {transport}, "
+                        f"moyenne {stats['seconds'] / stats['commands'] * 1000:.1f}ms"
+                    )
             self.driver_manager.close()
             self.driver = None
             self.wait = None
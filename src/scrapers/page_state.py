@@ -0,0 +1,74 @@
+"""
+Détection rapide de l'état de la page Google après navigation
+
+Une seule requête DOM (execute_script) classe la page en consentement,
+blocage "trafic inhabituel", captcha ou page normale, au lieu d'attendre
+l'épuisement des timeouts des sélecteurs du calendrier.
+"""
+
+from ..core.exceptions import BlockedError, CaptchaError
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+PAGE_NORMAL = "normal"
+PAGE_CONSENT = "consent"
+PAGE_BLOCK = "block"
+PAGE_CAPTCHA = "captcha"
+
+# Textes de l'interstitiel /sorry/ (fr + en)
+BLOCK_PATTERNS = [
+    "unusual traffic",
+    "trafic inhabituel",
+    "trafic exceptionnel",
+    "not a robot",
+    "pas un robot",
+]
+
+PAGE_STATE_SCRIPT = """
+const captcha = document.querySelector(
+    '#captcha-form, .g-recaptcha, iframe[src*="recaptcha"], iframe[title*="reCAPTCHA"]'
+);
+if (location.hostname.startsWith('consent.') || document.querySelector('form[action*="consent.google"]')) {
+    return 'consent';
+}
+if (captcha) {
+    return 'captcha';
+}
+if (location.pathname.startsWith('/sorry/')) {
+    return 'block';
+}
+const text = ((document.body && document.body.innerText) || '').slice(0, 3000).toLowerCase();
+return arguments[0].some(p => text.includes(p)) ? 'block' : 'normal';
+"""
+
+
+def detect_page_state(driver) -> str:
+    """
+    Classe la page courante
+
+    Returns:
+        PAGE_NORMAL, PAGE_CONSENT, PAGE_BLOCK ou PAGE_CAPTCHA
+    """
+    try:
+        state = driver.execute_script(PAGE_STATE_SCRIPT, BLOCK_PATTERNS)
+    except Exception as e:
+        logger.debug(f"Détection état page impossible: {e}")
+        return PAGE_NORMAL
+    return state or PAGE_NORMAL
+
+
+def raise_for_page_state(state: str, proxy: str = None):
+    """
+    Lève l'exception typée correspondant à une page de blocage
+
+    Raises:
+        CaptchaError: Captcha servi
+        BlockedError: Interstitiel "trafic inhabituel"
+    """
+    details = {"page_state": state, "proxy": proxy}
+    if state == PAGE_CAPTCHA:
+        raise CaptchaError("Captcha Google détecté", details=details)
+    if state == PAGE_BLOCK:
+        raise BlockedError("Page de blocage Google (trafic inhabituel)", details=details)
@@ -0,0 +1,577 @@
+"""
+Moteur de scraping Playwright asynchrone: un navigateur, plusieurs contextes
+
+Avec SCRAPER_ENGINE=playwright, les scrapings ne lancent plus un process
+Python + Chrome chacun: un seul Chromium héberge un contexte isolé
+(cookies, cache, proxy) par scraping, tous pilotés depuis une boucle
+asyncio dédiée du process. Le parcours du calendrier et l'extraction sont
+ceux du moteur Selenium (calendar_extraction); seule l'exécution des
+scripts change.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from ..core.circuit_breaker import circuit_breakers
+from ..core.config import settings
+from ..core.driver_manager import STEALTH_SCRIPTS, TRANSFER_STATS_SCRIPT, DriverManager
+from ..core.exceptions import BlockedError, CalendarNotFoundError, DriverInitializationError, PreemptedError
+from ..core.pacing import pacing_controller
+from ..core.proxy_pool import (
+    proxy_pool,
+    OUTCOME_SUCCESS,
+    OUTCOME_FAILURE,
+    OUTCOME_TIMEOUT,
+    OUTCOME_BLOCKED,
+    OUTCOME_CANCELLED,
+)
+from ..utils.logger import get_logger
+from ..utils.validators import Validators
+from .calendar_extraction import (
+    CLICK_NAV_SCRIPT,
+    GOOGLE_FLIGHTS_URL,
+    GRID_CELLS_SCRIPT,
+    MONTH_GROUPS_SCRIPT,
+    NAV_FOUND,
+    NAV_NEXT,
+    NAV_PREV,
+    NAV_RETRY,
+    NEXT_LABEL,
+    OPEN_CALENDAR_SELECTORS,
+    POPUP_SELECTORS,
+    PREV_LABEL,
+    SCROLL_TO_MONTH_SCRIPT,
+    build_url,
+    cells_to_prices,
+    count_priced_cells,
+    month_navigation,
+    month_prefix,
+    months_in_range,
+    page_function,
+)
+from .page_state import BLOCK_PATTERNS, PAGE_CONSENT, PAGE_NORMAL, PAGE_STATE_SCRIPT, raise_for_page_state
+
+logger = get_logger(__name__)
+
+# Dépendance optionnelle (pip install playwright && playwright install chromium)
+PLAYWRIGHT_AVAILABLE = False
+async_playwright = None
+
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    pass
+
+
+SCRAPER_ENGINE_SELENIUM = "selenium"
+SCRAPER_ENGINE_PLAYWRIGHT = "playwright"
+
+# Arguments de lancement alignés sur DriverManager
+CHROMIUM_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-gpu',
+    '--disable-notifications',
+    '--disable-popup-blocking',
+    '--lang=fr-FR',
+]
+
+
+class AsyncCalendarScraper:
+    """
+    Parcours du calendrier sur une page Playwright (un contexte par scraping)
+
+    Mêmes étapes, délais et heartbeats que CalendarScraper.
+    """
+
+    base_url = GOOGLE_FLIGHTS_URL
+
+    def __init__(
+            self,
+            page,
+            proxy: Optional[str] = None,
+            progress_callback: Optional[Callable] = None,
+            should_stop: Optional[Callable[[], bool]] = None
+    ):
+        self.page = page
+        self.proxy = proxy
+        self.progress_callback = progress_callback
+        self.should_stop = should_stop
+        self._stage: Optional[str] = None
+        self.prices: Dict[str, float] = {}
+        self.transfer_stats: Dict = {}
+        self.page_load_seconds: Optional[float] = None
+
+    # ==================== UTILITIES ====================
+
+    async def _run(self, script: str, *args):
+        """Exécute un script au format execute_script"""
+        return await self.page.evaluate(page_function(script), list(args))
+
+    def _progress(self, stage: Optional[str] = None, **info):
+        """Signale une étape ou un progrès (None = activité dans l'étape courante)"""
+        if stage is not None:
+            self._stage = stage
+        if self.progress_callback:
+            try:
+                self.progress_callback(stage, **info)
+            except Exception as e:
+                logger.debug(f"Erreur heartbeat: {e}")
+
+    async def _pace(self, cost: float = 1.0):
+        """Jeton du contrôleur de cadence, attendu hors de la boucle asyncio"""
+        if cost <= 0 or not pacing_controller.enabled:
+            return
+        previous = self._stage
+        self._progress("pacing")
+        await asyncio.to_thread(
+            pacing_controller.acquire, cost, settings.pacing_max_wait_seconds, self.proxy
+        )
+        self._progress(previous)
+
+    async def _navigate(self, url: str):
+        """Charge une page après accord du contrôleur de cadence global"""
+        await self._pace()
+        self._progress("navigate")
+        started = time.time()
+        await self.page.goto(url, wait_until="load", timeout=settings.timeout * 1000)
+        self.page_load_seconds = time.time() - started
+        await self._check_page_state()
+
+    async def _detect_page_state(self) -> str:
+        try:
+            return await self._run(PAGE_STATE_SCRIPT, BLOCK_PATTERNS) or PAGE_NORMAL
+        except Exception as e:
+            logger.debug(f"Détection état page impossible: {e}")
+            return PAGE_NORMAL
+
+    async def _check_page_state(self):
+        """Classe la page (un seul script) et échoue vite si Google bloque"""
+        state = await self._detect_page_state()
+        if state == PAGE_CONSENT:
+            await self._handle_consent()
+            state = await self._detect_page_state()
+
+        if state != PAGE_NORMAL:
+            logger.warning(f"🚫 Page {state} ({self.proxy or 'direct'})")
+        raise_for_page_state(state, self.proxy)
+
+    # ==================== POPUPS & CONSENT ====================
+
+    async def _handle_consent(self):
+        """Gère la page de consentement Google"""
+        try:
+            if "consent.google.com" in self.page.url:
+                await self.page.locator("button:has-text('Tout accepter')").first.click(
+                    timeout=settings.timeout * 1000
+                )
+                await asyncio.sleep(2)
+                logger.debug("✓ Consentement accepté")
+        except Exception as e:
+            logger.debug(f"Pas de page de consentement ou erreur: {e}")
+
+    async def _handle_popups(self) -> bool:
+        """Ferme les popups de cookies sur la page principale"""
+        for selector in POPUP_SELECTORS:
+            locator = self.page.locator(f"xpath={selector}" if selector.startswith('//') else selector).first
+            try:
+                if await locator.count():
+                    await locator.click(timeout=2000)
+                    logger.debug("✓ Popup cookies fermé")
+                    await asyncio.sleep(random.uniform(1, 2))
+                    return True
+            except Exception:
+                continue
+        return False
+
+    # ==================== CALENDAR NAVIGATION ====================
+
+    async def _open_calendar(self) -> bool:
+        """Ouvre le calendrier en cliquant sur le champ Départ"""
+        try:
+            await self.page.locator(", ".join(OPEN_CALENDAR_SELECTORS)).first.click(
+                timeout=settings.timeout * 1000
+            )
+            await asyncio.sleep(2.0)
+            return True
+        except Exception as e:
+            logger.warning(f"Impossible d'ouvrir le calendrier: {e}")
+            return False
+
+    async def _click_nav_button(self, label: str) -> bool:
+        await self._pace(settings.pacing_nav_cost)
+        try:
+            if await self._run(CLICK_NAV_SCRIPT, label):
+                self._progress()
+                return True
+            return False
+        except Exception as e:
+            logger.debug(f"Erreur clic {label}: {e}")
+            return False
+
+    async def _focus_on_month(self, year: int, month: int, max_attempts: int = 60) -> bool:
+        """Navigue vers le mois cible (scroll ou clic Suivant/Précédent)"""
+        for _ in range(max_attempts):
+            groups = await self._run(MONTH_GROUPS_SCRIPT) or []
+            action, group = month_navigation(groups, year, month)
+
+            if action == NAV_FOUND:
+                await self._run(SCROLL_TO_MONTH_SCRIPT, month_prefix(year, month))
+                await asyncio.sleep(0.8)
+                return True
+            if action == NAV_RETRY:
+                await asyncio.sleep(0.5)
+                continue
+            if action in (NAV_PREV, NAV_NEXT):
+                if not await self._click_nav_button(PREV_LABEL if action == NAV_PREV else NEXT_LABEL):
+                    return False
+                await asyncio.sleep(1.0)
+                continue
+
+            await self._run(SCROLL_TO_MONTH_SCRIPT, month_prefix(group["year"], group["month"]))
+            await asyncio.sleep(0.8)
+
+        logger.warning(f"Impossible d'afficher {year}-{month:02d} après {max_attempts} tentatives")
+        return False
+
+    # ==================== PRICE EXTRACTION ====================
+
+    async def _extract_prices_for_month(self, year: int, month: int,
+                                        min_cells: int = 4, timeout: float = 7.0) -> Dict[str, float]:
+        """Attend que le mois ait des prix puis les extrait"""
+        prefix = month_prefix(year, month)
+        deadline = time.time() + timeout
+        cells = await self._run(GRID_CELLS_SCRIPT, prefix) or []
+        while count_priced_cells(cells) < min_cells and time.time() < deadline:
+            await asyncio.sleep(0.3)
+            cells = await self._run(GRID_CELLS_SCRIPT, prefix) or []
+
+        if count_priced_cells(cells) < min_cells:
+            logger.warning(f"Peu de cellules avec prix détectées pour {year}-{month:02d}")
+        prices = cells_to_prices(cells, year, month)
+        self._progress()
+        return prices
+
+    # ==================== MAIN SCRAPE METHOD ====================
+
+    async def scrape_date_range(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str
+    ) -> Dict[str, float]:
+        """
+        Scrape les prix pour une plage de dates (voir CalendarScraper)
+
+        Returns:
+            Dict {date: prix}
+        """
+        origin, destination = Validators.validate_route(origin, destination)
+        months = months_in_range(start_date, end_date)
+        all_prices = {}
+
+        try:
+            await self._navigate(build_url(origin, destination, self.base_url))
+            await asyncio.sleep(5)
+
+            await self._handle_consent()
+            await asyncio.sleep(1)
+            await self._handle_popups()
+            await asyncio.sleep(1)
+
+            self._progress("open_calendar")
+            if not await self._open_calendar():
+                await self._check_page_state()
+                raise CalendarNotFoundError("Impossible d'ouvrir le calendrier")
+
+            for idx, (year, month) in enumerate(months, 1):
+                # Préemption: on rend les mois déjà faits, la suite sera reprise
+                if idx > 1 and self.should_stop and self.should_stop():
+                    resume_from = max(start_date, f"{year:04d}-{month:02d}-01")
+                    partial = {d: p for d, p in all_prices.items() if start_date <= d < resume_from}
+                    raise PreemptedError(
+                        f"Préempté avant {year}-{month:02d}", prices=partial, resume_from=resume_from
+                    )
+
+                self._progress("month", month_index=idx, months_total=len(months))
+                if not await self._focus_on_month(year, month):
+                    logger.warning(f"⚠️ Skip {year}-{month:02d}")
+                    continue
+
+                all_prices.update(await self._extract_prices_for_month(year, month))
+                await asyncio.sleep(0.5)
+
+            self._progress("done")
+            self.prices = {d: p for d, p in all_prices.items() if start_date <= d <= end_date}
+            return self.prices
+
+        finally:
+            try:
+                self.transfer_stats = await self._run(TRANSFER_STATS_SCRIPT) or {}
+            except Exception:
+                pass
+
+
+class PlaywrightEngine:
+    """
+    Chromium partagé et boucle asyncio dédiée
+
+    Les scrapings sont soumis depuis n'importe quel thread (scrape) ou
+    depuis la boucle (scrape_async); au plus max_contexts contextes sont
+    ouverts en même temps. Le navigateur est lancé au premier scraping et
+    relancé s'il meurt.
+    """
+
+    def __init__(self, max_contexts: Optional[int] = None, headless: Optional[bool] = None):
+        self.max_contexts = max_contexts or settings.playwright_max_contexts
+        self.headless = settings.headless if headless is None else headless
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._playwright = None
+        self._browser = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.active = 0
+        self.scrapes = 0
+        self.failures = 0
+        self.browser_launches = 0
+
+    # ==================== BOUCLE & NAVIGATEUR ====================
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Démarre la boucle asyncio du moteur (thread démon)"""
+        if not PLAYWRIGHT_AVAILABLE:
+            raise DriverInitializationError(
+                "Playwright non installé (pip install playwright && playwright install chromium)"
+            )
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="playwright-engine", daemon=True)
+                self._thread.start()
+        return self._loop
+
+    async def _ensure_browser(self):
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_contexts)
+
+        async with self._browser_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            try:
+                self._browser = await self._playwright.chromium.launch(headless=self.headless, args=CHROMIUM_ARGS)
+            except Exception as e:
+                raise DriverInitializationError(f"Impossible de lancer Chromium: {e}")
+            self.browser_launches += 1
+            logger.info(f"✓ Chromium Playwright lancé ({self.max_contexts} contextes max)")
+            return self._browser
+
+    async def _new_context(self, browser, proxy: Optional[str]):
+        """Contexte isolé avec les mêmes réglages anti-détection que DriverManager"""
+        user_agents = DriverManager.USER_AGENTS
+        context = await browser.new_context(
+            user_agent=random.choice(user_agents) if settings.random_user_agent else user_agents[0],
+            locale="fr-FR",
+            viewport={"width": 1920, "height": 1080},
+            extra_http_headers={"Accept-Language": "fr-FR,fr,en-US,en"},
+            proxy={"server": proxy} if proxy else None,
+        )
+        context.set_default_timeout(settings.timeout * 1000)
+        for source in STEALTH_SCRIPTS:
+            await context.add_init_script(source)
+        return context
+
+    # ==================== SCRAPING ====================
+
+    async def scrape_async(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            proxy: Optional[str] = None,
+            progress_callback: Optional[Callable] = None,
+            should_stop: Optional[Callable[[], bool]] = None
+    ) -> AsyncCalendarScraper:
+        """
+        Scrape une plage dans un contexte dédié (à appeler depuis la boucle du moteur)
+
+        Returns:
+            Le scraper terminé (prix dans .prices, mesures réseau)
+        """
+        browser = await self._ensure_browser()
+        async with self._semaphore:
+            self.active += 1
+            context = None
+            try:
+                context = await self._new_context(browser, proxy)
+                page = await context.new_page()
+                scraper = AsyncCalendarScraper(page, proxy, progress_callback, should_stop)
+                await scraper.scrape_date_range(origin, destination, start_date, end_date)
+                self.scrapes += 1
+                return scraper
+            except Exception:
+                self.failures += 1
+                raise
+            finally:
+                self.active -= 1
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Exécute une coroutine sur la boucle du moteur (bloquant, thread appelant)"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def scrape(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            timeout: Optional[float] = None
+    ) -> Dict[str, float]:
+        """
+        Scrape une plage (bloquant), avec proxy du pool et disjoncteurs
+
+        Raises:
+            TimeoutError: Scraping plus long que timeout (contexte fermé)
+            BlockedError, CaptchaError: Page de blocage Google
+            RateLimitError: Pas de proxy libre / disjoncteur ouvert
+        """
+        self._ensure_loop()
+        proxy = proxy_pool.acquire()
+        try:
+            circuit_breakers.before_job(proxy)
+        except Exception:
+            proxy_pool.release(proxy, OUTCOME_CANCELLED)
+            raise
+
+        outcome, scraper = OUTCOME_FAILURE, None
+        try:
+            scraper = self.run(self.scrape_async(origin, destination, start_date, end_date, proxy), timeout)
+            outcome = OUTCOME_SUCCESS
+            return scraper.prices
+        except TimeoutError:
+            outcome = OUTCOME_TIMEOUT
+            raise TimeoutError(f"Scraping Playwright {origin}->{destination} timeout ({timeout}s)")
+        except BlockedError:
+            outcome = OUTCOME_BLOCKED
+            raise
+        finally:
+            circuit_breakers.record(proxy, outcome)
+            stats = dict(scraper.transfer_stats) if scraper else {}
+            latency = scraper.page_load_seconds if scraper else None
+            proxy_pool.release(proxy, outcome, latency_seconds=latency, stats=stats)
+
+    def get_stats(self) -> Dict:
+        """Contextes ouverts et compteurs"""
+        return {
+            'available': PLAYWRIGHT_AVAILABLE,
+            'running': self._loop is not None,
+            'max_contexts': self.max_contexts,
+            'active_contexts': self.active,
+            'scrapes': self.scrapes,
+            'failures': self.failures,
+            'browser_launches': self.browser_launches,
+        }
+
+    async def _close(self):
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def shutdown(self):
+        """Ferme le navigateur et arrête la boucle"""
+        if self._loop is None:
+            return
+        try:
+            self.run(self._close(), timeout=10)
+        except Exception as e:
+            logger.debug(f"Erreur fermeture Playwright: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+
+class PlaywrightCalendarScraper:
+    """
+    Même interface que CalendarScraper, exécutée sur le moteur Playwright
+
+    Args:
+        engine: Moteur partagé (défaut: playwright_engine); headless est
+            réglé au niveau du moteur
+    """
+
+    def __init__(
+            self,
+            headless: Optional[bool] = None,
+            proxy: Optional[str] = None,
+            progress_callback: Optional[Callable] = None,
+            should_stop: Optional[Callable[[], bool]] = None,
+            engine: Optional[PlaywrightEngine] = None
+    ):
+        self.engine = engine or playwright_engine
+        self.proxy = proxy
+        self.progress_callback = progress_callback
+        self.should_stop = should_stop
+        self.transfer_stats: Dict = {}
+        self.page_load_seconds: Optional[float] = None
+
+    def scrape_date_range(self, origin: str, destination: str, start_date: str, end_date: str) -> Dict[str, float]:
+        """Scrape les prix pour une plage de dates (bloquant)"""
+        scraper = self.engine.run(self.engine.scrape_async(
+            origin, destination, start_date, end_date,
+            self.proxy, self.progress_callback, self.should_stop
+        ))
+        self.transfer_stats = scraper.transfer_stats
+        self.page_load_seconds = scraper.page_load_seconds
+        return scraper.prices
+
+    def scrape_many(self, routes: List[tuple]) -> List:
+        """
+        Scrape plusieurs plages en parallèle dans un seul navigateur
+
+        Args:
+            routes: [(origin, destination, start_date, end_date), ...]
+
+        Returns:
+            Dict {date: prix} ou exception, par route
+        """
+        async def gather():
+            results = await asyncio.gather(
+                *(self.engine.scrape_async(*route, self.proxy) for route in routes),
+                return_exceptions=True
+            )
+            return [r if isinstance(r, BaseException) else r.prices for r in results]
+
+        return self.engine.run(gather())
+
+    def close(self):
+        """Le navigateur est partagé: rien à fermer par scraper"""
+
+
+# Instance globale
+playwright_engine = PlaywrightEngine()
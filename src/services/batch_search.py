@@ -0,0 +1,252 @@
+"""
+Calendrier des prix de plusieurs routes en une requête (trip planner)
+
+Les codes métropole (PAR, NYC, ...) sont développés en routes aéroport →
+aéroport comme pour une route seule (voir metro_search): chaque route
+demandée est rendue au minimum par date de ses routes aéroport. Le cache est lu comme pour une route seule (mémoire, TTL adaptatif,
+stale-while-revalidate), la base en une seule requête SQL pour toutes
+les routes. Une route en cache mais stale est servie et rafraîchie en
+arrière-plan; une route absente ou dont un mois n'a aucun prix est
+scrapée. Les routes à scraper sont regroupées par origine puis découpées
+en sessions de BATCH_SESSION_MAX_ROUTES destinations: une session = un
+job = un Chrome qui enchaîne ses destinations. Les sessions tournent en
+parallèle (au plus la capacité du pool) et chaque route est rendue dès
+que sa session finit (une route métropole, quand toutes ses routes
+aéroport sont connues).
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..core.config import settings
+from ..core.scraper_pool import scraper_pool
+from ..database.manager import db_manager
+from ..scrapers.playwright_scraper import SCRAPER_ENGINE_PLAYWRIGHT
+from ..utils.logger import get_logger
+from .calendar_service import DEFAULT_SCRAPE_TIMEOUT, scrape_destinations_and_store
+from .job_queue import job_queue
+from .metro_search import expand_route, merge_min
+from .prewarm_scheduler import prewarm_scheduler
+from .refresh_queue import refresh_queue
+
+logger = get_logger(__name__)
+
+Route = Tuple[str, str]
+
+STATUS_CACHED = "cached"
+STATUS_SCRAPED = "scraped"
+STATUS_ERROR = "error"
+
+
+class RouteOutcome(NamedTuple):
+    """Résultat d'une route aéroport → aéroport du batch"""
+    status: str
+    prices: Dict[str, float]
+    stale: bool = False
+    error: Optional[str] = None
+
+
+def expand_routes(routes: List[Route]) -> Dict[Route, List[Route]]:
+    """
+    Routes aéroport de chaque route demandée (doublons retirés, ordre conservé)
+
+    Raises:
+        ValueError: Voir expand_route
+    """
+    return {route: expand_route(*route) for route in dict.fromkeys(routes)}
+
+
+def group_by_origin(routes: List[Route], max_per_session: int) -> List[Tuple[str, List[str]]]:
+    """
+    Sessions (origine, destinations) pour des routes à scraper
+
+    Ordre des routes conservé; une origine avec plus de max_per_session
+    destinations est répartie sur plusieurs sessions.
+    """
+    by_origin: Dict[str, List[str]] = {}
+    for origin, destination in routes:
+        by_origin.setdefault(origin, []).append(destination)
+
+    return [
+        (origin, destinations[i:i + max_per_session])
+        for origin, destinations in by_origin.items()
+        for i in range(0, len(destinations), max_per_session)
+    ]
+
+
+def route_event(
+        route: Route,
+        status: str,
+        prices: Dict[str, float] = None,
+        error: str = None,
+        stale: bool = False,
+        winners: Optional[Dict[str, Route]] = None
+) -> Dict:
+    """Ligne du flux NDJSON pour une route (winners: route du prix minimum par date, requête métropole)"""
+    prices = prices or {}
+    return {
+        "origin": route[0],
+        "destination": route[1],
+        "status": status,
+        "stale": stale,
+        "prices": prices,
+        "total_dates": len(prices),
+        "min_price": min(prices.values()) if prices else None,
+        "routes": {d: f"{o}-{dest}" for d, (o, dest) in winners.items()} if winners else None,
+        "error": error,
+    }
+
+
+def merge_event(route: Route, airport_routes: List[Route], outcomes: Dict[Route, RouteOutcome]) -> Dict:
+    """
+    Ligne d'une route demandée à partir de ses routes aéroport
+
+    Comme metro_search: les routes en échec sont ignorées tant qu'une
+    route a des prix; scrapée dès qu'une route l'a été, stale dès qu'une
+    route servie l'est.
+    """
+    parts = [outcomes[r] for r in airport_routes]
+    found = {r: outcomes[r].prices for r in airport_routes if outcomes[r].prices}
+    if not found:
+        errors = [part.error for part in parts if part.error]
+        return route_event(route, STATUS_ERROR, error=errors[0] if errors else "Destination en échec")
+
+    prices, winners = merge_min(found)
+    status = STATUS_SCRAPED if any(part.status == STATUS_SCRAPED for part in parts) else STATUS_CACHED
+    return route_event(
+        route, status, prices,
+        stale=any(part.stale for part in parts),
+        winners=winners if len(airport_routes) > 1 else None
+    )
+
+
+class BatchSearch:
+    """Cache groupé puis sessions Chrome partagées par origine"""
+
+    def _scrape_session(
+            self,
+            origin: str,
+            destinations: List[str],
+            start_date: str,
+            end_date: str,
+            timeout: float
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Une session: un job pour toutes les destinations
+
+        La file en base (workers distants) et le moteur Playwright (un
+        navigateur partagé par process) gardent un job par route.
+        """
+        if not job_queue.enabled and settings.scraper_engine != SCRAPER_ENGINE_PLAYWRIGHT:
+            return scrape_destinations_and_store(origin, destinations, start_date, end_date, timeout)
+
+        results, last_error = {}, None
+        for destination in destinations:
+            try:
+                results[destination] = job_queue.scrape(origin, destination, start_date, end_date, timeout)
+            except Exception as e:
+                logger.warning(f"⚠️ {origin} → {destination} en échec: {e}")
+                last_error = e
+        if not results and last_error is not None:
+            raise last_error
+        return results
+
+    def stream(
+            self,
+            routes: List[Route],
+            start_date: str,
+            end_date: str,
+            force_refresh: bool = False,
+            timeout: float = DEFAULT_SCRAPE_TIMEOUT
+    ) -> Iterator[Dict]:
+        """
+        Résultats route par route, au fil de l'eau (bloquant)
+
+        Les routes en cache sortent d'abord, puis celles de chaque session
+        à sa fin; une dernière ligne {"done": true, ...} résume le batch.
+
+        Raises:
+            ValueError: Voir expand_route (avant la première ligne)
+        """
+        start_time = time.time()
+        expanded = expand_routes(routes)
+        airport_routes = list(dict.fromkeys(r for parts in expanded.values() for r in parts))
+        for origin, destination in airport_routes:
+            prewarm_scheduler.record_request(origin, destination, start_date, end_date)
+
+        cached = {} if force_refresh else db_manager.lookup_calendar_prices_batch(airport_routes, start_date, end_date)
+        outcomes: Dict[Route, RouteOutcome] = {}
+        pending = dict(expanded)
+        counts = {STATUS_CACHED: 0, STATUS_SCRAPED: 0, STATUS_ERROR: 0}
+        stale_routes = 0
+        misses: List[Route] = []
+
+        def ready() -> Iterator[Dict]:
+            """Routes demandées dont toutes les routes aéroport sont connues"""
+            nonlocal stale_routes
+            for route, parts in list(pending.items()):
+                if all(part in outcomes for part in parts):
+                    del pending[route]
+                    event = merge_event(route, parts, outcomes)
+                    counts[event["status"]] += 1
+                    stale_routes += event["stale"]
+                    yield event
+
+        for route in airport_routes:
+            prices, stale_months, missing_months = cached.get(route, (None, [], []))
+            # Absente ou partiellement couverte: scrapée avec la session de son origine
+            if not prices or missing_months:
+                misses.append(route)
+                continue
+            if stale_months:
+                refresh_queue.schedule_months(route[0], route[1], start_date, end_date, stale_months)
+            outcomes[route] = RouteOutcome(STATUS_CACHED, prices, stale=bool(stale_months))
+        yield from ready()
+
+        sessions = group_by_origin(misses, settings.batch_session_max_routes)
+        logger.info(
+            f"📦 Batch: {len(expanded)} routes ({len(airport_routes)} aéroport → aéroport), "
+            f"{len(airport_routes) - len(misses)} en cache, {len(misses)} à scraper en {len(sessions)} sessions"
+        )
+
+        if sessions:
+            # Une session occupe un slot du pool: pas plus de threads que de slots
+            workers = min(len(sessions), max(1, scraper_pool.capacity()))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as executor:
+                futures = {
+                    executor.submit(self._scrape_session, origin, destinations, start_date, end_date, timeout):
+                        (origin, destinations)
+                    for origin, destinations in sessions
+                }
+                for future in as_completed(futures):
+                    origin, destinations = futures[future]
+                    try:
+                        results = future.result()
+                        error = None
+                    except Exception as e:
+                        logger.warning(f"⚠️ Session {origin} ({', '.join(destinations)}) en échec: {e}")
+                        results, error = {}, str(e)
+
+                    for destination in destinations:
+                        if destination in results:
+                            outcomes[(origin, destination)] = RouteOutcome(STATUS_SCRAPED, results[destination])
+                        else:
+                            outcomes[(origin, destination)] = RouteOutcome(
+                                STATUS_ERROR, {}, error=error or "Destination en échec"
+                            )
+                    yield from ready()
+
+        duration = time.time() - start_time
+        logger.info(
+            f"✓ Batch terminé: {counts[STATUS_CACHED]} en cache, {counts[STATUS_SCRAPED]} scrapées, "
+            f"{counts[STATUS_ERROR]} en échec ({duration:.1f}s)"
+        )
+        yield {
+            "done": True, "routes": len(expanded), **counts, "stale": stale_routes,
+            "duration_seconds": round(duration, 2),
+        }
+
+
+# Instance globale
+batch_search = BatchSearch()
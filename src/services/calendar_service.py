@@ -0,0 +1,426 @@
+"""
+Service de scraping du calendrier (aller simple, plusieurs destinations en
+une session, grille aller-retour) et de la liste des vols: soumission au
+pool, sauvegarde et log
+
+Avec SCRAPER_ENGINE=playwright, le calendrier aller simple tourne dans un
+contexte du navigateur partagé de ce process au lieu d'un worker du
+ScraperPool.
+"""
+
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from ..core.config import settings
+from ..core.exceptions import PreemptedError
+from ..core.job_scheduler import priority_for_trigger
+from ..core.scraper_pool import scraper_pool
+from ..database.manager import db_manager
+from ..scrapers.playwright_scraper import SCRAPER_ENGINE_PLAYWRIGHT, playwright_engine
+from ..utils.logger import get_logger
+from .price_cache import month_last_day
+from .ttl_policy import ttl_policy
+
+logger = get_logger(__name__)
+
+
+# Timeout par défaut d'un job de scraping (secondes)
+DEFAULT_SCRAPE_TIMEOUT = 300
+
+
+def _record_recoveries(params: Dict, job_id: Optional[str]) -> Dict:
+    """
+    Ajoute aux params du log le nombre de drivers recréés par le worker
+
+    Returns:
+        Stats du worker pour le job (vide si pas de job ou pas de résultat)
+    """
+    stats = scraper_pool.pop_job_stats(job_id) if job_id else {}
+    recoveries = stats.get("recoveries")
+    if recoveries:
+        params["driver_recoveries"] = recoveries
+    return stats
+
+
+def _destination_seconds(stats: Dict, destination: str, session_seconds: float, batch_size: int) -> float:
+    """
+    Durée d'une destination d'une session partagée
+
+    Temps relevé par le worker, sinon une part égale de la session
+    (worker sans ce relevé, ou destination jamais atteinte).
+    """
+    seconds = (stats.get("destination_seconds") or {}).get(destination)
+    if seconds is not None:
+        return seconds
+    return session_seconds / max(1, batch_size)
+
+
+def scrape_and_store(
+        origin: str,
+        destination: str,
+        start_date: str,
+        end_date: str,
+        timeout: float = DEFAULT_SCRAPE_TIMEOUT,
+        trigger: str = "interactive",
+        prune_missing: bool = False,
+        launch_profile: Optional[str] = None
+) -> Dict[str, float]:
+    """
+    Scrape une plage via le pool, sauvegarde les prix et log le résultat
+
+    Bloquant: à appeler depuis un thread (run_in_executor côté API).
+    La classe de priorité du job découle du trigger; l'échéance est le
+    timeout.
+
+    Args:
+        origin: Code IATA départ
+        destination: Code IATA arrivée
+        start_date: Date début (YYYY-MM-DD)
+        end_date: Date fin (YYYY-MM-DD)
+        timeout: Timeout du job en secondes
+        trigger: Origine de la demande (interactive, stale_refresh, ...)
+        prune_missing: Supprimer les dates de la plage disparues du calendrier
+        launch_profile: Profil de lancement de Chrome (None = CHROME_LAUNCH_PROFILE)
+
+    Returns:
+        Dict {date: prix} (vide si aucun prix trouvé)
+
+    Raises:
+        TimeoutError: Si le job dépasse le timeout
+        PreemptedError: Job refresh/bulk interrompu (mois faits déjà sauvegardés)
+        Exception: Erreur remontée par le worker
+    """
+    start_time = time.time()
+    deadline = start_time + timeout
+    params = {"start_date": start_date, "end_date": end_date, "trigger": trigger}
+    if launch_profile:
+        params["launch_profile"] = launch_profile
+
+    job_id = None
+    try:
+        if settings.scraper_engine == SCRAPER_ENGINE_PLAYWRIGHT:
+            prices = playwright_engine.scrape(
+                origin, destination, start_date, end_date, timeout=max(1.0, deadline - time.time())
+            )
+        else:
+            job_id = scraper_pool.submit_scrape(
+                origin, destination, start_date, end_date,
+                priority=priority_for_trigger(trigger), deadline=deadline, launch_profile=launch_profile
+            )
+            prices = scraper_pool.wait_for_job(job_id, max(1.0, deadline - time.time()))
+
+    except PreemptedError as e:
+        _record_recoveries(params, job_id)
+        # Les mois terminés restent acquis, l'appelant replanifie le reste
+        done_until = (date.fromisoformat(e.resume_from) - timedelta(days=1)).isoformat()
+        if e.prices:
+            db_manager.save_calendar_prices(
+                origin, destination, e.prices, start_date, done_until, prune_missing=prune_missing
+            )
+        db_manager.log_scrape(
+            scrape_type="calendar",
+            origin=origin,
+            destination=destination,
+            success=False,
+            results_count=len(e.prices),
+            error_message=str(e),
+            started_at=datetime.fromtimestamp(start_time),
+            duration_seconds=time.time() - start_time,
+            params={**params, "preempted": True, "resume_from": e.resume_from}
+        )
+        raise
+
+    except Exception as e:
+        _record_recoveries(params, job_id)
+        db_manager.log_scrape(
+            scrape_type="calendar",
+            origin=origin,
+            destination=destination,
+            success=False,
+            error_message=str(e),
+            started_at=datetime.fromtimestamp(start_time),
+            duration_seconds=time.time() - start_time,
+            params=params
+        )
+        raise
+
+    duration = time.time() - start_time
+    _record_recoveries(params, job_id)
+
+    if prices:
+        db_manager.save_calendar_prices(
+            origin, destination, prices, start_date, end_date, prune_missing=prune_missing
+        )
+        change_rate = ttl_policy.pop_last_observation(origin, destination)
+        if change_rate is not None:
+            params["price_change_rate"] = round(change_rate, 6)
+
+    db_manager.log_scrape(
+        scrape_type="calendar",
+        origin=origin,
+        destination=destination,
+        success=bool(prices),
+        results_count=len(prices),
+        error_message=None if prices else "Aucun prix trouvé",
+        started_at=datetime.fromtimestamp(start_time),
+        duration_seconds=duration,
+        params=params
+    )
+
+    logger.info(f"✓ Scraping {origin}->{destination} terminé ({duration:.1f}s, trigger={trigger})")
+    return prices
+
+
+def scrape_round_trip_and_store(
+        origin: str,
+        destination: str,
+        start_date: str,
+        end_date: str,
+        trip_lengths: List[int],
+        timeout: float = DEFAULT_SCRAPE_TIMEOUT,
+        trigger: str = "interactive"
+) -> Dict[int, Dict[str, float]]:
+    """
+    Scrape une grille aller-retour (départ × durée) via le pool, la sauvegarde et log
+
+    Un seul job, donc un seul navigateur, pour toutes les durées (toujours
+    sur le moteur Selenium du pool).
+
+    Args:
+        trip_lengths: Durées de séjour en jours
+
+    Returns:
+        Dict {durée: {date de départ: prix}}
+
+    Raises:
+        TimeoutError: Si le job dépasse le timeout
+        Exception: Erreur remontée par le worker
+    """
+    start_time = time.time()
+    deadline = start_time + timeout
+    params = {
+        "start_date": start_date, "end_date": end_date,
+        "trip_lengths": trip_lengths, "trigger": trigger,
+    }
+
+    job_id = None
+    try:
+        job_id = scraper_pool.submit_scrape(
+            origin, destination, start_date, end_date,
+            priority=priority_for_trigger(trigger), deadline=deadline, trip_lengths=trip_lengths
+        )
+        result = scraper_pool.wait_for_job(job_id, max(1.0, deadline - time.time()))
+        grid = {int(length): prices for length, prices in result.items()}
+
+    except Exception as e:
+        _record_recoveries(params, job_id)
+        db_manager.log_scrape(
+            scrape_type="round_trip",
+            origin=origin,
+            destination=destination,
+            success=False,
+            error_message=str(e),
+            started_at=datetime.fromtimestamp(start_time),
+            duration_seconds=time.time() - start_time,
+            params=params
+        )
+        raise
+
+    duration = time.time() - start_time
+    _record_recoveries(params, job_id)
+    total = sum(len(prices) for prices in grid.values())
+
+    if total:
+        db_manager.save_round_trip_grid(origin, destination, start_date, end_date, grid)
+
+    db_manager.log_scrape(
+        scrape_type="round_trip",
+        origin=origin,
+        destination=destination,
+        success=bool(total),
+        results_count=total,
+        error_message=None if total else "Aucun prix trouvé",
+        started_at=datetime.fromtimestamp(start_time),
+        duration_seconds=duration,
+        params=params
+    )
+
+    logger.info(
+        f"✓ Grille {origin}<->{destination} terminée: {total} prix, {len(grid)} durées ({duration:.1f}s)"
+    )
+    return grid
+
+
+def scrape_flights_and_store(
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: Optional[str] = None,
+        timeout: float = DEFAULT_SCRAPE_TIMEOUT,
+        trigger: str = "interactive"
+) -> List[Dict]:
+    """
+    Liste des vols d'une date via le pool, sauvegardée avec le calendrier lu au passage
+
+    Le worker extrait le calendrier du mois de départ puis choisit la date
+    dans la même session: ces prix (aller simple, ou séjours de même durée
+    en aller-retour) alimentent aussi leur cache.
+
+    Args:
+        departure_date: Date de départ (YYYY-MM-DD)
+        return_date: Date de retour (None = aller simple)
+
+    Returns:
+        Vols au format de db_manager.save_flights (vide si aucun vol)
+
+    Raises:
+        TimeoutError: Si le job dépasse le timeout
+        Exception: Erreur remontée par le worker
+    """
+    start_time = time.time()
+    deadline = start_time + timeout
+    params = {"departure_date": departure_date, "return_date": return_date, "trigger": trigger}
+
+    # Plage du job: le mois de départ, à partir d'aujourd'hui
+    month_start = max(f"{departure_date[:7]}-01", date.today().isoformat())
+    month_end = month_last_day(departure_date[:7])
+
+    job_id = None
+    try:
+        job_id = scraper_pool.submit_scrape(
+            origin, destination, month_start, month_end,
+            priority=priority_for_trigger(trigger), deadline=deadline,
+            flight_dates=[departure_date, return_date] if return_date else [departure_date]
+        )
+        result = scraper_pool.wait_for_job(job_id, max(1.0, deadline - time.time()))
+        calendar = {d: p for d, p in result.get("calendar", {}).items() if month_start <= d <= month_end}
+        flights = result.get("flights", [])
+
+    except Exception as e:
+        _record_recoveries(params, job_id)
+        db_manager.log_scrape(
+            scrape_type="flights",
+            origin=origin,
+            destination=destination,
+            success=False,
+            error_message=str(e),
+            started_at=datetime.fromtimestamp(start_time),
+            duration_seconds=time.time() - start_time,
+            params=params
+        )
+        raise
+
+    duration = time.time() - start_time
+    _record_recoveries(params, job_id)
+
+    if flights:
+        db_manager.save_flights(origin, destination, departure_date, flights, return_date=return_date)
+
+    if calendar:
+        params["calendar_prices"] = len(calendar)
+        if return_date:
+            trip_length = (date.fromisoformat(return_date) - date.fromisoformat(departure_date)).days
+            db_manager.save_round_trip_grid(origin, destination, month_start, month_end, {trip_length: calendar})
+        else:
+            db_manager.save_calendar_prices(origin, destination, calendar, month_start, month_end)
+
+    db_manager.log_scrape(
+        scrape_type="flights",
+        origin=origin,
+        destination=destination,
+        success=bool(flights),
+        results_count=len(flights),
+        error_message=None if flights else "Aucun vol trouvé",
+        started_at=datetime.fromtimestamp(start_time),
+        duration_seconds=duration,
+        params=params
+    )
+
+    logger.info(f"✓ Vols {origin}->{destination} le {departure_date}: {len(flights)} ({duration:.1f}s)")
+    return flights
+
+
+def scrape_destinations_and_store(
+        origin: str,
+        destinations: List[str],
+        start_date: str,
+        end_date: str,
+        timeout: float = DEFAULT_SCRAPE_TIMEOUT,
+        trigger: str = "interactive"
+) -> Dict[str, Dict[str, float]]:
+    """
+    Calendriers de plusieurs destinations depuis une origine, en un seul job (une session Chrome)
+
+    Chaque destination est sauvegardée et loggée comme un scraping
+    calendrier ordinaire (params: batch_size, destinations en échec
+    absentes du résultat). La durée loggée est le temps passé sur la
+    destination (relevé par le worker), la session entière dans
+    params.session_seconds: l'estimateur apprend le coût d'une route.
+
+    Returns:
+        Dict {destination: {date: prix}}
+
+    Raises:
+        TimeoutError: Si le job dépasse le timeout
+        Exception: Erreur remontée par le worker (aucune destination n'a abouti)
+    """
+    start_time = time.time()
+    deadline = start_time + timeout
+    params = {"start_date": start_date, "end_date": end_date, "trigger": trigger, "batch_size": len(destinations)}
+
+    job_id = None
+    try:
+        job_id = scraper_pool.submit_scrape(
+            origin, destinations[0], start_date, end_date,
+            priority=priority_for_trigger(trigger), deadline=deadline, destinations=destinations
+        )
+        results = scraper_pool.wait_for_job(job_id, max(1.0, deadline - time.time()))
+
+    except Exception as e:
+        stats = _record_recoveries(params, job_id)
+        duration = time.time() - start_time
+        params["session_seconds"] = round(duration, 2)
+        for destination in destinations:
+            db_manager.log_scrape(
+                scrape_type="calendar",
+                origin=origin,
+                destination=destination,
+                success=False,
+                error_message=str(e),
+                started_at=datetime.fromtimestamp(start_time),
+                duration_seconds=_destination_seconds(stats, destination, duration, len(destinations)),
+                params=params
+            )
+        raise
+
+    duration = time.time() - start_time
+    stats = _record_recoveries(params, job_id)
+    params["session_seconds"] = round(duration, 2)
+
+    for destination in destinations:
+        prices = results.get(destination)
+        route_params = dict(params)
+        if prices:
+            db_manager.save_calendar_prices(origin, destination, prices, start_date, end_date)
+            change_rate = ttl_policy.pop_last_observation(origin, destination)
+            if change_rate is not None:
+                route_params["price_change_rate"] = round(change_rate, 6)
+
+        db_manager.log_scrape(
+            scrape_type="calendar",
+            origin=origin,
+            destination=destination,
+            success=bool(prices),
+            results_count=len(prices or {}),
+            error_message=None if prices else ("Aucun prix trouvé" if prices is not None else "Destination en échec"),
+            started_at=datetime.fromtimestamp(start_time),
+            duration_seconds=_destination_seconds(stats, destination, duration, len(destinations)),
+            params=route_params
+        )
+
+    logger.info(
+        f"✓ Session partagée {origin} -> {len(destinations)} destinations: "
+        f"{sum(1 for prices in results.values() if prices)} avec prix ({duration:.1f}s)"
+    )
+    return results
@@ -0,0 +1,215 @@
+"""
+Estimation de la durée et du coût des jobs de scraping
+
+Apprise sur scrape_logs: une régression durée = base + pente × mois sur
+les scrapings réussis, corrigée par un facteur par route et par heure de
+la journée (EWMA du rapport observé / prédit). Le coût en temps de worker
+tient compte du taux de succès de la route (relances). Les nouveaux logs
+sont intégrés de façon incrémentale (id croissant).
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..core.hedging import month_count
+from ..database.manager import db_manager
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# A priori tant qu'il n'y a pas assez d'historique (~35s pour un mois)
+DEFAULT_BASE_SECONDS = 20.0
+DEFAULT_SECONDS_PER_MONTH = 15.0
+
+# Échantillons minimum avant d'utiliser la régression
+MIN_FIT_SAMPLES = 5
+
+# Oubli progressif des anciens logs dans la régression
+SAMPLE_DECAY = 0.995
+
+# Lissage des facteurs route / heure et du taux de succès
+FACTOR_EWMA_ALPHA = 0.2
+MIN_FACTOR = 0.3
+MAX_FACTOR = 5.0
+
+# Plancher du taux de succès dans le calcul du coût
+MIN_SUCCESS_RATE = 0.2
+
+
+class JobEstimator:
+    """Prédit la durée et le temps de worker d'un job de scraping"""
+
+    def __init__(self, refresh_seconds: Optional[int] = None, history_days: Optional[int] = None):
+        self.refresh_seconds = refresh_seconds or settings.estimator_refresh_seconds
+        self.history_days = history_days or settings.estimator_history_days
+
+        # Sommes pondérées de la régression (x = mois, y = durée)
+        self._n = self._sx = self._sy = self._sxx = self._sxy = 0.0
+        self._route_factor: Dict[Tuple[str, str], float] = {}
+        self._route_success: Dict[Tuple[str, str], float] = {}
+        self._hour_factor: Dict[int, float] = {}
+        self._global_success = 1.0
+
+        self._last_id = 0
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+        self.samples = 0
+
+    # ==================== APPRENTISSAGE ====================
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Intègre les logs apparus depuis le dernier passage
+
+        Returns:
+            Nombre de logs intégrés
+        """
+        if not force and time.time() - self._last_refresh < self.refresh_seconds:
+            return 0
+        if not self._refresh_lock.acquire(blocking=False):
+            return 0
+
+        try:
+            since = datetime.now() - timedelta(days=self.history_days) if self._last_id == 0 else None
+            logs = db_manager.get_scrape_logs_since(self._last_id, since=since)
+            for log in logs:
+                self.observe(log)
+            if logs:
+                self._last_id = logs[-1]['id']
+                logger.debug(f"Estimateur: {len(logs)} nouveaux logs")
+            self._last_refresh = time.time()
+            return len(logs)
+        finally:
+            self._refresh_lock.release()
+
+    def observe(self, log: Dict):
+        """Intègre un log de scraping (dict de get_scrape_logs_since)"""
+        params = log.get('params') or {}
+        if params.get('preempted'):
+            # Interrompu volontairement: ni échec ni durée représentative
+            return
+        route = (log['origin'], log['destination'])
+        success = bool(log.get('success'))
+
+        with self._lock:
+            self._global_success = self._ewma(self._global_success, 1.0 if success else 0.0)
+            self._route_success[route] = self._ewma(
+                self._route_success.get(route, self._global_success), 1.0 if success else 0.0
+            )
+
+            duration = log.get('duration_seconds')
+            if not success or not duration or not params.get('start_date') or not params.get('end_date'):
+                return
+            if params.get('batch_size') and 'session_seconds' not in params:
+                # Session partagée loggée avant le relevé par destination: durée de toute la session
+                duration /= params['batch_size']
+
+            months = month_count(params['start_date'], params['end_date'])
+            base = self._base(months)
+            hour = log['started_at'].hour
+            route_factor = self._route_factor.get(route, 1.0)
+            hour_factor = self._hour_factor.get(hour, 1.0)
+
+            self._route_factor[route] = self._clamp(
+                self._ewma(route_factor, duration / (base * hour_factor))
+            )
+            self._hour_factor[hour] = self._clamp(
+                self._ewma(hour_factor, duration / (base * route_factor))
+            )
+
+            # Régression sur la durée ramenée à une route et une heure "moyennes"
+            y = duration / (route_factor * hour_factor)
+            self._n = self._n * SAMPLE_DECAY + 1
+            self._sx = self._sx * SAMPLE_DECAY + months
+            self._sy = self._sy * SAMPLE_DECAY + y
+            self._sxx = self._sxx * SAMPLE_DECAY + months * months
+            self._sxy = self._sxy * SAMPLE_DECAY + months * y
+            self.samples += 1
+
+    @staticmethod
+    def _ewma(current: float, value: float) -> float:
+        return FACTOR_EWMA_ALPHA * value + (1 - FACTOR_EWMA_ALPHA) * current
+
+    @staticmethod
+    def _clamp(factor: float) -> float:
+        return min(MAX_FACTOR, max(MIN_FACTOR, factor))
+
+    def _coefficients(self) -> Tuple[float, float]:
+        """(base, secondes par mois) de la régression, ou l'a priori"""
+        if self.samples < MIN_FIT_SAMPLES:
+            return DEFAULT_BASE_SECONDS, DEFAULT_SECONDS_PER_MONTH
+
+        variance = self._n * self._sxx - self._sx * self._sx
+        if variance <= 1e-9:
+            # Toujours le même nombre de mois: pente a priori, base ajustée
+            slope = DEFAULT_SECONDS_PER_MONTH
+        else:
+            slope = max(0.0, (self._n * self._sxy - self._sx * self._sy) / variance)
+        base = max(0.0, (self._sy - slope * self._sx) / self._n)
+        return base, slope
+
+    def _base(self, months: int) -> float:
+        base, slope = self._coefficients()
+        return max(1.0, base + slope * months)
+
+    # ==================== PRÉDICTION ====================
+
+    def estimate(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            at: Optional[datetime] = None
+    ) -> Dict:
+        """
+        Prédit un job (sans relire la base: voir refresh)
+
+        Args:
+            at: Heure de lancement prévue (défaut: maintenant)
+
+        Returns:
+            Dict {months, duration_seconds, worker_seconds, success_rate}
+        """
+        at = at or datetime.now()
+        months = month_count(start_date, end_date)
+        route = (origin, destination)
+
+        with self._lock:
+            duration = (
+                self._base(months)
+                * self._route_factor.get(route, 1.0)
+                * self._hour_factor.get(at.hour, 1.0)
+            )
+            success_rate = self._route_success.get(route, self._global_success)
+
+        return {
+            'months': months,
+            'duration_seconds': round(duration, 1),
+            'worker_seconds': round(duration / max(MIN_SUCCESS_RATE, success_rate), 1),
+            'success_rate': round(success_rate, 3),
+        }
+
+    def get_stats(self) -> Dict:
+        """Coefficients appris et facteurs"""
+        with self._lock:
+            base, slope = self._coefficients()
+            return {
+                'samples': self.samples,
+                'last_log_id': self._last_id,
+                'base_seconds': round(base, 1),
+                'seconds_per_month': round(slope, 1),
+                'success_rate': round(self._global_success, 3),
+                'routes': len(self._route_factor),
+                'hour_factors': {h: round(f, 2) for h, f in sorted(self._hour_factor.items())},
+            }
+
+
+# Instance globale
+job_estimator = JobEstimator()
@@ -0,0 +1,290 @@
+"""
+File de jobs durable en base pour des workers multi-nœuds
+
+Avec JOB_BACKEND=database, l'API et la file de rafraîchissement ne lancent
+plus de navigateur: elles insèrent un job dans la table scrape_jobs et
+attendent son résultat. Les workers (scripts/queue_worker.py, sur un ou
+plusieurs hôtes) prennent les jobs par bail (visibility timeout prolongé
+pendant le scraping), scrapent avec leur ScraperPool local et écrivent
+prix, logs et résultat via db_manager. Un worker mort laisse expirer son
+bail et le job est repris ailleurs.
+"""
+
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from ..core.config import settings
+from ..core.exceptions import (
+    BlockedError,
+    CaptchaError,
+    PreemptedError,
+    RateLimitError,
+    ScraperException,
+    ScrapingTimeoutError,
+    ValidationError,
+)
+from ..core.job_scheduler import PRIORITY_RANK, priority_for_trigger
+from ..database.manager import db_manager
+from ..utils.logger import get_logger
+from .calendar_service import DEFAULT_SCRAPE_TIMEOUT, scrape_and_store
+from .price_cache import month_keys, price_cache
+
+logger = get_logger(__name__)
+
+
+JOB_BACKEND_LOCAL = "local"
+JOB_BACKEND_DATABASE = "database"
+
+# Erreurs du worker recréées côté appelant (mapping HTTP de l'API)
+REMOTE_ERRORS = {
+    "BlockedError": BlockedError,
+    "CaptchaError": CaptchaError,
+    "RateLimitError": RateLimitError,
+    "CapacityError": RateLimitError,
+    "CircuitOpenError": RateLimitError,
+    "ScrapingTimeoutError": ScrapingTimeoutError,
+    "StuckJobError": ScrapingTimeoutError,
+    "TimeoutError": ScrapingTimeoutError,
+}
+
+# Erreurs inutiles à retenter sur un autre worker
+NON_RETRYABLE_ERRORS = (ValidationError, ValueError)
+
+# Timeout minimal d'un job dont l'échéance client est (presque) passée
+MIN_JOB_TIMEOUT = 30.0
+
+
+class DatabaseJobQueue:
+    """Côté producteur: soumission et attente des jobs en base"""
+
+    def __init__(self, backend: Optional[str] = None, poll_seconds: Optional[float] = None):
+        self.backend = backend or settings.job_backend
+        self.poll_seconds = poll_seconds or settings.job_poll_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend == JOB_BACKEND_DATABASE
+
+    def scrape(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            timeout: float = DEFAULT_SCRAPE_TIMEOUT,
+            trigger: str = "interactive",
+            prune_missing: bool = False
+    ) -> Dict[str, float]:
+        """
+        Scrape une plage en local (ScraperPool) ou via la file en base
+
+        Même contrat que calendar_service.scrape_and_store.
+        """
+        if not self.enabled:
+            return scrape_and_store(
+                origin, destination, start_date, end_date,
+                timeout=timeout, trigger=trigger, prune_missing=prune_missing
+            )
+
+        deadline = time.time() + timeout
+        job_id = db_manager.enqueue_scrape_job(
+            origin, destination, start_date, end_date,
+            trigger=trigger,
+            priority=PRIORITY_RANK[priority_for_trigger(trigger)],
+            deadline=datetime.fromtimestamp(deadline),
+            max_attempts=settings.job_max_attempts,
+        )
+        logger.info(f"📨 Job {job_id[:8]} en file: {origin}->{destination} ({trigger})")
+        return self.wait(job_id, deadline)
+
+    def wait(self, job_id: str, deadline: float) -> Dict[str, float]:
+        """
+        Attend le résultat d'un job en base
+
+        Raises:
+            TimeoutError: Échéance dépassée (le job est annulé s'il n'a pas démarré)
+            PreemptedError: Job interrompu par un job plus prioritaire
+            BlockedError, RateLimitError, ScraperException: Échec du worker
+        """
+        while True:
+            job = db_manager.get_scrape_job(job_id)
+            if job is None:
+                raise ScraperException(f"Job {job_id} introuvable")
+
+            status = job['status']
+            if status == 'done':
+                # Prix écrits par le worker (autre process): le cache mémoire
+                # de ce process n'a pas été invalidé par save_calendar_prices
+                price_cache.invalidate(
+                    job['origin'], job['destination'], month_keys(job['start_date'], job['end_date'])
+                )
+                result = job['result'] or {}
+                if result.get('preempted'):
+                    raise PreemptedError(
+                        f"Job {job_id[:8]} préempté", prices=result.get('prices', {}),
+                        resume_from=result['resume_from']
+                    )
+                return result.get('prices', {})
+            if status == 'failed':
+                error_class = REMOTE_ERRORS.get(job['error_type'], ScraperException)
+                raise error_class(job['error_message'] or "Échec du worker", details={"job_id": job_id})
+            if status == 'cancelled':
+                raise ScraperException(f"Job {job_id} annulé")
+
+            if time.time() >= deadline:
+                db_manager.cancel_scrape_job(job_id)
+                raise TimeoutError(f"Job {job_id} timeout ({status})")
+            time.sleep(min(self.poll_seconds, max(0.05, deadline - time.time())))
+
+    def get_stats(self) -> Dict:
+        """Backend courant et état de la file en base"""
+        stats = {'backend': self.backend}
+        if self.enabled:
+            stats.update(db_manager.get_job_queue_stats())
+        return stats
+
+
+class QueueWorker:
+    """
+    Côté consommateur: boucle de bail / scraping / écriture du résultat
+
+    Args:
+        execute: Fonction de scraping (défaut: scrape_and_store via le pool local)
+    """
+
+    def __init__(
+            self,
+            worker_id: Optional[str] = None,
+            concurrency: Optional[int] = None,
+            lease_seconds: Optional[float] = None,
+            poll_seconds: Optional[float] = None,
+            execute: Optional[Callable] = None
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = concurrency or settings.queue_worker_concurrency
+        self.lease_seconds = lease_seconds or settings.job_lease_seconds
+        self.poll_seconds = poll_seconds or settings.job_poll_seconds
+        self.execute = execute or scrape_and_store
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self.lost_leases = 0
+
+    def run_once(self, slot: int = 0) -> bool:
+        """
+        Prend et exécute un job
+
+        Returns:
+            True si un job a été traité
+        """
+        job = db_manager.lease_scrape_job(f"{self.worker_id}-{slot}", self.lease_seconds)
+        if job is None:
+            return False
+        self._process(job)
+        return True
+
+    def _keep_lease(self, job: Dict, done: threading.Event):
+        """Prolonge le bail tant que le scraping tourne"""
+        while not done.wait(self.lease_seconds / 3):
+            if not db_manager.extend_scrape_job_lease(job['id'], job['lease_token'], self.lease_seconds):
+                with self._lock:
+                    self.lost_leases += 1
+                logger.warning(f"Job {job['id'][:8]}: bail perdu")
+                return
+
+    def _process(self, job: Dict):
+        job_id = job['id']
+        remaining = (job['deadline'] - datetime.now()).total_seconds()
+        timeout = max(MIN_JOB_TIMEOUT, min(DEFAULT_SCRAPE_TIMEOUT, remaining))
+        logger.info(
+            f"📥 Job {job_id[:8]} (tentative {job['attempts']}/{job['max_attempts']}): "
+            f"{job['origin']}->{job['destination']} {job['start_date']} → {job['end_date']}"
+        )
+
+        done = threading.Event()
+        keeper = threading.Thread(target=self._keep_lease, args=(job, done), daemon=True)
+        keeper.start()
+
+        status, result, error = 'done', None, None
+        try:
+            prices = self.execute(
+                job['origin'], job['destination'], job['start_date'], job['end_date'],
+                timeout=timeout, trigger=job['trigger'],
+                prune_missing=job['trigger'] != 'interactive'
+            )
+            result = {'prices': prices}
+        except PreemptedError as e:
+            result = {'prices': e.prices, 'preempted': True, 'resume_from': e.resume_from}
+        except Exception as e:
+            error = e
+            retry = (
+                not isinstance(e, NON_RETRYABLE_ERRORS)
+                and job['attempts'] < job['max_attempts']
+                and remaining > MIN_JOB_TIMEOUT
+            )
+            status = 'queued' if retry else 'failed'
+        finally:
+            done.set()
+
+        error_type = type(error).__name__ if error else None
+        if not db_manager.finish_scrape_job(
+                job_id, job['lease_token'], status, result=result,
+                error_type=error_type, error_message=str(error) if error else None
+        ):
+            logger.warning(f"Job {job_id[:8]}: résultat ignoré (bail repris par un autre worker)")
+
+        with self._lock:
+            self.processed += 1
+            if status == 'failed':
+                self.failed += 1
+            elif status == 'queued':
+                self.retried += 1
+        if error:
+            logger.warning(f"Job {job_id[:8]}: {error_type} ({'nouvelle tentative' if status == 'queued' else 'échec'})")
+
+    def _loop(self, slot: int):
+        while not self._stop.is_set():
+            try:
+                if self.run_once(slot):
+                    continue
+            except Exception as e:
+                logger.error(f"Erreur worker de file: {e}")
+            self._stop.wait(self.poll_seconds)
+
+    def run_forever(self):
+        """Boucle bloquante: `concurrency` jobs en parallèle"""
+        logger.info(f"✓ Worker de file {self.worker_id}: {self.concurrency} jobs simultanés")
+        threads = [
+            threading.Thread(target=self._loop, args=(slot,), name=f"queue-worker-{slot}", daemon=True)
+            for slot in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1.0)
+
+    def stop(self):
+        self._stop.set()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'worker_id': self.worker_id,
+                'processed': self.processed,
+                'failed': self.failed,
+                'retried': self.retried,
+                'lost_leases': self.lost_leases,
+            }
+
+
+# Instance globale (producteur)
+job_queue = DatabaseJobQueue()
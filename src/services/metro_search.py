@@ -0,0 +1,172 @@
+"""
+Calendrier des prix pour un code métropole (PAR, LON, NYC, ...)
+
+Une requête métropole est éclatée en routes aéroport → aéroport: les
+routes en cache (mémoire puis base, stale compris) sont servies telles
+quelles, les autres sont scrapées en parallèle (un job par route). Le
+résultat garde, pour chaque date, le prix minimum et la route gagnante.
+"""
+
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..database.manager import db_manager
+from ..utils.airports import airport_index
+from ..utils.logger import get_logger
+from .calendar_service import DEFAULT_SCRAPE_TIMEOUT
+from .job_queue import job_queue
+from .prewarm_scheduler import prewarm_scheduler
+from .price_cache import price_cache
+from .refresh_queue import refresh_queue
+
+logger = get_logger(__name__)
+
+Route = Tuple[str, str]
+
+
+@dataclass
+class MetroResult:
+    """Calendrier fusionné d'une requête métropole"""
+    prices: Dict[str, float] = field(default_factory=dict)
+    winners: Dict[str, Route] = field(default_factory=dict)  # date -> route du prix minimum
+    cached_routes: List[Route] = field(default_factory=list)
+    scraped_routes: List[Route] = field(default_factory=list)
+    failed_routes: Dict[Route, str] = field(default_factory=dict)
+    stale: bool = False
+
+    @property
+    def from_cache(self) -> bool:
+        return not self.scraped_routes and not self.failed_routes
+
+    def route_labels(self) -> Dict[str, str]:
+        """{date: "CDG-JFK"}"""
+        return {d: f"{o}-{dest}" for d, (o, dest) in self.winners.items()}
+
+
+def expand_route(origin: str, destination: str) -> List[Route]:
+    """
+    Routes aéroport → aéroport d'une requête (codes métropole développés)
+
+    Raises:
+        ValueError: Aucune route possible ou plus de METRO_MAX_ROUTES routes
+    """
+    routes = [
+        (o, d) for o, d in itertools.product(airport_index.members(origin), airport_index.members(destination))
+        if o != d
+    ]
+    if not routes:
+        raise ValueError(f"Aucune route entre {origin} et {destination}")
+    if len(routes) > settings.metro_max_routes:
+        raise ValueError(
+            f"{origin}->{destination}: {len(routes)} routes, maximum {settings.metro_max_routes}"
+        )
+    return routes
+
+
+def merge_min(results: Dict[Route, Dict[str, float]]) -> Tuple[Dict[str, float], Dict[str, Route]]:
+    """
+    Prix minimum par date et route gagnante
+
+    À prix égal, la première route de `results` l'emporte (aéroports
+    principaux d'abord, voir expand_route).
+    """
+    prices: Dict[str, float] = {}
+    winners: Dict[str, Route] = {}
+    for route, route_prices in results.items():
+        for day, price in route_prices.items():
+            if day not in prices or price < prices[day]:
+                prices[day] = price
+                winners[day] = route
+    return prices, winners
+
+
+class MetroSearch:
+    """Éclatement d'une requête métropole en jobs par aéroport"""
+
+    def _lookup_cache(self, route: Route, start_date: str, end_date: str) -> Optional[Tuple[Dict[str, float], List[str]]]:
+        """
+        Même lecture que l'endpoint calendrier: mémoire puis base, stale compris
+
+        La base est relue dès que la mémoire n'a pas de prix frais (bloc
+        négatif de 30s, mois stale): un autre process a pu y écrire.
+        """
+        origin, destination = route
+        cached = price_cache.lookup(origin, destination, start_date, end_date, allow_stale=True)
+        if cached is None or not cached[0] or cached[1]:
+            cached = db_manager.lookup_calendar_prices(origin, destination, start_date, end_date)
+        if cached and cached[0]:
+            return cached
+        return None
+
+    def calendar_prices(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            force_refresh: bool = False,
+            timeout: float = DEFAULT_SCRAPE_TIMEOUT
+    ) -> MetroResult:
+        """
+        Calendrier fusionné (bloquant, à appeler depuis un thread)
+
+        Les routes en échec sont ignorées tant qu'au moins une route a
+        répondu.
+
+        Raises:
+            ValueError: Voir expand_route
+            Exception: Erreur de la première route si toutes ont échoué
+        """
+        routes = expand_route(origin, destination)
+        result = MetroResult()
+        found: Dict[Route, Dict[str, float]] = {}
+        misses: List[Route] = []
+
+        for route in routes:
+            prewarm_scheduler.record_request(route[0], route[1], start_date, end_date)
+            cached = None if force_refresh else self._lookup_cache(route, start_date, end_date)
+            if cached is None:
+                misses.append(route)
+                continue
+
+            route_prices, stale_months = cached
+            found[route] = route_prices
+            result.cached_routes.append(route)
+            if stale_months:
+                result.stale = True
+                refresh_queue.schedule_months(route[0], route[1], start_date, end_date, stale_months)
+
+        logger.info(
+            f"🏙️ {origin}->{destination}: {len(routes)} routes, "
+            f"{len(result.cached_routes)} en cache, {len(misses)} à scraper"
+        )
+
+        errors: Dict[Route, Exception] = {}
+        if misses:
+            with ThreadPoolExecutor(max_workers=len(misses), thread_name_prefix="metro") as executor:
+                futures = {
+                    route: executor.submit(job_queue.scrape, route[0], route[1], start_date, end_date, timeout)
+                    for route in misses
+                }
+                for route, future in futures.items():
+                    try:
+                        found[route] = future.result()
+                        result.scraped_routes.append(route)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Route {route[0]}->{route[1]} en échec: {e}")
+                        errors[route] = e
+                        result.failed_routes[route] = str(e)
+
+        if errors and not any(found.values()):
+            raise next(iter(errors.values()))
+
+        # Ordre d'expand_route pour départager les égalités
+        result.prices, result.winners = merge_min({route: found[route] for route in routes if route in found})
+        return result
+
+
+# Instance globale
+metro_search = MetroSearch()
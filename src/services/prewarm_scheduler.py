@@ -0,0 +1,303 @@
+"""
+Pré-chauffage du cache des routes populaires
+
+Classe les routes par demande récente (scrape_logs + requêtes servies par
+ce process), puis rafraîchit leurs mois peu avant l'expiration du TTL, en
+priorité en heures creuses et dans la limite d'un budget global.
+"""
+
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from ..core.config import settings
+from ..core.circuit_breaker import circuit_breakers
+from ..core.scraper_pool import scraper_pool
+from ..database.manager import db_manager
+from ..utils.logger import get_logger
+from .price_cache import month_keys, month_last_day
+from .job_estimator import job_estimator
+from .job_queue import job_queue
+from .refresh_queue import refresh_queue
+from .ttl_policy import ttl_policy
+
+logger = get_logger(__name__)
+
+
+# Demi-vie du score de popularité (heures)
+DEMAND_HALF_LIFE_HOURS = 24.0
+
+
+def parse_hours_window(window: str) -> Set[int]:
+    """
+    Parse une fenêtre horaire "0-6" ou "22-6" (bornes incluses)
+
+    Returns:
+        Ensemble des heures (0-23) de la fenêtre
+    """
+    try:
+        start, end = (int(x) for x in window.split("-"))
+    except ValueError:
+        return set()
+
+    if start <= end:
+        return set(range(start, end + 1))
+    return set(range(start, 24)) | set(range(0, end + 1))
+
+
+class PrewarmScheduler:
+    """
+    Planificateur de pré-chauffage du cache
+
+    Les scrapings passent par refresh_queue (dédoublonnés avec les
+    rafraîchissements stale) et ne sont lancés que s'il reste au moins
+    prewarm_min_free_workers slots libres: les requêtes interactives
+    gardent toujours la main. Le décompte lit les slots partagés en base
+    (navigateurs de l'API, du sidecar et des workers de file), pas
+    seulement le pool de ce process.
+    """
+
+    def __init__(self):
+        self.interval_seconds = settings.prewarm_interval_seconds
+        self.top_routes = settings.prewarm_top_routes
+        self.lead_minutes = settings.prewarm_lead_minutes
+        self.max_scrapes_per_hour = settings.prewarm_max_scrapes_per_hour
+        self.peak_budget_ratio = settings.prewarm_peak_budget_ratio
+        self.offpeak_hours = parse_hours_window(settings.prewarm_offpeak_hours)
+        self.min_free_workers = settings.prewarm_min_free_workers
+
+        # Requêtes vues par ce process: {(origin, destination): [(ts, start, end)]}
+        self._requests: Dict[Tuple[str, str], Deque[Tuple[float, str, str]]] = defaultdict(
+            lambda: deque(maxlen=200)
+        )
+        self._tracking_since: Optional[float] = None
+        self._launched: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.runs = 0
+        self.refreshes = 0
+        self.skipped_budget = 0
+        self.skipped_capacity = 0
+        self.skipped_circuit = 0
+
+    # ==================== DEMANDE ====================
+
+    def record_request(self, origin: str, destination: str, start_date: str, end_date: str):
+        """Enregistre une requête calendrier (y compris cache hit)"""
+        with self._lock:
+            if self._tracking_since is None:
+                self._tracking_since = time.time()
+            self._requests[(origin, destination)].append((time.time(), start_date, end_date))
+
+    def rank_routes(self, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Classe les routes par demande récente (score à décroissance exponentielle)
+
+        Returns:
+            Liste de dicts {route, origin, destination, score, requests, months}
+        """
+        now = now or datetime.now()
+        now_ts = now.timestamp()
+        decay = math.log(2) / (DEMAND_HALF_LIFE_HOURS * 3600)
+
+        routes: Dict[Tuple[str, str], Dict] = {}
+
+        def add(origin, destination, ts, start_date, end_date):
+            entry = routes.setdefault((origin, destination), {
+                'route': f"{origin}-{destination}",
+                'origin': origin,
+                'destination': destination,
+                'score': 0.0,
+                'requests': 0,
+                'months': set(),
+            })
+            entry['score'] += math.exp(-decay * max(0.0, now_ts - ts))
+            entry['requests'] += 1
+            if start_date and end_date:
+                entry['months'].update(month_keys(start_date, end_date))
+
+        with self._lock:
+            tracking_since = self._tracking_since
+            seen = {k: list(v) for k, v in self._requests.items()}
+
+        for log in db_manager.get_scrape_history(days=settings.prewarm_demand_days):
+            params = log.get('params') or {}
+            if params.get('trigger', 'interactive') != 'interactive':
+                continue
+            # Déjà compté via record_request depuis que ce process suit la demande
+            if tracking_since is not None and log['started_at'].timestamp() >= tracking_since:
+                continue
+            add(
+                log['origin'], log['destination'], log['started_at'].timestamp(),
+                params.get('start_date'), params.get('end_date')
+            )
+
+        for (origin, destination), events in seen.items():
+            for ts, start_date, end_date in events:
+                add(origin, destination, ts, start_date, end_date)
+
+        current_month = now.strftime("%Y-%m")
+        ranked = sorted(routes.values(), key=lambda r: r['score'], reverse=True)
+        for entry in ranked:
+            entry['score'] = round(entry['score'], 3)
+            entry['months'] = sorted(m for m in entry['months'] if m >= current_month)
+        return ranked
+
+    # ==================== PLANIFICATION ====================
+
+    def _is_offpeak(self, now: datetime) -> bool:
+        return now.hour in self.offpeak_hours
+
+    def _remaining_budget(self, now: datetime) -> int:
+        """Scrapings encore autorisés sur l'heure glissante"""
+        hour_ago = now.timestamp() - 3600
+        with self._lock:
+            while self._launched and self._launched[0] < hour_ago:
+                self._launched.popleft()
+            used = len(self._launched)
+
+        budget = self.max_scrapes_per_hour
+        if not self._is_offpeak(now):
+            budget = int(budget * self.peak_budget_ratio)
+        return max(0, budget - used)
+
+    def _free_workers(self) -> int:
+        """
+        Slots libres, tous process confondus
+
+        Avec la file en base, les jobs en attente d'un worker comptent
+        aussi comme occupés.
+        """
+        busy = max(scraper_pool.get_active_jobs_count(), sum(db_manager.count_scraper_slots().values()))
+        if job_queue.enabled:
+            busy += db_manager.get_job_queue_stats().get('by_status', {}).get('queued', 0)
+        return scraper_pool.capacity() - busy
+
+    def _months_due(self, route: Dict, now: datetime) -> Tuple[List[str], Optional[float]]:
+        """
+        Mois demandés dont la fraîcheur expire dans moins de lead_minutes
+
+        Returns:
+            (mois, première expiration) - l'expiration sert d'échéance dans la file
+        """
+        if not route['months']:
+            return [], None
+
+        start_date = max(f"{route['months'][0]}-01", date.today().isoformat())
+        end_date = month_last_day(route['months'][-1])
+
+        rows = db_manager.get_cached_price_ages(
+            route['origin'], route['destination'], start_date, end_date
+        )
+
+        deadline = (now + timedelta(minutes=self.lead_minutes)).timestamp()
+        due = set()
+        first_expiry = None
+        for travel_date, _, scraped_at in rows:
+            month = travel_date[:7]
+            if month not in route['months'] or month in due:
+                continue
+            expires = ttl_policy.expires_at(
+                route['origin'], route['destination'], travel_date, scraped_at
+            )
+            if expires <= deadline:
+                due.add(month)
+                first_expiry = expires if first_expiry is None else min(first_expiry, expires)
+
+        # Les mois sans aucun prix en cache ne sont pas pré-chauffés (pas de boucle)
+        return sorted(due), first_expiry
+
+    def run_once(self, now: Optional[datetime] = None) -> int:
+        """
+        Un passage du planificateur
+
+        Returns:
+            Nombre de rafraîchissements lancés
+        """
+        now = now or datetime.now()
+        self.runs += 1
+        launched = 0
+
+        # Pas de pré-chauffage pendant un blocage Google
+        if circuit_breakers.retry_after() > 0:
+            self.skipped_circuit += 1
+            return 0
+
+        # Durées estimées à jour pour ordonner la file
+        job_estimator.refresh()
+
+        for route in self.rank_routes(now)[:self.top_routes]:
+            if self._remaining_budget(now) <= 0:
+                self.skipped_budget += 1
+                break
+            if self._free_workers() <= self.min_free_workers:
+                self.skipped_capacity += 1
+                break
+
+            months, first_expiry = self._months_due(route, now)
+            if not months:
+                continue
+
+            start_date = max(f"{months[0]}-01", date.today().isoformat())
+            started = refresh_queue.schedule_months(
+                route['origin'], route['destination'],
+                start_date, month_last_day(months[-1]), months,
+                trigger="prewarm", deadline=first_expiry
+            )
+
+            if started:
+                with self._lock:
+                    self._launched.extend([now.timestamp()] * started)
+                launched += started
+                logger.info(f"🔥 Pré-chauffage {route['route']}: {', '.join(months)}")
+
+        self.refreshes += launched
+        return launched
+
+    # ==================== BOUCLE ====================
+
+    def run_forever(self):
+        """Boucle bloquante (sidecar ou thread)"""
+        logger.info(
+            f"✓ Pré-chauffage actif (top {self.top_routes}, "
+            f"{self.max_scrapes_per_hour} scrapings/h, creuses: {settings.prewarm_offpeak_hours})"
+        )
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Erreur pré-chauffage: {e}")
+            self._stop.wait(self.interval_seconds)
+
+    def start(self):
+        """Démarre le planificateur dans un thread daemon"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="prewarm", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête le planificateur"""
+        self._stop.set()
+
+    def get_stats(self) -> Dict:
+        """Compteurs du planificateur"""
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'runs': self.runs,
+            'refreshes': self.refreshes,
+            'skipped_budget': self.skipped_budget,
+            'skipped_capacity': self.skipped_capacity,
+            'skipped_circuit': self.skipped_circuit,
+            'remaining_budget': self._remaining_budget(datetime.now()),
+        }
+
+
+# Instance globale
+prewarm_scheduler = PrewarmScheduler()
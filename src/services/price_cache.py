@@ -0,0 +1,310 @@
+"""
+Cache mémoire des prix du calendrier (LRU + TTL) devant la base de données
+"""
+
+import calendar
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..core.config import settings
+from ..utils.logger import get_logger
+from .ttl_policy import ttl_policy
+
+logger = get_logger(__name__)
+
+
+# Durée de vie d'un mois connu comme vide (aucun prix frais en base)
+NEGATIVE_TTL_SECONDS = 30
+
+
+@dataclass
+class MonthBlock:
+    """Prix d'une route pour un mois, tels que lus en base"""
+    prices: Dict[str, float]
+    fresh_until: float
+    expires_at: float
+
+
+def month_keys(start_date: str, end_date: str) -> List[str]:
+    """
+    Liste les mois (YYYY-MM) couverts par une plage de dates
+
+    Args:
+        start_date: Date début (YYYY-MM-DD)
+        end_date: Date fin (YYYY-MM-DD)
+
+    Returns:
+        Liste ordonnée de clés "YYYY-MM"
+    """
+    year, month = int(start_date[:4]), int(start_date[5:7])
+    end_year, end_month = int(end_date[:4]), int(end_date[5:7])
+
+    keys = []
+    while (year, month) <= (end_year, end_month):
+        keys.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+
+def month_bounds(start_date: str, end_date: str) -> Tuple[str, str]:
+    """Élargit une plage aux mois complets (comparaison de chaînes ISO)"""
+    return f"{start_date[:7]}-01", f"{end_date[:7]}-31"
+
+
+def month_last_day(month: str) -> str:
+    """Dernier jour réel d'un mois YYYY-MM (format YYYY-MM-DD)"""
+    year, month_num = int(month[:4]), int(month[5:7])
+    return f"{month}-{calendar.monthrange(year, month_num)[1]:02d}"
+
+
+def month_ranges(start_date: str, end_date: str, months: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Regroupe des mois en plages contiguës, bornées à [start_date, end_date]
+
+    Sert à planifier le re-scraping des seuls mois périmés d'une plage.
+
+    Returns:
+        Liste de tuples (début, fin) au format YYYY-MM-DD
+    """
+    wanted = set(months)
+    ranges: List[Tuple[str, str]] = []
+    run: List[str] = []
+
+    for month in month_keys(start_date, end_date) + [None]:
+        if month in wanted:
+            run.append(month)
+            continue
+        if run:
+            ranges.append((max(f"{run[0]}-01", start_date), min(month_last_day(run[-1]), end_date)))
+            run = []
+
+    return ranges
+
+
+class PriceCache:
+    """
+    Cache LRU borné des prix, par route et par bloc mensuel
+
+    Un bloc est frais tant que toutes ses dates le sont selon la politique
+    TTL (même contrat que la lecture en base), puis servable en "stale"
+    jusqu'à cache_stale_ttl_minutes avant d'être expiré.
+    """
+
+    def __init__(
+            self,
+            max_entries: Optional[int] = None,
+            ttl_minutes: Optional[int] = None,
+            stale_ttl_minutes: Optional[int] = None
+    ):
+        self.max_entries = max_entries or settings.price_cache_max_entries
+        self.ttl_seconds = (ttl_minutes or settings.cache_ttl_minutes) * 60
+        self.stale_ttl_seconds = max(
+            (stale_ttl_minutes or settings.cache_stale_ttl_minutes) * 60,
+            ttl_policy.horizon_ttl_minutes * 60,
+            self.ttl_seconds
+        )
+        self.enabled = settings.price_cache_enabled
+
+        self._blocks: "OrderedDict[Tuple[str, str, str], MonthBlock]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Générations par route (invalidate) et globale (clear): une lecture en
+        # base commencée avant une écriture ne remet pas d'anciens prix en mémoire
+        self._generations: Dict[Tuple[str, str], int] = {}
+        self._epoch = 0
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str
+    ) -> Optional[Dict[str, float]]:
+        """
+        Lit les prix d'une plage si tous ses mois sont en mémoire et frais
+
+        Returns:
+            Dict {date: prix} (éventuellement vide) ou None si cache miss
+        """
+        found = self.lookup(origin, destination, start_date, end_date)
+        return found[0] if found else None
+
+    def lookup(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            allow_stale: bool = False
+    ) -> Optional[Tuple[Dict[str, float], List[str]]]:
+        """
+        Lit les prix d'une plage si tous ses mois sont en mémoire
+
+        Args:
+            allow_stale: Accepter les blocs au-delà du TTL frais
+
+        Returns:
+            Tuple ({date: prix}, mois stale) ou None si cache miss
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        result: Dict[str, float] = {}
+        stale_months: List[str] = []
+
+        with self._lock:
+            for month in month_keys(start_date, end_date):
+                key = (origin, destination, month)
+                block = self._blocks.get(key)
+
+                if block is None:
+                    self.misses += 1
+                    return None
+
+                if block.expires_at <= now:
+                    del self._blocks[key]
+                    self.expirations += 1
+                    self.misses += 1
+                    return None
+
+                if block.fresh_until <= now:
+                    if not allow_stale:
+                        self.misses += 1
+                        return None
+                    stale_months.append(month)
+
+                self._blocks.move_to_end(key)
+                result.update(block.prices)
+
+            if stale_months:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+
+        return {d: p for d, p in result.items() if start_date <= d <= end_date}, stale_months
+
+    def generation(self, origin: str, destination: str) -> Tuple[int, int]:
+        """Génération de la route, à relever avant une lecture en base (voir put_rows)"""
+        with self._lock:
+            return self._epoch, self._generations.get((origin, destination), 0)
+
+    def put_rows(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            rows: Iterable[Tuple[str, float, datetime]],
+            generation: Optional[Tuple[int, int]] = None
+    ):
+        """
+        Remplit les blocs mensuels à partir de lignes lues en base
+
+        La plage doit couvrir des mois complets (voir month_bounds) pour
+        qu'un bloc représente tout ce que la base contient pour ce mois.
+
+        Args:
+            rows: Tuples (date, prix, scraped_at)
+            generation: generation() relevée avant la lecture; si la route a
+                été invalidée depuis, les lignes sont périmées et ignorées
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        # {mois: (prix, scraped_at le plus ancien, fin de fraîcheur la plus proche)}
+        blocks = {month: ({}, None, None) for month in month_keys(start_date, end_date)}
+
+        for date, price, scraped_at in rows:
+            month = date[:7]
+            if month not in blocks:
+                continue
+            prices, oldest, fresh_until = blocks[month]
+            prices[date] = price
+            row_fresh_until = ttl_policy.expires_at(origin, destination, date, scraped_at)
+            blocks[month] = (
+                prices,
+                scraped_at if oldest is None else min(oldest, scraped_at),
+                row_fresh_until if fresh_until is None else min(fresh_until, row_fresh_until),
+            )
+
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get((origin, destination), 0)):
+                return
+
+            for month, (prices, oldest, fresh_until) in blocks.items():
+                if oldest is not None:
+                    expires_at = oldest.timestamp() + self.stale_ttl_seconds
+                else:
+                    fresh_until = expires_at = now + min(NEGATIVE_TTL_SECONDS, self.ttl_seconds)
+
+                if expires_at <= now:
+                    continue
+
+                key = (origin, destination, month)
+                self._blocks[key] = MonthBlock(
+                    prices=prices, fresh_until=fresh_until, expires_at=expires_at
+                )
+                self._blocks.move_to_end(key)
+
+            while len(self._blocks) > self.max_entries:
+                self._blocks.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, origin: str, destination: str, dates: Optional[Iterable[str]] = None):
+        """
+        Invalide les blocs d'une route (écriture en base)
+
+        Args:
+            dates: Dates modifiées (None = toute la route)
+        """
+        with self._lock:
+            self._generations[(origin, destination)] = self._generations.get((origin, destination), 0) + 1
+            if dates is None:
+                keys = [k for k in self._blocks if k[0] == origin and k[1] == destination]
+            else:
+                keys = [(origin, destination, m) for m in {d[:7] for d in dates}]
+
+            for key in keys:
+                if self._blocks.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        """Vide entièrement le cache"""
+        with self._lock:
+            self.invalidations += len(self._blocks)
+            self._blocks.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def get_stats(self) -> Dict:
+        """Compteurs du cache mémoire"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._blocks),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale_hits': self.stale_hits,
+                'hit_rate': round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+
+# Instance globale
+price_cache = PriceCache()
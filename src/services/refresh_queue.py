@@ -0,0 +1,389 @@
+"""
+File de rafraîchissement en arrière-plan (stale-while-revalidate, pré-chauffage)
+
+Les jobs en attente sont ordonnés selon REFRESH_QUEUE_ORDER: échéance la
+plus proche d'abord (deadline, départage par durée estimée), job le plus
+court d'abord (sjf) ou ordre d'arrivée (fifo). Les durées viennent de
+l'estimateur entraîné sur scrape_logs, qui sert aussi à calculer l'ETA
+de chaque job en file, et des jobs du pool ou de la file en base
+(interactifs compris) via get_scraper_jobs.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..core.config import settings
+from ..core.exceptions import PreemptedError
+from ..core.hedging import month_count
+from ..core.job_scheduler import PRIORITY_RANK
+from ..core.scraper_pool import scraper_pool
+from ..database.manager import db_manager
+from ..utils.logger import get_logger
+from .job_queue import job_queue
+from .job_estimator import job_estimator
+from .price_cache import month_keys, month_ranges
+
+logger = get_logger(__name__)
+
+
+ORDER_DEADLINE = "deadline"
+ORDER_SJF = "sjf"
+ORDER_FIFO = "fifo"
+
+
+def simulate_starts(busy_until: List[float], estimates: List[float], workers: int, now: float) -> List[float]:
+    """
+    Instants de démarrage prévus de jobs en file
+
+    Args:
+        busy_until: Fin estimée de chaque job en cours
+        estimates: Durées estimées des jobs en file, dans leur ordre de passage
+        workers: Jobs simultanés possibles
+
+    Returns:
+        Timestamp de démarrage de chaque job en file
+    """
+    free_at = [max(now, end) for end in busy_until]
+    free_at += [now] * max(0, workers - len(free_at))
+    heapq.heapify(free_at)
+
+    starts = []
+    for estimate in estimates:
+        start = heapq.heappop(free_at)
+        starts.append(start)
+        heapq.heappush(free_at, start + estimate)
+    return starts
+
+
+@dataclass(order=True)
+class RefreshJob:
+    """Rafraîchissement en file (trié par sort_key puis ordre d'arrivée)"""
+    sort_key: Tuple
+    seq: int
+    origin: str = field(compare=False)
+    destination: str = field(compare=False)
+    start_date: str = field(compare=False)
+    end_date: str = field(compare=False)
+    keys: List[Tuple[str, str, str]] = field(compare=False)
+    trigger: str = field(compare=False)
+    deadline: float = field(compare=False)
+    estimate_seconds: float = field(compare=False)
+    enqueued_at: float = field(compare=False)
+    started_at: Optional[float] = field(default=None, compare=False)
+
+
+class RefreshQueue:
+    """
+    Rafraîchit les plages servies en stale ou pré-chauffées, sans doublon
+
+    Un même mois d'une route n'est jamais rafraîchi deux fois en parallèle:
+    une demande dont tous les mois sont déjà en cours est ignorée.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, order: Optional[str] = None):
+        self.max_workers = max_workers or settings.stale_refresh_workers
+        self.order = order or settings.refresh_queue_order
+        self._queue: List[RefreshJob] = []
+        self._running: Dict[int, RefreshJob] = {}
+        self._seq = itertools.count()
+        self._inflight: Set[Tuple[str, str, str]] = set()
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._threads: List[threading.Thread] = []
+        self._closed = False
+        self._drain = False
+
+        self.scheduled = 0
+        self.deduplicated = 0
+        self.failed = 0
+        self.preempted = 0
+
+    def schedule_months(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            months: List[str],
+            trigger: str = "stale_refresh",
+            deadline: Optional[float] = None
+    ) -> int:
+        """
+        Rafraîchit uniquement les mois périmés d'une plage
+
+        Returns:
+            Nombre de rafraîchissements lancés
+        """
+        return sum(
+            self.schedule(origin, destination, range_start, range_end, trigger, deadline)
+            for range_start, range_end in month_ranges(start_date, end_date, months)
+        )
+
+    def schedule(
+            self,
+            origin: str,
+            destination: str,
+            start_date: str,
+            end_date: str,
+            trigger: str = "stale_refresh",
+            deadline: Optional[float] = None
+    ) -> bool:
+        """
+        Met en file un rafraîchissement
+
+        Args:
+            trigger: Origine journalisée dans scrape_logs (stale_refresh, prewarm)
+            deadline: Timestamp avant lequel le job devrait être fini
+                (défaut: maintenant, les données servies sont déjà périmées)
+
+        Returns:
+            True si un nouveau rafraîchissement a été lancé
+        """
+        keys = [(origin, destination, month) for month in month_keys(start_date, end_date)]
+        now = time.time()
+        estimate = job_estimator.estimate(origin, destination, start_date, end_date)['duration_seconds']
+        deadline = now if deadline is None else deadline
+
+        with self._cond:
+            if self._closed:
+                return False
+            new_keys = [k for k in keys if k not in self._inflight]
+            if not new_keys:
+                self.deduplicated += 1
+                return False
+            self._inflight.update(new_keys)
+            self.scheduled += 1
+
+            seq = next(self._seq)
+            heapq.heappush(self._queue, RefreshJob(
+                sort_key=self._sort_key(deadline, estimate, seq),
+                seq=seq,
+                origin=origin,
+                destination=destination,
+                start_date=start_date,
+                end_date=end_date,
+                keys=new_keys,
+                trigger=trigger,
+                deadline=deadline,
+                estimate_seconds=estimate,
+                enqueued_at=now,
+            ))
+            self._ensure_workers()
+            self._cond.notify()
+
+        logger.info(
+            f"🔄 Rafraîchissement planifié ({trigger}): {origin}->{destination} "
+            f"({start_date} → {end_date}, ~{estimate:.0f}s)"
+        )
+        return True
+
+    def _sort_key(self, deadline: float, estimate: float, seq: int) -> Tuple:
+        if self.order == ORDER_SJF:
+            return (estimate,)
+        if self.order == ORDER_FIFO:
+            return (seq,)
+        return (deadline, estimate)
+
+    def _ensure_workers(self):
+        """Démarre les threads de la file au premier job"""
+        self._threads = [t for t in self._threads if t.is_alive()]
+        for i in range(self.max_workers - len(self._threads)):
+            thread = threading.Thread(target=self._worker, name=f"stale-refresh-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue or (self._closed and not self._drain):
+                    return
+                job = heapq.heappop(self._queue)
+                job.started_at = time.time()
+                self._running[job.seq] = job
+            self._run(job)
+
+    def _run(self, job: RefreshJob):
+        """
+        Exécute le scraping puis libère les mois réservés par cette demande
+
+        Un job préempté (requête interactive prioritaire) est replanifié à
+        partir du premier mois non terminé, avec la même échéance.
+        """
+        preempted = None
+        try:
+            # Re-scrape complet de la plage: les dates absentes ont disparu
+            job_queue.scrape(
+                job.origin, job.destination, job.start_date, job.end_date,
+                trigger=job.trigger, prune_missing=True
+            )
+        except PreemptedError as e:
+            preempted = e
+            with self._lock:
+                self.preempted += 1
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            logger.warning(f"Échec rafraîchissement {job.origin}->{job.destination}: {e}")
+        finally:
+            with self._lock:
+                self._running.pop(job.seq, None)
+                self._inflight.difference_update(job.keys)
+            # Le log de ce job est en base: mise à jour incrémentale
+            job_estimator.refresh(force=True)
+
+        if preempted is not None:
+            self.schedule(
+                job.origin, job.destination, preempted.resume_from, job.end_date,
+                trigger=job.trigger, deadline=job.deadline
+            )
+
+    def get_queue(self) -> List[Dict]:
+        """
+        Jobs en cours et en file, avec leur ETA
+
+        Les ETA simulent le passage des jobs en file sur les workers selon
+        l'ordre de la file et les durées estimées.
+
+        Returns:
+            Liste de dicts (en cours puis en file, dans l'ordre d'exécution)
+        """
+        job_estimator.refresh()
+        now = time.time()
+        with self._lock:
+            running = sorted(self._running.values(), key=lambda j: j.started_at)
+            queued = sorted(self._queue)
+
+        starts = simulate_starts(
+            [j.started_at + j.estimate_seconds for j in running],
+            [j.estimate_seconds for j in queued],
+            self.max_workers, now
+        )
+
+        def describe(job: RefreshJob, status: str, start: float) -> Dict:
+            end = start + job.estimate_seconds
+            return {
+                'status': status,
+                'route': f"{job.origin}-{job.destination}",
+                'start_date': job.start_date,
+                'end_date': job.end_date,
+                'trigger': job.trigger,
+                'estimated_seconds': job.estimate_seconds,
+                'waited_seconds': round((job.started_at or now) - job.enqueued_at, 1),
+                'eta_start_seconds': round(max(0.0, start - now), 1),
+                'eta_seconds': round(max(0.0, end - now), 1),
+                'deadline_in_seconds': round(job.deadline - now, 1),
+            }
+
+        jobs = [describe(j, 'running', j.started_at) for j in running]
+        jobs += [describe(j, 'queued', start) for j, start in zip(queued, starts)]
+        return jobs
+
+    def get_scraper_jobs(self) -> List[Dict]:
+        """
+        Jobs de scraping de toutes origines (interactifs compris), avec ETA
+
+        Pool local: jobs lancés puis en attente d'un slot. File en base
+        (JOB_BACKEND=database): jobs sous bail puis en attente d'un worker,
+        le parallélisme supposé étant le nombre de baux en cours.
+
+        Returns:
+            Liste de dicts (en cours puis en file, dans l'ordre d'exécution)
+        """
+        job_estimator.refresh()
+        now = time.time()
+
+        if job_queue.enabled:
+            priorities = {rank: name for name, rank in PRIORITY_RANK.items()}
+            jobs = [
+                {
+                    'status': 'running' if row['status'] == 'leased' else 'queued',
+                    'job_id': row['id'],
+                    'origin': row['origin'],
+                    'destination': row['destination'],
+                    'start_date': row['start_date'],
+                    'end_date': row['end_date'],
+                    'priority': priorities.get(row['priority'], row['trigger']),
+                    'months': month_count(row['start_date'], row['end_date']),
+                    'since': (row['started_at'] if row['status'] == 'leased' else row['created_at']).timestamp(),
+                }
+                for row in db_manager.get_active_scrape_jobs()
+            ]
+            workers = max(1, sum(1 for job in jobs if job['status'] == 'running'))
+        else:
+            jobs = scraper_pool.get_jobs()
+            workers = scraper_pool.capacity()
+
+        for job in jobs:
+            estimate = job_estimator.estimate(job['origin'], job['destination'], job['start_date'], job['end_date'])
+            # Grilles aller-retour et sessions batch: plus de mois que la plage
+            job['estimated_seconds'] = round(estimate['duration_seconds'] * job['months'] / estimate['months'], 1)
+
+        running = [job for job in jobs if job['status'] == 'running']
+        queued = [job for job in jobs if job['status'] == 'queued']
+        starts = simulate_starts(
+            [job['since'] + job['estimated_seconds'] for job in running],
+            [job['estimated_seconds'] for job in queued],
+            workers, now
+        )
+
+        def describe(job: Dict, start: float) -> Dict:
+            since = job.pop('since')
+            end = start + job['estimated_seconds']
+            job.update({
+                'route': f"{job['origin']}-{job['destination']}",
+                # Depuis le lancement (en cours) ou la mise en file (en attente)
+                'elapsed_seconds' if job['status'] == 'running' else 'waited_seconds': round(now - since, 1),
+                'eta_start_seconds': round(max(0.0, start - now), 1),
+                'eta_seconds': round(max(0.0, end - now), 1),
+            })
+            return job
+
+        return (
+            [describe(job, job['since']) for job in running]
+            + [describe(job, start) for job, start in zip(queued, starts)]
+        )
+
+    def get_stats(self) -> dict:
+        """Compteurs de la file"""
+        with self._lock:
+            return {
+                'order': self.order,
+                'queued': len(self._queue),
+                'running': len(self._running),
+                'inflight_months': len(self._inflight),
+                'scheduled': self.scheduled,
+                'deduplicated': self.deduplicated,
+                'failed': self.failed,
+                'preempted': self.preempted,
+            }
+
+    def shutdown(self, wait: bool = False):
+        """
+        Arrête la file
+
+        Args:
+            wait: Attendre la fin des scrapings en file (sinon annulés)
+        """
+        with self._cond:
+            self._closed = True
+            self._drain = wait
+            if not wait:
+                for job in self._queue:
+                    self._inflight.difference_update(job.keys)
+                self._queue.clear()
+            self._cond.notify_all()
+            threads = list(self._threads)
+
+        if wait:
+            for thread in threads:
+                thread.join()
+
+
+# Instance globale
+refresh_queue = RefreshQueue()
@@ -0,0 +1,259 @@
+"""
+Politique de fraîcheur adaptative des prix du calendrier
+
+Le TTL d'une date dépend de la distance au départ (un vol dans 10 mois
+bouge beaucoup moins qu'un vol demain) et de la volatilité observée de la
+route entre deux scrapings successifs.
+"""
+
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..core.config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# (jours avant départ max, multiplicateur du TTL de base)
+HORIZON_MULTIPLIERS = [
+    (3, 1.0),
+    (14, 1.5),
+    (45, 3.0),
+    (120, 6.0),
+    (None, 10.0),
+]
+
+# Bornes de l'ajustement par la volatilité
+MIN_VOLATILITY_FACTOR = 0.5
+MAX_VOLATILITY_FACTOR = 2.0
+
+MIN_TTL_MINUTES = 15
+
+# Lissage exponentiel du taux de variation observé
+VOLATILITY_EWMA_ALPHA = 0.3
+
+# Écart minimal entre deux scrapings pour mesurer une variation (heures)
+MIN_OBSERVATION_HOURS = 1.0
+
+
+class TTLPolicy:
+    """Calcule le TTL (en minutes) de chaque date en cache"""
+
+    def __init__(
+            self,
+            base_ttl_minutes: Optional[int] = None,
+            max_ttl_minutes: Optional[int] = None,
+            reference_change_rate: Optional[float] = None,
+            enabled: Optional[bool] = None
+    ):
+        self.base_ttl_minutes = base_ttl_minutes or settings.cache_ttl_minutes
+        self.max_ttl_minutes = max(
+            max_ttl_minutes or settings.adaptive_ttl_max_minutes,
+            self.base_ttl_minutes
+        )
+        self.reference_change_rate = reference_change_rate or settings.adaptive_ttl_reference_change_rate
+        self.enabled = settings.adaptive_ttl_enabled if enabled is None else enabled
+
+        # {(origin, destination): taux de variation relatif par jour (EWMA)}
+        self._change_rates: Dict[Tuple[str, str], float] = {}
+        # Dernière mesure brute, journalisée dans scrape_logs
+        self._last_observed: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    # ==================== TTL ====================
+
+    def horizon_multiplier(self, travel_date: str, today: Optional[date] = None) -> float:
+        """Multiplicateur selon le nombre de jours avant le départ"""
+        today = today or date.today()
+        try:
+            days_out = (date.fromisoformat(travel_date) - today).days
+        except ValueError:
+            return 1.0
+
+        for max_days, multiplier in HORIZON_MULTIPLIERS:
+            if max_days is None or days_out <= max_days:
+                return multiplier
+        return 1.0
+
+    def volatility_factor(self, change_rate: Optional[float]) -> float:
+        """Raccourcit le TTL des routes volatiles, l'allonge pour les routes calmes"""
+        if change_rate is None:
+            return 1.0
+        if change_rate <= 0:
+            return MAX_VOLATILITY_FACTOR
+        factor = self.reference_change_rate / change_rate
+        return min(MAX_VOLATILITY_FACTOR, max(MIN_VOLATILITY_FACTOR, factor))
+
+    def ttl_minutes(
+            self,
+            travel_date: str,
+            change_rate: Optional[float] = None,
+            today: Optional[date] = None
+    ) -> float:
+        """
+        TTL d'une date en cache
+
+        Args:
+            travel_date: Date du vol (YYYY-MM-DD)
+            change_rate: Taux de variation de la route (None = inconnu)
+            today: Date de référence (tests/simulation)
+
+        Returns:
+            TTL en minutes
+        """
+        if not self.enabled:
+            return float(self.base_ttl_minutes)
+
+        ttl = (
+            self.base_ttl_minutes
+            * self.horizon_multiplier(travel_date, today)
+            * self.volatility_factor(change_rate)
+        )
+        return min(self.max_ttl_minutes, max(MIN_TTL_MINUTES, ttl))
+
+    def expires_at(
+            self,
+            origin: str,
+            destination: str,
+            travel_date: str,
+            scraped_at: datetime
+    ) -> float:
+        """Timestamp de fin de fraîcheur d'une ligne en cache"""
+        ttl = self.ttl_minutes(
+            travel_date,
+            self.change_rate(origin, destination),
+            scraped_at.date()
+        )
+        return scraped_at.timestamp() + ttl * 60
+
+    def is_fresh(
+            self,
+            origin: str,
+            destination: str,
+            travel_date: str,
+            scraped_at: datetime,
+            now: Optional[datetime] = None
+    ) -> bool:
+        """Vrai si la ligne est encore fraîche"""
+        now = now or datetime.now()
+        return self.expires_at(origin, destination, travel_date, scraped_at) > now.timestamp()
+
+    def stale_months(
+            self,
+            origin: str,
+            destination: str,
+            rows: Iterable[Tuple[str, float, datetime]],
+            now: Optional[datetime] = None
+    ) -> List[str]:
+        """
+        Mois (YYYY-MM) contenant au moins une date qui n'est plus fraîche
+
+        Args:
+            rows: Tuples (date, prix, scraped_at)
+        """
+        now = now or datetime.now()
+        stale = {
+            travel_date[:7]
+            for travel_date, _, scraped_at in rows
+            if not self.is_fresh(origin, destination, travel_date, scraped_at, now)
+        }
+        return sorted(stale)
+
+    @property
+    def horizon_ttl_minutes(self) -> int:
+        """TTL maximal possible (pour dimensionner les lectures en base)"""
+        return self.max_ttl_minutes if self.enabled else self.base_ttl_minutes
+
+    # ==================== VOLATILITÉ ====================
+
+    def change_rate(self, origin: str, destination: str) -> Optional[float]:
+        """Taux de variation relatif par jour observé sur la route"""
+        with self._lock:
+            return self._change_rates.get((origin, destination))
+
+    def pop_last_observation(self, origin: str, destination: str) -> Optional[float]:
+        """Dernier taux brut mesuré par observe() (consommé une seule fois)"""
+        with self._lock:
+            return self._last_observed.pop((origin, destination), None)
+
+    def record_change_rate(self, origin: str, destination: str, rate: float) -> float:
+        """Intègre un taux observé dans la moyenne lissée de la route"""
+        key = (origin, destination)
+        with self._lock:
+            previous = self._change_rates.get(key)
+            if previous is None:
+                smoothed = rate
+            else:
+                smoothed = VOLATILITY_EWMA_ALPHA * rate + (1 - VOLATILITY_EWMA_ALPHA) * previous
+            self._change_rates[key] = smoothed
+            return smoothed
+
+    def observe(
+            self,
+            origin: str,
+            destination: str,
+            previous_rows: Iterable[Tuple[str, float, datetime]],
+            new_prices: Dict[str, float],
+            now: Optional[datetime] = None
+    ) -> Optional[float]:
+        """
+        Mesure la variation des prix entre l'ancien et le nouveau scraping
+
+        Args:
+            previous_rows: Tuples (date, prix, scraped_at) déjà en base
+            new_prices: Dict {date: prix} qui vont être écrits
+
+        Returns:
+            Taux de variation observé (relatif par jour) ou None si rien à comparer
+        """
+        now = now or datetime.now()
+        changes = []
+        elapsed_days = []
+
+        for travel_date, old_price, scraped_at in previous_rows:
+            new_price = new_prices.get(travel_date)
+            if new_price is None or not old_price:
+                continue
+            changes.append(abs(new_price - old_price) / old_price)
+            elapsed_days.append((now - scraped_at).total_seconds() / 86400)
+
+        if not changes:
+            return None
+
+        # Des re-scrapings trop rapprochés donneraient un taux par jour aberrant
+        elapsed = sum(elapsed_days) / len(elapsed_days)
+        if elapsed * 24 < MIN_OBSERVATION_HOURS:
+            return None
+
+        rate = (sum(changes) / len(changes)) / elapsed
+
+        with self._lock:
+            self._last_observed[(origin, destination)] = rate
+
+        smoothed = self.record_change_rate(origin, destination, rate)
+        logger.debug(f"Volatilité {origin}-{destination}: {rate:.4f}/jour (lissée {smoothed:.4f})")
+        return rate
+
+    def load_history(self, scrape_logs: Iterable[Dict]):
+        """
+        Recharge les taux de variation depuis l'historique scrape_logs
+
+        Args:
+            scrape_logs: Dicts avec origin, destination, params (ordre chronologique)
+        """
+        loaded = 0
+        for log in scrape_logs:
+            rate = (log.get('params') or {}).get('price_change_rate')
+            if rate is None:
+                continue
+            self.record_change_rate(log['origin'], log['destination'], float(rate))
+            loaded += 1
+
+        if loaded:
+            logger.info(f"✓ Politique TTL: {loaded} mesures de volatilité rechargées")
+
+
+# Instance globale
+ttl_policy = TTLPolicy()
@@ -0,0 +1,92 @@
+"""
+Index des aéroports et des codes métropole (PAR, LON, NYC, ...)
+
+Chargé une fois depuis src/data/airports.csv (iata, metro, city, country,
+name): un tuple par aéroport et, par code métropole, le tuple de ses
+aéroports dans l'ordre du fichier (principal d'abord). Un code métropole
+n'est jamais aussi un code aéroport: BRU reste l'aéroport de Bruxelles.
+"""
+
+import csv
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+AIRPORTS_FILE = Path(__file__).parent.parent / "data" / "airports.csv"
+
+
+class Airport(NamedTuple):
+    """Métadonnées d'un aéroport"""
+    code: str
+    metro: Optional[str]
+    city: str
+    country: str
+    name: str
+
+
+class AirportIndex:
+    """Aéroports par code IATA et membres de chaque métropole"""
+
+    def __init__(self, path: Path = AIRPORTS_FILE):
+        self.path = Path(path)
+        self._airports: Optional[Dict[str, Airport]] = None
+        self._metros: Dict[str, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Airport]:
+        """Lit le fichier au premier accès"""
+        if self._airports is not None:
+            return self._airports
+        with self._lock:
+            if self._airports is None:
+                airports: Dict[str, Airport] = {}
+                metros: Dict[str, List[str]] = {}
+                with open(self.path, newline='', encoding='utf-8') as f:
+                    for row in csv.DictReader(f):
+                        code = row['iata'].strip().upper()
+                        metro = row['metro'].strip().upper() or None
+                        airports[code] = Airport(code, metro, row['city'], row['country'], row['name'])
+                        if metro:
+                            metros.setdefault(metro, []).append(code)
+
+                overlap = set(metros) & set(airports)
+                if overlap:
+                    raise ValueError(f"Codes métropole aussi codes aéroport: {', '.join(sorted(overlap))}")
+
+                self._metros = {metro: tuple(codes) for metro, codes in metros.items()}
+                self._airports = airports
+        return self._airports
+
+    def get(self, code: str) -> Optional[Airport]:
+        """Aéroport par code IATA (None si inconnu ou code métropole)"""
+        return self._load().get(code.upper())
+
+    def is_metro(self, code: str) -> bool:
+        """Code métropole (regroupe plusieurs aéroports)"""
+        self._load()
+        return code.upper() in self._metros
+
+    def is_known(self, code: str) -> bool:
+        """Code aéroport ou métropole présent dans l'index"""
+        return self.get(code) is not None or self.is_metro(code)
+
+    def members(self, code: str) -> Tuple[str, ...]:
+        """Aéroports d'une métropole, ou le code lui-même pour un aéroport"""
+        self._load()
+        code = code.upper()
+        return self._metros.get(code, (code,))
+
+    def metro_of(self, code: str) -> Optional[str]:
+        """Métropole d'un aéroport (None si isolé ou inconnu)"""
+        airport = self.get(code)
+        return airport.metro if airport else None
+
+    @property
+    def metros(self) -> Dict[str, Tuple[str, ...]]:
+        """Toutes les métropoles {code: aéroports}"""
+        self._load()
+        return dict(self._metros)
+
+
+# Instance globale
+airport_index = AirportIndex()
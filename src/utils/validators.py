@@ -6,6 +6,7 @@ import re
 from datetime import datetime, date, timedelta
 from typing import Optional
 from src.core.exceptions import InvalidAirportCodeError, InvalidDateError
+from src.utils.airports import airport_index
 
 
 class Validators:
@@ -41,7 +42,8 @@ class Validators:
         
         Args:
             code: Code IATA (3 lettres)
-            strict: Si True, vérifie dans la liste des codes connus
+            strict: Si True, vérifie dans la liste des codes connus (ou
+                l'index des aéroports, codes métropole compris)
             
         Returns:
             Code en majuscules si valide
@@ -59,7 +61,7 @@ class Validators:
             raise InvalidAirportCodeError(code)
         
         # Vérification stricte (liste connue)
-        if strict and code not in Validators.VALID_AIRPORT_CODES:
+        if strict and code not in Validators.VALID_AIRPORT_CODES and not airport_index.is_known(code):
             raise InvalidAirportCodeError(code)
         
         return code
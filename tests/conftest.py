@@ -0,0 +1,10 @@
+"""
+Configuration pytest: racine du projet dans le PYTHONPATH (imports src.*)
+"""
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
@@ -0,0 +1,122 @@
+"""
+🧪 Tests de la lecture des limites et de l'usage cgroup (v1 et v2)
+"""
+
+import os
+
+import pytest
+
+from src.core.admission import read_cgroup_limits, read_cgroup_usage
+
+GB = 1024 ** 3
+
+
+def host_memory():
+    """MemTotal de l'hôte (repli quand le cgroup ne limite pas la mémoire)"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def write(root, relative, content):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+
+# ==================== LIMITES CGROUP V2 ====================
+
+def test_v2_memory_and_cpu_quota(tmp_path):
+    write(tmp_path, "memory.max", f"{2 * GB}\n")
+    write(tmp_path, "cpu.max", "150000 100000\n")
+
+    limits = read_cgroup_limits(tmp_path)
+    assert limits == {"memory_bytes": 2 * GB, "cpus": 1.5, "source": "cgroup2"}
+
+
+def test_v2_max_means_no_limit(tmp_path):
+    write(tmp_path, "memory.max", "max\n")
+    write(tmp_path, "cpu.max", "max 100000\n")
+
+    limits = read_cgroup_limits(tmp_path)
+    assert limits["source"] == "cgroup2"
+    # Repli sur l'hôte: /proc/meminfo et os.cpu_count()
+    assert limits["cpus"] == float(os.cpu_count() or 1)
+    assert limits["memory_bytes"] == host_memory()
+
+
+def test_v2_cpu_only(tmp_path):
+    write(tmp_path, "cpu.max", "200000 100000")
+    limits = read_cgroup_limits(tmp_path)
+    assert limits["source"] == "cgroup2"
+    assert limits["cpus"] == 2.0
+
+
+# ==================== LIMITES CGROUP V1 ====================
+
+def test_v1_memory_and_cfs_quota(tmp_path):
+    write(tmp_path, "memory/memory.limit_in_bytes", f"{GB}\n")
+    write(tmp_path, "cpu/cpu.cfs_quota_us", "50000\n")
+    write(tmp_path, "cpu/cpu.cfs_period_us", "100000\n")
+
+    limits = read_cgroup_limits(tmp_path)
+    assert limits == {"memory_bytes": GB, "cpus": 0.5, "source": "cgroup1"}
+
+
+def test_v1_unlimited_sentinel_and_no_quota(tmp_path):
+    # Valeur "illimitée" du noyau (page-aligned LONG_MAX) et quota -1
+    write(tmp_path, "memory/memory.limit_in_bytes", "9223372036854771712\n")
+    write(tmp_path, "cpu/cpu.cfs_quota_us", "-1\n")
+    write(tmp_path, "cpu/cpu.cfs_period_us", "100000\n")
+
+    limits = read_cgroup_limits(tmp_path)
+    assert limits["source"] == "cgroup1"
+    assert limits["memory_bytes"] == host_memory()
+    assert limits["cpus"] == float(os.cpu_count() or 1)
+
+
+def test_no_cgroup_is_host(tmp_path):
+    limits = read_cgroup_limits(tmp_path)
+    assert limits["source"] == "host"
+    assert limits["memory_bytes"] == host_memory()
+    assert limits["cpus"] == float(os.cpu_count() or 1)
+
+
+# ==================== USAGE ====================
+
+def test_v2_usage_minus_inactive_file(tmp_path):
+    write(tmp_path, "memory.current", f"{3 * GB}\n")
+    write(tmp_path, "memory.stat", f"anon {GB}\nfile {2 * GB}\ninactive_file {GB}\nactive_file {GB}\n")
+    assert read_cgroup_usage(tmp_path) == 2 * GB
+
+
+def test_v1_usage_minus_total_inactive_file(tmp_path):
+    write(tmp_path, "memory/memory.usage_in_bytes", f"{3 * GB}\n")
+    write(tmp_path, "memory/memory.stat", f"inactive_file {GB}\ntotal_inactive_file {2 * GB}\n")
+    assert read_cgroup_usage(tmp_path) == GB
+
+
+def test_usage_without_stat_file(tmp_path):
+    write(tmp_path, "memory.current", "1000")
+    assert read_cgroup_usage(tmp_path) == 1000
+
+
+def test_usage_never_negative(tmp_path):
+    write(tmp_path, "memory.current", "1000")
+    write(tmp_path, "memory.stat", "inactive_file 5000")
+    assert read_cgroup_usage(tmp_path) == 0
+
+
+def test_usage_outside_cgroup(tmp_path):
+    assert read_cgroup_usage(tmp_path) is None
+
+
+@pytest.mark.parametrize("relative", ["memory.current", "memory/memory.usage_in_bytes"])
+def test_usage_prefers_available_version(tmp_path, relative):
+    write(tmp_path, relative, "4096")
+    assert read_cgroup_usage(tmp_path) == 4096
@@ -0,0 +1,131 @@
+"""
+🧪 Tests du découpage en sessions du batch (group_by_origin, route_event, codes métropole)
+"""
+
+import pytest
+
+from src.services.batch_search import (
+    STATUS_CACHED, STATUS_ERROR, STATUS_SCRAPED, RouteOutcome,
+    expand_routes, group_by_origin, merge_event, route_event,
+)
+
+
+# ==================== GROUP_BY_ORIGIN ====================
+
+def test_single_origin_single_session():
+    routes = [("CDG", "JFK"), ("CDG", "BCN"), ("CDG", "LHR")]
+    assert group_by_origin(routes, 10) == [("CDG", ["JFK", "BCN", "LHR"])]
+
+
+def test_destination_order_is_kept():
+    routes = [("CDG", "LHR"), ("CDG", "BCN"), ("CDG", "JFK")]
+    assert group_by_origin(routes, 10) == [("CDG", ["LHR", "BCN", "JFK"])]
+
+
+def test_split_at_max_per_session():
+    routes = [("CDG", d) for d in ("JFK", "BCN", "LHR", "MAD", "FCO")]
+    assert group_by_origin(routes, 2) == [
+        ("CDG", ["JFK", "BCN"]),
+        ("CDG", ["LHR", "MAD"]),
+        ("CDG", ["FCO"]),
+    ]
+
+
+def test_exact_multiple_has_no_empty_session():
+    routes = [("CDG", d) for d in ("JFK", "BCN", "LHR", "MAD")]
+    sessions = group_by_origin(routes, 2)
+    assert len(sessions) == 2
+    assert all(destinations for _, destinations in sessions)
+
+
+def test_multiple_origins_in_first_seen_order():
+    # Routes entrelacées: une session par origine, dans l'ordre d'apparition
+    routes = [("ORY", "BCN"), ("CDG", "JFK"), ("ORY", "MAD"), ("CDG", "LHR")]
+    assert group_by_origin(routes, 10) == [
+        ("ORY", ["BCN", "MAD"]),
+        ("CDG", ["JFK", "LHR"]),
+    ]
+
+
+def test_multiple_origins_split_independently():
+    routes = [("ORY", "BCN"), ("CDG", "JFK"), ("ORY", "MAD"), ("ORY", "FCO")]
+    assert group_by_origin(routes, 2) == [
+        ("ORY", ["BCN", "MAD"]),
+        ("ORY", ["FCO"]),
+        ("CDG", ["JFK"]),
+    ]
+
+
+def test_no_routes_no_session():
+    assert group_by_origin([], 5) == []
+
+
+# ==================== ROUTE_EVENT ====================
+
+def test_route_event_summarizes_prices():
+    event = route_event(("CDG", "JFK"), STATUS_CACHED, {"2027-03-01": 320.0, "2027-03-02": 280.0}, stale=True)
+    assert event["origin"] == "CDG"
+    assert event["destination"] == "JFK"
+    assert event["status"] == STATUS_CACHED
+    assert event["stale"] is True
+    assert event["total_dates"] == 2
+    assert event["min_price"] == 280.0
+    assert event["error"] is None
+
+
+def test_route_event_error_without_prices():
+    event = route_event(("CDG", "JFK"), STATUS_ERROR, error="Timeout")
+    assert event["prices"] == {}
+    assert event["total_dates"] == 0
+    assert event["min_price"] is None
+    assert event["stale"] is False
+    assert event["error"] == "Timeout"
+
+
+# ==================== CODES MÉTROPOLE ====================
+
+def test_expand_routes_develops_metro_codes():
+    expanded = expand_routes([("PAR", "BCN"), ("CDG", "JFK"), ("PAR", "BCN")])
+    assert expanded == {
+        ("PAR", "BCN"): [("CDG", "BCN"), ("ORY", "BCN"), ("BVA", "BCN")],
+        ("CDG", "JFK"): [("CDG", "JFK")],
+    }
+
+
+def test_expand_routes_rejects_too_many_routes():
+    with pytest.raises(ValueError, match="maximum"):
+        expand_routes([("CDG", "JFK"), ("PAR", "LON")])
+
+
+def test_merge_event_min_per_date_with_winners():
+    parts = [("CDG", "BCN"), ("ORY", "BCN"), ("BVA", "BCN")]
+    outcomes = {
+        ("CDG", "BCN"): RouteOutcome(STATUS_CACHED, {"2027-03-01": 300.0, "2027-03-02": 100.0}, stale=True),
+        ("ORY", "BCN"): RouteOutcome(STATUS_SCRAPED, {"2027-03-01": 250.0}),
+        ("BVA", "BCN"): RouteOutcome(STATUS_ERROR, {}, error="boom"),
+    }
+    event = merge_event(("PAR", "BCN"), parts, outcomes)
+    assert event["status"] == STATUS_SCRAPED
+    assert event["stale"] is True
+    assert event["prices"] == {"2027-03-01": 250.0, "2027-03-02": 100.0}
+    assert event["routes"] == {"2027-03-01": "ORY-BCN", "2027-03-02": "CDG-BCN"}
+    assert event["error"] is None
+
+
+def test_merge_event_airport_route_has_no_winners():
+    outcomes = {("CDG", "JFK"): RouteOutcome(STATUS_CACHED, {"2027-03-01": 320.0})}
+    event = merge_event(("CDG", "JFK"), [("CDG", "JFK")], outcomes)
+    assert event["status"] == STATUS_CACHED
+    assert event["routes"] is None
+
+
+def test_merge_event_all_failed():
+    parts = [("CDG", "BCN"), ("ORY", "BCN")]
+    outcomes = {
+        ("CDG", "BCN"): RouteOutcome(STATUS_ERROR, {}, error="Timeout"),
+        ("ORY", "BCN"): RouteOutcome(STATUS_ERROR, {}, error="boom"),
+    }
+    event = merge_event(("PAR", "BCN"), parts, outcomes)
+    assert event["status"] == STATUS_ERROR
+    assert event["error"] == "Timeout"
+    assert event["prices"] == {}
@@ -0,0 +1,91 @@
+"""
+🧪 Tests des fonctions pures d'extraction du calendrier
+"""
+
+import pytest
+
+from src.scrapers.calendar_extraction import (
+    NAV_FOUND,
+    NAV_NEXT,
+    NAV_PREV,
+    NAV_RETRY,
+    NAV_SCROLL,
+    build_url,
+    cells_to_prices,
+    count_priced_cells,
+    month_navigation,
+    months_in_range,
+    parse_price,
+)
+
+
+def group(year, month, top=0):
+    return {"year": year, "month": month, "top": top}
+
+
+# ==================== NAVIGATION ====================
+
+def test_month_navigation_found():
+    groups = [group(2026, 11), group(2026, 12)]
+    assert month_navigation(groups, 2026, 12) == (NAV_FOUND, groups[1])
+
+
+def test_month_navigation_before_and_after_loaded_months():
+    groups = [group(2026, 11), group(2026, 12)]
+    assert month_navigation(groups, 2026, 10) == (NAV_PREV, None)
+    assert month_navigation(groups, 2027, 1) == (NAV_NEXT, None)
+
+
+def test_month_navigation_scrolls_to_closest_loaded_month():
+    groups = [group(2026, 11), group(2027, 2)]
+    assert month_navigation(groups, 2026, 12) == (NAV_SCROLL, groups[0])
+    assert month_navigation(groups, 2027, 1) == (NAV_SCROLL, groups[1])
+
+
+def test_month_navigation_year_boundary():
+    groups = [group(2026, 12), group(2027, 1)]
+    assert month_navigation(groups, 2027, 1) == (NAV_FOUND, groups[1])
+    assert month_navigation(groups, 2027, 2) == (NAV_NEXT, None)
+
+
+def test_month_navigation_retry_without_groups():
+    assert month_navigation([], 2026, 11) == (NAV_RETRY, None)
+
+
+def test_months_in_range():
+    assert months_in_range("2026-11-15", "2027-02-01") == [(2026, 11), (2026, 12), (2027, 1), (2027, 2)]
+    with pytest.raises(ValueError):
+        months_in_range("2026-12-01", "2026-11-01")
+
+
+# ==================== PRIX ====================
+
+@pytest.mark.parametrize("text,expected", [
+    ("45 €", 45.0),
+    ("1 234 €", 1234.0),
+    ("", None),
+    (None, None),
+    ("—", None),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == expected
+
+
+def test_cells_to_prices():
+    cells = [
+        {"day": "1", "price": "45 €"},
+        {"day": "2", "price": ""},
+        {"day": "15", "price": "1 120 €"},
+        {"day": "", "price": "99 €"},
+        {"day": "x", "price": "99 €"},
+    ]
+    assert cells_to_prices(cells, 2026, 3) == {"2026-03-01": 45.0, "2026-03-15": 1120.0}
+    assert count_priced_cells(cells) == 4
+
+
+# ==================== URL ====================
+
+def test_build_url():
+    assert build_url("BRU", "BCN") == (
+        "https://www.google.com/travel/flights?q=Flights+from+BRU+to+BCN&curr=EUR&hl=fr"
+    )
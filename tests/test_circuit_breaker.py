@@ -0,0 +1,198 @@
+"""
+🧪 Tests des disjoncteurs (ouvert → half-open → fermé, cool-down) et de la détection de page
+"""
+
+import pytest
+
+from src.core import circuit_breaker
+from src.core.circuit_breaker import (
+    DIRECT_SCOPE, GLOBAL_SCOPE, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreakers,
+)
+from src.core.exceptions import BlockedError, CaptchaError, CircuitOpenError
+from src.core.proxy_pool import OUTCOME_BLOCKED, OUTCOME_FAILURE, OUTCOME_SUCCESS, OUTCOME_TIMEOUT
+from src.scrapers.page_state import (
+    PAGE_BLOCK, PAGE_CAPTCHA, PAGE_CONSENT, PAGE_NORMAL, detect_page_state, raise_for_page_state,
+)
+
+PROXY = "http://10.0.0.1:3128"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def breakers(clock):
+    return CircuitBreakers(
+        global_threshold=3, direct_threshold=2,
+        cooldown_seconds=60, max_cooldown_seconds=240, enabled=True
+    )
+
+
+def state(breakers, scope=DIRECT_SCOPE):
+    return breakers.get_stats()[scope]["state"]
+
+
+def trip(breakers, blocks=2):
+    for _ in range(blocks):
+        breakers.record(None, OUTCOME_BLOCKED)
+
+
+# ==================== OUVERTURE ====================
+
+def test_closed_below_threshold(breakers):
+    breakers.record(None, OUTCOME_BLOCKED)
+    assert state(breakers) == STATE_CLOSED
+    breakers.before_job()
+
+
+def test_opens_at_threshold(breakers):
+    trip(breakers)
+    assert state(breakers) == STATE_OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        breakers.before_job()
+    assert info.value.retry_after == pytest.approx(60)
+
+
+def test_direct_breaker_does_not_stop_proxies(breakers):
+    trip(breakers)
+    assert state(breakers, GLOBAL_SCOPE) == STATE_CLOSED
+    breakers.before_job(PROXY)
+
+
+def test_proxy_blocks_count_only_globally(breakers):
+    for _ in range(3):
+        breakers.record(PROXY, OUTCOME_BLOCKED)
+    assert state(breakers, GLOBAL_SCOPE) == STATE_OPEN
+    assert state(breakers, DIRECT_SCOPE) == STATE_CLOSED
+    with pytest.raises(CircuitOpenError):
+        breakers.before_job(PROXY)
+
+
+def test_success_resets_consecutive_blocks(breakers):
+    breakers.record(None, OUTCOME_BLOCKED)
+    breakers.record(None, OUTCOME_SUCCESS)
+    breakers.record(None, OUTCOME_BLOCKED)
+    assert state(breakers) == STATE_CLOSED
+
+
+# ==================== HALF-OPEN ====================
+
+def test_half_open_after_cooldown_lets_one_probe(breakers, clock):
+    trip(breakers)
+    clock.now += 61
+    assert state(breakers) == STATE_HALF_OPEN
+
+    breakers.before_job()
+    with pytest.raises(CircuitOpenError):
+        breakers.before_job()
+
+
+def test_probe_success_closes(breakers, clock):
+    trip(breakers)
+    clock.now += 61
+    breakers.before_job()
+    breakers.record(None, OUTCOME_SUCCESS)
+
+    assert state(breakers) == STATE_CLOSED
+    assert breakers.get_stats()[DIRECT_SCOPE]["trips"] == 0
+    breakers.before_job()
+    breakers.before_job()
+
+
+def test_probe_blocked_reopens(breakers, clock):
+    trip(breakers)
+    clock.now += 61
+    breakers.before_job()
+    breakers.record(None, OUTCOME_BLOCKED)
+
+    assert state(breakers) == STATE_OPEN
+    assert breakers.get_stats()[DIRECT_SCOPE]["retry_after_seconds"] == 120
+    with pytest.raises(CircuitOpenError):
+        breakers.before_job()
+
+
+@pytest.mark.parametrize("outcome", [OUTCOME_FAILURE, OUTCOME_TIMEOUT])
+def test_non_block_outcome_only_releases_probe(breakers, clock, outcome):
+    trip(breakers)
+    clock.now += 61
+    breakers.before_job()
+    breakers.record(None, outcome)
+
+    # Ni fermé ni rouvert: un nouveau job de test peut partir
+    assert state(breakers) == STATE_HALF_OPEN
+    assert breakers.get_stats()[DIRECT_SCOPE]["trips"] == 1
+    breakers.before_job()
+    with pytest.raises(CircuitOpenError):
+        breakers.before_job()
+
+
+def test_lost_probe_is_released_after_cooldown(breakers, clock):
+    trip(breakers)
+    clock.now += 61
+    breakers.before_job()
+    clock.now += 61
+    breakers.before_job()
+
+
+# ==================== COOL-DOWN ====================
+
+def test_cooldown_doubles_and_is_capped(breakers, clock):
+    cooldowns = []
+    trip(breakers)
+    for _ in range(5):
+        cooldowns.append(round(breakers.get_stats()[DIRECT_SCOPE]["retry_after_seconds"]))
+        clock.now += cooldowns[-1] + 1
+        breakers.before_job()
+        breakers.record(None, OUTCOME_BLOCKED)
+    assert cooldowns == [60, 120, 240, 240, 240]
+
+
+def test_disabled_never_opens(clock):
+    breakers = CircuitBreakers(direct_threshold=1, enabled=False)
+    for _ in range(5):
+        breakers.record(None, OUTCOME_BLOCKED)
+    breakers.before_job()
+
+
+# ==================== ÉTAT DE LA PAGE ====================
+
+class FakeDriver:
+    def __init__(self, result=None, error=None):
+        self.result, self.error = result, error
+
+    def execute_script(self, script, *args):
+        if self.error:
+            raise self.error
+        return self.result
+
+
+@pytest.mark.parametrize("result", [PAGE_NORMAL, PAGE_CONSENT, PAGE_BLOCK, PAGE_CAPTCHA])
+def test_detect_page_state(result):
+    assert detect_page_state(FakeDriver(result)) == result
+
+
+def test_detect_page_state_defaults_to_normal():
+    assert detect_page_state(FakeDriver(None)) == PAGE_NORMAL
+    assert detect_page_state(FakeDriver(error=RuntimeError("no session"))) == PAGE_NORMAL
+
+
+def test_raise_for_page_state():
+    with pytest.raises(CaptchaError):
+        raise_for_page_state(PAGE_CAPTCHA, PROXY)
+    with pytest.raises(BlockedError) as info:
+        raise_for_page_state(PAGE_BLOCK, PROXY)
+    assert info.value.details["proxy"] == PROXY
+    raise_for_page_state(PAGE_NORMAL)
+    raise_for_page_state(PAGE_CONSENT)
@@ -0,0 +1,121 @@
+"""
+🧪 Tests de la sauvegarde des prix du calendrier (upsert groupé, dates disparues, cache mémoire)
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.database.manager import DatabaseManager
+from src.database.models import CalendarPrice
+from src.services.price_cache import month_bounds, price_cache
+
+
+ROUTE = ("BRU", "LIS")
+
+
+@pytest.fixture
+def db():
+    return DatabaseManager("sqlite://")
+
+
+def rows(db, origin=ROUTE[0], destination=ROUTE[1]):
+    with db.get_session() as session:
+        return {
+            row.date: row.price
+            for row in session.query(CalendarPrice).filter_by(origin=origin, destination=destination)
+        }
+
+
+def count(db):
+    with db.get_session() as session:
+        return session.query(CalendarPrice).count()
+
+
+# ==================== UPSERT ====================
+
+def test_second_save_updates_instead_of_duplicating(db):
+    assert db.save_calendar_prices(*ROUTE, {"2027-03-01": 100.0, "2027-03-02": 120.0})
+    assert db.save_calendar_prices(*ROUTE, {"2027-03-01": 90.0, "2027-03-03": 130.0})
+
+    assert count(db) == 3
+    assert rows(db) == {"2027-03-01": 90.0, "2027-03-02": 120.0, "2027-03-03": 130.0}
+
+
+def test_upsert_refreshes_scraped_at(db):
+    db.save_calendar_prices(*ROUTE, {"2027-03-01": 100.0})
+    with db.get_session() as session:
+        session.query(CalendarPrice).update({"scraped_at": datetime(2020, 1, 1)})
+        session.commit()
+
+    db.save_calendar_prices(*ROUTE, {"2027-03-01": 100.0})
+    with db.get_session() as session:
+        assert session.query(CalendarPrice).one().scraped_at > datetime(2020, 1, 1)
+
+
+def test_routes_are_independent(db):
+    db.save_calendar_prices("BRU", "LIS", {"2027-03-01": 100.0})
+    db.save_calendar_prices("BRU", "OPO", {"2027-03-01": 80.0})
+    assert rows(db, "BRU", "LIS") == {"2027-03-01": 100.0}
+    assert rows(db, "BRU", "OPO") == {"2027-03-01": 80.0}
+
+
+# ==================== PRUNE_MISSING ====================
+
+def test_prune_missing_deletes_only_absent_dates_in_range(db):
+    db.save_calendar_prices(*ROUTE, {
+        "2027-02-28": 95.0,   # hors plage
+        "2027-03-01": 100.0,
+        "2027-03-02": 120.0,  # disparue du calendrier
+        "2027-03-03": 130.0,
+        "2027-04-01": 140.0,  # hors plage
+    })
+
+    db.save_calendar_prices(
+        *ROUTE, {"2027-03-01": 105.0, "2027-03-03": 125.0},
+        start_date="2027-03-01", end_date="2027-03-31", prune_missing=True
+    )
+
+    assert rows(db) == {
+        "2027-02-28": 95.0,
+        "2027-03-01": 105.0,
+        "2027-03-03": 125.0,
+        "2027-04-01": 140.0,
+    }
+
+
+def test_without_prune_missing_absent_dates_stay(db):
+    db.save_calendar_prices(*ROUTE, {"2027-03-01": 100.0, "2027-03-02": 120.0})
+    db.save_calendar_prices(*ROUTE, {"2027-03-01": 105.0}, start_date="2027-03-01", end_date="2027-03-31")
+    assert rows(db) == {"2027-03-01": 105.0, "2027-03-02": 120.0}
+
+
+def test_prune_missing_with_empty_scrape_clears_range(db):
+    db.save_calendar_prices(*ROUTE, {"2027-03-01": 100.0, "2027-04-01": 140.0})
+    db.save_calendar_prices(*ROUTE, {}, start_date="2027-03-01", end_date="2027-03-31", prune_missing=True)
+    assert rows(db) == {"2027-04-01": 140.0}
+
+
+# ==================== CACHE MÉMOIRE ====================
+
+def test_save_invalidates_memory_cache(db):
+    month_start, month_end = month_bounds("2027-03-01", "2027-03-31")
+    price_cache.put_rows(*ROUTE, month_start, month_end, [("2027-03-01", 999.0, datetime.now())])
+    assert price_cache.lookup(*ROUTE, "2027-03-01", "2027-03-31") is not None
+
+    db.save_calendar_prices(*ROUTE, {"2027-03-01": 100.0})
+
+    assert price_cache.lookup(*ROUTE, "2027-03-01", "2027-03-31") is None
+    prices, stale = db.lookup_calendar_prices(*ROUTE, "2027-03-01", "2027-03-31")
+    assert prices == {"2027-03-01": 100.0}
+
+
+def test_prune_invalidates_months_without_new_prices(db):
+    # Mois vidé par le prune: son bloc mémoire ne doit pas survivre
+    db.save_calendar_prices(*ROUTE, {"2027-05-10": 100.0})
+    month_start, month_end = month_bounds("2027-05-01", "2027-05-31")
+    price_cache.put_rows(*ROUTE, month_start, month_end, [("2027-05-10", 100.0, datetime.now())])
+
+    db.save_calendar_prices(*ROUTE, {}, start_date="2027-05-01", end_date="2027-05-31", prune_missing=True)
+
+    assert price_cache.lookup(*ROUTE, "2027-05-01", "2027-05-31") is None
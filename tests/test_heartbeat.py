@@ -0,0 +1,102 @@
+"""
+🧪 Tests de la détection des jobs bloqués (heartbeat, délais par étape)
+"""
+
+import time
+
+import pytest
+
+from src.core.config import settings
+from src.core.heartbeat import (
+    DEFAULT_STAGE_DEADLINE, STAGE_DEADLINES, HeartbeatWriter, check_stuck, read_heartbeat, stage_deadline,
+)
+
+
+@pytest.fixture
+def heartbeat_file(tmp_path):
+    return tmp_path / "job.heartbeat"
+
+
+@pytest.fixture(autouse=True)
+def factor(monkeypatch):
+    monkeypatch.setattr(settings, "watchdog_deadline_factor", 1.0)
+
+
+# ==================== FICHIER HEARTBEAT ====================
+
+def test_fresh_heartbeat_is_not_stuck(heartbeat_file):
+    HeartbeatWriter(heartbeat_file)("month", month_index=1, months_total=3)
+    heartbeat = read_heartbeat(heartbeat_file)
+
+    assert heartbeat["stage"] == "month"
+    assert check_stuck(heartbeat, started_at=time.time() - 600) is None
+
+
+def test_stale_heartbeat_is_stuck(heartbeat_file):
+    HeartbeatWriter(heartbeat_file)("month", month_index=1, months_total=3)
+    heartbeat = read_heartbeat(heartbeat_file)
+
+    now = heartbeat["last_activity"] + STAGE_DEADLINES["month"] + 1
+    stage, idle = check_stuck(heartbeat, started_at=0, now=now)
+    assert stage == "month"
+    assert idle == pytest.approx(STAGE_DEADLINES["month"] + 1)
+
+
+def test_missing_file_uses_start_time(heartbeat_file):
+    # Worker pas encore démarré: étape "starting" depuis le lancement
+    assert read_heartbeat(heartbeat_file) is None
+    assert read_heartbeat(None) is None
+
+    started_at = 1_000_000.0
+    deadline = STAGE_DEADLINES["starting"]
+    assert check_stuck(None, started_at, now=started_at + deadline - 1) is None
+    assert check_stuck(None, started_at, now=started_at + deadline + 1) == ("starting", deadline + 1)
+
+
+def test_unreadable_file_is_missing(heartbeat_file):
+    heartbeat_file.write_text("{not json")
+    assert read_heartbeat(heartbeat_file) is None
+
+
+def test_activity_without_stage_keeps_stage(heartbeat_file):
+    writer = HeartbeatWriter(heartbeat_file)
+    writer("open_calendar")
+    writer(month_index=2)
+    assert read_heartbeat(heartbeat_file)["stage"] == "open_calendar"
+
+
+# ==================== DÉLAIS PAR ÉTAPE ====================
+
+def test_deadline_depends_on_stage():
+    heartbeat = {"stage": "done", "last_activity": 1_000_000.0}
+    now = 1_000_000.0 + STAGE_DEADLINES["done"] + 5
+    assert check_stuck(heartbeat, 0, now=now) is not None
+
+    heartbeat["stage"] = "driver"
+    assert check_stuck(heartbeat, 0, now=now) is None
+
+
+def test_unknown_stage_uses_default():
+    assert stage_deadline("unknown") == DEFAULT_STAGE_DEADLINE
+
+
+def test_pacing_stage_follows_max_wait(monkeypatch):
+    monkeypatch.setattr(settings, "pacing_max_wait_seconds", 300)
+    assert stage_deadline("pacing") == 315
+
+
+def test_open_calendar_covers_selector_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "timeout", 30)
+    assert stage_deadline("open_calendar") == STAGE_DEADLINES["open_calendar"]
+    monkeypatch.setattr(settings, "timeout", 60)
+    assert stage_deadline("open_calendar") == 75
+
+
+def test_deadline_factor_scales_deadlines(monkeypatch):
+    monkeypatch.setattr(settings, "watchdog_deadline_factor", 2.0)
+    assert stage_deadline("month") == STAGE_DEADLINES["month"] * 2
+
+    heartbeat = {"stage": "month", "last_activity": 1_000_000.0}
+    now = 1_000_000.0 + STAGE_DEADLINES["month"] + 1
+    assert check_stuck(heartbeat, 0, now=now) is None
+    assert check_stuck(heartbeat, 0, now=now + STAGE_DEADLINES["month"]) is not None
@@ -0,0 +1,77 @@
+"""
+🧪 Tests du hedging (percentile, nombre de mois, budget de doublons)
+"""
+
+import pytest
+
+from src.core.hedging import HedgePolicy, month_count, percentile
+
+
+@pytest.fixture
+def policy():
+    return HedgePolicy(percentile_target=0.9, min_samples=5, budget_ratio=0.2, enabled=True)
+
+
+# ==================== PERCENTILE ====================
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 11))
+    assert percentile(values, 0.9) == 9
+    assert percentile(values, 0.5) == 5
+    assert percentile(values, 1.0) == 10
+
+
+def test_percentile_bounds_and_order():
+    assert percentile([30.0, 10.0, 20.0], 0.0) == 10.0
+    assert percentile([30.0, 10.0, 20.0], 0.99) == 30.0
+    assert percentile([42.0], 0.9) == 42.0
+
+
+# ==================== MONTH_COUNT ====================
+
+def test_month_count_same_month():
+    assert month_count("2027-03-01", "2027-03-31") == 1
+
+
+def test_month_count_across_year():
+    assert month_count("2026-11-15", "2027-02-03") == 4
+
+
+def test_month_count_reversed_range_is_one():
+    assert month_count("2027-05-01", "2027-03-01") == 1
+
+
+# ==================== BUDGET ====================
+
+@pytest.mark.parametrize("capacity, expected", [
+    (1, 1), (2, 1), (3, 1), (4, 1), (5, 1),
+    (6, 2), (7, 2), (8, 2), (9, 2), (10, 2),
+])
+def test_budget_rounds_up_with_at_least_one(policy, capacity, expected):
+    assert policy.budget(capacity) == expected
+
+
+def test_budget_zero_ratio_disables_hedges():
+    policy = HedgePolicy(budget_ratio=0.0, enabled=True)
+    assert policy.budget(10) == 0
+    assert not policy.try_start(10)
+
+
+def test_try_start_respects_budget(policy):
+    assert policy.try_start(4)
+    assert not policy.try_start(4)
+    policy.end(won=True)
+    assert policy.try_start(4)
+    assert policy.get_stats()["launched"] == 2
+
+
+# ==================== SEUIL ====================
+
+def test_threshold_needs_min_samples(policy):
+    for duration in (10.0, 20.0, 30.0, 40.0):
+        policy.record(2, duration)
+    assert policy.threshold(2) is None
+
+    policy.record(2, 50.0)
+    assert policy.threshold(2) == 50.0
+    assert policy.threshold(3) is None
@@ -0,0 +1,68 @@
+"""
+🧪 Tests de l'apprentissage de l'estimateur sur les sessions partagées (batch)
+"""
+
+from datetime import datetime
+
+import pytest
+
+from src.services.calendar_service import _destination_seconds
+from src.services.job_estimator import JobEstimator
+
+START, END = "2027-03-01", "2027-03-31"
+
+
+def make_log(duration, **params):
+    return {
+        "origin": "CDG",
+        "destination": "JFK",
+        "success": True,
+        "duration_seconds": duration,
+        "started_at": datetime(2026, 10, 19, 10),
+        "params": {"start_date": START, "end_date": END, **params},
+    }
+
+
+def route_factor(*logs):
+    estimator = JobEstimator(refresh_seconds=60, history_days=7)
+    for log in logs:
+        estimator.observe(log)
+    return estimator._route_factor[("CDG", "JFK")]
+
+
+# ==================== OBSERVE ====================
+
+def test_batch_log_with_destination_time_counts_as_is():
+    # Durée de la destination, session entière à part: identique à un job seul
+    single = route_factor(make_log(40.0))
+    batch = route_factor(make_log(40.0, batch_size=4, session_seconds=160.0))
+    assert batch == pytest.approx(single)
+
+
+def test_legacy_batch_log_is_divided_by_batch_size():
+    # Ancien log: durée de toute la session de 4 destinations
+    single = route_factor(make_log(40.0))
+    legacy = route_factor(make_log(160.0, batch_size=4))
+    assert legacy == pytest.approx(single)
+
+
+def test_batch_does_not_inflate_estimate():
+    estimator = JobEstimator(refresh_seconds=60, history_days=7)
+    for _ in range(10):
+        estimator.observe(make_log(40.0, batch_size=5, session_seconds=200.0))
+    estimate = estimator.estimate("CDG", "JFK", START, END, at=datetime(2026, 10, 19, 10))
+    assert estimate["duration_seconds"] == pytest.approx(40.0, rel=0.1)
+
+
+# ==================== DURÉE PAR DESTINATION ====================
+
+def test_destination_seconds_from_worker_stats():
+    stats = {"destination_seconds": {"JFK": 31.5, "LHR": 12.0}}
+    assert _destination_seconds(stats, "JFK", 90.0, 3) == 31.5
+    assert _destination_seconds(stats, "LHR", 90.0, 3) == 12.0
+
+
+def test_destination_seconds_falls_back_to_equal_share():
+    # Destination jamais atteinte, ou worker sans relevé
+    assert _destination_seconds({"destination_seconds": {"JFK": 31.5}}, "BCN", 90.0, 3) == 30.0
+    assert _destination_seconds({}, "JFK", 90.0, 3) == 30.0
@@ -0,0 +1,167 @@
+"""
+🧪 Tests de la file de jobs en base (bail SQLite, workers multi-process)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.database.manager import DatabaseManager
+
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# Worker d'un process séparé: scraping simulé, jobs traités écrits sur stdout
+WORKER_SCRIPT = """
+import json, sys, time
+from src.services.job_queue import QueueWorker
+
+executed = []
+
+def execute(origin, destination, start_date, end_date, **kwargs):
+    executed.append(destination)
+    time.sleep(0.05)
+    return {start_date: 100.0}
+
+worker = QueueWorker(worker_id=sys.argv[1], concurrency=1, lease_seconds=30, poll_seconds=0.05, execute=execute)
+idle = 0
+while idle < 10:
+    if worker.run_once():
+        idle = 0
+    else:
+        idle += 1
+        time.sleep(0.05)
+print(json.dumps(executed))
+"""
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'jobs.db'}"
+
+
+def enqueue(db, destination, priority=0):
+    return db.enqueue_scrape_job(
+        "BRU", destination, "2026-11-01", "2026-11-30",
+        priority=priority, deadline=datetime.now() + timedelta(minutes=5)
+    )
+
+
+def test_concurrent_leases_take_a_job_once(database_url):
+    """Deux connexions sur le même fichier: l'UPDATE conditionnel sert de compare-and-set"""
+    first, second = DatabaseManager(database_url), DatabaseManager(database_url)
+    job_id = enqueue(first, "BCN")
+
+    barrier = threading.Barrier(2)
+    leased = {}
+
+    def lease(name, db):
+        barrier.wait()
+        leased[name] = db.lease_scrape_job(name, lease_seconds=60)
+
+    threads = [threading.Thread(target=lease, args=(name, db)) for name, db in (("a", first), ("b", second))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [job for job in leased.values() if job is not None]
+    assert len(winners) == 1
+    assert winners[0]["id"] == job_id
+    assert winners[0]["attempts"] == 1
+    assert first.get_scrape_job(job_id)["status"] == "leased"
+
+
+def test_lease_order_priority_then_deadline(database_url):
+    db = DatabaseManager(database_url)
+    bulk = enqueue(db, "BCN", priority=2)
+    interactive = enqueue(db, "MAD", priority=0)
+
+    assert db.lease_scrape_job("w", 60)["id"] == interactive
+    assert db.lease_scrape_job("w", 60)["id"] == bulk
+    assert db.lease_scrape_job("w", 60) is None
+
+
+def test_expired_lease_is_taken_over(database_url):
+    db = DatabaseManager(database_url)
+    job_id = enqueue(db, "BCN")
+
+    lost = db.lease_scrape_job("dead-worker", lease_seconds=-1)
+    taken = db.lease_scrape_job("live-worker", lease_seconds=60)
+
+    assert taken["id"] == job_id
+    assert taken["attempts"] == 2
+    # L'ancien détenteur ne peut plus prolonger ni terminer le job
+    assert not db.extend_scrape_job_lease(job_id, lost["lease_token"], 60)
+    assert not db.finish_scrape_job(job_id, lost["lease_token"], "done", result={"prices": {}})
+    assert db.finish_scrape_job(job_id, taken["lease_token"], "done", result={"prices": {"2026-11-03": 1.0}})
+    assert db.get_scrape_job(job_id)["result"] == {"prices": {"2026-11-03": 1.0}}
+
+
+def test_expired_lease_without_attempts_left_fails(database_url):
+    db = DatabaseManager(database_url)
+    job_id = db.enqueue_scrape_job(
+        "BRU", "BCN", "2026-11-01", "2026-11-30",
+        deadline=datetime.now() + timedelta(minutes=5), max_attempts=1
+    )
+    db.lease_scrape_job("dead-worker", lease_seconds=-1)
+
+    assert db.lease_scrape_job("live-worker", 60) is None
+    job = db.get_scrape_job(job_id)
+    assert job["status"] == "failed"
+    assert job["error_type"] == "LeaseExpired"
+
+
+def test_cancel_only_queued_jobs(database_url):
+    db = DatabaseManager(database_url)
+    enqueue(db, "BCN")
+    queued = enqueue(db, "MAD")
+    leased = db.lease_scrape_job("w", 60)["id"]
+
+    assert db.cancel_scrape_job(queued)
+    assert not db.cancel_scrape_job(leased)
+    assert db.get_scrape_job(queued)["status"] == "cancelled"
+    assert db.get_scrape_job(leased)["status"] == "leased"
+
+
+def test_two_worker_processes_share_one_sqlite_file(database_url, tmp_path):
+    db = DatabaseManager(database_url)
+    destinations = [f"D{i:02d}" for i in range(20)]
+    job_ids = [enqueue(db, destination) for destination in destinations]
+
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        LOG_FILE=str(tmp_path / "worker.log"),
+        PACING_ENABLED="false",
+        PYTHONPATH=str(ROOT_DIR),
+    )
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER_SCRIPT, f"worker-{i}"],
+            cwd=ROOT_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        for i in range(2)
+    ]
+    outputs = []
+    for worker in workers:
+        stdout, stderr = worker.communicate(timeout=120)
+        assert worker.returncode == 0, stderr
+        outputs.append(json.loads(stdout.strip().splitlines()[-1]))
+
+    # Chaque job exécuté une seule fois, par l'un ou l'autre process
+    executed = outputs[0] + outputs[1]
+    assert sorted(executed) == destinations
+    assert all(outputs), "les deux workers doivent avoir pris des jobs"
+
+    for job_id in job_ids:
+        job = db.get_scrape_job(job_id)
+        assert job["status"] == "done"
+        assert job["attempts"] == 1
+        assert job["result"] == {"prices": {"2026-11-01": 100.0}}
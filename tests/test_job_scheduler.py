@@ -0,0 +1,143 @@
+"""
+🧪 Tests de l'attribution des slots par priorité (SlotScheduler)
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.core.exceptions import CapacityError
+from src.core.job_scheduler import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_REFRESH,
+    SlotScheduler,
+    priority_for_trigger,
+)
+
+
+def make_scheduler(capacity, reserved=0, preemption=True):
+    preempted = []
+    scheduler = SlotScheduler(
+        lambda: capacity, preempted.append,
+        reserved_interactive=reserved, preemption_enabled=preemption
+    )
+    return scheduler, preempted
+
+
+def start_waiter(scheduler, started, job_id, priority, deadline_in=30.0):
+    """Lance un acquire bloquant; started reçoit le job_id à l'obtention du slot"""
+    def run():
+        scheduler.acquire(job_id, priority, time.time() + deadline_in)
+        started.append(job_id)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    # Attendre que le job soit en file
+    while job_id not in scheduler.waiting_job_ids() and job_id not in started:
+        time.sleep(0.01)
+    return thread
+
+
+def release_one_by_one(scheduler, started, running_id, count):
+    """Libère les slots un par un et renvoie l'ordre de démarrage"""
+    current = running_id
+    for _ in range(count):
+        before = len(started)
+        scheduler.release(current)
+        deadline = time.time() + 5
+        while len(started) == before and time.time() < deadline:
+            time.sleep(0.01)
+        current = started[-1]
+    return list(started)
+
+
+def test_priority_for_trigger():
+    assert priority_for_trigger("interactive") == PRIORITY_INTERACTIVE
+    assert priority_for_trigger("stale_refresh") == PRIORITY_REFRESH
+    assert priority_for_trigger("prewarm") == PRIORITY_REFRESH
+    assert priority_for_trigger("backfill") == PRIORITY_BULK
+
+
+def test_waiting_jobs_ordered_by_class_then_deadline():
+    scheduler, _ = make_scheduler(capacity=1)
+    scheduler.acquire("running", PRIORITY_BULK)
+    started = []
+
+    threads = [
+        start_waiter(scheduler, started, "bulk", PRIORITY_BULK, 5),
+        start_waiter(scheduler, started, "refresh-late", PRIORITY_REFRESH, 20),
+        start_waiter(scheduler, started, "refresh-soon", PRIORITY_REFRESH, 10),
+        start_waiter(scheduler, started, "interactive", PRIORITY_INTERACTIVE, 30),
+    ]
+    assert scheduler.waiting_job_ids() == ["interactive", "refresh-soon", "refresh-late", "bulk"]
+
+    order = release_one_by_one(scheduler, started, "running", 4)
+    assert order == ["interactive", "refresh-soon", "refresh-late", "bulk"]
+    for thread in threads:
+        thread.join(timeout=5)
+
+
+def test_reserved_slots_kept_for_interactive():
+    scheduler, _ = make_scheduler(capacity=3, reserved=1, preemption=False)
+    scheduler.acquire("r1", PRIORITY_REFRESH)
+    scheduler.acquire("r2", PRIORITY_REFRESH)
+
+    with pytest.raises(CapacityError):
+        scheduler.acquire("r3", PRIORITY_REFRESH, block=False)
+    scheduler.acquire("i1", PRIORITY_INTERACTIVE, block=False)
+
+    stats = scheduler.get_stats()
+    assert stats["running"] == {PRIORITY_INTERACTIVE: 1, PRIORITY_REFRESH: 2, PRIORITY_BULK: 0}
+    assert stats["rejected"] == 1
+
+
+@pytest.mark.parametrize("capacity", [1, 2])
+def test_small_pool_keeps_one_background_slot(capacity):
+    """Capacité <= slots réservés: refresh/bulk gardent un slot, pas plus"""
+    scheduler, _ = make_scheduler(capacity=capacity, reserved=2)
+    scheduler.acquire("refresh", PRIORITY_REFRESH, block=False)
+
+    with pytest.raises(CapacityError):
+        scheduler.acquire("bulk", PRIORITY_BULK, block=False)
+    assert scheduler.get_stats()["running"][PRIORITY_REFRESH] == 1
+
+
+def test_interactive_preempts_lowest_priority_job():
+    scheduler, preempted = make_scheduler(capacity=2)
+    scheduler.acquire("refresh", PRIORITY_REFRESH, time.time() + 100)
+    scheduler.acquire("bulk", PRIORITY_BULK, time.time() + 50)
+    started = []
+
+    thread = start_waiter(scheduler, started, "interactive", PRIORITY_INTERACTIVE)
+    deadline = time.time() + 5
+    while not preempted and time.time() < deadline:
+        time.sleep(0.01)
+
+    # Classe la plus basse d'abord, une seule préemption par requête en attente
+    time.sleep(0.2)
+    assert preempted == ["bulk"]
+    assert scheduler.get_stats()["preemptions"] == 1
+
+    scheduler.release("bulk")
+    thread.join(timeout=5)
+    assert started == ["interactive"]
+
+
+def test_no_preemption_when_disabled():
+    scheduler, preempted = make_scheduler(capacity=1, preemption=False)
+    scheduler.acquire("refresh", PRIORITY_REFRESH)
+
+    with pytest.raises(CapacityError):
+        scheduler.acquire("interactive", PRIORITY_INTERACTIVE, time.time() + 0.3)
+    assert preempted == []
+
+
+def test_interactive_never_preempts_interactive():
+    scheduler, preempted = make_scheduler(capacity=1)
+    scheduler.acquire("first", PRIORITY_INTERACTIVE)
+
+    with pytest.raises(CapacityError):
+        scheduler.acquire("second", PRIORITY_INTERACTIVE, time.time() + 0.3)
+    assert preempted == []
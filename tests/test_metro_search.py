@@ -0,0 +1,81 @@
+"""
+🧪 Tests de l'éclatement des codes métropole (expand_route, merge_min)
+"""
+
+import pytest
+
+from src.services.metro_search import MetroResult, expand_route, merge_min
+
+
+# ==================== EXPAND_ROUTE ====================
+
+def test_airport_to_airport_is_a_single_route():
+    assert expand_route("BRU", "BCN") == [("BRU", "BCN")]
+
+
+def test_metro_members_in_file_order():
+    assert expand_route("PAR", "BCN") == [("CDG", "BCN"), ("ORY", "BCN"), ("BVA", "BCN")]
+    assert expand_route("BRU", "NYC") == [("BRU", "JFK"), ("BRU", "EWR"), ("BRU", "LGA")]
+
+
+def test_metro_to_metro_cross_product():
+    routes = expand_route("PAR", "NYC")
+    assert len(routes) == 9
+    assert routes[0] == ("CDG", "JFK")
+    assert routes[-1] == ("BVA", "LGA")
+
+
+def test_same_airport_routes_are_dropped():
+    assert expand_route("CDG", "PAR") == [("CDG", "ORY"), ("CDG", "BVA")]
+    with pytest.raises(ValueError):
+        expand_route("CDG", "CDG")
+
+
+def test_too_many_routes():
+    # 3 aéroports à Paris x 6 à Londres > METRO_MAX_ROUTES
+    with pytest.raises(ValueError, match="maximum"):
+        expand_route("PAR", "LON")
+
+
+def test_codes_are_case_insensitive():
+    assert expand_route("par", "BCN") == expand_route("PAR", "BCN")
+
+
+# ==================== MERGE_MIN ====================
+
+def test_merge_min_keeps_cheapest_route_per_date():
+    results = {
+        ("CDG", "BCN"): {"2026-11-01": 80.0, "2026-11-02": 60.0},
+        ("ORY", "BCN"): {"2026-11-01": 55.0, "2026-11-03": 70.0},
+    }
+
+    prices, winners = merge_min(results)
+
+    assert prices == {"2026-11-01": 55.0, "2026-11-02": 60.0, "2026-11-03": 70.0}
+    assert winners == {
+        "2026-11-01": ("ORY", "BCN"),
+        "2026-11-02": ("CDG", "BCN"),
+        "2026-11-03": ("ORY", "BCN"),
+    }
+
+
+def test_merge_min_tie_goes_to_first_route():
+    results = {
+        ("CDG", "BCN"): {"2026-11-01": 50.0},
+        ("ORY", "BCN"): {"2026-11-01": 50.0},
+    }
+    assert merge_min(results)[1] == {"2026-11-01": ("CDG", "BCN")}
+
+
+def test_merge_min_empty():
+    assert merge_min({}) == ({}, {})
+    assert merge_min({("CDG", "BCN"): {}}) == ({}, {})
+
+
+def test_result_labels_and_cache_flag():
+    result = MetroResult(winners={"2026-11-01": ("ORY", "BCN")}, cached_routes=[("ORY", "BCN")])
+    assert result.route_labels() == {"2026-11-01": "ORY-BCN"}
+    assert result.from_cache
+
+    result.failed_routes[("CDG", "BCN")] = "timeout"
+    assert not result.from_cache
@@ -0,0 +1,141 @@
+"""
+🧪 Tests du token bucket de cadence (recharge, burst, buckets par proxy, RateLimitError)
+"""
+
+import pytest
+
+from src.core import pacing
+from src.core.exceptions import RateLimitError
+from src.core.pacing import BUCKET_NAME, PacingController
+
+
+class FakeClock:
+    """time.time / time.sleep du module pacing: le sommeil avance l'horloge"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(pacing, "time", clock)
+    return clock
+
+
+def make_controller(tmp_path, **kwargs):
+    # 3600/h = 1 jeton par seconde, burst de 3
+    options = {"requests_per_hour": 3600, "burst": 3, "enabled": True, **kwargs}
+    return PacingController(db_path=str(tmp_path / "pacing.db"), **options)
+
+
+@pytest.fixture
+def controller(tmp_path, clock):
+    return make_controller(tmp_path)
+
+
+# ==================== BURST ====================
+
+def test_full_bucket_allows_burst_without_waiting(controller, clock):
+    for _ in range(3):
+        assert controller.acquire() == 0.0
+    assert clock.sleeps == []
+
+
+def test_empty_bucket_waits_for_refill(controller, clock):
+    for _ in range(3):
+        controller.acquire()
+
+    waited = controller.acquire()
+    assert waited == pytest.approx(1.0, abs=0.3)
+    assert clock.sleeps
+
+
+def test_cost_above_capacity_is_capped(controller, clock):
+    assert controller.acquire(cost=10) == 0.0
+    # Bucket vidé d'un coup (coût ramené au burst)
+    with pytest.raises(RateLimitError):
+        controller.acquire(timeout=0.5)
+
+
+# ==================== RECHARGE ====================
+
+def test_refill_at_configured_rate(controller, clock):
+    for _ in range(3):
+        controller.acquire()
+
+    clock.now += 2.0
+    assert controller.acquire() == 0.0
+    assert controller.acquire() == 0.0
+    with pytest.raises(RateLimitError):
+        controller.acquire(timeout=0.5)
+
+
+def test_refill_is_capped_at_burst(controller, clock):
+    controller.acquire()
+    clock.now += 3600
+    for _ in range(3):
+        assert controller.acquire() == 0.0
+    with pytest.raises(RateLimitError):
+        controller.acquire(timeout=0.5)
+
+
+# ==================== BUCKETS PAR PROXY ====================
+
+def test_proxy_buckets_are_independent(controller, clock):
+    for _ in range(3):
+        controller.acquire()
+
+    proxy = "http://10.0.0.1:3128"
+    for _ in range(3):
+        assert controller.acquire(bucket=proxy) == 0.0
+    with pytest.raises(RateLimitError):
+        controller.acquire(timeout=0.5, bucket=proxy)
+
+    buckets = controller.get_stats()["buckets"]
+    assert set(buckets) == {BUCKET_NAME, proxy}
+
+
+def test_bucket_is_shared_through_sqlite(tmp_path, clock):
+    # Deux contrôleurs = deux process sur le même fichier
+    first, second = make_controller(tmp_path), make_controller(tmp_path)
+    for _ in range(3):
+        first.acquire()
+    with pytest.raises(RateLimitError):
+        second.acquire(timeout=0.5)
+
+
+# ==================== TIMEOUT ====================
+
+def test_rate_limit_error_when_wait_exceeds_timeout(controller, clock):
+    for _ in range(3):
+        controller.acquire()
+
+    with pytest.raises(RateLimitError) as info:
+        controller.acquire(cost=2, timeout=1.0)
+    assert info.value.details["wait_seconds"] == pytest.approx(2.0)
+    # Refus immédiat, sans dormir ni consommer
+    assert clock.sleeps == []
+    clock.now += 2.0
+    assert controller.acquire(cost=2) == 0.0
+
+
+def test_wait_within_timeout_succeeds(controller, clock):
+    for _ in range(3):
+        controller.acquire()
+    assert controller.acquire(timeout=5.0) > 0
+
+
+def test_disabled_controller_never_waits(tmp_path, clock):
+    controller = make_controller(tmp_path, enabled=False)
+    for _ in range(10):
+        assert controller.acquire() == 0.0
+    assert not (tmp_path / "pacing.db").exists()
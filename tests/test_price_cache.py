@@ -0,0 +1,121 @@
+"""
+🧪 Tests du cache mémoire des prix (PriceCache)
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.services.price_cache import PriceCache, month_bounds, month_keys, month_ranges
+
+
+ROUTE = ("BRU", "BCN")
+
+
+@pytest.fixture
+def cache():
+    return PriceCache(max_entries=10, ttl_minutes=60, stale_ttl_minutes=1440)
+
+
+def fill(cache, start, end, rows, generation=None):
+    month_start, month_end = month_bounds(start, end)
+    cache.put_rows(*ROUTE, month_start, month_end, rows, generation=generation)
+
+
+def test_month_helpers():
+    assert month_keys("2026-11-15", "2027-01-03") == ["2026-11", "2026-12", "2027-01"]
+    assert month_ranges("2026-11-15", "2027-02-10", ["2026-11", "2026-12", "2027-02"]) == [
+        ("2026-11-15", "2026-12-31"),
+        ("2027-02-01", "2027-02-10"),
+    ]
+
+
+def test_lookup_miss_then_hit(cache):
+    assert cache.lookup(*ROUTE, "2026-11-01", "2026-11-30") is None
+
+    now = datetime.now()
+    fill(cache, "2026-11-01", "2026-11-30", [("2026-11-03", 50.0, now), ("2026-11-20", 70.0, now)])
+
+    prices, stale = cache.lookup(*ROUTE, "2026-11-01", "2026-11-10")
+    assert prices == {"2026-11-03": 50.0}
+    assert stale == []
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_lookup_needs_every_month(cache):
+    fill(cache, "2026-11-01", "2026-11-30", [("2026-11-03", 50.0, datetime.now())])
+    assert cache.lookup(*ROUTE, "2026-11-01", "2026-12-15") is None
+
+
+def test_empty_month_is_negative_block(cache):
+    fill(cache, "2026-11-01", "2026-11-30", [])
+    assert cache.lookup(*ROUTE, "2026-11-01", "2026-11-30") == ({}, [])
+
+
+def test_stale_block_served_only_when_allowed(cache):
+    scraped_at = datetime.now() - timedelta(hours=2)
+    fill(cache, "2026-11-01", "2026-11-30", [("2026-11-03", 50.0, scraped_at)])
+
+    # Au-delà du TTL frais mais dans la fenêtre stale (horizon TTL max)
+    block = cache._blocks[(*ROUTE, "2026-11")]
+    block.fresh_until = time.time() - 1
+
+    assert cache.lookup(*ROUTE, "2026-11-01", "2026-11-30") is None
+    prices, stale = cache.lookup(*ROUTE, "2026-11-01", "2026-11-30", allow_stale=True)
+    assert prices == {"2026-11-03": 50.0}
+    assert stale == ["2026-11"]
+
+
+def test_invalidate_dates_drops_their_months(cache):
+    now = datetime.now()
+    fill(cache, "2026-11-01", "2026-12-31", [("2026-11-03", 50.0, now), ("2026-12-03", 60.0, now)])
+
+    cache.invalidate(*ROUTE, ["2026-12-03"])
+
+    assert cache.lookup(*ROUTE, "2026-11-01", "2026-11-30") is not None
+    assert cache.lookup(*ROUTE, "2026-12-01", "2026-12-31") is None
+
+
+def test_invalidate_whole_route(cache):
+    now = datetime.now()
+    fill(cache, "2026-11-01", "2026-12-31", [("2026-11-03", 50.0, now), ("2026-12-03", 60.0, now)])
+    cache.put_rows("BRU", "MAD", "2026-11-01", "2026-11-31", [("2026-11-03", 40.0, now)])
+
+    cache.invalidate(*ROUTE)
+
+    assert cache.lookup(*ROUTE, "2026-11-01", "2026-11-30") is None
+    assert cache.lookup("BRU", "MAD", "2026-11-01", "2026-11-30") is not None
+    assert cache.get_stats()["invalidations"] == 2
+
+
+def test_put_rows_after_invalidate_is_ignored(cache):
+    """Lecture en base commencée avant une sauvegarde: les anciens prix ne reviennent pas"""
+    generation = cache.generation(*ROUTE)
+    cache.invalidate(*ROUTE, ["2026-11-03"])
+
+    fill(cache, "2026-11-01", "2026-11-30", [("2026-11-03", 50.0, datetime.now())], generation=generation)
+    assert cache.lookup(*ROUTE, "2026-11-01", "2026-11-30") is None
+
+    fill(cache, "2026-11-01", "2026-11-30", [("2026-11-03", 45.0, datetime.now())],
+         generation=cache.generation(*ROUTE))
+    assert cache.lookup(*ROUTE, "2026-11-01", "2026-11-30")[0] == {"2026-11-03": 45.0}
+
+
+def test_put_rows_after_clear_is_ignored(cache):
+    generation = cache.generation(*ROUTE)
+    cache.clear()
+
+    fill(cache, "2026-11-01", "2026-11-30", [("2026-11-03", 50.0, datetime.now())], generation=generation)
+    assert cache.lookup(*ROUTE, "2026-11-01", "2026-11-30") is None
+
+
+def test_lru_eviction():
+    cache = PriceCache(max_entries=2, ttl_minutes=60, stale_ttl_minutes=1440)
+    now = datetime.now()
+    for month in ("2026-11", "2026-12", "2027-01"):
+        cache.put_rows(*ROUTE, f"{month}-01", f"{month}-31", [(f"{month}-03", 50.0, now)])
+
+    assert cache.lookup(*ROUTE, "2026-11-01", "2026-11-30") is None
+    assert cache.lookup(*ROUTE, "2027-01-01", "2027-01-31") is not None
+    assert cache.get_stats()["evictions"] == 1
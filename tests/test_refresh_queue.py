@@ -0,0 +1,124 @@
+"""
+🧪 Tests de la file de rafraîchissement (ordre et ETA)
+"""
+
+import time
+
+import pytest
+
+from src.services import refresh_queue as refresh_module
+from src.services.refresh_queue import (
+    ORDER_DEADLINE,
+    ORDER_FIFO,
+    ORDER_SJF,
+    RefreshQueue,
+    simulate_starts,
+)
+
+
+# Durée estimée par destination (secondes)
+DURATIONS = {"BCN": 30.0, "MAD": 10.0, "LIS": 20.0}
+
+
+@pytest.fixture(autouse=True)
+def fake_estimator(monkeypatch):
+    def estimate(origin, destination, start_date, end_date, at=None):
+        return {"months": 1, "duration_seconds": DURATIONS[destination]}
+
+    monkeypatch.setattr(refresh_module.job_estimator, "estimate", estimate)
+    monkeypatch.setattr(refresh_module.job_estimator, "refresh", lambda force=False: 0)
+
+
+def make_queue(order, workers=1):
+    queue = RefreshQueue(max_workers=workers, order=order)
+    # Pas de thread: les jobs restent en file
+    queue._ensure_workers = lambda: None
+    return queue
+
+
+def schedule_all(queue, deadlines):
+    now = time.time()
+    for destination, deadline_in in deadlines.items():
+        queue.schedule("BRU", destination, "2026-11-01", "2026-11-30", deadline=now + deadline_in)
+
+
+def routes(jobs):
+    return [job["route"] for job in jobs]
+
+
+def test_deadline_order():
+    queue = make_queue(ORDER_DEADLINE)
+    schedule_all(queue, {"BCN": 300, "MAD": 600, "LIS": 100})
+    assert routes(queue.get_queue()) == ["BRU-LIS", "BRU-BCN", "BRU-MAD"]
+
+
+def test_deadline_ties_broken_by_estimate():
+    # Même échéance: le plus court d'abord
+    now = time.time()
+    queue = make_queue(ORDER_DEADLINE)
+    for destination in ("BCN", "MAD", "LIS"):
+        queue.schedule("BRU", destination, "2026-11-01", "2026-11-30", deadline=now + 300)
+    assert routes(queue.get_queue()) == ["BRU-MAD", "BRU-LIS", "BRU-BCN"]
+
+
+def test_sjf_order():
+    queue = make_queue(ORDER_SJF)
+    schedule_all(queue, {"BCN": 100, "MAD": 600, "LIS": 300})
+    assert routes(queue.get_queue()) == ["BRU-MAD", "BRU-LIS", "BRU-BCN"]
+
+
+def test_fifo_order():
+    queue = make_queue(ORDER_FIFO)
+    schedule_all(queue, {"BCN": 600, "MAD": 100, "LIS": 300})
+    assert routes(queue.get_queue()) == ["BRU-BCN", "BRU-MAD", "BRU-LIS"]
+
+
+def test_eta_single_worker():
+    queue = make_queue(ORDER_SJF)
+    schedule_all(queue, {"BCN": 0, "MAD": 0, "LIS": 0})
+
+    jobs = queue.get_queue()
+    assert [job["eta_start_seconds"] for job in jobs] == pytest.approx([0, 10, 30], abs=0.2)
+    assert [job["eta_seconds"] for job in jobs] == pytest.approx([10, 30, 60], abs=0.2)
+    assert all(job["status"] == "queued" for job in jobs)
+
+
+def test_eta_two_workers():
+    queue = make_queue(ORDER_SJF, workers=2)
+    schedule_all(queue, {"BCN": 0, "MAD": 0, "LIS": 0})
+
+    jobs = queue.get_queue()
+    # MAD et LIS démarrent tout de suite, BCN à la fin de MAD
+    assert [job["eta_start_seconds"] for job in jobs] == pytest.approx([0, 0, 10], abs=0.2)
+    assert [job["eta_seconds"] for job in jobs] == pytest.approx([10, 20, 40], abs=0.2)
+
+
+def test_duplicate_months_are_deduplicated():
+    queue = make_queue(ORDER_DEADLINE)
+    assert queue.schedule("BRU", "BCN", "2026-11-01", "2026-12-31")
+    assert not queue.schedule("BRU", "BCN", "2026-11-10", "2026-11-20")
+    assert queue.schedule("BRU", "BCN", "2026-11-10", "2027-01-20")
+
+    stats = queue.get_stats()
+    assert stats["queued"] == 2
+    assert stats["deduplicated"] == 1
+    assert stats["inflight_months"] == 3
+
+
+def test_schedule_months_only_stale_ranges():
+    queue = make_queue(ORDER_FIFO)
+    started = queue.schedule_months("BRU", "BCN", "2026-11-15", "2027-02-10", ["2026-11", "2027-02"])
+
+    assert started == 2
+    assert [(job["start_date"], job["end_date"]) for job in queue.get_queue()] == [
+        ("2026-11-15", "2026-11-30"),
+        ("2027-02-01", "2027-02-10"),
+    ]
+
+
+def test_simulate_starts_with_running_jobs():
+    now = 1000.0
+    # Un worker occupé jusqu'à +20s, un libre
+    assert simulate_starts([1020.0], [5.0, 5.0, 5.0], workers=2, now=now) == [1000.0, 1005.0, 1010.0]
+    # Fin estimée dépassée: le worker est considéré libre maintenant
+    assert simulate_starts([990.0], [5.0], workers=1, now=now) == [1000.0]
@@ -0,0 +1,94 @@
+"""
+🧪 Tests de la politique TTL adaptative (TTLPolicy)
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.services.ttl_policy import MAX_VOLATILITY_FACTOR, MIN_TTL_MINUTES, TTLPolicy
+
+
+TODAY = date(2026, 10, 1)
+
+
+@pytest.fixture
+def policy():
+    return TTLPolicy(base_ttl_minutes=60, max_ttl_minutes=720, reference_change_rate=0.05, enabled=True)
+
+
+def test_ttl_grows_with_departure_distance(policy):
+    tomorrow = policy.ttl_minutes("2026-10-02", today=TODAY)
+    next_month = policy.ttl_minutes("2026-11-01", today=TODAY)
+    next_year = policy.ttl_minutes("2027-08-01", today=TODAY)
+
+    assert tomorrow == 60
+    assert tomorrow < next_month < next_year
+    assert next_year == 600
+
+
+def test_ttl_capped_by_max(policy):
+    # Route très calme: facteur de volatilité maximal, borné par max_ttl_minutes
+    assert policy.ttl_minutes("2027-08-01", change_rate=0.001, today=TODAY) == 720
+
+
+def test_volatile_route_gets_shorter_ttl(policy):
+    calm = policy.ttl_minutes("2026-11-01", change_rate=0.01, today=TODAY)
+    unknown = policy.ttl_minutes("2026-11-01", today=TODAY)
+    volatile = policy.ttl_minutes("2026-11-01", change_rate=0.5, today=TODAY)
+
+    assert volatile < unknown < calm
+    assert volatile >= MIN_TTL_MINUTES
+
+
+def test_volatility_factor_bounds(policy):
+    assert policy.volatility_factor(None) == 1.0
+    assert policy.volatility_factor(0) == MAX_VOLATILITY_FACTOR
+    assert policy.volatility_factor(0.05) == 1.0
+
+
+def test_disabled_policy_uses_base_ttl():
+    policy = TTLPolicy(base_ttl_minutes=60, enabled=False)
+    assert policy.ttl_minutes("2027-08-01", change_rate=0.001, today=TODAY) == 60
+    assert policy.horizon_ttl_minutes == 60
+
+
+def test_observe_measures_relative_change_per_day(policy):
+    now = datetime(2026, 10, 3, 12, 0)
+    previous = [
+        ("2026-11-01", 100.0, now - timedelta(days=2)),
+        ("2026-11-02", 200.0, now - timedelta(days=2)),
+    ]
+
+    rate = policy.observe("BRU", "BCN", previous, {"2026-11-01": 110.0, "2026-11-02": 180.0}, now=now)
+
+    # 10% de variation moyenne en 2 jours
+    assert rate == pytest.approx(0.05)
+    assert policy.change_rate("BRU", "BCN") == pytest.approx(0.05)
+    assert policy.pop_last_observation("BRU", "BCN") == pytest.approx(0.05)
+    assert policy.pop_last_observation("BRU", "BCN") is None
+
+
+def test_observe_ignores_close_rescrapes_and_missing_dates(policy):
+    now = datetime(2026, 10, 3, 12, 0)
+    recent = [("2026-11-01", 100.0, now - timedelta(minutes=10))]
+    assert policy.observe("BRU", "BCN", recent, {"2026-11-01": 150.0}, now=now) is None
+
+    old = [("2026-11-01", 100.0, now - timedelta(days=1))]
+    assert policy.observe("BRU", "BCN", old, {"2026-11-05": 150.0}, now=now) is None
+    assert policy.change_rate("BRU", "BCN") is None
+
+
+def test_observe_smooths_successive_rates(policy):
+    policy.record_change_rate("BRU", "BCN", 0.10)
+    smoothed = policy.record_change_rate("BRU", "BCN", 0.0)
+    assert smoothed == pytest.approx(0.07)
+
+
+def test_stale_months(policy):
+    now = datetime(2026, 10, 1, 12, 0)
+    rows = [
+        ("2026-10-02", 50.0, now - timedelta(hours=2)),    # TTL 60 min: périmé
+        ("2027-08-01", 80.0, now - timedelta(hours=2)),    # TTL 600 min: frais
+    ]
+    assert policy.stale_months("BRU", "BCN", rows, now=now) == ["2026-10"]